@@ -9,7 +9,7 @@ Automatikus és manuális biztonsági mentés kezelése.
 """
 
 import os
-import shutil
+import sqlite3
 import zipfile
 import logging
 from datetime import datetime, timedelta
@@ -17,6 +17,22 @@ from datetime import datetime, timedelta
 logger = logging.getLogger(__name__)
 
 
+def copy_database(src_path: str, dest_path: str):
+    """
+    Konzisztens adatbázis másolat az SQLite online backup API-val.
+    WAL módban a .db fájl puszta másolása elveszítené a -wal fájlban lévő
+    módosításokat; ez viszont írás közben is használható, és élő
+    adatbázisba visszaállításra is alkalmas.
+    """
+    src = sqlite3.connect(src_path)
+    dst = sqlite3.connect(dest_path)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+
+
 class BackupManager:
     def __init__(self, base_dir: str, db_path: str, backup_keep_days: int = 30):
         self.base_dir = base_dir
@@ -42,7 +58,7 @@ class BackupManager:
             return False
 
         try:
-            shutil.copy2(self.db_path, today_backup)
+            copy_database(self.db_path, today_backup)
             logger.info(f"Automatikus backup elkészült: {today_backup}")
             self._cleanup_old_backups()
             return True
@@ -76,10 +92,12 @@ class BackupManager:
         dest_path: a kívánt ZIP fájl elérési útja
         """
         upload_dir = os.path.join(self.base_dir, "csatolmanyok")
+        snapshot = os.path.join(self.backup_dir, "_export_snapshot.db")
         try:
+            copy_database(self.db_path, snapshot)
             with zipfile.ZipFile(dest_path, "w", zipfile.ZIP_DEFLATED) as zf:
                 # Adatbázis
-                zf.write(self.db_path, arcname="auto_naplo.db")
+                zf.write(snapshot, arcname="auto_naplo.db")
 
                 # Csatolmányok
                 if os.path.exists(upload_dir):
@@ -97,6 +115,9 @@ class BackupManager:
         except Exception as e:
             logger.error(f"ZIP export hiba: {e}")
             return False
+        finally:
+            if os.path.exists(snapshot):
+                os.remove(snapshot)
 
     # ------------------------------------------------------------------
     # ZIP import (visszaállítás)
@@ -113,7 +134,7 @@ class BackupManager:
             f"pre_import_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
         )
         try:
-            shutil.copy2(self.db_path, pre_backup)
+            copy_database(self.db_path, pre_backup)
         except Exception as e:
             return False, f"Nem sikerült előzetes mentést készíteni:\n{e}"
 
@@ -124,9 +145,14 @@ class BackupManager:
                 if "auto_naplo.db" not in names:
                     return False, "A ZIP fájl nem tartalmaz érvényes WheelBooK adatbázist!"
 
-                # Adatbázis visszaállítása
-                with zf.open("auto_naplo.db") as src, open(self.db_path, "wb") as dst:
+                # Adatbázis visszaállítása – kicsomagolás, majd backup API az élő fájlba
+                extracted = os.path.join(self.backup_dir, "_import_tmp.db")
+                with zf.open("auto_naplo.db") as src, open(extracted, "wb") as dst:
                     dst.write(src.read())
+                try:
+                    copy_database(extracted, self.db_path)
+                finally:
+                    os.remove(extracted)
 
                 # Csatolmányok visszaállítása
                 upload_dir = os.path.join(self.base_dir, "csatolmanyok")
@@ -143,10 +169,10 @@ class BackupManager:
 
         except zipfile.BadZipFile:
             # Visszaállítjuk az eredeti DB-t
-            shutil.copy2(pre_backup, self.db_path)
+            copy_database(pre_backup, self.db_path)
             return False, "Sérült vagy érvénytelen ZIP fájl!"
         except Exception as e:
-            shutil.copy2(pre_backup, self.db_path)
+            copy_database(pre_backup, self.db_path)
             return False, f"Visszaállítási hiba:\n{e}"
 
     # ------------------------------------------------------------------
@@ -176,8 +202,8 @@ class BackupManager:
             f"pre_restore_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
         )
         try:
-            shutil.copy2(self.db_path, pre)
-            shutil.copy2(backup_path, self.db_path)
+            copy_database(self.db_path, pre)
+            copy_database(backup_path, self.db_path)
             return True, "Visszaállítás sikeres! Az alkalmazás újraindítása szükséges."
         except Exception as e:
             return False, f"Visszaállítási hiba:\n{e}"
@@ -0,0 +1,526 @@
+"""
+chart_renderer.py
+-----------------
+Grafikonok háttérszálas rajzolása mindkét felülethez (CustomTkinter és PyQt6).
+- A grafikonok pyplot nélkül, saját Figure + Agg vásznon készülnek, így
+  bármely szálon rajzolhatók; az eredmény PNG bájtsor, amit a felület
+  képként jelenít meg (élő vászon nélkül)
+- Kulcs: (autó, grafikon típus, adat generáció, téma, DPI); a generáció a
+  rajzolt adatok tartalmi lenyomata, így a lemezen tárolt kép újraindítás
+  után is érvényes, és bármely írás után magától elavul
+- Két szintű gyorsítótár: memória (LRU, bájt korlát) és lemez (a korlát
+  felett a legrégebben használt fájlok törlődnek)
+- Saját worker szál (submit) a Tk felülethez; a Qt a DataLoader szálain
+  hívja a render()-t
+
+- A grafikon típusok hosszú életű Figure-öket tartanak (LiveChart):
+  frissítéskor az artistek helyben változnak, változatlan elrendezésnél
+  a statikus háttér visszatöltésével (blitting)
+
+A grafikon típusok a CHARTS táblában: név -> LiveChart alosztály.
+"""
+
+import hashlib
+import io
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from lazy_import import lazy, available
+
+# A NumPy és a matplotlib az első rajzoláskor (vagy előtöltéskor) töltődik be
+np = lazy("numpy")
+_figure = lazy("matplotlib.figure")
+_agg = lazy("matplotlib.backends.backend_agg")
+_image = lazy("matplotlib.image")
+_patches = lazy("matplotlib.patches")
+_ticker = lazy("matplotlib.ticker")
+HAS_MPL = available("matplotlib")
+
+logger = logging.getLogger(__name__)
+
+# A matplotlib betűkészlet gyorsítótára nem szálbiztos, a Figure-ök pedig
+# közösek: egyszerre egy rajzolás fut
+_render_lock = threading.Lock()
+
+
+def _ft(x, _=None) -> str:
+    return f"{int(x):,}".replace(",", " ")
+
+
+def _nice_limits(lo: float, hi: float) -> tuple[float, float]:
+    """Kerek tengely határok az adat köré: amíg az adat belefér, a tengely (és a háttér) nem változik."""
+    if not hi > lo:
+        hi = lo + 1
+    ticks = _ticker.MaxNLocator(nbins=6).tick_values(lo, hi)
+    return float(ticks[0]), float(ticks[-1])
+
+
+def _png(canvas) -> bytes:
+    buf = io.BytesIO()
+    _image.imsave(buf, np.asarray(canvas.buffer_rgba()), format="png")
+    return buf.getvalue()
+
+
+# ----------------------------------------------------------------------
+# Grafikon típusok
+# ----------------------------------------------------------------------
+
+class LiveChart:
+    """
+    Hosszú életű Figure egy grafikon típushoz (és DPI-hez).
+
+    Az első rajzoláskor (vagy témaváltáskor) készülnek a tengelyek; utána
+    frissítéskor csak az adat artistek változnak helyben (oszlop magasság,
+    vonal adat, feliratok). Ha az elrendezés – tengely határok, tick-ek,
+    címkék – is ugyanaz, a statikus háttér visszatöltődik (blitting), és
+    csak az adat artistek rajzolódnak újra; különben teljes rajzolás és új
+    háttér mentés.
+
+    Alosztályok: setup(c), layout(*data) -> összehasonlítható kulcs,
+    apply_layout(layout, *data), update(*data) – az utóbbi a self.dynamic
+    listába teszi a háttér fölé rajzolandó (animated) artisteket.
+    """
+    figsize = (10, 3.0)
+    pad = 1.5
+
+    def __init__(self, dpi: int):
+        self.fig = _figure.Figure(figsize=self.figsize, dpi=dpi)
+        self.canvas = _agg.FigureCanvasAgg(self.fig)
+        self.colors = None
+        self.dynamic = []
+        self._layout = None
+        self._background = None
+        self.full_draws = 0
+        self.blits = 0
+
+    @staticmethod
+    def slot(*data):
+        """Külön Figure azonos típuson belül (pl. idősor címenként); alapból egy van."""
+        return None
+
+    def render(self, colors: dict, *data) -> bytes:
+        if colors != self.colors:
+            self.fig.clear()
+            self.fig.patch.set_facecolor(colors["bg"])
+            self.colors = colors
+            self.dynamic = []
+            self._layout = None
+            self.setup(colors)
+        self.update(*data)
+        layout = self.layout(*data)
+        if layout != self._layout:
+            self.apply_layout(layout, *data)
+            self.fig.tight_layout(pad=self.pad)
+            self.canvas.draw()                  # az animated artistek nélkül
+            self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+            self._layout = layout
+            self.full_draws += 1
+        else:
+            self.canvas.restore_region(self._background)
+            self.blits += 1
+        for artist in self.dynamic:
+            self.fig.draw_artist(artist)
+        return _png(self.canvas)
+
+    def _dyn(self, artist):
+        artist.set_animated(True)
+        self.dynamic.append(artist)
+        return artist
+
+    def _style(self, ax, title):
+        c = self.colors
+        ax.set_facecolor(c["bg"])
+        ax.set_title(title, color=c["fg"], fontsize=10, pad=8)
+        ax.tick_params(colors=c["fg"], labelsize=8)
+        for spine in ax.spines.values():
+            spine.set_color(c["grid"])
+        ax.yaxis.grid(True, color=c["grid"], alpha=0.4, zorder=0)
+        ax.set_axisbelow(True)
+
+    @staticmethod
+    def _ticks(ax, labels, rotation, fontsize=8):
+        ax.set_xticks(range(len(labels)))
+        ax.set_xticklabels(labels, rotation=rotation, ha="right", fontsize=fontsize)
+        ax.set_xlim(-0.5, len(labels) - 0.5)
+
+    def _set_bars(self, ax, bars, heights, offset=0.0, width=0.6, **kw):
+        """Oszlopok helyben frissítve; új oszlop készlet csak darabszám változáskor."""
+        if bars is None or len(bars) != len(heights):
+            if bars is not None:
+                bars.remove()
+            bars = ax.bar(np.arange(len(heights)) + offset, heights, width=width, zorder=3, **kw)
+        else:
+            for rect, h in zip(bars, heights):
+                rect.set_height(h)
+        for rect in bars:
+            self._dyn(rect)
+        return bars
+
+
+class HaviChart(LiveChart):
+    """Havi tankolási költség és mennyiség oszlopokkal, értékekkel az oszlopok tetején."""
+    figsize = (11, 3.0)
+    SERIES = (("Havi tankolási költség", "#3b82f6", lambda x: _ft(x) + " Ft"),
+              ("Havi tankolási mennyiség", "#10b981", lambda x: f"{x:.1f} L"))
+
+    def setup(self, c):
+        self.axes = self.fig.subplots(1, 2)
+        self.bars = [None, None]
+        for ax, (title, _, _) in zip(self.axes, self.SERIES):
+            self._style(ax, title)
+
+    def layout(self, honapok, ossz, literek):
+        return (tuple(honapok),) + tuple(_nice_limits(0, max(v) * 1.1 if len(v) else 1)
+                                         for v in (ossz, literek))
+
+    def apply_layout(self, layout, honapok, ossz, literek):
+        for ax, ylim in zip(self.axes, layout[1:]):
+            self._ticks(ax, honapok, rotation=40)
+            ax.set_ylim(*ylim)
+
+    def update(self, honapok, ossz, literek):
+        self.dynamic = []
+        for i, (ax, adatok, (_, szin, fmt)) in enumerate(zip(self.axes, (ossz, literek), self.SERIES)):
+            self.bars[i] = self._set_bars(ax, self.bars[i], adatok, color=szin, alpha=0.85)
+            for t in list(ax.texts):
+                t.remove()
+            top = max(adatok) if len(adatok) else 0
+            for x, v in enumerate(adatok):
+                if v > 0:
+                    self._dyn(ax.text(x, v + top * 0.01, fmt(v), ha="center", va="bottom",
+                                      fontsize=7, color=self.colors["fg"], fontweight="bold"))
+
+
+class FogyasztasChart(LiveChart):
+    """Tankolásonkénti fogyasztás vonallal, átlag vonallal és az eltérés kitöltésével."""
+    figsize = (11, 2.7)
+
+    def setup(self, c):
+        self.ax = self.fig.subplots()
+        self._style(self.ax, "Fogyasztás tankolásról tankolásra (L/100km)")
+        self.ax.set_ylabel("L/100km", color=c["fg"], fontsize=9)
+        self.line, = self.ax.plot([], [], color="#ef4444", linewidth=2.0,
+                                  marker="o", markersize=7, markerfacecolor="#ef4444",
+                                  markeredgecolor=c["bg"], markeredgewidth=1.5, zorder=4)
+        self.avg = self.ax.axhline(0, color="#f97316", linewidth=1.5, linestyle="--",
+                                   alpha=0.8, zorder=3)
+        self.fills = []
+
+    def layout(self, x_vals, y_vals, x_labels):
+        lo, hi = _nice_limits(max(0, min(y_vals) - 1), max(y_vals) + 1.5)
+        return tuple(x_vals.tolist()), tuple(x_labels), (lo, hi)
+
+    def apply_layout(self, layout, x_vals, y_vals, x_labels):
+        ax = self.ax
+        ax.set_xticks(x_vals)
+        ax.set_xticklabels(x_labels, rotation=40, ha="right", fontsize=7)
+        ax.set_xlim(x_vals[0] - 0.5, x_vals[-1] + 0.5)
+        ax.set_ylim(*layout[2])
+
+    def update(self, x_vals, y_vals, x_labels):
+        ax, c = self.ax, self.colors
+        avg_line = float(np.mean(y_vals))
+        self.dynamic = []
+        self.line.set_data(x_vals, y_vals)
+        self.avg.set_ydata([avg_line, avg_line])
+        self.avg.set_label(f"Átlag: {avg_line:.1f} L/100km")
+        for artist in self.fills + list(ax.texts):
+            artist.remove()
+        self.fills = [
+            ax.fill_between(x_vals, y_vals, avg_line, where=y_vals >= avg_line,
+                            alpha=0.15, color="#ef4444", zorder=2, interpolate=True),
+            ax.fill_between(x_vals, y_vals, avg_line, where=y_vals < avg_line,
+                            alpha=0.15, color="#22c55e", zorder=2, interpolate=True),
+        ]
+        for artist in self.fills + [self.avg, self.line]:
+            self._dyn(artist)
+        for xi, yi in zip(x_vals, y_vals):
+            self._dyn(ax.annotate(f"{yi:.1f}", xy=(xi, yi), xytext=(0, 10 if yi >= avg_line else -16),
+                                  textcoords="offset points", ha="center", fontsize=7.5,
+                                  color=c["fg"], fontweight="bold"))
+        self._dyn(ax.legend(handles=[self.avg], facecolor=c["bg"], edgecolor=c["grid"],
+                            labelcolor=c["fg"], fontsize=9))
+
+
+class EvesChart(LiveChart):
+    """Egy év havi kiadásai kategóriánként, csoportosított oszlopokkal."""
+    figsize = (10, 2.7)
+    pad = 1.2
+    WIDTH = 0.28
+    SERIES = (("⛽ Tankolás", "#3b82f6", -WIDTH), ("🔧 Karbantartás", "#10b981", 0.0),
+              ("📦 Egyéb", "#f97316", WIDTH))
+
+    def setup(self, c):
+        self.ax = self.fig.subplots()
+        self._style(self.ax, "")
+        self.ax.yaxis.grid(True, color=c["grid"], alpha=0.5, zorder=0)
+        self.ax.yaxis.set_major_formatter(_ticker.FuncFormatter(_ft))
+        self.ax.legend(handles=[_patches.Patch(color=szin, alpha=0.85, label=nev) for nev, szin, _ in self.SERIES],
+                       facecolor=c["bg"], edgecolor=c["grid"], labelcolor=c["fg"], fontsize=8)
+        self.bars = [None] * len(self.SERIES)
+
+    def layout(self, ev, honapok, *values):
+        top = max((max(v) for v in values if len(v)), default=0)
+        return ev, tuple(honapok), _nice_limits(0, top * 1.05 or 1)
+
+    def apply_layout(self, layout, ev, honapok, *values):
+        self.ax.set_title(f"{ev} – havi kiadások kategóriánként",
+                          color=self.colors["fg"], fontsize=10, pad=8)
+        self._ticks(self.ax, honapok, rotation=30)
+        self.ax.set_ylim(*layout[2])
+
+    def update(self, ev, honapok, *values):
+        self.dynamic = []
+        for i, (adatok, (_, szin, offset)) in enumerate(zip(values, self.SERIES)):
+            self.bars[i] = self._set_bars(self.ax, self.bars[i], adatok, offset=offset,
+                                          width=self.WIDTH, color=szin, alpha=0.85)
+
+
+class IdosorChart(LiveChart):
+    """Egyszerű idősor vonal pontokkal (Tk statisztika); címenként külön Figure."""
+    figsize = (10, 2.5)
+    pad = 1.08
+
+    @staticmethod
+    def slot(title, x, y, color):
+        return title
+
+    def setup(self, c):
+        self.ax = self.fig.subplots()
+        self.ax.set_facecolor(c["bg"])
+        self.ax.tick_params(colors=c["fg"])
+        self.line = None
+
+    def layout(self, title, x, y, color):
+        return title, tuple(x), _nice_limits(min(y), max(y)) if len(y) else (0.0, 1.0)
+
+    def apply_layout(self, layout, title, x, y, color):
+        self.ax.set_title(title, fontsize=10, fontweight="bold", color=self.colors["fg"])
+        self._ticks(self.ax, x, rotation=20)
+        self.ax.set_ylim(*layout[2])
+
+    def update(self, title, x, y, color):
+        if self.line is None:
+            self.line, = self.ax.plot([], [], marker="o", linewidth=2)
+        self.line.set_data(np.arange(len(y)), y)
+        self.line.set_color(color)
+        self.dynamic = [self.line]
+        self.line.set_animated(True)
+
+
+CHARTS = {
+    "havi":       HaviChart,
+    "fogyasztas": FogyasztasChart,
+    "eves":       EvesChart,
+    "idosor":     IdosorChart,
+}
+
+
+# ----------------------------------------------------------------------
+# Kulcs
+# ----------------------------------------------------------------------
+
+def data_digest(data) -> str:
+    """A rajzolt adatok tartalmi lenyomata (tömböknél a nyers bájtok alapján)."""
+    h = hashlib.sha1()
+    for value in data:
+        if isinstance(value, np.ndarray):
+            h.update(f"{value.dtype.str}{value.shape}".encode())
+            h.update(np.ascontiguousarray(value).tobytes())
+        else:
+            h.update(repr(value).encode())
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+class ChartRenderer:
+    """
+    Használat (Qt, DataLoader szálon):
+        key = renderer.key(auto_id, "havi", theme_name, dpi, data)
+        png = renderer.cached(key)                  # GUI szál, azonnal
+        if png is None:
+            loader.submit(owner, lambda conn: renderer.render(key, data, colors), show)
+
+    Tk: renderer.submit(owner, key, data, colors, callback) – a callback(png)
+    a worker szálon hívódik, csak ha ez az owner legutolsó kérése.
+    """
+    MEMORY_BYTES = 32 * 1024 * 1024
+    DISK_BYTES = 64 * 1024 * 1024
+
+    def __init__(self, cache_dir: str | None = None,
+                 memory_bytes: int = MEMORY_BYTES, disk_bytes: int = DISK_BYTES):
+        self.cache_dir = cache_dir
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self._lock = threading.Condition()
+        self._memory: OrderedDict[tuple, bytes] = OrderedDict()
+        self._memory_size = 0
+        self._pending: dict = {}          # owner -> (token, key, data, colors, callback)
+        self._latest: dict = {}           # owner -> token
+        self._token = 0
+        self._thread = None
+        self._figures: dict[tuple, LiveChart] = {}   # (típus, dpi, slot) -> hosszú életű Figure
+        self.hits = 0
+        self.disk_hits = 0
+        self.renders = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._prune_disk()
+
+    @staticmethod
+    def key(auto_id, chart: str, theme_name: str, dpi: int, data) -> tuple:
+        return (auto_id, chart, data_digest(data), theme_name, int(dpi))
+
+    # ------------------------------------------------------------------
+    # Gyorsítótár
+    # ------------------------------------------------------------------
+
+    def _path(self, key) -> str:
+        name = hashlib.sha1(repr(key[1:]).encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{key[1]}_{name}.png")
+
+    def cached(self, key) -> bytes | None:
+        """A kész kép memóriából vagy lemezről; None, ha rajzolni kell."""
+        with self._lock:
+            png = self._memory.get(key)
+            if png is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return png
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                png = f.read()
+            os.utime(path)      # a törlési sorrendhez: legutóbb használt
+        except OSError:
+            return None
+        with self._lock:
+            self.disk_hits += 1
+            self._remember(key, png)
+        return png
+
+    def _remember(self, key, png: bytes):
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_size -= len(old)
+        self._memory[key] = png
+        self._memory_size += len(png)
+        while self._memory_size > self.memory_bytes and len(self._memory) > 1:
+            _, dropped = self._memory.popitem(last=False)
+            self._memory_size -= len(dropped)
+
+    def _store_disk(self, key, png: bytes):
+        path = self._path(key)
+        tmp = f"{path}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(png)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Grafikon gyorsítótár írási hiba: {e}")
+
+    def _prune_disk(self):
+        """A lemez korlát feletti, legrégebben használt képek törlése."""
+        try:
+            files = [e for e in os.scandir(self.cache_dir) if e.name.endswith(".png")]
+        except OSError:
+            return
+        stats = [(e.stat().st_mtime, e.stat().st_size, e.path) for e in files]
+        total = sum(size for _, size, _ in stats)
+        for _, size, path in sorted(stats):
+            if total <= self.disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_size = 0
+
+    # ------------------------------------------------------------------
+    # Rajzolás
+    # ------------------------------------------------------------------
+
+    def render(self, key, data, colors: dict) -> bytes:
+        """A kép rajzolása (bármely szálon) és tárolása mindkét szinten."""
+        png = self.cached(key)
+        if png is not None:
+            return png
+        chart, dpi = key[1], key[4]
+        cls = CHARTS[chart]
+        slot = (chart, dpi, cls.slot(*data))
+        with _render_lock:
+            live = self._figures.get(slot)
+            if live is None:
+                live = self._figures[slot] = cls(dpi)
+            png = live.render(colors, *data)
+        with self._lock:
+            self.renders += 1
+            self._remember(key, png)
+        if self.cache_dir:
+            self._store_disk(key, png)
+            if self.renders % 50 == 0:
+                self._prune_disk()
+        return png
+
+    def submit(self, owner, key, data, colors: dict, callback) -> int:
+        """
+        Rajzolás a saját worker szálon. Az ownernek csak a legutolsó kérése
+        fut le (a várakozó korábbi elmarad). Visszatér: a kérés tokenje.
+        """
+        with self._lock:
+            self._token += 1
+            self._latest[owner] = self._token
+            self._pending[owner] = (self._token, key, data, colors, callback)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._worker, name="charts", daemon=True)
+                self._thread.start()
+            self._lock.notify()
+            return self._token
+
+    def cancel(self, owner) -> bool:
+        """Az owner kérésének elvetése. Igaz, ha volt még el nem készült kérése."""
+        with self._lock:
+            self._pending.pop(owner, None)
+            return self._latest.pop(owner, None) is not None
+
+    def _worker(self):
+        while True:
+            with self._lock:
+                while not self._pending:
+                    self._lock.wait()
+                owner = next(iter(self._pending))
+                token, key, data, colors, callback = self._pending.pop(owner)
+            try:
+                png = self.render(key, data, colors)
+            except Exception as e:
+                logger.error(f"Grafikon rajzolási hiba ({key[1]}): {e}")
+                continue
+            with self._lock:
+                if self._latest.get(owner) != token:
+                    continue
+                del self._latest[owner]
+            callback(png)
+
+    def stats(self) -> dict:
+        """{memory_items, memory_bytes, hits, disk_hits, renders, figures, full_draws, blits}"""
+        with self._lock:
+            figures = list(self._figures.values())
+            return {
+                "memory_items": len(self._memory),
+                "memory_bytes": self._memory_size,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "renders": self.renders,
+                "figures": len(figures),
+                "full_draws": sum(f.full_draws for f in figures),
+                "blits": sum(f.blits for f in figures),
+            }
@@ -1,6 +1,23 @@
+"""
+config.py
+---------
+Beállítások mindkét felülethez (CustomTkinter és PyQt6), folyamaton belül
+egyetlen megosztott példánnyal útvonalanként (ConfigManager.for_path).
+- A fájl egyszer olvasódik be; a lekérdezések (get, get_int, get_bool, ...)
+  memóriából szolgálnak ki, fájl I/O nélkül
+- Külső módosítás (másik felület, kézi szerkesztés): a fájl mtime-ja
+  legfeljebb RELOAD_CHECK_S másodpercenként ellenőrződik, változáskor újraolvasás
+- Írás: a set() / update() csak megjelöl; a mentés SAVE_DELAY_S múlva egyben,
+  atomikusan (ideiglenes fájl + os.replace) történik. A flush() azonnal ír,
+  kilépéskor (atexit) automatikusan lefut
+"""
+
 import json
 import os
+import time
+import atexit
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
@@ -15,40 +32,209 @@ DEFAULT_SETTINGS = {
     "reminder_days_before": 30,
     "oil_warning_km": 1000,
     "default_oil_interval": 10000,
+    "db_profile": "balanced",
+    "db_pragmas": {},
+    # Gépelés után ennyi ms szünet indítja a keresést
+    "search_debounce_ms": 250,
+    # PyQt6 felület
+    "dark_mode": True,
+    "muszaki_warning_days": 30,
+    "biztositas_warning_days": 30,
+    # Grafikon és PDF modulok betöltése háttérben az ablak megjelenése után
+    "preload_modules": True,
+}
+
+# Adatbázis teljesítmény profilok – minden megnyitott kapcsolatra érvényesek.
+# A "db_pragmas" beállítással kulcsonként felülírhatók.
+DB_PROFILES = {
+    "safe": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size_kb": 8192,
+        "mmap_size_mb": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout_ms": 5000,
+    },
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size_kb": 16384,
+        "mmap_size_mb": 64,
+        "temp_store": "MEMORY",
+        "busy_timeout_ms": 5000,
+    },
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size_kb": 65536,
+        "mmap_size_mb": 256,
+        "temp_store": "MEMORY",
+        "busy_timeout_ms": 10000,
+    },
 }
 
 class ConfigManager:
+    RELOAD_CHECK_S = 2.0   # ennyi időnként nézi meg a fájl mtime-ját (get hívásakor)
+    SAVE_DELAY_S = 0.5     # az egymást követő set() hívások egy mentésbe olvadnak
+
+    _instances: dict[str, "ConfigManager"] = {}
+    _instances_lock = threading.Lock()
+
     def __init__(self, filepath):
         self.filepath = filepath
         self.settings = DEFAULT_SETTINGS.copy()
+        self._lock = threading.RLock()
+        self._mtime = None          # a legutóbb beolvasott / írt fájl mtime-ja
+        self._checked = 0.0         # az utolsó mtime ellenőrzés ideje (monotonic)
+        self._dirty = False
+        self._timer = None
         self.load()
+        atexit.register(self.flush)
+
+    @classmethod
+    def for_path(cls, filepath: str) -> "ConfigManager":
+        """Folyamaton belül megosztott példány egy adott konfigurációs fájlhoz."""
+        key = os.path.abspath(filepath)
+        with cls._instances_lock:
+            manager = cls._instances.get(key)
+            if manager is None:
+                manager = cls(filepath)
+                cls._instances[key] = manager
+            return manager
+
+    # ------------------------------------------------------------------
+    # Olvasás
+    # ------------------------------------------------------------------
+
+    def _file_mtime(self):
+        try:
+            return os.stat(self.filepath).st_mtime_ns
+        except OSError:
+            return None
 
     def load(self):
-        if os.path.exists(self.filepath):
+        with self._lock:
+            self._mtime = self._file_mtime()
+            self._checked = time.monotonic()
+            if self._mtime is None:
+                return
             try:
                 with open(self.filepath, "r", encoding="utf-8") as f:
                     data = json.load(f)
                     if isinstance(data, dict):
-                        self.settings.update(data)
+                        self.settings = {**DEFAULT_SETTINGS, **data}
             except json.JSONDecodeError as e:
                 logger.warning(f"Konfigurációs fájl sérült, alapértelmezett beállítások betöltve: {e}")
             except OSError as e:
                 logger.error(f"Konfigurációs fájl olvasási hiba: {e}")
 
-    def save(self):
-        try:
-            with open(self.filepath, "w", encoding="utf-8") as f:
-                json.dump(self.settings, f, indent=2, ensure_ascii=False)
-        except OSError as e:
-            logger.error(f"Konfigurációs fájl mentési hiba: {e}")
+    def _maybe_reload(self):
+        """Újraolvasás, ha a fájl kívülről megváltozott (ritkítva; függő írásnál nem)."""
+        now = time.monotonic()
+        if now - self._checked < self.RELOAD_CHECK_S:
+            return
+        with self._lock:
+            self._checked = now
+            if self._dirty or self._file_mtime() == self._mtime:
+                return
+            logger.info("Konfigurációs fájl megváltozott, újraolvasás")
+            self.load()
 
     def get(self, key, default=None):
+        self._maybe_reload()
         return self.settings.get(key, default)
 
+    def _typed(self, key, kind, default):
+        if default is None:
+            default = DEFAULT_SETTINGS.get(key)
+        value = self.get(key, default)
+        if type(value) is kind:
+            return value
+        try:
+            if kind is bool:
+                if isinstance(value, str):
+                    return value.strip().lower() in ("1", "true", "igen", "yes", "on")
+                return bool(value)
+            return kind(value)
+        except (TypeError, ValueError):
+            logger.warning(f"Érvénytelen beállítás: {key}={value!r}, alapérték: {default!r}")
+            return default
+
+    def get_int(self, key, default=None) -> int:
+        return self._typed(key, int, default)
+
+    def get_float(self, key, default=None) -> float:
+        return self._typed(key, float, default)
+
+    def get_bool(self, key, default=None) -> bool:
+        return self._typed(key, bool, default)
+
+    def get_str(self, key, default=None) -> str:
+        return self._typed(key, str, default)
+
+    def snapshot(self) -> dict:
+        """A beállítások másolata (pl. háttérszálnak átadáshoz)."""
+        self._maybe_reload()
+        with self._lock:
+            return dict(self.settings)
+
+    def get_db_profile(self) -> dict:
+        """Az aktív adatbázis profil PRAGMA értékei, a felülírásokkal együtt."""
+        name = self.settings.get("db_profile", "balanced")
+        if name not in DB_PROFILES:
+            logger.warning(f"Ismeretlen adatbázis profil: {name}, 'balanced' használva")
+            name = "balanced"
+        profile = DB_PROFILES[name].copy()
+        overrides = self.settings.get("db_pragmas") or {}
+        if isinstance(overrides, dict):
+            profile.update({k: v for k, v in overrides.items() if k in profile})
+        return profile
+
+    # ------------------------------------------------------------------
+    # Írás
+    # ------------------------------------------------------------------
+
     def set(self, key, value):
-        self.settings[key] = value
-        self.save()
+        self.update({key: value})
+
+    def update(self, values: dict):
+        """Több kulcs módosítása; a mentés késleltetve, egyetlen írásban történik."""
+        with self._lock:
+            self.settings.update(values)
+            self._schedule_save()
 
     def reset(self):
-        self.settings = DEFAULT_SETTINGS.copy()
-        self.save()
+        with self._lock:
+            self.settings = DEFAULT_SETTINGS.copy()
+            self._schedule_save()
+
+    def _schedule_save(self):
+        self._dirty = True
+        if self._timer is None:
+            self._timer = threading.Timer(self.SAVE_DELAY_S, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """A függő módosítások azonnali kiírása (ha van)."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._dirty:
+                self.save()
+
+    def save(self):
+        """Atomikus mentés: ideiglenes fájlba írás, majd csere (félbeszakadt írás nem rontja el)."""
+        with self._lock:
+            tmp = f"{self.filepath}.tmp"
+            try:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(self.settings, f, indent=2, ensure_ascii=False)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self.filepath)
+                self._dirty = False
+                self._mtime = self._file_mtime()
+            except OSError as e:
+                logger.error(f"Konfigurációs fájl mentési hiba: {e}")
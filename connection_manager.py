@@ -0,0 +1,271 @@
+"""
+connection_manager.py
+---------------------
+Megosztott SQLite kapcsolatkezelő mindkét felülethez (CustomTkinter és PyQt6).
+- Egyetlen hosszú életű író kapcsolat; a writer() blokk idejére a
+  write_lock zár védi
+- Szálanként egy olvasó kapcsolat, amely a szál végén lezárul; a nem
+  Python szálak (pl. QThread worker) saját kapcsolatot kérnek (open_reader)
+- A PRAGMA beállítások kapcsolatonként csak egyszer futnak le
+- Teljesítmény profil (WAL, synchronous, cache, mmap, temp_store, busy_timeout)
+- Számlálók: megnyitott kapcsolatok és újrafelhasználások
+"""
+
+import sqlite3
+import threading
+import logging
+import weakref
+
+logger = logging.getLogger(__name__)
+
+# A PRAGMA értékek nem paraméterezhetők, ezért csak ezek engedélyezettek
+_JOURNAL_MODES = {"WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY"}
+_SYNCHRONOUS = {"OFF", "NORMAL", "FULL", "EXTRA"}
+_TEMP_STORE = {"DEFAULT", "FILE", "MEMORY"}
+
+
+def profile_pragmas(profile: dict | None) -> list[str]:
+    """
+    Teljesítmény profilból (config.DB_PROFILES) PRAGMA utasítások listája.
+    Az érvénytelen értékeket naplózza és kihagyja.
+    """
+    if not profile:
+        return []
+    pragmas = []
+
+    def choice(key, allowed):
+        value = str(profile.get(key, "")).upper()
+        if value in allowed:
+            return value
+        if key in profile:
+            logger.warning(f"Érvénytelen PRAGMA érték: {key}={profile[key]}")
+        return None
+
+    def integer(key):
+        try:
+            return int(profile[key])
+        except (KeyError, TypeError, ValueError):
+            if key in profile:
+                logger.warning(f"Érvénytelen PRAGMA érték: {key}={profile[key]}")
+            return None
+
+    if (mode := choice("journal_mode", _JOURNAL_MODES)):
+        pragmas.append(f"PRAGMA journal_mode = {mode}")
+    if (sync := choice("synchronous", _SYNCHRONOUS)):
+        pragmas.append(f"PRAGMA synchronous = {sync}")
+    if (cache_kb := integer("cache_size_kb")) is not None:
+        # Negatív érték = KiB-ban megadott méret
+        pragmas.append(f"PRAGMA cache_size = {-abs(cache_kb)}")
+    if (mmap_mb := integer("mmap_size_mb")) is not None:
+        pragmas.append(f"PRAGMA mmap_size = {max(mmap_mb, 0) * 1024 * 1024}")
+    if (temp := choice("temp_store", _TEMP_STORE)):
+        pragmas.append(f"PRAGMA temp_store = {temp}")
+    if (timeout := integer("busy_timeout_ms")) is not None:
+        pragmas.append(f"PRAGMA busy_timeout = {max(timeout, 0)}")
+    return pragmas
+
+
+def apply_profile(conn: sqlite3.Connection, pragmas: list[str]):
+    """PRAGMA lista alkalmazása egy kapcsolatra."""
+    for pragma in pragmas:
+        try:
+            conn.execute(pragma)
+        except sqlite3.OperationalError as e:
+            logger.warning(f"PRAGMA hiba ({pragma}): {e}")
+
+
+class ConnectionManager:
+    """
+    Kapcsolat pool egy adatbázis fájlhoz.
+
+    A `with manager.writer() as conn:` minta ugyanúgy működik, mint korábban
+    a `with get_db() as conn:` – a blokk végén commit, hiba esetén rollback –,
+    csak a kapcsolat nem záródik le, hanem a következő hívás újrahasználja.
+    A blokk a write_lock zárat tartja; ugyanazon a szálon egymásba ágyazott
+    blokkok egy tranzakciót alkotnak: a legkülső végén commit, de ha bármelyik
+    blokk hibával lépett ki, rollback.
+    """
+
+    _instances: dict[str, "ConnectionManager"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, db_path: str, row_factory=None, profile: dict | None = None):
+        self.db_path = db_path
+        self.row_factory = row_factory
+        self._pragmas = profile_pragmas(profile)
+        self.write_lock = threading.RLock()
+        self._writer = None
+        self._depth = 0            # egymásba ágyazott writer() blokkok (write_lock alatt)
+        self._failed = False       # egy belső blokk hibával lépett ki: a végén rollback
+        self._local = threading.local()
+        self._readers: list[sqlite3.Connection] = []
+        self._stats_lock = threading.Lock()
+        self._opened = 0
+        self._reused = 0
+
+    @classmethod
+    def for_path(cls, db_path: str, row_factory=None) -> "ConnectionManager":
+        """Folyamaton belül megosztott példány egy adott adatbázis útvonalhoz."""
+        with cls._instances_lock:
+            manager = cls._instances.get(db_path)
+            if manager is None:
+                manager = cls(db_path, row_factory=row_factory)
+                cls._instances[db_path] = manager
+            return manager
+
+    def set_profile(self, profile: dict | None):
+        """
+        Teljesítmény profil beállítása. Az új kapcsolatok megnyitáskor kapják meg,
+        a már nyitottakra azonnal alkalmazódik.
+        """
+        self._pragmas = profile_pragmas(profile)
+        with self.write_lock:
+            if self._writer is not None:
+                apply_profile(self._writer, self._pragmas)
+        with self._stats_lock:
+            readers = list(self._readers)
+        for conn in readers:
+            apply_profile(conn, self._pragmas)
+
+    # ------------------------------------------------------------------
+    # Kapcsolatok
+    # ------------------------------------------------------------------
+
+    def writer(self) -> "_WriterSession":
+        """
+        A közös író kapcsolat kontextuskezelőként: `with manager.writer() as conn:`.
+        A blokk idejére a write_lock zárat tartja, így a kapcsolatot egyszerre
+        csak egy szál használja.
+        """
+        return _WriterSession(self)
+
+    def reader(self) -> sqlite3.Connection:
+        """Az aktuális szál saját olvasó kapcsolata; a szál végén lezárul."""
+        holder = getattr(self._local, "reader", None)
+        if holder is None:
+            holder = _ReaderHolder(self.open_reader())
+            # A szál végén a threading.local törli a tartót, ekkor zárul a kapcsolat
+            weakref.finalize(holder, self.release_reader, holder.conn)
+            self._local.reader = holder
+        else:
+            self._count_reuse()
+        return holder.conn
+
+    def open_reader(self) -> sqlite3.Connection:
+        """
+        Külön olvasó kapcsolat egy hosszú életű worker számára, amelynek a
+        szál-lokális állapota nem marad meg hívások között (pl. QThread slot).
+        A tulajdonos zárja le: release_reader(); addig a close_all is lezárja.
+        """
+        conn = self._open()
+        with self._stats_lock:
+            self._readers.append(conn)
+        return conn
+
+    def release_reader(self, conn: sqlite3.Connection):
+        """Olvasó kapcsolat lezárása (a szál végén vagy az open_reader tulajdonosa)."""
+        with self._stats_lock:
+            if conn not in self._readers:
+                return   # close_all már lezárta
+            self._readers.remove(conn)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def _acquire_writer(self) -> sqlite3.Connection:
+        self.write_lock.acquire()
+        try:
+            if self._writer is None:
+                self._writer = self._open()
+            elif self._depth == 0:
+                self._count_reuse()
+            self._depth += 1
+            return self._writer
+        except BaseException:
+            self.write_lock.release()
+            raise
+
+    def _release_writer(self, commit: bool):
+        try:
+            self._depth -= 1
+            self._failed = self._failed or not commit
+            if self._depth == 0:
+                failed, self._failed = self._failed, False
+                if self._writer is not None:
+                    if failed:
+                        self._writer.rollback()
+                    else:
+                        self._writer.commit()
+        finally:
+            self.write_lock.release()
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute("PRAGMA foreign_keys = ON")
+        apply_profile(conn, self._pragmas)
+        if self.row_factory is not None:
+            conn.row_factory = self.row_factory
+        with self._stats_lock:
+            self._opened += 1
+        logger.debug(f"Új SQLite kapcsolat: {self.db_path}")
+        return conn
+
+    def _count_reuse(self):
+        with self._stats_lock:
+            self._reused += 1
+
+    # ------------------------------------------------------------------
+    # Statisztika és lezárás
+    # ------------------------------------------------------------------
+
+    def stats(self) -> dict:
+        """Visszaadja a kapcsolat számlálókat: {open, opened, reused}."""
+        with self._stats_lock:
+            open_count = len(self._readers) + (1 if self._writer is not None else 0)
+            return {
+                "open": open_count,
+                "opened": self._opened,
+                "reused": self._reused,
+            }
+
+    def close_all(self):
+        """Minden kapcsolat lezárása (kilépéskor vagy visszaállítás előtt)."""
+        with self.write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        with self._stats_lock:
+            for conn in self._readers:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._readers.clear()
+        self._local = threading.local()
+        logger.info(f"SQLite kapcsolatok lezárva: {self.db_path}")
+
+
+class _ReaderHolder:
+    """Egy szál olvasó kapcsolatának tartója (a weakref.finalize ehhez kötődik)."""
+
+    __slots__ = ("conn", "__weakref__")
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+
+class _WriterSession:
+    """A writer() kontextuskezelője: zár + commit / rollback a legkülső blokk végén."""
+
+    __slots__ = ("_manager",)
+
+    def __init__(self, manager: ConnectionManager):
+        self._manager = manager
+
+    def __enter__(self) -> sqlite3.Connection:
+        return self._manager._acquire_writer()
+
+    def __exit__(self, exc_type, exc, tb):
+        self._manager._release_writer(commit=exc_type is None)
+        return False
@@ -0,0 +1,155 @@
+"""
+data_events.py
+--------------
+Típusos változás események a bejegyzés írásokhoz (CustomTkinter és PyQt6).
+- EntryChange: beszúrás / módosítás / törlés, a bejegyzés id-jával, az
+  autóval, a kategóriával és (törlés kivételével) az új lista sorral
+- EventBus: szinkron feliratkozás és értesítés a fő szálon
+- ViewRegistry: a nézetek táblafüggőségei és piszkos jelzői; csak a
+  látható nézet frissül azonnal, a többi a megjelenésekor
+
+Az írás helye küldi az eseményt; a nézetek a sort helyben javítják a
+listában, teljes újratöltés helyett.
+"""
+
+import logging
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+INSERTED = "inserted"
+UPDATED = "updated"
+DELETED = "deleted"
+
+
+@dataclass(frozen=True)
+class EntryChange:
+    kind: str                 # INSERTED / UPDATED / DELETED
+    entry_id: int
+    auto_id: int
+    kategoria: str
+    row: tuple | None = None  # database.LIST_COLUMNS szerinti sor, törlésnél None
+
+
+class EventBus:
+    """Egyszerű esemény elosztó; a feliratkozók a küldés sorrendjében futnak."""
+
+    def __init__(self):
+        self._subscribers = []
+
+    def subscribe(self, callback):
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def publish(self, event):
+        for callback in list(self._subscribers):
+            try:
+                callback(event)
+            except Exception as e:
+                # Egy hibás nézet ne akassza meg a többi értesítését
+                logger.error(f"Esemény feldolgozási hiba ({event.kind} #{event.entry_id}): {e}")
+
+
+class _View:
+    __slots__ = ("refresh", "tables", "patch", "cancel", "dirty", "car")
+
+    def __init__(self, refresh, tables, patch, cancel):
+        self.refresh, self.tables = refresh, frozenset(tables)
+        self.patch, self.cancel = patch, cancel
+        self.dirty, self.car = True, None
+
+
+class ViewRegistry:
+    """
+    Nézetek érvénytelenítése és frissítése a megjelenéskor.
+
+    Minden nézet megadja, mely tábláktól függ. Írás után az invalidate()
+    csak piszkosnak jelöli az érintett nézeteket; a látható azonnal
+    frissül, a többi a show() hívásakor. Egy nézet akkor is frissül a
+    megjelenésekor, ha azóta másik autó lett kiválasztva (set_car).
+    """
+
+    def __init__(self):
+        self._views: dict[str, _View] = {}
+        self._visible = None
+        self._car = None
+
+    def register(self, name, refresh, tables, patch=None, cancel=None):
+        """
+        refresh()            – a nézet teljes újraépítése
+        tables               – a táblák, amelyektől a nézet függ
+        patch(event) -> bool – EntryChange helyben alkalmazása (False: nem
+                               sikerült, a nézet piszkos lesz)
+        cancel() -> bool     – a folyamatban lévő frissítés megszakítása,
+                               amikor a nézet eltűnik (True: volt mit)
+        """
+        self._views[name] = _View(refresh, tables, patch, cancel)
+
+    def clear(self):
+        """Minden nézet eltávolítása (a fülek újraépítése előtt)."""
+        self._views.clear()
+        self._visible = None
+
+    def is_dirty(self, name) -> bool:
+        view = self._views.get(name)
+        return view is not None and (view.dirty or view.car != self._car)
+
+    # ------------------------------------------------------------------
+    # Érvénytelenítés
+    # ------------------------------------------------------------------
+
+    def invalidate(self, *tables, auto_id=None):
+        """
+        A megadott táblákra épülő nézetek piszkosak lesznek (tábla nélkül:
+        minden nézet). auto_id esetén csak az arra az autóra épült nézetek.
+        """
+        wanted = frozenset(tables)
+        for view in self._views.values():
+            if wanted and not view.tables & wanted:
+                continue
+            if auto_id is None or view.car == auto_id:
+                view.dirty = True
+        self._refresh_visible()
+
+    def apply(self, event: EntryChange):
+        """EventBus feliratkozó: a bejegyzés írását a nézetek helyben javítják, ha tudják."""
+        for view in self._views.values():
+            if "szerviz_adatok" not in view.tables or view.dirty or view.car != event.auto_id:
+                continue
+            if view.patch is None or not view.patch(event):
+                view.dirty = True
+        self._refresh_visible()
+
+    def set_car(self, auto_id):
+        """A kiválasztott autó változása: a látható nézet frissül, a többi megjelenéskor."""
+        self._car = auto_id
+        self._refresh_visible()
+
+    # ------------------------------------------------------------------
+    # Láthatóság
+    # ------------------------------------------------------------------
+
+    def show(self, name):
+        """A nézet láthatóvá vált: frissül, ha piszkos. Az előző nézet futó munkája megszakad."""
+        previous = self._views.get(self._visible)
+        if name != self._visible and previous is not None and previous.cancel is not None:
+            if previous.cancel():
+                previous.dirty = True
+        self._visible = name
+        self._refresh_visible()
+
+    def _refresh_visible(self):
+        if not self.is_dirty(self._visible):
+            return
+        view = self._views[self._visible]
+        view.dirty, view.car = False, self._car
+        try:
+            view.refresh()
+        except Exception as e:
+            view.dirty = True
+            logger.error(f"Nézet frissítési hiba ({self._visible}): {e}")
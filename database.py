@@ -1,117 +1,1127 @@
-import sqlite3
-import logging
-
-logger = logging.getLogger(__name__)
-
-# Alapértelmezett kategóriák
-DEFAULT_KATEGORIAK = [
-    ("Tankolás",       "⛽", "#3b82f6", 1),
-    ("Karbantartás",   "🔧", "#10b981", 1),
-    ("Egyéb",          "📦", "#f97316", 1),
-    ("Biztosítás",     "🛡️", "#8b5cf6", 1),
-]
-
-def init_db(db_path):
-    conn = sqlite3.connect(db_path)
-    conn.execute("PRAGMA foreign_keys = ON")
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS autok (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            marka TEXT NOT NULL,
-            tipus TEXT NOT NULL,
-            evjarat TEXT,
-            km_allas INTEGER DEFAULT 0,
-            vin TEXT,
-            rendszam TEXT,
-            muszaki_lejarat TEXT,
-            olaj_intervallum INTEGER DEFAULT 10000
-        )
-    """)
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS szerviz_adatok (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            auto_id INTEGER NOT NULL,
-            datum TEXT NOT NULL,
-            kategoria TEXT NOT NULL,
-            osszeg REAL DEFAULT 0,
-            km_allas INTEGER,
-            mennyiseg_liter REAL,
-            egysegar_ft_l REAL,
-            benzinkut TEXT,
-            megjegyzes TEXT,
-            kep_utvonal TEXT DEFAULT '',
-            FOREIGN KEY (auto_id) REFERENCES autok (id) ON DELETE CASCADE
-        )
-    """)
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS kategoriak (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nev TEXT NOT NULL UNIQUE,
-            ikon TEXT DEFAULT '📦',
-            szin TEXT DEFAULT '#64748b',
-            alap INTEGER DEFAULT 0
-        )
-    """)
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS biztositas (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            auto_id INTEGER NOT NULL,
-            datum TEXT NOT NULL,
-            osszeg REAL DEFAULT 0,
-            biztosito TEXT,
-            kezdete TEXT,
-            vege TEXT,
-            megjegyzes TEXT,
-            kep_utvonal TEXT DEFAULT '',
-            FOREIGN KEY (auto_id) REFERENCES autok (id) ON DELETE CASCADE
-        )
-    """)
-
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_szerviz_auto_id ON szerviz_adatok (auto_id)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_szerviz_datum ON szerviz_adatok (datum)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_biztositas_auto_id ON biztositas (auto_id)")
-
-    conn.commit()
-    _migrate_db(cursor, conn)
-
-    # Alapértelmezett kategóriák feltöltése ha még üres
-    existing = cursor.execute("SELECT COUNT(*) FROM kategoriak").fetchone()[0]
-    if existing == 0:
-        cursor.executemany(
-            "INSERT INTO kategoriak (nev, ikon, szin, alap) VALUES (?,?,?,?)",
-            DEFAULT_KATEGORIAK
-        )
-        conn.commit()
-    else:
-        # Biztosítás hozzáadása ha még nincs (meglévő adatbázisnál)
-        biz = cursor.execute(
-            "SELECT id FROM kategoriak WHERE nev='Biztosítás'"
-        ).fetchone()
-        if not biz:
-            cursor.execute(
-                "INSERT INTO kategoriak (nev, ikon, szin, alap) VALUES (?,?,?,?)",
-                ("Biztosítás", "🛡️", "#8b5cf6", 1)
-            )
-            conn.commit()
-
-    conn.close()
-
-def _migrate_db(cursor, conn):
-    try:
-        cursor.execute("SELECT kep_utvonal FROM szerviz_adatok LIMIT 1")
-    except sqlite3.OperationalError:
-        logger.info("Migráció: kep_utvonal oszlop hozzáadása...")
-        cursor.execute("ALTER TABLE szerviz_adatok ADD COLUMN kep_utvonal TEXT DEFAULT ''")
-        conn.commit()
-
-    try:
-        cursor.execute("SELECT ikon FROM autok LIMIT 1")
-    except sqlite3.OperationalError:
-        logger.info("Migráció: ikon oszlop hozzáadása az autok táblához...")
-        cursor.execute("ALTER TABLE autok ADD COLUMN ikon TEXT DEFAULT '🚗'")
-        conn.commit()
\ No newline at end of file
+import re
+import sqlite3
+import logging
+import time
+from datetime import date, datetime
+
+from connection_manager import profile_pragmas, apply_profile
+
+logger = logging.getLogger(__name__)
+
+# Alapértelmezett kategóriák
+DEFAULT_KATEGORIAK = [
+    ("Tankolás",       "⛽", "#3b82f6", 1),
+    ("Karbantartás",   "🔧", "#10b981", 1),
+    ("Egyéb",          "📦", "#f97316", 1),
+    ("Biztosítás",     "🛡️", "#8b5cf6", 1),
+]
+
+# Kezelt indexek: név -> (tábla, oszlopok). A forró lekérdezések szűrő-, rendező-
+# és összegző oszlopait fedik le, így ezek index alapján, táblaolvasás nélkül futnak.
+MANAGED_INDEXES = {
+    # Listák: auto + kategória szűrés, dátum szerinti rendezés
+    "idx_szerviz_auto_kat_datum":  ("szerviz_adatok", "auto_id, kategoria_id, datum"),
+    # Utolsó tankolás (auto_osszesito): a normalizált nap szerint, id-vel döntve
+    "idx_szerviz_auto_kat_nap":    ("szerviz_adatok", "auto_id, kategoria_id, datum_nap"),
+    # KM szerinti rendezés, fogyasztás számítás (fedő: liter)
+    "idx_szerviz_auto_kat_km":     ("szerviz_adatok", "auto_id, kategoria_id, km_allas, mennyiseg_liter"),
+    # Összeg szerinti rendezés és lapozás – az id (rowid) az index végén implicit,
+    # így az (osszeg, id) kulcs sorrend rendezés nélkül jön
+    "idx_szerviz_auto_kat_osszeg_id": ("szerviz_adatok", "auto_id, kategoria_id, osszeg"),
+    # Kategóriától független dátum tartomány (PDF export)
+    "idx_szerviz_auto_nap":        ("szerviz_adatok", "auto_id, datum_nap"),
+    "idx_szerviz_auto_km":         ("szerviz_adatok", "auto_id, km_allas"),
+    "idx_biztositas_auto_vege":    ("biztositas", "auto_id, vege"),
+    # Utolsó olajcsere / gumicsere / ... km: egyetlen index keresés
+    "idx_esemeny_auto_tipus_km":   ("szerviz_esemenyek", "auto_id, esemeny, km_allas"),
+}
+
+# Lefedett vagy már nem használt indexek – a migráció törli őket
+OBSOLETE_INDEXES = [
+    "idx_szerviz_auto_id",
+    "idx_szerviz_datum",
+    "idx_biztositas_auto_id",
+    "idx_szerviz_auto_datum",
+    # A havi/éves nézetek a havi_osszesito táblából olvasnak
+    "idx_szerviz_auto_kat_honap",
+    "idx_szerviz_auto_honap",
+    # Az összegek az auto_osszesito táblából jönnek, a fedő oszlopok feleslegesek
+    "idx_szerviz_auto_kat_osszeg",
+]
+
+# Dátum kulcsok SQL kifejezése a 'YYYY.MM.DD' szöveges dátumból.
+# datum_nap: napsorszám (= date.toordinal()), honap_kulcs: YYYYMM egész.
+# Érvénytelen dátumnál mindkettő NULL.
+_ISO_DATUM_SQL = "replace(substr(trim({col}), 1, 10), '.', '-')"
+DATUM_NAP_SQL = f"CAST(julianday({_ISO_DATUM_SQL}) - 1721424.5 AS INTEGER)"
+HONAP_KULCS_SQL = f"CAST(strftime('%Y%m', {_ISO_DATUM_SQL}) AS INTEGER)"
+# Csoportosított hónap kulcsból 'YYYY.MM' felirat
+HONAP_CIMKE_SQL = "printf('%04d.%02d', honap_kulcs / 100, honap_kulcs % 100)"
+
+# A bejegyzések kategóriája egész kulcs (kategoria_id). Név szerinti szűrésnél
+# a név egyszer, a lekérdezés elején oldódik fel: kategoria_id = {KATEGORIA_ID_SQL}
+KATEGORIA_ID_SQL = "(SELECT id FROM kategoriak WHERE nev = ?)"
+
+# Szerviz esemény típusok. A karbantartás bejegyzéseket a megjegyzés alapján
+# az esemeny_szabalyok mintái (LIKE, az ASCII betűknél kis/nagybetű független)
+# sorolják be, rögzítéskor triggerrel.
+ESEMENY_OLAJ = "olaj"
+ESEMENY_GUMI = "gumi"
+ESEMENY_FEK = "fek"
+ESEMENY_VEZERMU = "vezermu"
+
+# A minták a szóközökkel keretezett, írásjel nélküli megjegyzésre illeszkednek
+# (ESEMENY_SZOVEG_SQL): a '% szó%' alak csak szó elején talál, így pl. a 'tire'
+# az 'entire', az 'oil' a 'coil' szóra nem. A magyar tövek összetételben is
+# állhatnak (motorolaj, kézifék), ezért azok szón belül is illeszkednek – az
+# ékezet nélküli 'fek' viszont a 'fekete' / 'fekvő' része is, ezért ott csak az
+# önálló szó és a fék alkatrészek tövei számítanak.
+DEFAULT_ESEMENY_SZABALYOK = [
+    (ESEMENY_OLAJ,    "%olaj%"),
+    (ESEMENY_OLAJ,    "% oil%"),
+    (ESEMENY_GUMI,    "%gumi%"),
+    (ESEMENY_GUMI,    "%abroncs%"),
+    (ESEMENY_GUMI,    "% tire%"),
+    (ESEMENY_GUMI,    "% tyre%"),
+    (ESEMENY_FEK,     "%fék%"),
+    (ESEMENY_FEK,     "%FÉK%"),
+    (ESEMENY_FEK,     "% fek %"),
+    (ESEMENY_FEK,     "%fekbetet%"),
+    (ESEMENY_FEK,     "%fektarcsa%"),
+    (ESEMENY_FEK,     "%fekfolyadek%"),
+    (ESEMENY_FEK,     "%fekpofa%"),
+    (ESEMENY_FEK,     "%fekdob%"),
+    (ESEMENY_FEK,     "%kezifek%"),
+    (ESEMENY_FEK,     "% brake%"),
+    (ESEMENY_VEZERMU, "%vezérmű%"),
+    (ESEMENY_VEZERMU, "%VEZÉRMŰ%"),
+    (ESEMENY_VEZERMU, "%vezermu%"),
+    (ESEMENY_VEZERMU, "% timing%"),
+]
+
+# A megjegyzés a mintákhoz: szóközzel keretezve, a szóhatárt jelző írásjelek szóközzé cserélve
+_SZOHATAR_JELEK = ",.;:!?()[]/+-"
+ESEMENY_SZOVEG_SQL = ("replace(" * len(_SZOHATAR_JELEK) + "' ' || {col} || ' '"
+                      + "".join(f", '{jel}', ' ')" for jel in _SZOHATAR_JELEK))
+
+# Az auto_osszesito saját oszloppárral vezetett kategóriái; a többi az egyeb_* oszlopokba kerül
+_AUTO_KATEGORIAK = {
+    "Tankolás": "tankolas",
+    "Karbantartás": "karbantartas",
+    "Biztosítás": "biztositas",
+}
+
+# Keresési találatok kiemelése a highlight() kimenetében (a felület cseréli
+# a saját jelölésére – Qt: félkövér, Tk: «» jelek)
+HL_START = "\x02"
+HL_END = "\x03"
+# Egy keresés legfeljebb ennyi (a legrelevánsabb) találatot ad vissza
+SEARCH_LIMIT = 500
+
+# A bejegyzés listák oszlopai (id, datum, osszeg, km_allas, kategoria, liter, ar_l, kut, megj, kep)
+LIST_COLUMNS = ("id, datum, osszeg, km_allas, kategoria, "
+                "mennyiseg_liter, egysegar_ft_l, benzinkut, megjegyzes, kep_utvonal")
+# A lapozott lista rendezési oszlopai és a sorbeli helyük
+LIST_ORDER_COLUMNS = {"datum": 1, "osszeg": 2, "km_allas": 3}
+
+# A keresésnél visszaadott oszlopok – az első tíz megegyezik a LIST_COLUMNS sorrendjével
+SEARCH_COLUMNS = (
+    "s.id, s.datum, s.osszeg, s.km_allas, k.nev AS kategoria, "
+    "s.mennyiseg_liter, s.egysegar_ft_l, s.benzinkut, s.megjegyzes, s.kep_utvonal, "
+    f"highlight(szerviz_fts, 0, '{HL_START}', '{HL_END}') AS megjegyzes_hl, "
+    f"highlight(szerviz_fts, 1, '{HL_START}', '{HL_END}') AS benzinkut_hl, "
+    f"highlight(szerviz_fts, 2, '{HL_START}', '{HL_END}') AS datum_hl"
+)
+SEARCH_COLUMN_NAMES = (
+    "id", "datum", "osszeg", "km_allas", "kategoria",
+    "mennyiseg_liter", "egysegar_ft_l", "benzinkut", "megjegyzes", "kep_utvonal",
+    "megjegyzes_hl", "benzinkut_hl", "datum_hl",
+)
+# Az FTS index oszlopai a találati sorban: (szöveg oszlop, kiemelt oszlop)
+SEARCH_TEXT_COLUMNS = (("megjegyzes", "megjegyzes_hl"), ("benzinkut", "benzinkut_hl"),
+                       ("datum", "datum_hl"))
+
+# Az alkalmazás forró lekérdezéseinek alakjai (mindkét felületről).
+# Indításkor EXPLAIN QUERY PLAN ellenőrzi őket: teljes táblaolvasás vagy
+# ideiglenes B-fa rendezés esetén figyelmeztetést naplózunk.
+HOT_QUERIES = {
+    "lista_datum": (
+        "SELECT id, datum, osszeg, km_allas, kategoria FROM szerviz_adatok_nevvel "
+        f"WHERE auto_id=? AND kategoria_id={KATEGORIA_ID_SQL} ORDER BY datum DESC",
+        (1, "Tankolás"),
+    ),
+    "lista_osszeg": (
+        "SELECT id, datum, osszeg, km_allas, kategoria FROM szerviz_adatok_nevvel "
+        f"WHERE auto_id=? AND kategoria_id={KATEGORIA_ID_SQL} ORDER BY osszeg DESC",
+        (1, "Tankolás"),
+    ),
+    "lista_km": (
+        "SELECT id, datum, osszeg, km_allas, kategoria FROM szerviz_adatok_nevvel "
+        f"WHERE auto_id=? AND kategoria_id={KATEGORIA_ID_SQL} ORDER BY km_allas DESC",
+        (1, "Tankolás"),
+    ),
+    "lista_lap_datum": (
+        f"SELECT {LIST_COLUMNS} FROM szerviz_adatok_nevvel "
+        f"WHERE auto_id=? AND kategoria_id={KATEGORIA_ID_SQL} AND datum IS NOT NULL "
+        "AND (datum, id) < (?, ?) ORDER BY datum DESC, id DESC LIMIT ?",
+        (1, "Tankolás", "2025.01.01", 1000, 100),
+    ),
+    "lista_lap_osszeg": (
+        f"SELECT {LIST_COLUMNS} FROM szerviz_adatok_nevvel "
+        f"WHERE auto_id=? AND kategoria_id={KATEGORIA_ID_SQL} AND osszeg IS NOT NULL "
+        "AND (osszeg, id) < (?, ?) ORDER BY osszeg DESC, id DESC LIMIT ?",
+        (1, "Tankolás", 20000, 1000, 100),
+    ),
+    "stat_bejegyzesek": (
+        "SELECT datum, datum_nap, honap_kulcs, "
+        f"CASE kategoria_id WHEN {KATEGORIA_ID_SQL} THEN 0 WHEN {KATEGORIA_ID_SQL} THEN 1 "
+        f"WHEN {KATEGORIA_ID_SQL} THEN 2 ELSE 3 END, "
+        "osszeg, mennyiseg_liter, egysegar_ft_l, km_allas FROM szerviz_adatok "
+        "WHERE auto_id=? ORDER BY km_allas, id",
+        ("Tankolás", "Karbantartás", "Biztosítás", 1),
+    ),
+    "eves_havi": (
+        f"SELECT honap_kulcs, round(SUM(CASE WHEN kategoria_id={KATEGORIA_ID_SQL} THEN osszeg ELSE 0 END), 2), "
+        "round(SUM(osszeg), 2) FROM havi_osszesito WHERE auto_id=? AND honap_kulcs BETWEEN ? AND ? "
+        "GROUP BY honap_kulcs ORDER BY honap_kulcs",
+        ("Tankolás", 1, 202501, 202512),
+    ),
+    "eves_osszesito": (
+        "SELECT h.honap_kulcs / 100, k.nev, round(h.osszeg, 2), h.db FROM havi_osszesito h "
+        "JOIN kategoriak k ON k.id = h.kategoria_id WHERE h.auto_id=?",
+        (1,),
+    ),
+    "utolso_esemeny_km": (
+        "SELECT MAX(km_allas) FROM szerviz_esemenyek "
+        "WHERE auto_id=? AND esemeny=? AND km_allas > 0",
+        (1, ESEMENY_OLAJ),
+    ),
+    "max_km": (
+        "SELECT MAX(km_allas) FROM szerviz_adatok WHERE auto_id=? AND km_allas IS NOT NULL",
+        (1,),
+    ),
+    "pdf_export": (
+        "SELECT datum, kategoria, osszeg, km_allas, megjegyzes FROM szerviz_adatok_nevvel "
+        "WHERE auto_id=? AND datum_nap BETWEEN ? AND ? ORDER BY datum_nap DESC",
+        (1, 739252, 739616),
+    ),
+    "kereses": (
+        f"SELECT {SEARCH_COLUMNS} FROM szerviz_fts "
+        "CROSS JOIN szerviz_adatok s ON s.id = szerviz_fts.rowid "
+        "JOIN kategoriak k ON k.id = s.kategoria_id "
+        f"WHERE szerviz_fts MATCH ? AND s.auto_id=? AND s.kategoria_id={KATEGORIA_ID_SQL} "
+        "ORDER BY szerviz_fts.rank LIMIT ?",
+        ('"olaj"*', 1, "Karbantartás", 500),
+    ),
+    "biztositas_lista": (
+        "SELECT id, datum, biztosito, kezdete, vege, osszeg FROM biztositas "
+        "WHERE auto_id=? ORDER BY vege DESC",
+        (1,),
+    ),
+    "auto_osszesito": (
+        "SELECT * FROM auto_osszesito WHERE auto_id=?",
+        (1,),
+    ),
+    "utolso_tankolas": (
+        "SELECT datum, km_allas FROM szerviz_adatok "
+        f"WHERE auto_id=? AND kategoria_id={KATEGORIA_ID_SQL} ORDER BY datum_nap DESC, id DESC LIMIT 1",
+        (1, "Tankolás"),
+    ),
+    "biztositas_vege": (
+        "SELECT MAX(vege) FROM biztositas WHERE auto_id=? AND vege IS NOT NULL AND vege != ''",
+        (1,),
+    ),
+    "biztositas_utolso": (
+        "SELECT biztosito, vege FROM biztositas "
+        "WHERE auto_id=? AND vege IS NOT NULL ORDER BY vege DESC LIMIT 1",
+        (1,),
+    ),
+}
+
+def init_db(db_path, profile=None):
+    """
+    Adatbázis megnyitása és a séma naprakészre hozása (migrate()).
+    profile: teljesítmény profil (ConfigManager.get_db_profile()) – a WAL
+    naplózási mód a fájlban marad, így minden későbbi kapcsolatra érvényes.
+    """
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    apply_profile(conn, profile_pragmas(profile))
+    try:
+        migrate(conn)
+        # Minden indításkor: néhány EXPLAIN, és a statisztika (ANALYZE) vagy egy
+        # kézzel módosított séma is elronthatja a tervet, nem csak a migráció
+        check_query_plans(conn)
+    finally:
+        conn.close()
+
+
+def migrate(conn) -> bool:
+    """
+    Verziózott migráció a PRAGMA user_version alapján.
+    Naprakész sémánál csak a verziót olvassa ki; különben a hiányzó
+    lépéseket sorban, egyetlen tranzakcióban futtatja.
+    Visszatér: True, ha migráció történt.
+    """
+    t0 = time.perf_counter()
+    current = conn.execute("PRAGMA user_version").fetchone()[0]
+    latest = MIGRATIONS[-1][0]
+
+    if current >= latest:
+        if current > latest:
+            logger.warning(f"Az adatbázis séma újabb (v{current}), mint az alkalmazásé (v{latest})")
+        logger.info(f"Séma naprakész (v{current}), {(time.perf_counter() - t0) * 1000:.1f} ms")
+        return False
+
+    isolation = conn.isolation_level
+    conn.isolation_level = None   # a tranzakciót kézzel kezeljük (DDL is benne legyen)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        for version, leiras, step in MIGRATIONS:
+            if version > current:
+                logger.info(f"Migráció v{version}: {leiras}...")
+                step(conn)
+        conn.execute(f"PRAGMA user_version = {latest}")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        logger.exception(f"Migráció sikertelen, a séma marad v{current}")
+        raise
+    finally:
+        conn.isolation_level = isolation
+
+    logger.info(f"Séma migráció v{current} → v{latest}, "
+                f"{(time.perf_counter() - t0) * 1000:.1f} ms")
+    return True
+
+
+# ----------------------------------------------------------------------
+# Migrációs lépések – tranzakción belül futnak, commit nélkül.
+# Mindegyik idempotens, mert a user_version előtti adatbázisok bármelyik
+# korábbi állapotban lehetnek.
+# ----------------------------------------------------------------------
+
+def _columns(conn, table) -> set[str]:
+    return {r[1] for r in conn.execute(f"PRAGMA table_info({table})").fetchall()}
+
+
+def _kat(conn):
+    """
+    Kategória hivatkozás a séma aktuális állapota szerint: v9 előtt név
+    (kategoria TEXT), utána azonosító (kategoria_id). A trigger és feltöltő
+    SQL ezzel készül, így a korábbi lépések is az akkori sémára futnak.
+    Visszatér: (oszlop neve, név -> SQL érték függvény).
+    """
+    if "kategoria_id" not in _columns(conn, "szerviz_adatok"):
+        return "kategoria", lambda nev: f"'{nev}'"
+    ids = dict(conn.execute("SELECT nev, id FROM kategoriak").fetchall())
+    return "kategoria_id", lambda nev: str(ids[nev])
+
+
+def _m1_alap_sema(conn):
+    """Táblák, régi oszlop pótlások és alapértelmezett kategóriák."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS autok (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            marka TEXT NOT NULL,
+            tipus TEXT NOT NULL,
+            evjarat TEXT,
+            km_allas INTEGER DEFAULT 0,
+            vin TEXT,
+            rendszam TEXT,
+            muszaki_lejarat TEXT,
+            olaj_intervallum INTEGER DEFAULT 10000,
+            ikon TEXT DEFAULT '🚗'
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS szerviz_adatok (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            auto_id INTEGER NOT NULL,
+            datum TEXT NOT NULL,
+            kategoria TEXT NOT NULL,
+            osszeg REAL DEFAULT 0,
+            km_allas INTEGER,
+            mennyiseg_liter REAL,
+            egysegar_ft_l REAL,
+            benzinkut TEXT,
+            megjegyzes TEXT,
+            kep_utvonal TEXT DEFAULT '',
+            FOREIGN KEY (auto_id) REFERENCES autok (id) ON DELETE CASCADE
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS kategoriak (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nev TEXT NOT NULL UNIQUE,
+            ikon TEXT DEFAULT '📦',
+            szin TEXT DEFAULT '#64748b',
+            alap INTEGER DEFAULT 0
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS biztositas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            auto_id INTEGER NOT NULL,
+            datum TEXT NOT NULL,
+            osszeg REAL DEFAULT 0,
+            biztosito TEXT,
+            kezdete TEXT,
+            vege TEXT,
+            megjegyzes TEXT,
+            kep_utvonal TEXT DEFAULT '',
+            FOREIGN KEY (auto_id) REFERENCES autok (id) ON DELETE CASCADE
+        )
+    """)
+
+    # Régebbi adatbázisokból hiányzó oszlopok
+    if "kep_utvonal" not in _columns(conn, "szerviz_adatok"):
+        conn.execute("ALTER TABLE szerviz_adatok ADD COLUMN kep_utvonal TEXT DEFAULT ''")
+    if "ikon" not in _columns(conn, "autok"):
+        conn.execute("ALTER TABLE autok ADD COLUMN ikon TEXT DEFAULT '🚗'")
+
+    # Alapértelmezett kategóriák feltöltése ha még üres
+    existing = conn.execute("SELECT COUNT(*) FROM kategoriak").fetchone()[0]
+    if existing == 0:
+        conn.executemany(
+            "INSERT INTO kategoriak (nev, ikon, szin, alap) VALUES (?,?,?,?)",
+            DEFAULT_KATEGORIAK
+        )
+    else:
+        # Biztosítás hozzáadása ha még nincs (meglévő adatbázisnál)
+        conn.execute(
+            "INSERT OR IGNORE INTO kategoriak (nev, ikon, szin, alap) VALUES (?,?,?,?)",
+            ("Biztosítás", "🛡️", "#8b5cf6", 1)
+        )
+
+
+def _m2_datum_oszlopok(conn):
+    """
+    datum_nap / honap_kulcs egész oszlopok a szerviz_adatok táblában.
+    A meglévő sorokat feltölti, a triggerek beszúráskor és a dátum
+    módosításakor tartják szinkronban.
+    """
+    if "datum_nap" not in _columns(conn, "szerviz_adatok"):
+        conn.execute("ALTER TABLE szerviz_adatok ADD COLUMN datum_nap INTEGER")
+        conn.execute("ALTER TABLE szerviz_adatok ADD COLUMN honap_kulcs INTEGER")
+        conn.execute(f"""
+            UPDATE szerviz_adatok
+            SET datum_nap = {DATUM_NAP_SQL.format(col="datum")},
+                honap_kulcs = {HONAP_KULCS_SQL.format(col="datum")}
+        """)
+    _datum_triggerek(conn)
+
+
+def _datum_triggerek(conn):
+    for event in ("INSERT", "UPDATE OF datum"):
+        name = "trg_szerviz_datum_" + ("ins" if event == "INSERT" else "upd")
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {name}
+            AFTER {event} ON szerviz_adatok
+            BEGIN
+                UPDATE szerviz_adatok
+                SET datum_nap = {DATUM_NAP_SQL.format(col="NEW.datum")},
+                    honap_kulcs = {HONAP_KULCS_SQL.format(col="NEW.datum")}
+                WHERE id = NEW.id;
+            END
+        """)
+
+
+def _m3_havi_osszesito(conn):
+    """
+    havi_osszesito: (auto, hónap, kategória) szerinti összeg / liter / darab.
+    A triggerek minden beszúrásnál, módosításnál és törlésnél pontosan
+    karbantartják (kerekítés nélkül, az olvasó kerekít); létrehozáskor a
+    meglévő adatokból épül fel.
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='havi_osszesito'"
+    ).fetchone()
+    if not exists:
+        conn.execute("""
+            CREATE TABLE havi_osszesito (
+                auto_id INTEGER NOT NULL,
+                honap_kulcs INTEGER NOT NULL,
+                kategoria TEXT NOT NULL,
+                osszeg REAL NOT NULL DEFAULT 0,
+                liter REAL NOT NULL DEFAULT 0,
+                db INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (auto_id, honap_kulcs, kategoria)
+            ) WITHOUT ROWID
+        """)
+        _fill_havi_osszesito(conn)
+    _havi_triggerek(conn)
+
+
+def _havi_triggerek(conn):
+    col, _ = _kat(conn)
+
+    # A kulcsot a dátum szövegből számoljuk: a honap_kulcs oszlopot egy
+    # másik AFTER trigger tölti, így itt még nem biztos, hogy friss.
+    # Nincs lépésenkénti kerekítés (az elcsúsztatná az összeget a valódi
+    # SUM-tól): az olvasó lekérdezések kerekítenek.
+    def add(row):
+        key = HONAP_KULCS_SQL.format(col=f"{row}.datum")
+        return f"""
+            INSERT INTO havi_osszesito (auto_id, honap_kulcs, {col}, osszeg, liter, db)
+            SELECT {row}.auto_id, {key}, {row}.{col},
+                   COALESCE({row}.osszeg, 0), COALESCE({row}.mennyiseg_liter, 0), 1
+            WHERE {key} IS NOT NULL
+            ON CONFLICT (auto_id, honap_kulcs, {col}) DO UPDATE SET
+                osszeg = osszeg + excluded.osszeg,
+                liter = liter + excluded.liter,
+                db = db + 1;
+        """
+
+    def remove(row):
+        key = HONAP_KULCS_SQL.format(col=f"{row}.datum")
+        where = f"auto_id = {row}.auto_id AND honap_kulcs = {key} AND {col} = {row}.{col}"
+        return f"""
+            UPDATE havi_osszesito SET
+                osszeg = osszeg - COALESCE({row}.osszeg, 0),
+                liter = liter - COALESCE({row}.mennyiseg_liter, 0),
+                db = db - 1
+            WHERE {where};
+            DELETE FROM havi_osszesito WHERE {where} AND db <= 0;
+        """
+
+    # Az UPDATE trigger csak az összesítést érintő oszlopokra figyel, így a
+    # datum_nap / honap_kulcs szinkronizáló frissítés nem indítja el
+    triggers = {
+        "trg_havi_ins": ("AFTER INSERT", add("NEW")),
+        "trg_havi_upd": (f"AFTER UPDATE OF auto_id, datum, {col}, osszeg, mennyiseg_liter",
+                         remove("OLD") + add("NEW")),
+        "trg_havi_del": ("AFTER DELETE", remove("OLD")),
+    }
+    for name, (event, body) in triggers.items():
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {name}
+            {event} ON szerviz_adatok
+            BEGIN
+                {body}
+            END
+        """)
+
+
+def _sync_indexes(conn):
+    """Létrehozza a kezelt indexeket és törli a feleslegessé váltakat."""
+    existing = {r[0] for r in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='index'"
+    ).fetchall()}
+
+    tables = {r[0] for r in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table'"
+    ).fetchall()}
+
+    changed = False
+    for name, (table, columns) in MANAGED_INDEXES.items():
+        # Egy későbbi migráció táblájához / oszlopához tartozó index a következő
+        # szinkronnál jön létre
+        if name in existing or table not in tables:
+            continue
+        if {c.strip() for c in columns.split(",")} <= _columns(conn, table):
+            logger.info(f"Migráció: {name} index létrehozása...")
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+            changed = True
+    for name in OBSOLETE_INDEXES:
+        if name in existing:
+            logger.info(f"Migráció: {name} index törlése (már nem használt)...")
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+            changed = True
+    if changed:
+        # Friss statisztika, hogy a tervező a megfelelő összetett indexet válassza
+        conn.execute("ANALYZE")
+
+
+def _m5_kereses(conn):
+    """
+    FTS5 index a megjegyzés, benzinkút és dátum szövegére (külső tartalom:
+    a szöveg csak a szerviz_adatok táblában van tárolva). Ékezetfüggetlen
+    (remove_diacritics), 2–3 karakteres előtag indexszel a gépelés közbeni
+    kereséshez. A triggerek tartják szinkronban.
+    """
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS szerviz_fts USING fts5(
+            megjegyzes, benzinkut, datum,
+            content='szerviz_adatok', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+    """)
+    conn.execute("INSERT INTO szerviz_fts (szerviz_fts) VALUES ('rebuild')")
+    # Alapértelmezett rangsor: bm25, a dátum találat kisebb súllyal. A rank
+    # oszlop szerinti rendezést az FTS5 maga végzi, nem kell külön rendezés.
+    conn.execute("INSERT INTO szerviz_fts (szerviz_fts, rank) VALUES ('rank', 'bm25(1.0, 1.0, 0.5)')")
+    _fts_triggerek(conn)
+
+
+def _fts_triggerek(conn):
+    insert = ("INSERT INTO szerviz_fts (rowid, megjegyzes, benzinkut, datum) "
+              "VALUES (NEW.id, NEW.megjegyzes, NEW.benzinkut, NEW.datum);")
+    delete = ("INSERT INTO szerviz_fts (szerviz_fts, rowid, megjegyzes, benzinkut, datum) "
+              "VALUES ('delete', OLD.id, OLD.megjegyzes, OLD.benzinkut, OLD.datum);")
+    triggers = {
+        "trg_fts_ins": ("AFTER INSERT", insert),
+        "trg_fts_upd": ("AFTER UPDATE OF megjegyzes, benzinkut, datum", delete + insert),
+        "trg_fts_del": ("AFTER DELETE", delete),
+    }
+    for name, (event, body) in triggers.items():
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {name}
+            {event} ON szerviz_adatok
+            BEGIN
+                {body}
+            END
+        """)
+
+
+def _m6_esemenyek(conn):
+    """
+    Szerviz esemény tábla (olajcsere, gumi, fék, vezérmű) a karbantartás
+    bejegyzésekhez. Rögzítéskor és módosításkor trigger sorolja be a
+    bejegyzést az esemeny_szabalyok alapján; a meglévő bejegyzéseket a
+    migráció egyszer besorolja.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS esemeny_szabalyok (
+            esemeny TEXT NOT NULL,
+            minta TEXT NOT NULL,
+            PRIMARY KEY (esemeny, minta)
+        ) WITHOUT ROWID
+    """)
+    conn.executemany(
+        "INSERT OR IGNORE INTO esemeny_szabalyok (esemeny, minta) VALUES (?,?)",
+        DEFAULT_ESEMENY_SZABALYOK
+    )
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS szerviz_esemenyek (
+            bejegyzes_id INTEGER NOT NULL,
+            auto_id INTEGER NOT NULL,
+            esemeny TEXT NOT NULL,
+            km_allas INTEGER,
+            PRIMARY KEY (bejegyzes_id, esemeny)
+        ) WITHOUT ROWID
+    """)
+
+    _esemeny_triggerek(conn)
+    _fill_esemenyek(conn)
+
+
+def _esemeny_triggerek(conn):
+    col, kat = _kat(conn)
+    classify = f"""
+        INSERT OR IGNORE INTO szerviz_esemenyek (bejegyzes_id, auto_id, esemeny, km_allas)
+        SELECT NEW.id, NEW.auto_id, esemeny, NEW.km_allas FROM esemeny_szabalyok
+        WHERE NEW.{col} = {kat('Karbantartás')}
+          AND {ESEMENY_SZOVEG_SQL.format(col="NEW.megjegyzes")} LIKE minta;
+    """
+    delete = "DELETE FROM szerviz_esemenyek WHERE bejegyzes_id = OLD.id;"
+    triggers = {
+        "trg_esemeny_ins": ("AFTER INSERT", classify),
+        "trg_esemeny_upd": (f"AFTER UPDATE OF auto_id, {col}, km_allas, megjegyzes",
+                            delete + classify),
+        "trg_esemeny_del": ("AFTER DELETE", delete),
+    }
+    for name, (event, body) in triggers.items():
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {name}
+            {event} ON szerviz_adatok
+            BEGIN
+                {body}
+            END
+        """)
+
+
+def _m8_auto_osszesito(conn):
+    """
+    auto_osszesito: autónként egy sor a kártyákhoz, chipekhez és
+    emlékeztetőkhöz (km állás, darabszám, kategória összegek, utolsó
+    tankolás, utolsó olajcsere km, biztosítás vége). Az összegeket a
+    triggerek különbséggel vezetik; a maximum / utolsó értékeket indexes
+    kereséssel frissítik, így egyik sem olvassa végig az autó előzményeit.
+    Az autok.km_allas oszlopot is a bejegyzések maximumára állítják
+    (korábban a CustomTkinter felület _sync_car_km metódusa végezte).
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='auto_osszesito'"
+    ).fetchone()
+    if not exists:
+        conn.execute("""
+            CREATE TABLE auto_osszesito (
+                auto_id INTEGER PRIMARY KEY,
+                km_allas INTEGER,
+                bejegyzes_db INTEGER NOT NULL DEFAULT 0,
+                tankolas_osszeg REAL NOT NULL DEFAULT 0,
+                tankolas_liter REAL NOT NULL DEFAULT 0,
+                tankolas_db INTEGER NOT NULL DEFAULT 0,
+                tankolas_ar_osszeg REAL NOT NULL DEFAULT 0,
+                tankolas_ar_db INTEGER NOT NULL DEFAULT 0,
+                karbantartas_osszeg REAL NOT NULL DEFAULT 0,
+                karbantartas_db INTEGER NOT NULL DEFAULT 0,
+                biztositas_osszeg REAL NOT NULL DEFAULT 0,
+                biztositas_db INTEGER NOT NULL DEFAULT 0,
+                egyeb_osszeg REAL NOT NULL DEFAULT 0,
+                egyeb_db INTEGER NOT NULL DEFAULT 0,
+                utolso_tankolas_datum TEXT,
+                utolso_tankolas_km INTEGER,
+                utolso_olaj_km INTEGER,
+                biztositas_vege TEXT
+            )
+        """)
+        _fill_auto_osszesito(conn)
+    _auto_osszesito_triggerek(conn)
+
+
+def _auto_osszesito_triggerek(conn):
+    col, kat = _kat(conn)
+
+    # Összeg és darab változás egy bejegyzés hozzáadásakor (+) / elvételekor (-);
+    # kerekítés nélkül, hogy az összeg ne csússzon el a valódi SUM-tól
+    def delta(row, sign):
+        def when(kategoria, value):
+            if kategoria is None:
+                cond = f"{row}.{col} NOT IN ({', '.join(kat(k) for k in _AUTO_KATEGORIAK)})"
+            else:
+                cond = f"{row}.{col} = {kat(kategoria)}"
+            return f"CASE WHEN {cond} THEN {value} ELSE 0 END"
+
+        osszeg = f"COALESCE({row}.osszeg, 0)"
+        sets = [f"bejegyzes_db = bejegyzes_db {sign} 1"]
+        for kategoria, prefix in list(_AUTO_KATEGORIAK.items()) + [(None, "egyeb")]:
+            sets.append(f"{prefix}_osszeg = {prefix}_osszeg {sign} {when(kategoria, osszeg)}")
+            sets.append(f"{prefix}_db = {prefix}_db {sign} {when(kategoria, 1)}")
+        sets.append(f"tankolas_liter = tankolas_liter {sign} "
+                    f"{when('Tankolás', f'COALESCE({row}.mennyiseg_liter, 0)')}")
+        ar = f"{row}.egysegar_ft_l IS NOT NULL AND {row}.{col} = {kat('Tankolás')}"
+        sets.append(f"tankolas_ar_osszeg = tankolas_ar_osszeg {sign} "
+                    f"CASE WHEN {ar} THEN {row}.egysegar_ft_l ELSE 0 END")
+        sets.append(f"tankolas_ar_db = tankolas_ar_db {sign} CASE WHEN {ar} THEN 1 ELSE 0 END")
+        return (f"UPDATE auto_osszesito SET {', '.join(sets)} "
+                f"WHERE auto_id = {row}.auto_id;")
+
+    # Maximum km és utolsó tankolás: egy-egy index keresés (idx_szerviz_auto_km,
+    # idx_szerviz_auto_kat_nap); a km állás az autóhoz is visszaíródik. Az utolsó
+    # tankolás a normalizált datum_nap szerint dől el (a régi '2024-04-05' alakú
+    # dátum szövegként a '2024.01.05' elé rendeződne), azonos napon az id szerint.
+    # A datum_nap oszlopot egy másik AFTER trigger tölti, ezért annak frissítése
+    # (trg_auto_szerviz_nap) is újraszámolja a sort
+    def refresh(row):
+        car = f"{row}.auto_id"
+        return f"""
+            UPDATE auto_osszesito SET
+                km_allas = (SELECT MAX(km_allas) FROM szerviz_adatok WHERE auto_id = {car}),
+                (utolso_tankolas_datum, utolso_tankolas_km) = (
+                    SELECT datum, km_allas FROM szerviz_adatok
+                    WHERE auto_id = {car} AND {col} = {kat('Tankolás')}
+                    ORDER BY datum_nap DESC, id DESC LIMIT 1
+                )
+            WHERE auto_id = {car};
+            UPDATE autok SET km_allas = (SELECT km_allas FROM auto_osszesito WHERE auto_id = {car})
+            WHERE id = {car}
+              AND (SELECT km_allas FROM auto_osszesito WHERE auto_id = {car}) IS NOT NULL;
+        """
+
+    olaj = """
+        UPDATE auto_osszesito SET utolso_olaj_km = (
+            SELECT MAX(km_allas) FROM szerviz_esemenyek
+            WHERE auto_id = {row}.auto_id AND esemeny = '{esemeny}' AND km_allas > 0
+        ) WHERE auto_id = {row}.auto_id AND {row}.esemeny = '{esemeny}';
+    """
+    biztositas = """
+        UPDATE auto_osszesito SET biztositas_vege = (
+            SELECT MAX(vege) FROM biztositas
+            WHERE auto_id = {row}.auto_id AND vege IS NOT NULL AND vege != ''
+        ) WHERE auto_id = {row}.auto_id;
+    """
+
+    # Az összesítő sort az autó létrehozása hozza létre; a bejegyzés triggerek
+    # csak frissítenek, így az autó törlésekor a kaszkád törlés sem hozza vissza
+    triggers = {
+        "trg_auto_osszesito_ins": ("AFTER INSERT", "autok",
+                                   "INSERT OR IGNORE INTO auto_osszesito (auto_id) VALUES (NEW.id);"),
+        "trg_auto_osszesito_del": ("AFTER DELETE", "autok",
+                                   "DELETE FROM auto_osszesito WHERE auto_id = OLD.id;"),
+        "trg_auto_szerviz_ins": ("AFTER INSERT", "szerviz_adatok",
+                                 delta("NEW", "+") + refresh("NEW")),
+        "trg_auto_szerviz_upd": (f"AFTER UPDATE OF auto_id, datum, {col}, km_allas, osszeg, "
+                                 "mennyiseg_liter, egysegar_ft_l", "szerviz_adatok",
+                                 delta("OLD", "-") + delta("NEW", "+") + refresh("OLD") + refresh("NEW")),
+        "trg_auto_szerviz_del": ("AFTER DELETE", "szerviz_adatok",
+                                 delta("OLD", "-") + refresh("OLD")),
+        "trg_auto_szerviz_nap": ("AFTER UPDATE OF datum_nap", "szerviz_adatok",
+                                 refresh("NEW")),
+        "trg_auto_olaj_ins": ("AFTER INSERT", "szerviz_esemenyek",
+                              olaj.format(row="NEW", esemeny=ESEMENY_OLAJ)),
+        "trg_auto_olaj_del": ("AFTER DELETE", "szerviz_esemenyek",
+                              olaj.format(row="OLD", esemeny=ESEMENY_OLAJ)),
+        "trg_auto_biztositas_ins": ("AFTER INSERT", "biztositas",
+                                    biztositas.format(row="NEW")),
+        "trg_auto_biztositas_upd": ("AFTER UPDATE OF auto_id, vege", "biztositas",
+                                    biztositas.format(row="OLD") + biztositas.format(row="NEW")),
+        "trg_auto_biztositas_del": ("AFTER DELETE", "biztositas",
+                                    biztositas.format(row="OLD")),
+    }
+    for name, (event, table, body) in triggers.items():
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {name}
+            {event} ON {table}
+            BEGIN
+                {body}
+            END
+        """)
+
+
+def _m9_kategoria_id(conn):
+    """
+    A szerviz_adatok.kategoria név helyett egész kulcs (kategoria_id) a
+    kategoriak táblára; a havi_osszesito is ezzel kulcsol. Az SQLite nem
+    tud oszlop típust cserélni, ezért a tábla újraépül (az id-k, így az FTS
+    index és az esemény sorok is érvényesek maradnak), majd a triggerek az
+    új oszlopra jönnek létre. A szerviz_adatok_nevvel nézet a régi, név
+    szerinti alakot adja vissza olvasáshoz.
+    """
+    if "kategoria" in _columns(conn, "szerviz_adatok"):
+        # Minden használt név kapjon kategória sort (pl. régen törölt egyéni kategória)
+        conn.executemany(
+            "INSERT OR IGNORE INTO kategoriak (nev, ikon, szin, alap) VALUES (?,?,?,?)",
+            DEFAULT_KATEGORIAK
+        )
+        conn.execute("""
+            INSERT OR IGNORE INTO kategoriak (nev)
+            SELECT DISTINCT kategoria FROM szerviz_adatok
+        """)
+        conn.execute("""
+            CREATE TABLE szerviz_adatok_uj (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                auto_id INTEGER NOT NULL,
+                datum TEXT NOT NULL,
+                kategoria_id INTEGER NOT NULL REFERENCES kategoriak (id),
+                osszeg REAL DEFAULT 0,
+                km_allas INTEGER,
+                mennyiseg_liter REAL,
+                egysegar_ft_l REAL,
+                benzinkut TEXT,
+                megjegyzes TEXT,
+                kep_utvonal TEXT DEFAULT '',
+                datum_nap INTEGER,
+                honap_kulcs INTEGER,
+                FOREIGN KEY (auto_id) REFERENCES autok (id) ON DELETE CASCADE
+            )
+        """)
+        conn.execute("""
+            INSERT INTO szerviz_adatok_uj
+                (id, auto_id, datum, kategoria_id, osszeg, km_allas, mennyiseg_liter,
+                 egysegar_ft_l, benzinkut, megjegyzes, kep_utvonal, datum_nap, honap_kulcs)
+            SELECT s.id, s.auto_id, s.datum, k.id, s.osszeg, s.km_allas, s.mennyiseg_liter,
+                   s.egysegar_ft_l, s.benzinkut, s.megjegyzes, s.kep_utvonal,
+                   s.datum_nap, s.honap_kulcs
+            FROM szerviz_adatok s JOIN kategoriak k ON k.nev = s.kategoria
+        """)
+        # A régi tábla triggerei és indexei vele együtt törlődnek
+        conn.execute("DROP TABLE szerviz_adatok")
+        conn.execute("ALTER TABLE szerviz_adatok_uj RENAME TO szerviz_adatok")
+
+        conn.execute("DROP TABLE IF EXISTS havi_osszesito")
+        conn.execute("""
+            CREATE TABLE havi_osszesito (
+                auto_id INTEGER NOT NULL,
+                honap_kulcs INTEGER NOT NULL,
+                kategoria_id INTEGER NOT NULL,
+                osszeg REAL NOT NULL DEFAULT 0,
+                liter REAL NOT NULL DEFAULT 0,
+                db INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (auto_id, honap_kulcs, kategoria_id)
+            ) WITHOUT ROWID
+        """)
+        _fill_havi_osszesito(conn)
+
+    conn.execute("""
+        CREATE VIEW IF NOT EXISTS szerviz_adatok_nevvel AS
+        SELECT s.*, k.nev AS kategoria
+        FROM szerviz_adatok s JOIN kategoriak k ON k.id = s.kategoria_id
+    """)
+    for triggerek in (_datum_triggerek, _havi_triggerek, _fts_triggerek,
+                      _esemeny_triggerek, _auto_osszesito_triggerek):
+        triggerek(conn)
+
+
+# Sorrendben alkalmazott migrációk: (user_version, leírás, lépés).
+# Új sémaváltozás = új sor a lista végén; index változáskor _sync_indexes
+# újra felvehető egy későbbi verzióval – a leírás nevezze meg a létrejövő
+# és törlődő indexeket.
+MIGRATIONS = [
+    (1, "alap séma és kategóriák", _m1_alap_sema),
+    (2, "datum_nap / honap_kulcs oszlopok", _m2_datum_oszlopok),
+    (3, "havi_osszesito tábla", _m3_havi_osszesito),
+    (4, "összetett indexek (autó+kategória+dátum/km/összeg, autó+nap, autó+km, "
+        "biztosítás vége); az egyoszlopos és havi indexek törlése", _sync_indexes),
+    (5, "szerviz_fts teljes szöveges index", _m5_kereses),
+    (6, "szerviz esemény típusok", _m6_esemenyek),
+    (7, "idx_esemeny_auto_tipus_km index (utolsó esemény km)", _sync_indexes),
+    (8, "auto_osszesito tábla", _m8_auto_osszesito),
+    (9, "kategoria_id kulcs", _m9_kategoria_id),
+    (10, "az újraépített szerviz_adatok indexei a kategoria_id oszlopon "
+         "(autó+kategória+dátum/nap/km, autó+nap, autó+km)", _sync_indexes),
+    (11, "idx_szerviz_auto_kat_osszeg_id (összeg szerinti lapozás); "
+         "a fedő idx_szerviz_auto_kat_osszeg törlése", _sync_indexes),
+]
+
+
+def fts_query(text: str) -> str | None:
+    """
+    Felhasználói keresőszövegből FTS5 MATCH kifejezés.
+    Szavanként előtag keresés (ÉS kapcsolat); az írásjellel tagolt szavak
+    (pl. '2025.03') kifejezésként egymás utáni tokenekre illeszkednek.
+    Visszatér: None, ha nincs kereshető szó.
+    """
+    terms = []
+    for word in text.split():
+        tokens = re.findall(r"\w+", word)
+        if tokens:
+            terms.append('"' + " ".join(tokens) + '"*')
+    return " ".join(terms) or None
+
+
+def search_entries(conn, auto_id, kategoria, text, limit=SEARCH_LIMIT):
+    """
+    Rangsorolt keresés egy autó adott kategóriájában (szerviz_fts rank),
+    legfeljebb limit találattal. A sorok SEARCH_COLUMNS szerintiek, a *_hl
+    oszlopokban HL_START / HL_END jelöli a találatokat.
+    Visszatér: None, ha a szövegben nincs kereshető szó.
+    """
+    match = fts_query(text)
+    if match is None:
+        return None
+    # CROSS JOIN: az FTS index legyen a külső ciklus – fordított sorrendnél
+    # soronként futna egy teljes MATCH lekérdezés
+    return conn.execute(f"""
+        SELECT {SEARCH_COLUMNS}
+        FROM szerviz_fts
+        CROSS JOIN szerviz_adatok s ON s.id = szerviz_fts.rowid
+        JOIN kategoriak k ON k.id = s.kategoria_id
+        WHERE szerviz_fts MATCH ? AND s.auto_id=? AND s.kategoria_id={KATEGORIA_ID_SQL}
+        ORDER BY szerviz_fts.rank
+        LIMIT ?
+    """, (match, auto_id, kategoria, limit)).fetchall()
+
+
+def get_entry(conn, entry_id):
+    """Egy bejegyzés LIST_COLUMNS szerinti sora (pl. írás utáni lista frissítéshez), vagy None."""
+    return conn.execute(f"SELECT {LIST_COLUMNS} FROM szerviz_adatok_nevvel WHERE id=?",
+                        (entry_id,)).fetchone()
+
+
+def list_entries(conn, auto_id, kategoria, order="datum", desc=True, after=None,
+                 limit=100, where="", params=()):
+    """
+    Egy autó adott kategóriájának bejegyzései lapozva (keyset lapozás).
+
+    order: LIST_ORDER_COLUMNS egyike, azonos értéknél id szerint rendez
+    after: az előző lap utolsó sora (LIST_COLUMNS szerinti sor) vagy None
+    where / params: további szűrés (pl. "AND datum >= ?", ("2024.01.01",))
+
+    A következő lap az (order, id) kulcs után folytatódik, így a lekérdezés
+    az indexben a kulcsra ugrik – nem függ attól, hány sort lapoztunk már
+    át. A NULL értékű sorok (SQLite-ban a legkisebbek) külön szakaszban
+    jönnek: csökkenő rendezésnél a végén, növekvőnél az elején.
+    """
+    if order not in LIST_ORDER_COLUMNS:
+        raise ValueError(f"Ismeretlen rendezés: {order}")
+    direction, op = ("DESC", "<") if desc else ("ASC", ">")
+    sections = ["ertek", "null"] if desc else ["null", "ertek"]
+
+    start = 0
+    if after is not None:
+        key, last_id = after[LIST_ORDER_COLUMNS[order]], after[0]
+        start = sections.index("null" if key is None else "ertek")
+
+    rows = []
+    for i, section in enumerate(sections[start:]):
+        keyset = after is not None and i == 0
+        # A kulcs feltétel a szűrők előtt áll: azonos oszlopú tartomány
+        # feltételek közül a tervező az elsőt használja az index kereséshez
+        args = [auto_id, kategoria]
+        if section == "ertek":
+            cond, sort = f"{order} IS NOT NULL", f"{order} {direction}, id {direction}"
+            if keyset:
+                cond += f" AND ({order}, id) {op} (?, ?)"
+                args += [key, last_id]
+        else:
+            cond, sort = f"{order} IS NULL", f"id {direction}"
+            if keyset:
+                cond += f" AND id {op} ?"
+                args.append(last_id)
+        rows += conn.execute(f"""
+            SELECT {LIST_COLUMNS} FROM szerviz_adatok_nevvel
+            WHERE auto_id=? AND kategoria_id={KATEGORIA_ID_SQL} AND {cond} {where}
+            ORDER BY {sort} LIMIT ?
+        """, (*args, *params, limit - len(rows))).fetchall()
+        if len(rows) >= limit:
+            break
+    return rows
+
+
+def _fill_havi_osszesito(conn):
+    col, _ = _kat(conn)
+    conn.execute("DELETE FROM havi_osszesito")
+    conn.execute(f"""
+        INSERT INTO havi_osszesito (auto_id, honap_kulcs, {col}, osszeg, liter, db)
+        SELECT auto_id, {HONAP_KULCS_SQL.format(col="datum")} AS kulcs, {col},
+               SUM(COALESCE(osszeg, 0)), SUM(COALESCE(mennyiseg_liter, 0)), COUNT(*)
+        FROM szerviz_adatok
+        WHERE kulcs IS NOT NULL
+        GROUP BY auto_id, kulcs, {col}
+    """)
+
+
+def _fill_esemenyek(conn):
+    col, kat = _kat(conn)
+    conn.execute("DELETE FROM szerviz_esemenyek")
+    conn.execute(f"""
+        INSERT OR IGNORE INTO szerviz_esemenyek (bejegyzes_id, auto_id, esemeny, km_allas)
+        SELECT s.id, s.auto_id, r.esemeny, s.km_allas
+        FROM szerviz_adatok s
+        JOIN esemeny_szabalyok r ON {ESEMENY_SZOVEG_SQL.format(col="s.megjegyzes")} LIKE r.minta
+        WHERE s.{col} = {kat('Karbantartás')}
+    """)
+
+
+def _fill_auto_osszesito(conn):
+    col, kat = _kat(conn)
+
+    def sum_if(kategoria, value):
+        if kategoria is None:
+            cond = f"s.{col} NOT IN ({', '.join(kat(k) for k in _AUTO_KATEGORIAK)})"
+        else:
+            cond = f"s.{col} = {kat(kategoria)}"
+        return f"SUM(CASE WHEN {cond} THEN {value} ELSE 0 END)"
+
+    columns, values = ["auto_id", "km_allas", "bejegyzes_db"], ["a.id", "MAX(s.km_allas)", "COUNT(s.id)"]
+    for kategoria, prefix in list(_AUTO_KATEGORIAK.items()) + [(None, "egyeb")]:
+        columns += [f"{prefix}_osszeg", f"{prefix}_db"]
+        values += [sum_if(kategoria, 'COALESCE(s.osszeg, 0)'), sum_if(kategoria, 1)]
+    columns += ["tankolas_liter", "tankolas_ar_osszeg", "tankolas_ar_db"]
+    values += [sum_if('Tankolás', 'COALESCE(s.mennyiseg_liter, 0)'),
+               sum_if('Tankolás', 'COALESCE(s.egysegar_ft_l, 0)'),
+               f"SUM(s.{col} = {kat('Tankolás')} AND s.egysegar_ft_l IS NOT NULL)"]
+
+    conn.execute("DELETE FROM auto_osszesito")
+    conn.execute(f"""
+        INSERT INTO auto_osszesito ({', '.join(columns)})
+        SELECT {', '.join(values)}
+        FROM autok a LEFT JOIN szerviz_adatok s ON s.auto_id = a.id
+        GROUP BY a.id
+    """)
+    conn.execute(f"""
+        UPDATE auto_osszesito SET
+            (utolso_tankolas_datum, utolso_tankolas_km) = (
+                SELECT datum, km_allas FROM szerviz_adatok
+                WHERE auto_id = auto_osszesito.auto_id AND {col} = {kat('Tankolás')}
+                ORDER BY datum_nap DESC, id DESC LIMIT 1
+            ),
+            utolso_olaj_km = (
+                SELECT MAX(km_allas) FROM szerviz_esemenyek
+                WHERE auto_id = auto_osszesito.auto_id AND esemeny = '{ESEMENY_OLAJ}' AND km_allas > 0
+            ),
+            biztositas_vege = (
+                SELECT MAX(vege) FROM biztositas
+                WHERE auto_id = auto_osszesito.auto_id AND vege IS NOT NULL AND vege != ''
+            )
+    """)
+
+
+def reclassify_esemenyek(conn) -> int:
+    """Minden bejegyzés újra besorolása (pl. szabály változás után). Visszatér: sorok száma."""
+    with conn:
+        _fill_esemenyek(conn)
+    count = conn.execute("SELECT COUNT(*) FROM szerviz_esemenyek").fetchone()[0]
+    logger.info(f"szerviz_esemenyek újra besorolva: {count} esemény")
+    return count
+
+
+def utolso_esemeny_km(conn, auto_id, esemeny=ESEMENY_OLAJ) -> int | None:
+    """Az adott típusú utolsó szerviz esemény km állása (pl. utolsó olajcsere)."""
+    row = conn.execute("""
+        SELECT MAX(km_allas) FROM szerviz_esemenyek
+        WHERE auto_id=? AND esemeny=? AND km_allas > 0
+    """, (auto_id, esemeny)).fetchone()
+    return row[0] if row else None
+
+
+def rebuild_auto_osszesito(conn) -> int:
+    """Az auto_osszesito tábla teljes újraépítése. Visszatér: sorok száma."""
+    with conn:
+        _fill_auto_osszesito(conn)
+    count = conn.execute("SELECT COUNT(*) FROM auto_osszesito").fetchone()[0]
+    logger.info(f"auto_osszesito újraépítve: {count} sor")
+    return count
+
+
+def rebuild_havi_osszesito(conn) -> int:
+    """A havi_osszesito tábla teljes újraépítése. Visszatér: sorok száma."""
+    with conn:
+        _fill_havi_osszesito(conn)
+    count = conn.execute("SELECT COUNT(*) FROM havi_osszesito").fetchone()[0]
+    logger.info(f"havi_osszesito újraépítve: {count} sor")
+    return count
+
+
+def datum_nap(datum: str) -> int | None:
+    """'YYYY.MM.DD' szövegből napsorszám (a datum_nap oszlop értéke)."""
+    try:
+        return datetime.strptime(datum.strip()[:10], "%Y.%m.%d").toordinal()
+    except (ValueError, AttributeError):
+        return None
+
+
+def honap_kulcs(d: date, honap_eltolas: int = 0) -> int:
+    """YYYYMM hónap kulcs, opcionálisan hónapokkal eltolva (negatív = korábbi)."""
+    index = d.year * 12 + d.month - 1 + honap_eltolas
+    return (index // 12) * 100 + index % 12 + 1
+
+
+def check_query_plans(conn, queries=None) -> list[tuple[str, str]]:
+    """
+    EXPLAIN QUERY PLAN minden regisztrált lekérdezésre.
+    Visszatér: [(lekérdezés neve, terv sor), ...] a problémás lépésekkel
+    (teljes táblaolvasás, ideiglenes B-fa rendezés/csoportosítás).
+    """
+    problems = []
+    for name, (sql, params) in (queries or HOT_QUERIES).items():
+        try:
+            plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Lekérdezés terv hiba ({name}): {e}")
+            continue
+        for row in plan:
+            detail = row[3]
+            # A virtuális tábla (FTS5) saját indexét használja, az nem táblaolvasás
+            full_scan = (detail.startswith("SCAN ") and not detail.startswith("SCAN CONSTANT")
+                         and "VIRTUAL TABLE" not in detail)
+            if full_scan or "USE TEMP B-TREE" in detail:
+                problems.append((name, detail))
+
+    for name, detail in problems:
+        logger.warning(f"Lekérdezés terv: {name} – {detail}")
+    if not problems:
+        logger.info(f"Lekérdezés tervek rendben ({len(queries or HOT_QUERIES)} lekérdezés)")
+    return problems
+
+
+if __name__ == "__main__":
+    # Karbantartás parancssorból: python database.py rebuild <adatbázis útvonal>
+    import sys
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    if len(sys.argv) != 3 or sys.argv[1] != "rebuild":
+        print("Használat: python database.py rebuild <adatbázis.db>")
+        sys.exit(1)
+    init_db(sys.argv[2])
+    rebuild_conn = sqlite3.connect(sys.argv[2])
+    rebuild_havi_osszesito(rebuild_conn)
+    reclassify_esemenyek(rebuild_conn)
+    rebuild_auto_osszesito(rebuild_conn)
+    rebuild_conn.close()
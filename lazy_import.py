@@ -0,0 +1,152 @@
+"""
+lazy_import.py
+--------------
+Halasztott importok és indulási időmérés (CustomTkinter és PyQt6).
+- lazy(név): modul helyettes, az első attribútum eléréskor importál; a
+  NumPy, a matplotlib és az fpdf így csak az első grafikonnál vagy
+  exportnál töltődik be, nem az ablak megjelenése előtt
+- available(név): telepítettség ellenőrzése importálás nélkül (HAS_MPL,
+  HAS_FPDF)
+- preload(): előtöltés háttérszálon az első rajzolás után, hogy az első
+  grafikon ne várjon az importra
+- startup: az indulás mérföldkövei és a halasztott importok ideje; a
+  riport megmutatja, mennyi idő került át az ablak megjelenése utánra
+
+Ezt a modult a belépési pontok elsőként importálják: az időmérés innen
+indul.
+"""
+
+import importlib
+import importlib.util
+import logging
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Nehéz modulok, amelyeket az alkalmazás csak igény szerint tölt be;
+# az előtöltés ebben a sorrendben importál
+HEAVY_MODULES = (
+    "numpy",
+    "matplotlib.figure",
+    "matplotlib.backends.backend_agg",
+    "matplotlib.image",
+    "matplotlib.patches",
+    "matplotlib.ticker",
+    "fpdf",
+)
+
+_T0 = time.perf_counter()
+_lock = threading.Lock()
+# (modul név, kezdés az indulástól, időtartam) – csak a ténylegesen importált
+# modulok, a már betöltöttek nem
+_loads: list[tuple[str, float, float]] = []
+
+
+def load(name: str):
+    """A modul importálása (szálbiztos); az első betöltés idejét rögzíti."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    elapsed = time.perf_counter() - start
+    with _lock:
+        if not any(n == name for n, *_ in _loads):
+            _loads.append((name, start - _T0, elapsed))
+    logger.debug("Halasztott import: %s (%.0f ms)", name, elapsed * 1000)
+    return module
+
+
+def available(name: str) -> bool:
+    """Telepítve van-e a (legfelső szintű) csomag – importálás nélkül."""
+    try:
+        return importlib.util.find_spec(name.partition(".")[0]) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+class LazyModule:
+    """Modul helyettes: az első attribútum eléréskor importálja a valódit."""
+
+    __slots__ = ("_name", "_module")
+
+    def __init__(self, name: str):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_module", None)
+
+    def _load(self):
+        module = self._module
+        if module is None:
+            module = load(self._name)
+            object.__setattr__(self, "_module", module)
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "betöltve" if self._module is not None else "halasztva"
+        return f"<LazyModule {self._name} ({state})>"
+
+
+def lazy(name: str) -> LazyModule:
+    return LazyModule(name)
+
+
+def preload(names=HEAVY_MODULES, on_done=None) -> threading.Thread:
+    """
+    A modulok importálása háttérszálon. A hiányzó (nem telepített) modulok
+    kimaradnak. on_done(eltelt másodperc) a háttérszálon hívódik.
+    """
+    def run():
+        start = time.perf_counter()
+        for name in names:
+            try:
+                load(name)
+            except ImportError as e:
+                logger.debug("Előtöltés kihagyva: %s (%s)", name, e)
+        if on_done:
+            on_done(time.perf_counter() - start)
+
+    t = threading.Thread(target=run, name="preload", daemon=True)
+    t.start()
+    return t
+
+
+class StartupTimer:
+    """Indulási mérföldkövek (a lazy_import betöltésétől mérve) és riport."""
+
+    def __init__(self):
+        self._marks: dict[str, float] = {}
+
+    def mark(self, label: str) -> float:
+        """Mérföldkő rögzítése; az első rögzítés marad érvényes."""
+        return self._marks.setdefault(label, time.perf_counter() - _T0)
+
+    def report(self) -> str:
+        """
+        Egy soros összefoglaló: mérföldkövek, valamint az ablak előtt és
+        után betöltött halasztott modulok. Az ablak után betöltöttek ideje
+        a nyereség – korábban mind az ablak megjelenése előtt futott.
+        """
+        marks = ", ".join(f"{label} {t * 1000:.0f} ms" for label, t in self._marks.items())
+        window = self._marks.get("ablak")
+        with _lock:
+            loads = list(_loads)
+        before = [l for l in loads if window is None or l[1] < window]
+        after = [l for l in loads if window is not None and l[1] >= window]
+
+        def fmt(items):
+            return " ".join(f"{n}={d * 1000:.0f}ms" for n, _, d in items) or "-"
+
+        gain = sum(d for _, _, d in after)
+        deferred = [n for n in HEAVY_MODULES if not any(l[0] == n for l in loads)
+                    and n not in sys.modules]
+        return (f"Indulás: {marks}; ablak előtt importálva: {fmt(before)}; "
+                f"ablak után: {fmt(after)} (nyereség {gain * 1000:.0f} ms); "
+                f"még nem töltött: {', '.join(deferred) or '-'}")
+
+
+startup = StartupTimer()
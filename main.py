@@ -6,30 +6,38 @@ Funkciók: Tankolás, Karbantartás, Egyéb, Statisztika,
           Sötét mód, Keresés/Szűrés, Backup, Emlékeztetők
 """
 
+# Elsőként: innen indul az indulási időmérés
+from lazy_import import lazy, preload, startup
+
 import customtkinter as ctk
-import sqlite3
 import sys
 import os
 import csv
 import shutil
 import logging
+import base64
+import tkinter as tk
 from tkinter import filedialog, messagebox
 from updater import UpdateChecker, CURRENT_VERSION
-from ui_components import (InfoCard, DataRow, SearchFilterBar, ReminderPopup,
+from ui_components import (InfoCard, StatCard, DataRow, WindowedList, SearchFilterBar, ReminderPopup,
                            BackupPanel, SettingsPanel, ChangelogPopup,
                            CategoryManagerPanel, UpdatePopup)
-from database import init_db
+from database import (init_db, fts_query, list_entries, get_entry, KATEGORIA_ID_SQL,
+                      LIST_ORDER_COLUMNS, HL_START, HL_END, SEARCH_LIMIT)
+from connection_manager import ConnectionManager
 from config import ConfigManager
 from backup_manager import BackupManager
 from reminder_manager import ReminderManager
-import matplotlib
-import matplotlib.pyplot as plt
-matplotlib.use("TkAgg")
+from search_manager import SearchManager
+from data_events import EventBus, ViewRegistry, EntryChange, INSERTED, UPDATED, DELETED
+from widget_pool import WidgetPool, pool_stats
+from stats_engine import compute_stats, StatsCache
+from chart_renderer import ChartRenderer
 import warnings
 warnings.filterwarnings("ignore", message=".*categorical units.*")
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from fpdf import FPDF
-from fpdf.enums import XPos, YPos
+# Az fpdf csak az első PDF exportnál (vagy előtöltéskor) töltődik be
+fpdf = lazy("fpdf")
+fpdf_enums = lazy("fpdf.enums")
 from datetime import datetime
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
@@ -57,18 +65,36 @@ CHANGELOG_PATH = os.path.join(EXE_DIR, "CHANGELOG.md")
 
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+# Közös kapcsolat pool – a get_db() nem nyit új kapcsolatot minden hívásnál;
+# az olvasások (read_db) a szál saját kapcsolatán futnak, nem várnak az írásokra
+db = ConnectionManager.for_path(DB_PATH)
+
 
 def get_db():
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute("PRAGMA foreign_keys = ON")
-    return conn
+    """`with get_db() as conn:` – az író kapcsolat a write_lock alatt (commit a blokk végén)."""
+    return db.writer()
+
+
+def read_db():
+    """`with read_db() as conn:` – a szál olvasó kapcsolata; nem vár a folyamatban lévő írásra."""
+    return db.reader()
+
+
+# A statisztika grafikonjainak felbontása (a grafikon gyorsítótár kulcsának része)
+CHART_DPI = 90
+
+# A jármű kártyák (InfoCard) sorának oszlopai
+CAR_COLUMNS = ("id, marka, tipus, evjarat, km_allas, vin, rendszam, muszaki_lejarat, "
+               "olaj_intervallum, COALESCE(ikon,'🚗')")
 
 
 class WheelBooK(ctk.CTk):
     def __init__(self):
         super().__init__()
-        self.config_manager = ConfigManager(CONFIG_PATH)
-        init_db(DB_PATH)
+        self.config_manager = ConfigManager.for_path(CONFIG_PATH)
+        db_profile = self.config_manager.get_db_profile()
+        db.set_profile(db_profile)
+        init_db(DB_PATH, db_profile)
 
         # Managerek inicializálása
         self.backup_manager = BackupManager(
@@ -76,12 +102,28 @@ class WheelBooK(ctk.CTk):
             backup_keep_days=self.config_manager.get("backup_keep_days", 30)
         )
         self.reminder_manager = ReminderManager(DB_PATH, self.config_manager)
+        self.search_manager = SearchManager(db.reader)
+        # Bejegyzés írások eseményei: a listák helyben javulnak, nincs teljes újratöltés
+        self.events = EventBus()
+        # Fülek táblafüggőségei: írás után csak a látható fül frissül, a többi megjelenéskor
+        self.views = ViewRegistry()
+        # Statisztika eredmények: a bejelentett írás csak az érintett autót ejti ki
+        self.stats_cache = StatsCache()
+        self.events.subscribe(self._bump_stats)
+        self.events.subscribe(self.views.apply)
+        # Bejegyzés írásakor a km-állást a trigger frissíti: csak az az egy kártya frissül
+        self.events.subscribe(lambda ev: self.refresh_car(ev.auto_id))
+        self._search_tokens = {}   # kat -> a még meg nem érkezett keresés tokenje
+        # Grafikonok: háttérszálon rajzolt, memóriában és lemezen tárolt képek
+        self.chart_renderer = ChartRenderer(os.path.join(DATA_DIR, "chart_cache"))
+        self._stat_charts = []     # a statisztika még készülő grafikonjainak helyei
         self.update_checker = UpdateChecker(EXE_DIR, self._on_update_available)
 
         self.selected_car_id = None
+        self._car_cards = {}   # auto_id -> InfoCard (a sáv sorrendjében)
+        self._cars = {}        # auto_id -> autó sor (a kártyák és a nevek gyorsítótára)
         self.temp_image_path = None
         self._open_popups = set()  # Dupla kattintás védelem
-        self._stats_cache_key = None  # Statisztika cache
 
         # Sötét mód betöltése
         mode = self.config_manager.get("appearance_mode", "light")
@@ -95,9 +137,21 @@ class WheelBooK(ctk.CTk):
         self.setup_ui()
         self.refresh_cars()
 
+        # Az első rajzolás után (üresjáratban): indulási riport és előtöltés
+        self.after_idle(self._warm_up)
         # Indítás utáni feladatok (rövid késleltetéssel, hogy az UI betöltődjön)
         self.after(800, self._startup_tasks)
 
+    def _warm_up(self):
+        """Indulási riport, majd (ha be van kapcsolva) a nehéz modulok előtöltése háttérben."""
+        startup.mark("ablak")
+        logger.info(startup.report())
+        if self.config_manager.get("preload_modules", True):
+            def done(elapsed):
+                startup.mark("előtöltés")
+                logger.info("Előtöltés kész (%.0f ms) – %s", elapsed * 1000, startup.report())
+            preload(on_done=done)
+
     def _startup_tasks(self):
         """Indítás utáni háttérfeladatok: backup + emlékeztetők."""
         # Automatikus backup
@@ -117,15 +171,27 @@ class WheelBooK(ctk.CTk):
         self.after(3000, self.update_checker.check_async)
 
     def on_closing(self):
-        plt.close('all')
+        logger.info(f"Adatbázis kapcsolatok: {db.stats()}")
+        logger.info(f"Widget készletek: {pool_stats()}")
+        logger.info(f"Statisztika gyorsítótár: {self.stats_cache.stats()}")
+        logger.info(f"Grafikon gyorsítótár: {self.chart_renderer.stats()}")
+        self.config_manager.flush()
+        db.close_all()
         self.quit()
         self.destroy()
 
+    def _bump_stats(self, ev):
+        """Bejelentett írás: csak az érintett autó statisztikája avul el."""
+        # A kulcs az olvasó kapcsolaton készül (update_statistics): annak verziója az elfogadott
+        self.stats_cache.bump(ev.auto_id, db.reader())
+
     def _on_appearance_change(self, mode: str):
         """Sötét/Világos mód váltásakor frissíti az UI-t."""
         ctk.set_appearance_mode(mode)
         self.configure(fg_color="#1a1a2e" if mode == "dark" else "#f8fafc")
         self.refresh_cars()
+        # A grafikonok háttere is módváltó
+        self.refresh_data()
 
     # =========================================================================
     # UI Felépítés
@@ -166,11 +232,14 @@ class WheelBooK(ctk.CTk):
         for w in self.tab_container.winfo_children():
             w.destroy()
 
-        self.tab_lists = {}    # kat -> scrollframe
+        self.tab_lists = {}    # kat -> WindowedList
         self.tab_filters = {}  # kat -> filterbar
+        self.tab_views = {}    # fül neve -> nézet neve (ViewRegistry)
+        self.views.clear()
 
         self.tabs = ctk.CTkTabview(self.tab_container,
-                                   segmented_button_selected_color="#3b82f6")
+                                   segmented_button_selected_color="#3b82f6",
+                                   command=self._on_tab_change)
         self.tabs.pack(fill="both", expand=True)
 
         # Alap fülek (Biztosítás saját fület kap)
@@ -181,13 +250,16 @@ class WheelBooK(ctk.CTk):
         ]:
             tab = self.tabs.add(tab_name)
             self._setup_tab_content(tab, kat, import_fn)
+            self._register_list_view(tab_name, kat)
 
         # Biztosítás fix fül
         tab_biz = self.tabs.add("🛡️ Biztosítás")
         self._setup_biztositas_tab(tab_biz)
+        self._register_view("🛡️ Biztosítás", "__biz__", self._refresh_biztositas_tab,
+                            ("biztositas",))
 
         # Egyedi kategória fülek (Biztosítás kihagyva – már van saját füle)
-        with get_db() as conn:
+        with read_db() as conn:
             custom_cats = conn.execute(
                 "SELECT nev, ikon FROM kategoriak WHERE alap=0 ORDER BY id ASC"
             ).fetchall()
@@ -198,15 +270,47 @@ class WheelBooK(ctk.CTk):
             tab_label = f"{ikon} {nev}"
             tab = self.tabs.add(tab_label)
             self._setup_tab_content(tab, nev, None)
+            self._register_list_view(tab_label, nev)
 
         # Statisztika + Éves fülek
         tab_stat = self.tabs.add("📊 Statisztika")
         self.stat_scroll = ctk.CTkScrollableFrame(tab_stat, fg_color="transparent")
         self.stat_scroll.pack(fill="both", expand=True)
+        # A kártyák frissítésről frissítésre ugyanazok, csak a szövegük cserélődik
+        self.stat_cards = ctk.CTkFrame(self.stat_scroll, fg_color="transparent")
+        self.stat_cards.grid_columnconfigure((0, 1, 2), weight=1)
+        self.stat_card_pool = WidgetPool("StatCard", self._new_stat_card,
+                                         self._bind_stat_card, StatCard.grid_remove)
+        self._register_view("📊 Statisztika", "__stat__", self.update_statistics,
+                            ("szerviz_adatok", "biztositas", "autok"),
+                            cancel=self._cancel_statistics)
 
         tab_eves = self.tabs.add("📅 Éves összesítő")
         self.eves_scroll = ctk.CTkScrollableFrame(tab_eves, fg_color="transparent")
         self.eves_scroll.pack(fill="both", expand=True)
+        self._register_view("📅 Éves összesítő", "__eves__", self.update_yearly_stats,
+                            ("szerviz_adatok", "autok"))
+
+        # A kezdő fül tartalma (a többi a megjelenésekor töltődik be)
+        self._on_tab_change()
+
+    def _register_view(self, tab_name: str, view: str, refresh, tables, **kwargs):
+        self.tab_views[tab_name] = view
+        self.views.register(view, refresh, tables, **kwargs)
+
+    def _register_list_view(self, tab_name: str, kat: str):
+        self._register_view(tab_name, kat, lambda: self._refresh_tab(kat), ("szerviz_adatok",),
+                            patch=lambda ev: self._patch_tab(kat, ev),
+                            cancel=lambda: self._cancel_tab(kat))
+
+    def _on_tab_change(self):
+        """Fülváltás: az új fül csak akkor frissül, ha azóta változott, amitől függ."""
+        self.views.show(self.tab_views.get(self.tabs.get()))
+
+    def _show_tab(self, tab_name: str):
+        # A CTkTabview.set() nem hívja a command-ot
+        self.tabs.set(tab_name)
+        self._on_tab_change()
 
     def _setup_biztositas_tab(self, tab):
         """Biztosítás fül felépítése."""
@@ -227,7 +331,7 @@ class WheelBooK(ctk.CTk):
         if not self.selected_car_id:
             return
 
-        with get_db() as conn:
+        with read_db() as conn:
             rows = conn.execute("""
                 SELECT id, datum, biztosito, kezdete, vege, osszeg, megjegyzes, kep_utvonal
                 FROM biztositas WHERE auto_id=? ORDER BY vege DESC
@@ -300,7 +404,7 @@ class WheelBooK(ctk.CTk):
                           command=lambda i=rid: self._delete_biztositas(i)).pack(side="left", padx=2)
 
     def _edit_biztositas(self, eid: int):
-        with get_db() as conn:
+        with read_db() as conn:
             r = conn.execute(
                 "SELECT datum, osszeg, biztosito, kezdete, vege, megjegyzes FROM biztositas WHERE id=?",
                 (eid,)
@@ -316,7 +420,7 @@ class WheelBooK(ctk.CTk):
             return
         with get_db() as conn:
             conn.execute("DELETE FROM biztositas WHERE id=?", (eid,))
-        self.refresh_data()
+        self.views.invalidate("biztositas", auto_id=self.selected_car_id)
 
     def _setup_tab_content(self, tab, kat: str, import_cmd):
         """Egy fül tartalmának felépítése (lista + szűrő + gombok)."""
@@ -329,13 +433,21 @@ class WheelBooK(ctk.CTk):
                           command=import_cmd).pack(side="left", padx=5)
 
         filter_bar = SearchFilterBar(
-            tab, on_change_callback=lambda f, k=kat: self._refresh_tab(k))
+            tab, on_change_callback=lambda f, k=kat: self._refresh_tab(k),
+            debounce_ms=self.config_manager.get("search_debounce_ms", 250))
         filter_bar.pack(fill="x", padx=10, pady=(0, 5))
 
-        scroll = ctk.CTkScrollableFrame(tab, fg_color="transparent")
-        scroll.pack(fill="both", expand=True)
-
-        self.tab_lists[kat] = scroll
+        # Csak a látható sorok widgetek, a sorok lapozva töltődnek be
+        lst = WindowedList(
+            tab,
+            make_row=lambda parent: DataRow(parent, self.delete_entry, self.open_edit_popup,
+                                            copy_callback=self.copy_entry),
+            show_row=self._show_entry_row,
+            row_height=DataRow.HEIGHT,
+            empty_text="Nincs megjeleníthető bejegyzés.")
+        lst.pack(fill="both", expand=True)
+
+        self.tab_lists[kat] = lst
         self.tab_filters[kat] = filter_bar
 
     def _on_filter_change(self, kat: str, filters: dict):
@@ -401,45 +513,63 @@ class WheelBooK(ctk.CTk):
         threading.Thread(target=run, daemon=True).start()
 
     def _rebuild_tabs_and_refresh(self):
-        """Kategória változáskor újraépíti a tabokat és frissíti az adatokat."""
+        """Kategória változáskor újraépíti a tabokat (a látható fül azonnal betöltődik)."""
         self._build_tabs()
-        self.refresh_data()
 
     # =========================================================================
     # Adatok frissítése
     # =========================================================================
 
     def refresh_cars(self):
-        for w in self.car_list_container.winfo_children():
-            w.destroy()
-
-        with get_db() as conn:
-            cars = conn.execute(
-                "SELECT id, marka, tipus, evjarat, km_allas, vin, rendszam, muszaki_lejarat, olaj_intervallum, COALESCE(ikon,'🚗') FROM autok"
-            ).fetchall()
+        """
+        A jármű kártyák szinkronizálása az autók táblával: a meglévők helyben
+        frissülnek, csak az új autók kapnak új kártyát.
+        """
+        with read_db() as conn:
+            cars = conn.execute(f"SELECT {CAR_COLUMNS} FROM autok ORDER BY id").fetchall()
+        self._cars = {c[0]: c for c in cars}
 
-        if not self.selected_car_id and cars:
-            self.selected_car_id = cars[0][0]
+        for cid in [cid for cid in self._car_cards if cid not in self._cars]:
+            self._car_cards.pop(cid).destroy()
 
         for c in cars:
-            InfoCard(self.car_list_container, c,
-                     self.select_car, self.open_car_popup, self.delete_car,
-                     active=(c[0] == self.selected_car_id)).pack(side="left", padx=10)
+            card = self._car_cards.get(c[0])
+            if card is None:
+                # Az id szerinti sorrend miatt az új autó mindig a sor végére kerül
+                card = self._car_cards[c[0]] = InfoCard(
+                    self.car_list_container, c,
+                    self.select_car, self.open_car_popup, self.delete_car)
+                card.pack(side="left", padx=10)
+            else:
+                card.set_car(c)
 
-        self.refresh_data()
+        if self.selected_car_id not in self._cars:
+            self.selected_car_id = cars[0][0] if cars else None
+        self.select_car(self.selected_car_id, force=True)
 
-    def select_car(self, cid):
+    def refresh_car(self, cid):
+        """Egy autó gyorsítótárazott sorának és kártyájának frissítése."""
+        card = self._car_cards.get(cid)
+        if card is None:
+            return
+        with read_db() as conn:
+            c = conn.execute(f"SELECT {CAR_COLUMNS} FROM autok WHERE id=?", (cid,)).fetchone()
+        if c:
+            self._cars[cid] = c
+            card.set_car(c)
+
+    def select_car(self, cid, force=False):
+        # Kiválasztáskor nincs lekérdezés: csak a két érintett kártya színe vált
+        if cid == self.selected_car_id and not force:
+            return
+        for card_id, card in self._car_cards.items():
+            card.set_active(card_id == cid)
         self.selected_car_id = cid
-        self.refresh_cars()
+        self.views.set_car(cid)
 
     def refresh_data(self):
-        if not self.selected_car_id:
-            return
-        for kat in list(self.tab_lists.keys()):
-            self._refresh_tab(kat)
-        self._refresh_biztositas_tab()
-        self.update_statistics()
-        self.update_yearly_stats()
+        """Minden fül érvénytelenítése: a látható azonnal, a többi a megjelenésekor frissül."""
+        self.views.invalidate()
 
     def _refresh_tab(self, kat: str):
         if not self.selected_car_id:
@@ -449,74 +579,117 @@ class WheelBooK(ctk.CTk):
 
         lst = self.tab_lists[kat]
         fbar = self.tab_filters[kat]
+        car_id = self.selected_car_id
+
+        search = fbar.get_filters()["search"]
+        if search and fts_query(search) is not None:
+            # Keresés: a korábbi találatok szűkítése, vagy FTS lekérdezés háttérszálon
+            # (addig a jelenlegi lista marad látható)
+            with read_db() as conn:
+                data = self.search_manager.cached(conn, car_id, kat, search)
+            if data is None:
+                self._search_tokens[kat] = self.search_manager.submit(
+                    car_id, kat, search,
+                    lambda token, rows: self.after(0, lambda: self._on_search_done(kat, token, rows)))
+            else:
+                self._show_search_results(kat, data)
+            return
 
-        for w in lst.winfo_children():
-            w.destroy()
+        # Nincs keresés: a még futó keresés eredménye már nem kell
+        self._cancel_tab(kat)
+        # Szűrés és rendezés az adatbázisban, keyset lapozással
+        where, params = fbar.sql_filter()
+        order, desc = fbar.sort_order()
 
-        with get_db() as conn:
-            data = conn.execute("""
-                SELECT id, datum, osszeg, km_allas, kategoria,
-                       mennyiseg_liter, egysegar_ft_l, benzinkut, megjegyzes, kep_utvonal
-                FROM szerviz_adatok
-                WHERE auto_id=? AND kategoria=?
-                ORDER BY datum DESC
-            """, (self.selected_car_id, kat)).fetchall()
-
-        data = fbar.apply_filters(data)
-
-        if not data:
-            ctk.CTkLabel(lst, text="Nincs megjeleníthető bejegyzés.",
-                         text_color="gray", font=("Arial", 13)).pack(pady=30)
+        def fetch_page(last_row, limit):
+            with read_db() as conn:
+                return list_entries(conn, car_id, kat, order, desc, after=last_row,
+                                    limit=limit, where=where, params=params)
+
+        lst.set_source(fetch_page=fetch_page, order=(LIST_ORDER_COLUMNS[order], desc))
+
+    def _patch_tab(self, kat: str, ev: EntryChange) -> bool:
+        """Egy bejegyzés írása a fül listájában helyben (False: újratöltés kell)."""
+        if ev.kategoria != kat:
+            return True
+        fbar = self.tab_filters[kat]
+        search = fbar.get_filters()["search"]
+        if search and fts_query(search) is not None:
+            # A találatok relevancia sorrendje csak újrakereséssel állapítható meg
+            return False
+        lst = self.tab_lists[kat]
+        if ev.kind == DELETED or not fbar.apply_filters([ev.row], ranked=True):
+            lst.remove(ev.entry_id)
         else:
-            for r in data:
-                DataRow(lst, r[0], r[1], r[2], r[3], r[4],
-                        self.delete_entry, self.open_edit_popup,
-                        copy_callback=self.copy_entry,
-                        liter=r[5], ar_l=r[6], kut=r[7], note=r[8],
-                        image_path=r[9] or "")
+            lst.upsert(ev.row)
+        return True
+
+    def _cancel_tab(self, kat: str) -> bool:
+        """A fül várakozó keresésének elvetése. Igaz, ha volt ilyen."""
+        self.search_manager.cancel(kat)
+        return self._search_tokens.pop(kat, None) is not None
+
+    def _publish_entry(self, kind: str, entry_id: int, kategoria: str):
+        """EntryChange küldése a commit után (a sor a lista oszlopaival)."""
+        with read_db() as conn:
+            row = get_entry(conn, entry_id)
+        self.events.publish(EntryChange(kind, entry_id, self.selected_car_id, kategoria, row))
+
+    def _on_search_done(self, kat: str, token: int, rows):
+        if self.search_manager.current(kat, token) and kat in self.tab_lists:
+            self._search_tokens.pop(kat, None)
+            self._show_search_results(kat, rows or [])
+
+    def _show_search_results(self, kat: str, rows):
+        """FTS találatok (relevancia sorrendben, legfeljebb SEARCH_LIMIT) a dátum/összeg szűrőkkel."""
+        data = self.tab_filters[kat].apply_filters(rows, ranked=True)
+        footer = (f"Az első {SEARCH_LIMIT} találat látszik – pontosítsd a keresést."
+                  if len(rows) >= SEARCH_LIMIT else "")
+        self.tab_lists[kat].set_source(rows=data, footer=footer)
+
+    @staticmethod
+    def _show_entry_row(row_w: DataRow, r):
+        """WindowedList sor feltöltése (keresési találatnál a *_hl oszlopokkal)."""
+        def mark(text):
+            # Találatok jelölése (a CTkLabel nem formázható részenként)
+            return text.replace(HL_START, "«").replace(HL_END, "»") if text else text
+
+        ranked = len(r) > 10
+        kut, note = (mark(r[11]), mark(r[10])) if ranked else (r[7], r[8])
+        row_w.show(r[0], r[1], r[2], r[3], r[4], liter=r[5], ar_l=r[6],
+                   kut=kut, note=note, image_path=r[9] or "")
 
     # =========================================================================
     # Statisztika
     # =========================================================================
 
     def update_statistics(self):
+        self._cancel_statistics()
         for w in self.stat_scroll.winfo_children():
-            w.destroy()
-        plt.close('all')
+            if w is not self.stat_cards:
+                w.destroy()
+        self.stat_cards.pack_forget()
         if not self.selected_car_id:
             return
 
-        with get_db() as conn:
+        with read_db() as conn:
             c = conn.cursor()
-            car = c.execute(
-                "SELECT km_allas, muszaki_lejarat, olaj_intervallum FROM autok WHERE id=?",
-                (self.selected_car_id,)
-            ).fetchone()
+            # Autó adatai az emlékeztetőkhöz (utolsó olajcsere: trigger által vezetett összesítő)
+            car = c.execute("""
+                SELECT a.km_allas, a.muszaki_lejarat, a.olaj_intervallum, o.utolso_olaj_km
+                FROM autok a LEFT JOIN auto_osszesito o ON o.auto_id = a.id
+                WHERE a.id=?
+            """, (self.selected_car_id,)).fetchone()
             curr_km = car[0] or 0
             vizsga = car[1] or "---"
             intervallum = car[2] or 10000
+            last_oil_km = car[3]
 
-            last_oil = c.execute("""
-                SELECT km_allas FROM szerviz_adatok
-                WHERE auto_id=? AND kategoria='Karbantartás'
-                AND (megjegyzes LIKE '%olaj%' OR megjegyzes LIKE '%Oil%' OR megjegyzes LIKE '%OLAJ%')
-                ORDER BY km_allas DESC LIMIT 1
-            """, (self.selected_car_id,)).fetchone()
-
-            t_data = c.execute("""
-                SELECT datum, osszeg, mennyiseg_liter, km_allas FROM szerviz_adatok
-                WHERE auto_id=? AND kategoria='Tankolás' ORDER BY km_allas ASC
-            """, (self.selected_car_id,)).fetchall()
-
-            szerv = c.execute("""
-                SELECT SUM(osszeg), COUNT(id) FROM szerviz_adatok
-                WHERE auto_id=? AND kategoria='Karbantartás'
-            """, (self.selected_car_id,)).fetchone()
-
-            egyeb = c.execute("""
-                SELECT SUM(osszeg), COUNT(id) FROM szerviz_adatok
-                WHERE auto_id=? AND kategoria='Egyéb'
-            """, (self.selected_car_id,)).fetchone()
+            key = self.stats_cache.key(conn, self.selected_car_id)
+            stats = self.stats_cache.get(key)
+            if stats is None:
+                stats = compute_stats(conn, self.selected_car_id)
+                self.stats_cache.put(key, stats)
 
         # Emlékeztetők panel
         reminders = self.reminder_manager.check_all()
@@ -536,8 +709,8 @@ class WheelBooK(ctk.CTk):
         oil_txt = "Nincs adat az utolsó olajcseréről."
         oil_clr = "#64748b"
         show_oil_btn = False
-        if last_oil:
-            diff = curr_km - last_oil[0]
+        if last_oil_km:
+            diff = curr_km - last_oil_km
             rem_km = intervallum - diff
             if rem_km <= 0:
                 oil_txt = f"🔴 OLAJCSERE ESEDÉKES! ({diff} km telt el, {abs(rem_km)} km-rel túllépve)"
@@ -567,7 +740,7 @@ class WheelBooK(ctk.CTk):
         ctk.CTkLabel(rem_f, text=f"• Műszaki vizsga lejárata: {vizsga}").pack(anchor="w", padx=25, pady=(0, 5))
 
         # Biztosítási emlékeztető
-        with get_db() as conn:
+        with read_db() as conn:
             biz_row = conn.execute("""
                 SELECT biztosito, vege FROM biztositas
                 WHERE auto_id=? AND vege IS NOT NULL
@@ -598,47 +771,48 @@ class WheelBooK(ctk.CTk):
         ctk.CTkLabel(rem_f, text=f"• {biz_txt}",
                      text_color=biz_clr).pack(anchor="w", padx=25, pady=(0, 10))
 
+        self.stat_cards.pack(fill="x", padx=10)
         # Statisztika kártyák
-        tank_sum = sum(r[1] for r in t_data)
-        liter_sum = sum(r[2] for r in t_data if r[2])
-        full_sum = tank_sum + (szerv[0] or 0) + (egyeb[0] or 0)
-
-        avg_cons = 0
-        cons_hist = []
-        if len(t_data) > 1:
-            for i in range(1, len(t_data)):
-                d = t_data[i][3] - t_data[i - 1][3]
-                if d > 0 and t_data[i][2]:
-                    cons_hist.append((t_data[i][0], (t_data[i][2] / d) * 100))
-            dist = t_data[-1][3] - t_data[0][3]
-            if dist > 0:
-                avg_cons = (sum(r[2] for r in t_data[1:] if r[2]) / dist) * 100
-
-        card_f = ctk.CTkFrame(self.stat_scroll, fg_color="transparent")
-        card_f.pack(fill="x", padx=10)
-        card_f.grid_columnconfigure((0, 1, 2), weight=1)
-
         st_list = [
-            ("Összköltség", f"{full_sum:,.0f} Ft".replace(',', ' '), "Összesen"),
-            ("Tankolás", f"{tank_sum:,.0f} Ft".replace(',', ' '), f"{len(t_data)} alkalom"),
-            ("Karbantartás", f"{(szerv[0] or 0):,.0f} Ft".replace(',', ' '), f"{szerv[1]} tétel"),
-            ("Egyéb", f"{(egyeb[0] or 0):,.0f} Ft".replace(',', ' '), f"{egyeb[1]} tétel"),
-            ("Fogyasztás", f"{avg_cons:.2f} L/100", "Átlag"),
-            ("Üzemanyag", f"{liter_sum:.1f} L", "Összesen"),
+            ("Összköltség", f"{stats.osszes:,.0f} Ft".replace(',', ' '), "Összesen"),
+            ("Tankolás", f"{stats.tank_osszeg:,.0f} Ft".replace(',', ' '), f"{stats.tank_db} alkalom"),
+            ("Karbantartás", f"{stats.karb_osszeg:,.0f} Ft".replace(',', ' '), f"{stats.karb_db} tétel"),
+            ("Egyéb", f"{stats.egyeb_osszeg:,.0f} Ft".replace(',', ' '), f"{stats.egyeb_db} tétel"),
+            ("Fogyasztás", f"{stats.avg_fogyasztas:.2f} L/100", "Átlag"),
+            ("Üzemanyag", f"{stats.tank_liter:.1f} L", "Összesen"),
         ]
-        for i, (t, v, d) in enumerate(st_list):
-            card = ctk.CTkFrame(card_f, fg_color="white", corner_radius=12,
-                                border_width=1, border_color="#e2e8f0")
-            card.grid(row=i // 3, column=i % 3, padx=10, pady=10, sticky="nsew")
-            ctk.CTkLabel(card, text=t, font=("Arial", 11)).pack(pady=(10, 0))
-            ctk.CTkLabel(card, text=v, font=("Arial", 16, "bold")).pack()
-            ctk.CTkLabel(card, text=d, font=("Arial", 10), text_color="gray").pack(pady=(0, 10))
-
-        if t_data:
-            self.plot_graph("Költség alakulása", [r[0] for r in t_data], [r[1] for r in t_data], "#3b82f6")
-            if cons_hist:
-                self.plot_graph("Fogyasztás alakulása",
-                                [r[0] for r in cons_hist], [r[1] for r in cons_hist], "#10b981")
+        self.stat_card_pool.begin()
+        for t, v, d in st_list:
+            self.stat_card_pool.take(t, v, d)
+        self.stat_card_pool.end()
+
+        if stats.tank_db:
+            # A grafikonok a háttérben készülnek: a kártyák addig is látszanak,
+            # fülváltáskor pedig a még el nem készült rajzolás elmarad
+            self._draw_stat_graphs(stats)
+
+    def _new_stat_card(self):
+        i = len(self.stat_card_pool)
+        card = StatCard(self.stat_cards)
+        card.grid(row=i // 3, column=i % 3, padx=10, pady=10, sticky="nsew")
+        return card
+
+    @staticmethod
+    def _bind_stat_card(card, title, value, desc):
+        card.show(title, value, desc)
+        if not card.winfo_manager():
+            card.grid()     # a grid_remove előtti helyére
+
+    def _draw_stat_graphs(self, stats):
+        self.plot_graph("Költség alakulása", stats.tank_datum, stats.tank_ft, "#3b82f6")
+        if len(stats.fog_ertek):
+            self.plot_graph("Fogyasztás alakulása", stats.fog_datum, stats.fog_ertek, "#10b981")
+
+    def _cancel_statistics(self) -> bool:
+        """A statisztika még el nem készült grafikonjainak elvetése. Igaz, ha volt ilyen."""
+        cancelled = [h for h in self._stat_charts if self.chart_renderer.cancel(h)]
+        self._stat_charts.clear()
+        return bool(cancelled)
 
     def _mark_oil_change_done(self, curr_km: int):
         """
@@ -688,20 +862,15 @@ class WheelBooK(ctk.CTk):
                 megj_val = e_megj.get().strip() or "Olajcsere elvégezve"
 
                 with get_db() as conn:
-                    conn.execute("""
+                    cur = conn.execute(f"""
                         INSERT INTO szerviz_adatok
-                        (auto_id, datum, km_allas, osszeg, megjegyzes, kategoria, kep_utvonal)
-                        VALUES (?,?,?,?,?, 'Karbantartás', '')
-                    """, (self.selected_car_id, datum_val, km_val, osszeg_val, megj_val))
-                    if km_val:
-                        conn.execute("""
-                            UPDATE autok SET km_allas = ?
-                            WHERE id = ? AND (km_allas IS NULL OR km_allas < ?)
-                        """, (km_val, self.selected_car_id, km_val))
+                        (auto_id, datum, km_allas, osszeg, megjegyzes, kategoria_id, kep_utvonal)
+                        VALUES (?,?,?,?,?, {KATEGORIA_ID_SQL}, '')
+                    """, (self.selected_car_id, datum_val, km_val, osszeg_val, megj_val, "Karbantartás"))
+                self._publish_entry(INSERTED, cur.lastrowid, "Karbantartás")
 
                 pop.destroy()
-                self.refresh_data()
-                self.tabs.set("🔧 Karbantartás")
+                self._show_tab("🔧 Karbantartás")
             except ValueError as e:
                 messagebox.showerror("Hiba", f"Érvénytelen adat:\n{e}", parent=pop)
 
@@ -719,24 +888,20 @@ class WheelBooK(ctk.CTk):
         if not self.selected_car_id:
             return
 
-        with get_db() as conn:
-            # Összes bejegyzés évek szerint csoportosítva
+        with read_db() as conn:
+            # Havi összesítő sorok (hónap × kategória),
+            # az évekre összevonás és a rendezés lent történik
             rows = conn.execute("""
-                SELECT substr(datum, 1, 4) as ev,
-                       kategoria,
-                       SUM(osszeg) as osszeg,
-                       COUNT(id) as db
-                FROM szerviz_adatok
-                WHERE auto_id=?
-                GROUP BY ev, kategoria
-                ORDER BY ev DESC
+                SELECT h.honap_kulcs / 100 as ev, k.nev, round(h.osszeg, 2), h.db
+                FROM havi_osszesito h JOIN kategoriak k ON k.id = h.kategoria_id
+                WHERE h.auto_id=?
             """, (self.selected_car_id,)).fetchall()
 
             # Havi km adatok az előrejelzéshez
             km_rows = conn.execute("""
                 SELECT datum, km_allas FROM szerviz_adatok
-                WHERE auto_id=? AND km_allas IS NOT NULL
-                ORDER BY datum ASC
+                WHERE auto_id=? AND km_allas IS NOT NULL AND datum_nap IS NOT NULL
+                ORDER BY datum_nap ASC
             """, (self.selected_car_id,)).fetchall()
 
         if not rows:
@@ -748,8 +913,10 @@ class WheelBooK(ctk.CTk):
         from collections import defaultdict
         ev_data = defaultdict(lambda: {"Tankolás": 0, "Karbantartás": 0, "Egyéb": 0, "db": 0})
         for ev, kat, osszeg, db in rows:
-            ev_data[ev][kat] += osszeg or 0
-            ev_data[ev]["db"] += db
+            # A bontás a három oszlop kategóriáit mutatja; a többi (pl. Biztosítás)
+            # csak a bejegyzés számban szerepel
+            ev_data[str(ev)][kat] = ev_data[str(ev)].get(kat, 0) + (osszeg or 0)
+            ev_data[str(ev)]["db"] += db
 
         # Cím
         ctk.CTkLabel(self.eves_scroll, text="Éves összesítő",
@@ -828,22 +995,18 @@ class WheelBooK(ctk.CTk):
                                      text_color="gray").pack()
 
                     # Következő szerviz előrejelzés
-                    with get_db() as conn:
-                        car = conn.execute(
-                            "SELECT km_allas, olaj_intervallum FROM autok WHERE id=?",
-                            (self.selected_car_id,)
-                        ).fetchone()
-                        last_oil = conn.execute("""
-                            SELECT km_allas FROM szerviz_adatok
-                            WHERE auto_id=? AND kategoria='Karbantartás'
-                            AND (megjegyzes LIKE '%olaj%' OR megjegyzes LIKE '%OLAJ%')
-                            ORDER BY km_allas DESC LIMIT 1
+                    with read_db() as conn:
+                        car = conn.execute("""
+                            SELECT a.km_allas, a.olaj_intervallum, o.utolso_olaj_km
+                            FROM autok a LEFT JOIN auto_osszesito o ON o.auto_id = a.id
+                            WHERE a.id=?
                         """, (self.selected_car_id,)).fetchone()
+                    last_oil_km = car[2] if car else None
 
-                    if car and last_oil and havi_km > 0:
+                    if car and last_oil_km and havi_km > 0:
                         curr_km = car[0] or 0
                         intervallum = car[1] or 10000
-                        hatra = intervallum - (curr_km - last_oil[0])
+                        hatra = intervallum - (curr_km - last_oil_km)
                         if hatra > 0:
                             honapok = hatra / havi_km
                             import math
@@ -860,24 +1023,37 @@ class WheelBooK(ctk.CTk):
                 logger.warning(f"Előrejelzés hiba: {e}")
 
     def _get_car_name(self, cid) -> str:
-        with get_db() as conn:
-            r = conn.execute("SELECT marka, tipus FROM autok WHERE id=?", (cid,)).fetchone()
-        return f"{r[0]} {r[1]}" if r else ""
+        c = self._cars.get(cid)
+        return f"{c[1]} {c[2]}" if c else ""
 
     def plot_graph(self, title, x, y, color):
-        fig, ax = plt.subplots(figsize=(10, 2.5), dpi=90)
+        """Grafikon a statisztika fülre: helyőrző, a kép a háttérben készül (vagy gyorsítótárból)."""
         mode = self.config_manager.get("appearance_mode", "light")
-        bg = "#1a1a2e" if mode == "dark" else "#f8fafc"
-        fig.patch.set_facecolor(bg)
-        ax.set_facecolor(bg)
-        ax.plot(x, y, marker='o', color=color, linewidth=2)
-        ax.set_title(title, fontsize=10, fontweight='bold',
-                     color="white" if mode == "dark" else "black")
-        ax.tick_params(colors="white" if mode == "dark" else "black")
-        plt.xticks(rotation=20, fontsize=8)
-        plt.tight_layout()
-        canvas = FigureCanvasTkAgg(fig, master=self.stat_scroll)
-        canvas.get_tk_widget().pack(pady=10, fill="x")
+        dark = mode == "dark"
+        colors = {"bg": "#1a1a2e" if dark else "#f8fafc",
+                  "fg": "white" if dark else "black",
+                  "grid": "#334155" if dark else "#cbd5e1"}
+        data = (title, tuple(x), y, color)
+        key = self.chart_renderer.key(self.selected_car_id, "idosor", mode, CHART_DPI, data)
+
+        holder = tk.Label(self.stat_scroll, text="⏳ Grafikon készül…",
+                          bg=colors["bg"], fg="gray", pady=20)
+        holder.pack(pady=10, fill="x")
+        png = self.chart_renderer.cached(key)
+        if png is not None:
+            self._set_chart(holder, png)
+            return
+        self._stat_charts.append(holder)
+        self.chart_renderer.submit(holder, key, data, colors,
+                                   lambda png: self.after(0, lambda: self._set_chart(holder, png)))
+
+    @staticmethod
+    def _set_chart(holder, png: bytes):
+        if not holder.winfo_exists():
+            return
+        img = tk.PhotoImage(data=base64.b64encode(png))
+        holder.configure(image=img, text="", pady=0)
+        holder.image = img      # a képre hivatkozás kell, különben a Tk eldobja
 
     # =========================================================================
     # PDF Export
@@ -888,21 +1064,22 @@ class WheelBooK(ctk.CTk):
             messagebox.showwarning("Hiba", "Nincs kiválasztott jármű!")
             return
 
-        with get_db() as conn:
+        with read_db() as conn:
             car = conn.execute(
                 "SELECT marka, tipus, rendszam, vin, evjarat, km_allas FROM autok WHERE id=?",
                 (self.selected_car_id,)
             ).fetchone()
             records = conn.execute("""
                 SELECT datum, kategoria, osszeg, km_allas, megjegyzes
-                FROM szerviz_adatok WHERE auto_id=? ORDER BY datum DESC
+                FROM szerviz_adatok_nevvel WHERE auto_id=? ORDER BY datum_nap DESC, id DESC
             """, (self.selected_car_id,)).fetchall()
             total = conn.execute(
                 "SELECT SUM(osszeg) FROM szerviz_adatok WHERE auto_id=?",
                 (self.selected_car_id,)
             ).fetchone()[0] or 0
 
-        pdf = FPDF()
+        XPos, YPos = fpdf_enums.XPos, fpdf_enums.YPos
+        pdf = fpdf.FPDF()
         font_path = "C:\\Windows\\Fonts\\arial.ttf"
         font_path_bold = "C:\\Windows\\Fonts\\arialbd.ttf"
         if os.path.exists(font_path):
@@ -1027,7 +1204,7 @@ class WheelBooK(ctk.CTk):
             ikon_buttons[ikon] = btn
 
         if cid:
-            with get_db() as conn:
+            with read_db() as conn:
                 r = conn.execute(
                     "SELECT marka, tipus, rendszam, evjarat, km_allas, muszaki_lejarat, olaj_intervallum, COALESCE(ikon,'🚗') FROM autok WHERE id=?",
                     (cid,)
@@ -1057,7 +1234,11 @@ class WheelBooK(ctk.CTk):
                             "INSERT INTO autok (marka, tipus, rendszam, evjarat, km_allas, muszaki_lejarat, olaj_intervallum, ikon) VALUES (?,?,?,?,?,?,?,?)",
                             (*v, ikon_var.get())
                         )
-                self.refresh_cars()
+                if cid:
+                    self.views.invalidate("autok", auto_id=cid)
+                    self.refresh_car(cid)
+                else:
+                    self.refresh_cars()
                 pop.destroy()
             except Exception as e:
                 messagebox.showerror("Hiba", f"Mentési hiba:\n{e}", parent=pop)
@@ -1175,11 +1356,11 @@ class WheelBooK(ctk.CTk):
                     return
 
                 with get_db() as conn:
-                    conn.execute("""
+                    cur = conn.execute(f"""
                         INSERT INTO szerviz_adatok
                         (auto_id, datum, km_allas, mennyiseg_liter, egysegar_ft_l,
-                         osszeg, benzinkut, megjegyzes, kategoria, kep_utvonal)
-                        VALUES (?,?,?,?,?,?,?,?,?,?)
+                         osszeg, benzinkut, megjegyzes, kategoria_id, kep_utvonal)
+                        VALUES (?,?,?,?,?,?,?,?,{KATEGORIA_ID_SQL},?)
                     """, (
                         self.selected_car_id, datum,
                         ti(e_km), tf(e_liter), tf(e_ar), osszeg,
@@ -1187,9 +1368,8 @@ class WheelBooK(ctk.CTk):
                         txt.get("1.0", "end-1c").strip() or None,
                         kat, final_img
                     ))
-                    self._sync_car_km(conn, self.selected_car_id)
+                self._publish_entry(INSERTED, cur.lastrowid, kat)
 
-                self.refresh_data()
                 pop.destroy()
             except Exception as ex:
                 messagebox.showerror("Hiba", f"Mentési hiba:\n{ex}", parent=pop)
@@ -1298,7 +1478,7 @@ class WheelBooK(ctk.CTk):
                         """, (self.selected_car_id, datum, osszeg,
                               biztosito, kezdete, vege, megj, final_img))
 
-                self.refresh_data()
+                self.views.invalidate("biztositas", auto_id=self.selected_car_id)
                 pop.destroy()
             except Exception as ex:
                 messagebox.showerror("Hiba", f"Mentési hiba:\n{ex}", parent=pop)
@@ -1313,11 +1493,11 @@ class WheelBooK(ctk.CTk):
     def open_edit_popup(self, eid):
         self.temp_image_path = None
 
-        with get_db() as conn:
+        with read_db() as conn:
             r = conn.execute("""
                 SELECT datum, km_allas, mennyiseg_liter, egysegar_ft_l,
                        osszeg, benzinkut, megjegyzes, kategoria, kep_utvonal
-                FROM szerviz_adatok WHERE id=?
+                FROM szerviz_adatok_nevvel WHERE id=?
             """, (eid,)).fetchone()
 
         if not r:
@@ -1414,10 +1594,8 @@ class WheelBooK(ctk.CTk):
                         txt.get("1.0", "end-1c").strip() or None,
                         final_img_path, eid
                     ))
-                    # Km szinkronizálás: módosítás esetén is mindig a max km kerül az autóhoz
-                    self._sync_car_km(conn, self.selected_car_id)
+                self._publish_entry(UPDATED, eid, kat)
 
-                self.refresh_data()
                 pop.destroy()
             except Exception as e:
                 messagebox.showerror("Hiba", f"Frissítési hiba:\n{e}", parent=pop)
@@ -1430,11 +1608,11 @@ class WheelBooK(ctk.CTk):
 
     def copy_entry(self, eid: int):
         """Megnyitja az új bejegyzés popupot az adott bejegyzés adataival előtöltve."""
-        with get_db() as conn:
+        with read_db() as conn:
             r = conn.execute("""
                 SELECT datum, km_allas, mennyiseg_liter, egysegar_ft_l,
                        osszeg, benzinkut, megjegyzes, kategoria
-                FROM szerviz_adatok WHERE id=?
+                FROM szerviz_adatok_nevvel WHERE id=?
             """, (eid,)).fetchone()
         if not r:
             return
@@ -1455,29 +1633,19 @@ class WheelBooK(ctk.CTk):
     # Törlés
     # =========================================================================
 
-    def _sync_car_km(self, conn, car_id: int):
-        """
-        Szinkronizálja az autó km állását a bejegyzések maximuma alapján.
-        Törlés vagy módosítás után hívandó.
-        """
-        result = conn.execute("""
-            SELECT MAX(km_allas) FROM szerviz_adatok
-            WHERE auto_id=? AND km_allas IS NOT NULL
-        """, (car_id,)).fetchone()
-        max_km = result[0] if result and result[0] is not None else None
-        if max_km is not None:
-            conn.execute("UPDATE autok SET km_allas=? WHERE id=?", (max_km, car_id))
-
     def delete_entry(self, eid):
         if messagebox.askyesno("Törlés megerősítése", "Biztosan törölni szeretnéd ezt a bejegyzést?"):
             with get_db() as conn:
                 # Csatolt kép útvonalának lekérése törlés előtt
-                row = conn.execute("SELECT kep_utvonal FROM szerviz_adatok WHERE id=?", (eid,)).fetchone()
-                if row and row[0]:
+                row = conn.execute(
+                    "SELECT kep_utvonal, kategoria FROM szerviz_adatok_nevvel WHERE id=?", (eid,)
+                ).fetchone()
+                if not row:
+                    return
+                if row[0]:
                     self._delete_attachment_file(row[0])
                 conn.execute("DELETE FROM szerviz_adatok WHERE id=?", (eid,))
-                self._sync_car_km(conn, self.selected_car_id)
-            self.refresh_data()
+            self.events.publish(EntryChange(DELETED, eid, self.selected_car_id, row[1]))
 
     def delete_car(self, cid):
         if messagebox.askyesno("Törlés megerősítése",
@@ -1511,7 +1679,7 @@ class WheelBooK(ctk.CTk):
                     except (ValueError, IndexError) as e:
                         logger.warning(f"CSV sor hiba: {e} | {row}")
                         errors += 1
-            self.refresh_data()
+            self.views.invalidate("szerviz_adatok", auto_id=self.selected_car_id)
             msg = f"{count} sor sikeresen importálva."
             if errors:
                 msg += f"\n{errors} sor kihagyva (hibás formátum)."
@@ -1523,11 +1691,11 @@ class WheelBooK(ctk.CTk):
         def process(conn, row):
             if len(row) < 5: raise ValueError("Túl kevés oszlop")
             c = row[4].replace(" ", "").replace("Ft", "")
-            conn.execute("""INSERT INTO szerviz_adatok
-                (auto_id, datum, km_allas, mennyiseg_liter, egysegar_ft_l, osszeg, benzinkut, kategoria)
-                VALUES (?,?,?,?,?,?,?, 'Tankolás')""",
+            conn.execute(f"""INSERT INTO szerviz_adatok
+                (auto_id, datum, km_allas, mennyiseg_liter, egysegar_ft_l, osszeg, benzinkut, kategoria_id)
+                VALUES (?,?,?,?,?,?,?, {KATEGORIA_ID_SQL})""",
                 (self.selected_car_id, row[0], int(float(row[1])),
-                 float(row[2]), float(row[3]), float(c), row[6] if len(row) > 6 else ""))
+                 float(row[2]), float(row[3]), float(c), row[6] if len(row) > 6 else "", "Tankolás"))
         self._import_csv(process)
 
     def import_maintenance(self):
@@ -1535,10 +1703,10 @@ class WheelBooK(ctk.CTk):
             if len(row) < 5: raise ValueError("Túl kevés oszlop")
             c = row[4].replace(" ", "").replace("Ft", "")
             note = f"[{row[2]}] {row[3]} | {row[6] if len(row) > 6 else ''}"
-            conn.execute("""INSERT INTO szerviz_adatok
-                (auto_id, datum, km_allas, osszeg, benzinkut, megjegyzes, kategoria)
-                VALUES (?,?,?,?,?,?, 'Karbantartás')""",
-                (self.selected_car_id, row[0], int(float(row[1])), float(c), row[5], note))
+            conn.execute(f"""INSERT INTO szerviz_adatok
+                (auto_id, datum, km_allas, osszeg, benzinkut, megjegyzes, kategoria_id)
+                VALUES (?,?,?,?,?,?, {KATEGORIA_ID_SQL})""",
+                (self.selected_car_id, row[0], int(float(row[1])), float(c), row[5], note, "Karbantartás"))
         self._import_csv(process)
 
     def import_other(self):
@@ -1546,10 +1714,10 @@ class WheelBooK(ctk.CTk):
             if len(row) < 4: raise ValueError("Túl kevés oszlop")
             c = row[3].replace(" ", "").replace("Ft", "")
             note = f"[{row[1]}] {row[2]} | {row[4] if len(row) > 4 else ''}"
-            conn.execute("""INSERT INTO szerviz_adatok
-                (auto_id, datum, osszeg, megjegyzes, kategoria)
-                VALUES (?,?,?,?, 'Egyéb')""",
-                (self.selected_car_id, row[0], float(c), note))
+            conn.execute(f"""INSERT INTO szerviz_adatok
+                (auto_id, datum, osszeg, megjegyzes, kategoria_id)
+                VALUES (?,?,?,?, {KATEGORIA_ID_SQL})""",
+                (self.selected_car_id, row[0], float(c), note, "Egyéb"))
         self._import_csv(process)
 
     # =========================================================================
@@ -1577,5 +1745,6 @@ class WheelBooK(ctk.CTk):
 
 
 if __name__ == "__main__":
+    startup.mark("importok")
     app = WheelBooK()
     app.mainloop()
\ No newline at end of file
@@ -8,19 +8,29 @@ import sys
 import os
 import sqlite3
 import csv
+import re
 import shutil
+import bisect
 import logging
+from collections import OrderedDict
 from datetime import datetime, date
 
+# Elsőként: innen indul az indulási időmérés
+from lazy_import import lazy, available, preload, startup
+
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QFrame, QLabel, QPushButton,
     QHBoxLayout, QVBoxLayout, QScrollArea, QLineEdit, QComboBox,
     QDialog, QFormLayout, QMessageBox, QFileDialog, QSizePolicy,
     QStackedWidget, QGridLayout, QTextEdit, QDateEdit, QSpinBox,
-    QDoubleSpinBox, QCheckBox, QSplitter, QToolButton, QMenu,
+    QDoubleSpinBox, QCheckBox, QSplitter, QToolButton, QMenu, QInputDialog,
+    QTableView, QHeaderView, QAbstractItemView, QStyledItemDelegate, QStyle,
+)
+from PyQt6.QtCore import (
+    Qt, QObject, QSize, QDate, QRect, QRectF, QPoint, QEvent, QTimer, pyqtSignal, QThread, pyqtSlot,
+    QAbstractTableModel, QModelIndex,
 )
-from PyQt6.QtCore import Qt, QSize, QDate, pyqtSignal, QThread, pyqtSlot
-from PyQt6.QtGui import QFont, QIcon, QColor, QPalette, QCursor
+from PyQt6.QtGui import QFont, QFontMetrics, QIcon, QColor, QPalette, QCursor, QPainter, QPen, QPixmap
 
 try:
     from updater import start_update_check, check_update_manual, CURRENT_VERSION
@@ -32,22 +42,22 @@ except ImportError:
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 
 import zipfile
-import json
 import threading
 from pathlib import Path
-try:
-    import matplotlib
-    matplotlib.use("QtAgg")
-    import matplotlib.pyplot as plt
-    from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-    HAS_MPL = True
-except ImportError:
-    HAS_MPL = False
-try:
-    from fpdf import FPDF
-    HAS_FPDF = True
-except ImportError:
-    HAS_FPDF = False
+from connection_manager import ConnectionManager
+from config import ConfigManager
+from backup_manager import copy_database
+from search_manager import SearchManager
+from data_events import EventBus, ViewRegistry, EntryChange, INSERTED, UPDATED, DELETED
+from widget_pool import WidgetPool, pool_stats
+from stats_engine import compute_stats, CarStats, StatsCache
+import theme
+from database import (init_db, datum_nap, fts_query, get_entry, LIST_COLUMNS,
+                      HONAP_CIMKE_SQL, KATEGORIA_ID_SQL, HL_START, HL_END, SEARCH_LIMIT)
+from chart_renderer import ChartRenderer, CHARTS, HAS_MPL
+# Az fpdf csak az első PDF exportnál (vagy előtöltéskor) töltődik be
+fpdf = lazy("fpdf")
+HAS_FPDF = available("fpdf")
 logger = logging.getLogger(__name__)
 
 # ── Útvonalak ────────────────────────────────────────────────────────────────
@@ -67,485 +77,196 @@ BACKUP_DIR  = os.path.join(DATA_DIR, "backups")
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 os.makedirs(BACKUP_DIR, exist_ok=True)
 
-def load_config():
-    if os.path.exists(CONFIG_PATH):
-        try:
-            with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            pass
-    return {}
-
-def save_config(cfg):
-    with open(CONFIG_PATH, "w", encoding="utf-8") as f:
-        json.dump(cfg, f, ensure_ascii=False, indent=2)
+# Beállítások: egyszer beolvasva, memóriából; az írások késleltetve, egyben mentődnek
+config = ConfigManager.for_path(CONFIG_PATH)
 
 
 # ── Adatbázis ─────────────────────────────────────────────────────────────────
+# Közös kapcsolat pool – egy író kapcsolat, szálanként egy olvasó
+db = ConnectionManager.for_path(DB_PATH, row_factory=sqlite3.Row)
+db.set_profile(config.get_db_profile())
+# Gépelés közbeni keresés: gyorsítótár + háttérszálas FTS lekérdezés
+searcher = SearchManager(db.reader)
+# Bejegyzés írások eseményei (a listák helyben javítják magukat)
+events = EventBus()
+# Fülek táblafüggőségei: írás után csak a látható fül frissül, a többi megjelenéskor
+views = ViewRegistry()
+# Statisztika eredmények: a bejelentett írás csak az érintett autót ejti ki
+# (a nézetek előtt, hogy a frissülő fül már az új generációt kérje)
+stats_cache = StatsCache()
+
 def get_db():
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute("PRAGMA foreign_keys = ON")
-    conn.row_factory = sqlite3.Row
-    return conn
-
-def init_db():
-    with get_db() as conn:
-        conn.executescript("""
-            CREATE TABLE IF NOT EXISTS autok (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                marka TEXT NOT NULL,
-                tipus TEXT NOT NULL,
-                evjarat TEXT,
-                km_allas INTEGER DEFAULT 0,
-                vin TEXT,
-                rendszam TEXT,
-                muszaki_lejarat TEXT,
-                olaj_intervallum INTEGER DEFAULT 10000
-            );
-            CREATE TABLE IF NOT EXISTS szerviz_adatok (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                auto_id INTEGER NOT NULL,
-                datum TEXT NOT NULL,
-                kategoria TEXT NOT NULL,
-                osszeg REAL DEFAULT 0,
-                km_allas INTEGER,
-                mennyiseg_liter REAL,
-                egysegar_ft_l REAL,
-                benzinkut TEXT,
-                megjegyzes TEXT,
-                kep_utvonal TEXT DEFAULT '',
-                FOREIGN KEY (auto_id) REFERENCES autok(id) ON DELETE CASCADE
-            );
-            CREATE TABLE IF NOT EXISTS kategoriak (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nev TEXT NOT NULL UNIQUE,
-                ikon TEXT DEFAULT '📦',
-                szin TEXT DEFAULT '#64748b',
-                alap INTEGER DEFAULT 0
-            );
-            CREATE TABLE IF NOT EXISTS biztositas (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                auto_id INTEGER NOT NULL,
-                datum TEXT NOT NULL,
-                osszeg REAL DEFAULT 0,
-                biztosito TEXT,
-                kezdete TEXT,
-                vege TEXT,
-                megjegyzes TEXT,
-                kep_utvonal TEXT DEFAULT '',
-                FOREIGN KEY (auto_id) REFERENCES autok(id) ON DELETE CASCADE
-            );
-        """)
-        # Alapkategóriák
-        existing = conn.execute("SELECT COUNT(*) FROM kategoriak").fetchone()[0]
-        if existing == 0:
-            conn.executemany(
-                "INSERT INTO kategoriak (nev, ikon, szin, alap) VALUES (?,?,?,?)",
-                [("Tankolás","⛽","#3b82f6",1),
-                 ("Karbantartás","🔧","#10b981",1),
-                 ("Egyéb","📦","#f97316",1),
-                 ("Biztosítás","🛡️","#8b5cf6",1)]
-            )
+    """`with get_db() as conn:` – az író kapcsolat a write_lock alatt (commit a blokk végén)."""
+    return db.writer()
+
+def read_db():
+    """`with read_db() as conn:` – a szál olvasó kapcsolata; nem vár a folyamatban lévő írásra."""
+    return db.reader()
+
+def _bump_stats(ev):
+    # A statisztika kulcsa a GUI szál olvasó kapcsolatán készül: annak verziója az elfogadott
+    stats_cache.bump(ev.auto_id, db.reader())
+
+events.subscribe(_bump_stats)
+events.subscribe(views.apply)
+
+def close_db():
+    logger.info(f"Adatbázis kapcsolatok: {db.stats()}")
+    logger.info(f"Widget készletek: {pool_stats()}")
+    logger.info(f"Statisztika gyorsítótár: {stats_cache.stats()}")
+    logger.info(f"Grafikon gyorsítótár: {charts.stats()}")
+    db.close_all()
 
 # ══════════════════════════════════════════════════════════════════════════════
-# QSS Stíluslapok
+# Háttér lekérdezések (QThread worker pool)
 # ══════════════════════════════════════════════════════════════════════════════
-DARK_QSS = """
-QMainWindow, QDialog { background: #0f172a; }
-QWidget { background: transparent; color: #e2e8f0; font-family: 'Segoe UI'; font-size: 13px; }
-
-/* Topbar */
-#topbar { background: #1e293b; border-bottom: 1px solid #334155; }
-#logo   { color: #f97316; font-size: 20px; font-weight: 900; background: transparent; }
-
-/* Topbar gombok */
-#tb_btn {
-    background: #334155; color: #cbd5e1;
-    border: none; border-radius: 7px;
-    padding: 6px 14px; font-size: 12px; font-weight: 600;
-}
-#tb_btn:hover { background: #475569; color: white; }
-
-/* Chip sáv */
-#chipbar { background: #0f172a; border-bottom: 1px solid #1e293b; }
-
-/* Jármű chip */
-#car_chip {
-    background: #1e293b; border: 2px solid #334155;
-    border-radius: 10px; padding: 8px 14px;
-}
-#car_chip:hover { border-color: #3b82f6; }
-
-#car_chip_active {
-    background: #1e3a5f; border: 2px solid #3b82f6;
-    border-radius: 10px; padding: 8px 14px;
-}
-
-/* Új jármű chip */
-#chip_add {
-    background: transparent; border: 2px dashed #334155;
-    border-radius: 10px; color: #475569;
-    font-size: 13px; font-weight: 600;
-}
-#chip_add:hover { border-color: #f97316; color: #f97316; }
-
-/* Tab sáv */
-#tabbar { background: #1e293b; border-bottom: 2px solid #334155; }
-
-#tab_btn {
-    background: transparent; border: none;
-    color: #64748b; font-size: 13px; font-weight: 600;
-    padding: 12px 20px; border-bottom: 3px solid transparent;
-}
-#tab_btn:hover { color: #e2e8f0; background: #0f172a; }
-
-#tab_btn_active {
-    background: transparent; border: none;
-    color: #3b82f6; font-size: 13px; font-weight: 700;
-    padding: 12px 20px; border-bottom: 3px solid #3b82f6;
-}
-
-/* Toolbar */
-#toolbar { background: #0f172a; border-bottom: 1px solid #1e293b; }
-
-#btn_green {
-    background: #16a34a; color: white;
-    border: none; border-radius: 8px;
-    padding: 8px 16px; font-size: 13px; font-weight: 700;
-}
-#btn_green:hover { background: #15803d; }
-
-#btn_gray {
-    background: #1e293b; color: #94a3b8;
-    border: 1px solid #334155; border-radius: 8px;
-    padding: 8px 14px; font-size: 13px; font-weight: 600;
-}
-#btn_gray:hover { background: #334155; color: #e2e8f0; }
-
-#btn_red {
-    background: #450a0a; color: #f87171;
-    border: 1px solid #7f1d1d; border-radius: 8px;
-    padding: 7px 14px; font-size: 13px;
-}
-#btn_red:hover { background: #7f1d1d; }
-
-#btn_filter {
-    background: #1e293b; color: #94a3b8;
-    border: 1px solid #334155; border-radius: 8px;
-    padding: 7px 14px; font-size: 13px;
-}
-#btn_filter:hover { background: #334155; }
-
-#sort_combo {
-    background: #1e293b; color: #3b82f6;
-    border: 1px solid #3b82f6; border-radius: 7px;
-    padding: 6px 10px; font-size: 12px; font-weight: 600;
-}
-#sort_combo::drop-down { border: none; width: 20px; }
-#sort_combo QAbstractItemView { background: #1e293b; color: #e2e8f0; border: 1px solid #334155; }
-
-#search_box {
-    background: #1e293b; color: #e2e8f0;
-    border: 1px solid #334155; border-radius: 8px;
-    padding: 7px 12px; font-size: 13px;
-}
-#search_box:focus { border-color: #3b82f6; }
-
-/* Bejegyzés sorok */
-#entry_row {
-    background: #1e293b; border: 1px solid #334155;
-    border-radius: 10px;
-}
-#entry_row:hover { border-color: #475569; }
-
-#entry_date { color: #e2e8f0; font-size: 13px; font-weight: 700; }
-#entry_km   { color: #64748b; font-size: 12px; }
-#entry_sub  { color: #94a3b8; font-size: 12px; }
-#entry_amt  { color: #f1f5f9; font-size: 14px; font-weight: 800; }
-
-#e_btn {
-    background: transparent; border: 1px solid #334155;
-    border-radius: 7px; color: #64748b;
-    font-size: 13px; padding: 4px;
-    min-width: 30px; max-width: 30px;
-    min-height: 30px; max-height: 30px;
-}
-#e_btn:hover { background: #334155; color: #e2e8f0; }
-#e_btn_del:hover { border-color: #ef4444; color: #ef4444; background: #450a0a; }
-
-/* Scrollbar */
-QScrollBar:vertical { background: #0f172a; width: 8px; border-radius: 4px; }
-QScrollBar::handle:vertical { background: #334155; border-radius: 4px; min-height: 30px; }
-QScrollBar::handle:vertical:hover { background: #475569; }
-QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical { height: 0; }
-
-QScrollBar:horizontal { background: #0f172a; height: 8px; border-radius: 4px; }
-QScrollBar::handle:horizontal { background: #334155; border-radius: 4px; }
-QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal { width: 0; }
-
-/* Popup dialógusok */
-QDialog { background: #1e293b; border: 1px solid #334155; border-radius: 12px; }
-QLabel  { color: #94a3b8; font-size: 12px; }
-QLineEdit, QDoubleSpinBox, QSpinBox, QDateEdit, QTextEdit, QComboBox {
-    background: #0f172a; color: #e2e8f0;
-    border: 1.5px solid #334155; border-radius: 8px;
-    padding: 8px 12px; font-size: 13px;
-}
-QLineEdit:focus, QDoubleSpinBox:focus, QSpinBox:focus,
-QDateEdit:focus, QTextEdit:focus, QComboBox:focus { border-color: #3b82f6; }
-QComboBox::drop-down { border: none; width: 24px; }
-QComboBox QAbstractItemView { background: #1e293b; color: #e2e8f0; border: 1px solid #334155; selection-background-color: #1e3a5f; }
-QSpinBox { padding-right: 20px; }
-QDoubleSpinBox { padding-right: 20px; }
-QSpinBox::up-button, QSpinBox::down-button,
-QDoubleSpinBox::up-button, QDoubleSpinBox::down-button {
-    background: #475569; border: none; border-radius: 3px;
-    width: 18px; height: 14px;
-}
-QSpinBox::up-button { subcontrol-position: top right; subcontrol-origin: border; top: 2px; right: 2px; border-radius: 3px 3px 0 0; }
-QSpinBox::down-button { subcontrol-position: bottom right; subcontrol-origin: border; bottom: 2px; right: 2px; border-radius: 0 0 3px 3px; }
-QDoubleSpinBox::up-button { subcontrol-position: top right; subcontrol-origin: border; top: 2px; right: 2px; border-radius: 3px 3px 0 0; }
-QDoubleSpinBox::down-button { subcontrol-position: bottom right; subcontrol-origin: border; bottom: 2px; right: 2px; border-radius: 0 0 3px 3px; }
-QSpinBox::up-button:hover, QSpinBox::down-button:hover,
-QDoubleSpinBox::up-button:hover, QDoubleSpinBox::down-button:hover { background: #64748b; }
-QSpinBox::up-arrow, QDoubleSpinBox::up-arrow { image: none; width: 0; height: 0; border-left: 4px solid transparent; border-right: 4px solid transparent; border-bottom: 5px solid #e2e8f0; }
-QSpinBox::down-arrow, QDoubleSpinBox::down-arrow { image: none; width: 0; height: 0; border-left: 4px solid transparent; border-right: 4px solid transparent; border-top: 5px solid #e2e8f0; }
-QDateEdit::up-button, QDateEdit::down-button { background: #334155; border: none; }
-QDateEdit::drop-down { background: #475569; border: none; width: 24px; border-radius: 0 6px 6px 0; }
-
-#popup_title { color: #f1f5f9; font-size: 16px; font-weight: 700; }
-#save_btn {
-    background: #f97316; color: white;
-    border: none; border-radius: 8px;
-    padding: 10px; font-size: 14px; font-weight: 700;
-}
-#save_btn:hover { background: #ea580c; }
-#cancel_btn {
-    background: #334155; color: #94a3b8;
-    border: none; border-radius: 8px;
-    padding: 10px; font-size: 13px;
-}
-#cancel_btn:hover { background: #475569; color: #e2e8f0; }
-
-/* Üres állapot */
-#empty_label { color: #475569; font-size: 14px; }
-
-/* Bejegyzés sor chip-edit gombok */
-#chip_edit_btn {
-    background: #334155; border: none; border-radius: 4px;
-    color: #94a3b8; font-size: 11px;
-    min-width: 22px; max-width: 22px;
-    min-height: 22px; max-height: 22px;
-}
-#chip_edit_btn:hover { background: #475569; color: white; }
-#chip_del_btn {
-    background: #450a0a; border: none; border-radius: 4px;
-    color: #f87171; font-size: 11px;
-    min-width: 22px; max-width: 22px;
-    min-height: 22px; max-height: 22px;
-}
-#chip_del_btn:hover { background: #7f1d1d; }
-
-/* Chip neve/rsz/km labelek */
-#chip_name { color: #f1f5f9; font-size: 14px; font-weight: 800; background: transparent; }
-#chip_rsz  { color: #64748b; font-size: 11px; background: transparent; }
-#chip_km   { color: #3b82f6; font-size: 12px; font-weight: 700; background: transparent; }
-
-/* Content area */
-#content_area { background: #0f172a; }
-
-/* Scroll area */
-QScrollArea { border: none; background: #0f172a; }
-QScrollArea > QWidget > QWidget { background: #0f172a; }
-"""
+class _QueryWorker(QObject):
+    """
+    Egy háttérszálon élő lekérdező saját olvasó kapcsolattal. A PyQt a slot
+    hívások között eldobja a szál Python állapotát, ezért nem db.reader().
+    """
+    requested = pyqtSignal(int, object)
+    finished  = pyqtSignal(int, object, object)   # (kérés id, eredmény, hiba)
+
+    def __init__(self, loader):
+        super().__init__()
+        self._loader = loader
+        self.conn = None
+        # A GUI szálból küldött kérés a worker szálán fut (sorba állított kapcsolat)
+        self.requested.connect(self.run)
+
+    @pyqtSlot(int, object)
+    def run(self, request_id, job):
+        if not self._loader.wanted(request_id):
+            # Időközben újabb kérés érkezett ugyanarra a nézetre
+            self.finished.emit(request_id, None, None)
+            return
+        if self.conn is None:
+            self.conn = db.open_reader()
+        try:
+            self.finished.emit(request_id, job(self.conn), None)
+        except Exception as e:
+            self.finished.emit(request_id, None, e)
 
-LIGHT_QSS = """
-QMainWindow, QDialog { background: #f8fafc; }
-QWidget { background: transparent; color: #0f172a; font-family: 'Segoe UI'; font-size: 13px; }
-
-#topbar { background: #ffffff; border-bottom: 1px solid #e2e8f0; }
-#logo   { color: #f97316; font-size: 20px; font-weight: 900; background: transparent; }
-
-#tb_btn {
-    background: #f1f5f9; color: #374151;
-    border: 1px solid #e2e8f0; border-radius: 7px;
-    padding: 6px 14px; font-size: 12px; font-weight: 600;
-}
-#tb_btn:hover { background: #e2e8f0; }
-
-#chipbar { background: #f8fafc; border-bottom: 1px solid #e2e8f0; }
-
-#car_chip {
-    background: #ffffff; border: 2px solid #e2e8f0;
-    border-radius: 10px; padding: 8px 14px;
-}
-#car_chip:hover { border-color: #3b82f6; }
-
-#car_chip_active {
-    background: #eff6ff; border: 2px solid #3b82f6;
-    border-radius: 10px; padding: 8px 14px;
-}
-
-#chip_add {
-    background: transparent; border: 2px dashed #e2e8f0;
-    border-radius: 10px; color: #94a3b8;
-    font-size: 13px; font-weight: 600;
-}
-#chip_add:hover { border-color: #f97316; color: #f97316; }
-
-#tabbar { background: #ffffff; border-bottom: 2px solid #e2e8f0; }
-
-#tab_btn {
-    background: transparent; border: none;
-    color: #94a3b8; font-size: 13px; font-weight: 600;
-    padding: 12px 20px; border-bottom: 3px solid transparent;
-}
-#tab_btn:hover { color: #374151; }
-
-#tab_btn_active {
-    background: transparent; border: none;
-    color: #3b82f6; font-size: 13px; font-weight: 700;
-    padding: 12px 20px; border-bottom: 3px solid #3b82f6;
-}
-
-#toolbar { background: #f8fafc; border-bottom: 1px solid #f1f5f9; }
-
-#btn_green {
-    background: #22c55e; color: white;
-    border: none; border-radius: 8px;
-    padding: 8px 16px; font-size: 13px; font-weight: 700;
-}
-#btn_green:hover { background: #16a34a; }
-
-#btn_gray {
-    background: #f1f5f9; color: #374151;
-    border: 1px solid #e2e8f0; border-radius: 8px;
-    padding: 8px 14px; font-size: 13px; font-weight: 600;
-}
-#btn_gray:hover { background: #e2e8f0; }
-
-#btn_red {
-    background: #fee2e2; color: #dc2626;
-    border: 1px solid #fecaca; border-radius: 8px;
-    padding: 7px 14px; font-size: 13px;
-}
-#btn_red:hover { background: #fecaca; }
-
-#btn_filter {
-    background: #f1f5f9; color: #374151;
-    border: 1px solid #e2e8f0; border-radius: 8px;
-    padding: 7px 14px; font-size: 13px;
-}
-#btn_filter:hover { background: #e2e8f0; }
-
-#sort_combo {
-    background: #eff6ff; color: #3b82f6;
-    border: 1px solid #3b82f6; border-radius: 7px;
-    padding: 6px 10px; font-size: 12px; font-weight: 600;
-}
-#sort_combo::drop-down { border: none; width: 20px; }
-
-#search_box {
-    background: #ffffff; color: #0f172a;
-    border: 1.5px solid #e2e8f0; border-radius: 8px;
-    padding: 7px 12px; font-size: 13px;
-}
-#search_box:focus { border-color: #3b82f6; }
-
-#entry_row {
-    background: #ffffff; border: 1px solid #f1f5f9;
-    border-radius: 10px;
-}
-#entry_row:hover { border-color: #e2e8f0; }
-
-#entry_date { color: #1e293b; font-size: 13px; font-weight: 700; }
-#entry_km   { color: #94a3b8; font-size: 12px; }
-#entry_sub  { color: #64748b; font-size: 12px; }
-#entry_amt  { color: #0f172a; font-size: 14px; font-weight: 800; }
-
-#e_btn {
-    background: #f8fafc; border: 1px solid #e2e8f0;
-    border-radius: 7px; color: #94a3b8;
-    font-size: 13px; padding: 4px;
-    min-width: 30px; max-width: 30px;
-    min-height: 30px; max-height: 30px;
-}
-#e_btn:hover { background: #e2e8f0; color: #374151; }
-#e_btn_del:hover { border-color: #ef4444; color: #ef4444; background: #fee2e2; }
-
-QScrollBar:vertical { background: #f1f5f9; width: 8px; border-radius: 4px; }
-QScrollBar::handle:vertical { background: #cbd5e1; border-radius: 4px; min-height: 30px; }
-QScrollBar::handle:vertical:hover { background: #94a3b8; }
-QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical { height: 0; }
-
-QDialog { background: #ffffff; border: 1px solid #e2e8f0; border-radius: 12px; }
-QLabel  { color: #64748b; font-size: 12px; }
-QLineEdit, QDoubleSpinBox, QSpinBox, QDateEdit, QTextEdit, QComboBox {
-    background: #f8fafc; color: #0f172a;
-    border: 1.5px solid #e2e8f0; border-radius: 8px;
-    padding: 8px 12px; font-size: 13px;
-}
-QLineEdit:focus, QDoubleSpinBox:focus, QSpinBox:focus,
-QDateEdit:focus, QTextEdit:focus, QComboBox:focus { border-color: #3b82f6; }
-QComboBox::drop-down { border: none; width: 24px; }
-QComboBox QAbstractItemView { background: #ffffff; color: #0f172a; border: 1px solid #e2e8f0; selection-background-color: #eff6ff; }
-QSpinBox { padding-right: 20px; }
-QDoubleSpinBox { padding-right: 20px; }
-QSpinBox::up-button, QSpinBox::down-button,
-QDoubleSpinBox::up-button, QDoubleSpinBox::down-button {
-    background: #e2e8f0; border: none;
-    width: 18px; height: 14px;
-}
-QSpinBox::up-button { subcontrol-position: top right; subcontrol-origin: border; top: 2px; right: 2px; border-radius: 3px 3px 0 0; }
-QSpinBox::down-button { subcontrol-position: bottom right; subcontrol-origin: border; bottom: 2px; right: 2px; border-radius: 0 0 3px 3px; }
-QDoubleSpinBox::up-button { subcontrol-position: top right; subcontrol-origin: border; top: 2px; right: 2px; border-radius: 3px 3px 0 0; }
-QDoubleSpinBox::down-button { subcontrol-position: bottom right; subcontrol-origin: border; bottom: 2px; right: 2px; border-radius: 0 0 3px 3px; }
-QSpinBox::up-button:hover, QSpinBox::down-button:hover,
-QDoubleSpinBox::up-button:hover, QDoubleSpinBox::down-button:hover { background: #cbd5e1; }
-QSpinBox::up-arrow, QDoubleSpinBox::up-arrow { image: none; width: 0; height: 0; border-left: 4px solid transparent; border-right: 4px solid transparent; border-bottom: 5px solid #374151; }
-QSpinBox::down-arrow, QDoubleSpinBox::down-arrow { image: none; width: 0; height: 0; border-left: 4px solid transparent; border-right: 4px solid transparent; border-top: 5px solid #374151; }
-QDateEdit::drop-down { background: #e2e8f0; border: none; width: 24px; border-radius: 0 6px 6px 0; }
-
-#popup_title { color: #0f172a; font-size: 16px; font-weight: 700; }
-#save_btn {
-    background: #f97316; color: white;
-    border: none; border-radius: 8px;
-    padding: 10px; font-size: 14px; font-weight: 700;
-}
-#save_btn:hover { background: #ea580c; }
-#cancel_btn {
-    background: #f1f5f9; color: #374151;
-    border: none; border-radius: 8px;
-    padding: 10px; font-size: 13px;
-}
-#cancel_btn:hover { background: #e2e8f0; }
-
-#empty_label { color: #cbd5e1; font-size: 14px; }
-
-#chip_edit_btn {
-    background: #f1f5f9; border: none; border-radius: 4px;
-    color: #64748b; font-size: 11px;
-    min-width: 22px; max-width: 22px;
-    min-height: 22px; max-height: 22px;
-}
-#chip_edit_btn:hover { background: #e2e8f0; color: #374151; }
-#chip_del_btn {
-    background: #fee2e2; border: none; border-radius: 4px;
-    color: #dc2626; font-size: 11px;
-    min-width: 22px; max-width: 22px;
-    min-height: 22px; max-height: 22px;
-}
-#chip_del_btn:hover { background: #fecaca; }
-
-#chip_name { color: #0f172a; font-size: 14px; font-weight: 800; background: transparent; }
-#chip_rsz  { color: #94a3b8; font-size: 11px; background: transparent; }
-#chip_km   { color: #3b82f6; font-size: 12px; font-weight: 700; background: transparent; }
-
-#content_area { background: #f8fafc; }
-
-QScrollArea { border: none; background: #f8fafc; }
-QScrollArea > QWidget > QWidget { background: #f8fafc; }
-"""
+
+class DataLoader(QObject):
+    """
+    Lekérdezések és számítások a GUI szálon kívül.
+
+    submit(owner, job, callback): a job(conn) egy worker szálon fut, a
+    callback(eredmény) a GUI szálon hívódik – de csak akkor, ha ez az
+    owner (pl. a fül) legutolsó kérése; az elavult eredmény eldobódik.
+    """
+    THREADS = 2
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._latest = {}        # owner -> legutolsó kérés id
+        self._requests = {}      # kérés id -> (owner, callback, worker)
+        self._threads = []
+        self._workers = []
+        self._pending = []       # workerenként a kiadott, még vissza nem tért kérések
+
+    def _start(self):
+        for i in range(self.THREADS):
+            thread = QThread()
+            thread.setObjectName(f"query-{i}")
+            worker = _QueryWorker(self)
+            worker.moveToThread(thread)
+            worker.finished.connect(self._on_finished)
+            thread.start()
+            self._threads.append(thread)
+            self._workers.append(worker)
+            self._pending.append(0)
+
+    def submit(self, owner, job, callback) -> int:
+        """Kérés beküldése; visszatér: a kérés azonosítója."""
+        if not self._workers:
+            self._start()
+        # A legkevésbé terhelt worker kapja
+        index = min(range(len(self._workers)), key=self._pending.__getitem__)
+        self._pending[index] += 1
+        with self._lock:
+            self._next_id += 1
+            request_id = self._next_id
+            self._latest[owner] = request_id
+            self._requests[request_id] = (owner, callback, index)
+        self._workers[index].requested.emit(request_id, job)
+        return request_id
+
+    def wanted(self, request_id) -> bool:
+        """Igaz, ha a kérés még a tulajdonosa legutolsó kérése (bármely szálból hívható)."""
+        with self._lock:
+            owner = self._requests.get(request_id, (None,))[0]
+            return self._latest.get(owner) == request_id
+
+    def busy(self, owner) -> bool:
+        """Van-e az ownernek még meg nem érkezett kérése."""
+        with self._lock:
+            return owner in self._latest
+
+    def cancel(self, owner) -> bool:
+        """Az owner kérésének elvetése (a még el nem indult nem fut le). Igaz, ha volt ilyen."""
+        with self._lock:
+            return self._latest.pop(owner, None) is not None
+
+    def _on_finished(self, request_id, result, error):
+        with self._lock:
+            owner, callback, index = self._requests.pop(request_id)
+            self._pending[index] -= 1
+            if self._latest.get(owner) != request_id:
+                return
+            del self._latest[owner]
+        if error is not None:
+            logger.error(f"Háttér lekérdezés hiba ({type(owner).__name__}): {error}")
+            return
+        try:
+            callback(result)
+        except RuntimeError as e:
+            # Pl. időközben törölt (újraépített) fül
+            logger.warning(f"Háttér lekérdezés eredménye nem adható át: {e}")
+
+    def shutdown(self):
+        """A worker szálak leállítása (kilépéskor, a kapcsolatok lezárása előtt)."""
+        for thread in self._threads:
+            thread.quit()
+        for thread in self._threads:
+            thread.wait()
+        for worker in self._workers:
+            if worker.conn is not None:
+                db.release_reader(worker.conn)
+        self._threads.clear()
+        self._workers.clear()
+        self._pending.clear()
+
+# Lekérdezések a GUI szálon kívül (a fülek és az induláskori emlékeztetők)
+loader = DataLoader()
+# Grafikonok: a DataLoader szálain rajzolt, memóriában és lemezen tárolt képek
+charts = ChartRenderer(os.path.join(DATA_DIR, "chart_cache"))
+
+# ══════════════════════════════════════════════════════════════════════════════
+# Téma (QSS a theme.py token táblájából, alkalmazás szinten)
+# ══════════════════════════════════════════════════════════════════════════════
+def apply_theme(dark: bool):
+    """Témaváltás: egyetlen (gyorsítótárazott) stíluslap csere, widget újraépítés nélkül."""
+    name = theme.theme_name(dark)
+    theme.set_current(name)
+    QApplication.instance().setStyleSheet(theme.compile_qss(name))
+
+
+def chart_colors() -> dict:
+    """A grafikonok színei az aktuális témából (a rajzoló szál ezt a másolatot kapja)."""
+    return {"bg": theme.token("chart_bg"), "fg": theme.token("chart_fg"),
+            "grid": theme.token("chart_grid")}
+
+def set_prop(widget, name, value):
+    """Dinamikus property beállítása; a stílus csak változáskor polish-olódik újra."""
+    if widget.property(name) != value:
+        widget.setProperty(name, value)
+        widget.style().unpolish(widget)
+        widget.style().polish(widget)
 
 # ══════════════════════════════════════════════════════════════════════════════
 # Jármű Popup
@@ -607,7 +328,7 @@ class CarDialog(QDialog):
         lay.addLayout(btn_row)
 
     def _load(self):
-        with get_db() as conn:
+        with read_db() as conn:
             r = conn.execute(
                 "SELECT marka,tipus,rendszam,evjarat,km_allas,muszaki_lejarat,olaj_intervallum "
                 "FROM autok WHERE id=?", (self.car_id,)
@@ -721,7 +442,7 @@ class EntryDialog(QDialog):
                 self.f_osszeg.setValue(round(total))
 
     def _load(self):
-        with get_db() as conn:
+        with read_db() as conn:
             r = conn.execute(
                 "SELECT datum,osszeg,km_allas,mennyiseg_liter,egysegar_ft_l,benzinkut,megjegyzes "
                 "FROM szerviz_adatok WHERE id=?", (self.entry_id,)
@@ -762,106 +483,366 @@ class EntryDialog(QDialog):
         with get_db() as conn:
             if self.entry_id:
                 conn.execute(
-                    "UPDATE szerviz_adatok SET datum=?,osszeg=?,km_allas=?,kategoria=?,"
+                    f"UPDATE szerviz_adatok SET datum=?,osszeg=?,km_allas=?,kategoria_id={KATEGORIA_ID_SQL},"
                     "mennyiseg_liter=?,egysegar_ft_l=?,benzinkut=?,megjegyzes=? WHERE id=?",
                     (*vals, self.entry_id)
                 )
+                kind, entry_id = UPDATED, self.entry_id
             else:
-                conn.execute(
+                cur = conn.execute(
                     "INSERT INTO szerviz_adatok "
-                    "(datum,osszeg,km_allas,kategoria,mennyiseg_liter,egysegar_ft_l,benzinkut,megjegyzes,auto_id)"
-                    " VALUES (?,?,?,?,?,?,?,?,?)",
+                    "(datum,osszeg,km_allas,kategoria_id,mennyiseg_liter,egysegar_ft_l,benzinkut,megjegyzes,auto_id)"
+                    f" VALUES (?,?,?,{KATEGORIA_ID_SQL},?,?,?,?,?)",
                     (*vals, self.auto_id)
                 )
+                kind, entry_id = INSERTED, cur.lastrowid
+            row = get_entry(conn, entry_id)
         self.accept()
+        events.publish(EntryChange(kind, entry_id, self.auto_id, self.kategoria, row))
 
 # ══════════════════════════════════════════════════════════════════════════════
-# Bejegyzés sor widget
+# Bejegyzés lista (modell + rajzoló delegate)
 # ══════════════════════════════════════════════════════════════════════════════
-class EntryRow(QFrame):
+class EntryTableModel(QAbstractTableModel):
+    """
+    Egy oszlopos modell a bejegyzés listához.
+
+    Normál listánál csak a rendezett id-k és rendezési kulcsaik vannak a
+    memóriában; a sorok adatai PAGE_SIZE-os lapokban, az első
+    megjelenítéskor töltődnek be (`load_page(ids) -> {id: row}`), és
+    legfeljebb PAGE_SIZE * MAX_PAGES sor marad meg. Egy bejegyzés írása
+    után az upsert() / remove() helyben javítja a listát. Keresésnél a
+    (korlátozott számú) találat sorai közvetlenül kerülnek a modellbe.
+    """
+    RowRole = Qt.ItemDataRole.UserRole + 1
+    PAGE_SIZE = 200
+    MAX_PAGES = 8
+
+    def __init__(self, load_page, parent=None):
+        super().__init__(parent)
+        self._load_page = load_page
+        self._ids: list[int] = []
+        self._keys: list = []
+        self._desc = True
+        self._rows = None
+        self._cache: OrderedDict[int, object] = OrderedDict()
+
+    @property
+    def searching(self) -> bool:
+        return self._rows is not None
+
+    def set_ids(self, ids: list[int], keys: list, desc: bool):
+        """Rendezett id-k a rendezési kulcsaikkal (azonos kulcsnál id szerint rendezve)."""
+        self.beginResetModel()
+        self._ids, self._keys, self._desc, self._rows = ids, keys, desc, None
+        self._cache.clear()
+        self.endResetModel()
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self._ids, self._keys, self._rows = [r["id"] for r in rows], [], rows
+        self._cache.clear()
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._ids)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 1
+
+    def row(self, n: int):
+        """Az n. sor adatai (sqlite3.Row); szükség esetén betölti a lapját."""
+        if self._rows is not None:
+            return self._rows[n]
+        entry_id = self._ids[n]
+        if entry_id not in self._cache:
+            start = n - n % self.PAGE_SIZE
+            self._cache.update(self._load_page(self._ids[start:start + self.PAGE_SIZE]))
+            while len(self._cache) > self.PAGE_SIZE * self.MAX_PAGES:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(entry_id)
+        return self._cache.get(entry_id)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == self.RowRole:
+            return self.row(index.row())
+        if role == Qt.ItemDataRole.DisplayRole:
+            r = self.row(index.row())
+            return r["datum"] if r is not None else None
+        return None
+
+    # ------------------------------------------------------------------
+    # Helyben javítás (nem keresés közben)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _rank(key, entry_id):
+        # SQLite sorrend: a NULL a legkisebb érték
+        return (key is not None, key if key is not None else 0, entry_id)
+
+    def _position(self, key, entry_id) -> int:
+        """Az (key, id) helye a rendezett listában (bináris kereséssel)."""
+        new = self._rank(key, entry_id)
+        if self._desc:
+            after = lambda i: self._rank(self._keys[i], self._ids[i]) < new
+        else:
+            after = lambda i: self._rank(self._keys[i], self._ids[i]) > new
+        return bisect.bisect_left(range(len(self._ids)), True, key=after)
+
+    def upsert(self, row, key):
+        """Új vagy módosított sor: a helyén frissül, vagy a rendezés szerinti helyre kerül."""
+        entry_id = row["id"]
+        if entry_id in self._ids:
+            old = self._ids.index(entry_id)
+            del self._ids[old], self._keys[old]
+            pos = self._position(key, entry_id)
+            self._ids.insert(old, entry_id); self._keys.insert(old, key)
+            self._cache[entry_id] = row
+            if pos == old:
+                self._keys[old] = key
+                index = self.index(old, 0)
+                self.dataChanged.emit(index, index)
+                return
+            self.remove(entry_id)
+        pos = self._position(key, entry_id)
+        self.beginInsertRows(QModelIndex(), pos, pos)
+        self._ids.insert(pos, entry_id); self._keys.insert(pos, key)
+        self._cache[entry_id] = row
+        self.endInsertRows()
+
+    def remove(self, entry_id):
+        if entry_id not in self._ids:
+            return
+        pos = self._ids.index(entry_id)
+        self.beginRemoveRows(QModelIndex(), pos, pos)
+        del self._ids[pos], self._keys[pos]
+        self._cache.pop(entry_id, None)
+        self.endRemoveRows()
+
+
+class EntryDelegate(QStyledItemDelegate):
+    """
+    Egy bejegyzés sor kirajzolása widgetek nélkül. A másolás / szerkesztés /
+    törlés gombok csak rajzolt területek; a kattintást az editorEvent
+    területenként jelzi.
+    """
     edit_requested   = pyqtSignal(int)
     delete_requested = pyqtSignal(int)
     copy_requested   = pyqtSignal(int)
 
-    def __init__(self, row_data, kategoria, parent=None):
+    ROW_H, GAP, PAD = 52, 7, 14
+    BTN, BTN_GAP = 30, 3
+    ICONS = {"Tankolás": "⛽", "Karbantartás": "🔧", "Biztosítás": "🛡️", "Egyéb": "📦"}
+
+    def __init__(self, kategoria, parent=None):
         super().__init__(parent)
-        self.row_data  = row_data
-        self.entry_id  = row_data["id"]
         self.kategoria = kategoria
-        self.setObjectName("entry_row")
-        self._build()
+        self._actions = [
+            ("📋", self.copy_requested),
+            ("✏️", self.edit_requested),
+            ("🗑️", self.delete_requested),
+        ]
 
-    def _build(self):
-        r = self.row_data
-        lay = QHBoxLayout(self)
-        lay.setContentsMargins(14, 11, 14, 11)
-        lay.setSpacing(0)
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.ROW_H + self.GAP)
+
+    def button_rects(self, rect: QRect) -> list[QRect]:
+        """A sor gombjainak területe (másolás, szerkesztés, törlés sorrendben)."""
+        row = rect.adjusted(0, 0, 0, -self.GAP)
+        top = row.top() + (row.height() - self.BTN) // 2
+        x = row.right() - self.PAD - 3 * self.BTN - 2 * self.BTN_GAP
+        return [QRect(x + i * (self.BTN + self.BTN_GAP), top, self.BTN, self.BTN) for i in range(3)]
+
+    def hit(self, rect: QRect, pos: QPoint) -> int | None:
+        for i, btn in enumerate(self.button_rects(rect)):
+            if btn.contains(pos):
+                return i
+        return None
+
+    # ------------------------------------------------------------------
+    # Rajzolás
+    # ------------------------------------------------------------------
+
+    def paint(self, painter, option, index):
+        r = index.data(EntryTableModel.RowRole)
+        if r is None:
+            return
+        # Az #entry_row, #entry_* és #e_btn QSS színei (témaváltáskor elég újrarajzolni)
+        c = theme.tokens()
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        hover = bool(option.state & QStyle.StateFlag.State_MouseOver)
+        row = QRectF(option.rect.adjusted(0, 0, 0, -self.GAP)).adjusted(0.5, 0.5, -0.5, -0.5)
+        painter.setPen(QPen(QColor(c["entry_border_hover"] if hover else c["entry_border"]), 1))
+        painter.setBrush(QColor(c["entry_bg"]))
+        painter.drawRoundedRect(row, 10, 10)
+
+        base = QFont(option.font)
+        x = option.rect.left() + self.PAD
+        top, h = option.rect.top(), self.ROW_H
+
+        # Keresési találatnál a *_hl oszlopok jelölt szövege jelenik meg
+        hl = "megjegyzes_hl" in r.keys()
+        def text(col):
+            return r[f"{col}_hl"] if hl else (r[col] or "")
+
+        self._text(painter, QRect(x, top, 24, h), self.ICONS.get(self.kategoria, "📦"), base, 12, c["entry_sub"])
+        x += 34
+        self._text(painter, QRect(x, top, 88, h), text("datum"), base, 13, c["entry_date"], bold=True)
+        x += 88
+        km = f'{r["km_allas"]:,} km'.replace(",", " ") if r["km_allas"] else "—"
+        self._text(painter, QRect(x, top, 88, h), km, base, 12, c["muted"])
+        x += 88
 
-        # Ikon
-        ikon_map = {"Tankolás": "⛽", "Karbantartás": "🔧", "Biztosítás": "🛡️", "Egyéb": "📦"}
-        ikon = QLabel(ikon_map.get(self.kategoria, "📦"))
-        ikon.setFixedWidth(24)
-        ikon.setObjectName("entry_sub")
-        lay.addWidget(ikon)
-        lay.addSpacing(10)
-
-        # Dátum
-        date_lbl = QLabel(r["datum"] or "")
-        date_lbl.setObjectName("entry_date")
-        date_lbl.setFixedWidth(88)
-        lay.addWidget(date_lbl)
-
-        # KM
-        km_str = f'{r["km_allas"]:,} km'.replace(",", " ") if r["km_allas"] else "—"
-        km_lbl = QLabel(km_str)
-        km_lbl.setObjectName("entry_km")
-        km_lbl.setFixedWidth(88)
-        lay.addWidget(km_lbl)
-
-        # Részletek
         parts = []
         if r["mennyiseg_liter"]: parts.append(f'{r["mennyiseg_liter"]:.2f} L')
         if r["egysegar_ft_l"]:   parts.append(f'{r["egysegar_ft_l"]:.1f} Ft/L')
-        if r["benzinkut"]:       parts.append(f'📍 {r["benzinkut"]}')
-        if r["megjegyzes"] and not parts: parts.append(r["megjegyzes"])
-        sub_lbl = QLabel("  ·  ".join(parts) if parts else (r["megjegyzes"] or ""))
-        sub_lbl.setObjectName("entry_sub")
-        lay.addWidget(sub_lbl, stretch=1)
-
-        # Összeg
+        if r["benzinkut"]:       parts.append(f'📍 {text("benzinkut")}')
+        note_hit = hl and HL_START in (r["megjegyzes_hl"] or "")
+        if r["megjegyzes"] and (not parts or note_hit): parts.append(text("megjegyzes"))
+
+        buttons = self.button_rects(option.rect)
+        amt_right = buttons[0].left() - self.PAD
+        self._text(painter, QRect(x, top, max(amt_right - 90 - x, 0), h),
+                   "  ·  ".join(parts), base, 12, c["entry_sub"])
         amt = f'{int(r["osszeg"]):,} Ft'.replace(",", " ") if r["osszeg"] else "—"
-        amt_lbl = QLabel(amt)
-        amt_lbl.setObjectName("entry_amt")
-        amt_lbl.setFixedWidth(90)
-        amt_lbl.setAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-        lay.addWidget(amt_lbl)
-        lay.addSpacing(14)
-
-        # Gombok
-        for txt, obj, sig in [
-            ("📋", "e_btn", self.copy_requested),
-            ("✏️", "e_btn", self.edit_requested),
-            ("🗑️", "e_btn_del", self.delete_requested),
-        ]:
-            btn = QPushButton(txt)
-            btn.setObjectName(obj)
-            btn.setFixedSize(30, 30)
-            btn.clicked.connect(lambda _, s=sig: s.emit(self.entry_id))
-            lay.addWidget(btn)
-            lay.addSpacing(3)
+        self._text(painter, QRect(amt_right - 90, top, 90, h), amt, base, 14, c["heading"],
+                   bold=True, align=Qt.AlignmentFlag.AlignRight)
+
+        mouse = option.widget.mapFromGlobal(QCursor.pos()) if hover and option.widget else None
+        for i, btn in enumerate(buttons):
+            over = mouse is not None and btn.contains(mouse)
+            delete = i == len(buttons) - 1
+            bg = (c["danger_bg"] if delete else c["e_btn_hover_bg"]) if over else c["e_btn_bg"]
+            painter.setPen(QPen(QColor("#ef4444" if over and delete else c["e_btn_border"]), 1))
+            painter.setBrush(QColor(bg))
+            painter.drawRoundedRect(QRectF(btn).adjusted(0.5, 0.5, -0.5, -0.5), 7, 7)
+            self._text(painter, btn, self._actions[i][0], base, 13, c["e_btn_fg"],
+                       align=Qt.AlignmentFlag.AlignHCenter)
+        painter.restore()
+
+    def _text(self, painter, rect, text, base, size, color, bold=False,
+              align=Qt.AlignmentFlag.AlignLeft):
+        """
+        Egysoros szöveg a terület függőleges közepére, levágással. A
+        HL_START / HL_END közötti részek félkövérek.
+        """
+        font = QFont(base); font.setPixelSize(size); font.setBold(bold)
+        painter.setPen(QColor(color))
+        flags = align | Qt.AlignmentFlag.AlignVCenter
+        if HL_START not in text:
+            painter.setFont(font)
+            elided = QFontMetrics(font).elidedText(text, Qt.TextElideMode.ElideRight, rect.width())
+            painter.drawText(rect, flags, elided)
+            return
+
+        strong = QFont(font); strong.setBold(True)
+        x, right = rect.left(), rect.right()
+        for i, part in enumerate(re.split(f"[{HL_START}{HL_END}]", text)):
+            if not part:
+                continue
+            f = strong if i % 2 else font
+            fm = QFontMetrics(f)
+            width = fm.horizontalAdvance(part)
+            if x + width > right:
+                part = fm.elidedText(part, Qt.TextElideMode.ElideRight, right - x)
+                width = right - x
+            painter.setFont(f)
+            painter.drawText(QRect(x, rect.top(), width, rect.height()),
+                             Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, part)
+            x += width
+            if x >= right:
+                break
+
+    # ------------------------------------------------------------------
+    # Gomb területek
+    # ------------------------------------------------------------------
+
+    def editorEvent(self, event, model, option, index):
+        if (event.type() == QEvent.Type.MouseButtonRelease
+                and event.button() == Qt.MouseButton.LeftButton):
+            i = self.hit(option.rect, event.position().toPoint())
+            r = index.data(EntryTableModel.RowRole)
+            if i is not None and r is not None:
+                self._actions[i][1].emit(r["id"])
+                return True
+        return super().editorEvent(event, model, option, index)
+
+
+class EntryTableView(QTableView):
+    """
+    Fejléc és rács nélküli QTableView fix sormagassággal (a görgetés és az
+    elrendezés így nem függ a sorok számától), a gomb területek hover
+    kiemelésével és mutató kurzorával.
+    """
+
+    def __init__(self, row_height, parent=None):
+        super().__init__(parent)
+        self.setMouseTracking(True)
+        self.setShowGrid(False)
+        self.setWordWrap(False)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setFrameShape(QFrame.Shape.NoFrame)
+        self.setObjectName("content_area")
+        self.horizontalHeader().hide()
+        self.horizontalHeader().setStretchLastSection(True)
+        vh = self.verticalHeader()
+        vh.hide()
+        vh.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        vh.setDefaultSectionSize(row_height)
+        self._hover_row = -1
+
+    def _update_row(self, row):
+        if row >= 0:
+            self.viewport().update(self.visualRect(self.model().index(row, 0)))
+
+    def mouseMoveEvent(self, event):
+        super().mouseMoveEvent(event)
+        pos = event.position().toPoint()
+        index = self.indexAt(pos)
+        row = index.row() if index.isValid() else -1
+        if row != self._hover_row:
+            self._update_row(self._hover_row)
+            self._hover_row = row
+        self._update_row(row)
+        on_button = row >= 0 and self.itemDelegate().hit(self.visualRect(index), pos) is not None
+        self.viewport().setCursor(Qt.CursorShape.PointingHandCursor if on_button
+                                  else Qt.CursorShape.ArrowCursor)
+
+    def leaveEvent(self, event):
+        super().leaveEvent(event)
+        self._update_row(self._hover_row)
+        self._hover_row = -1
 
 # ══════════════════════════════════════════════════════════════════════════════
 # Tab tartalom (bejegyzés lista)
 # ══════════════════════════════════════════════════════════════════════════════
 class TabContent(QWidget):
+    # (token, sorok) – a keresés háttérszálából, sorban a fő szálra
+    search_done = pyqtSignal(int, object)
+
     def __init__(self, auto_id_getter, kategoria, parent=None):
         super().__init__(parent)
         self.auto_id_getter = auto_id_getter
         self.kategoria = kategoria
         self._search_text = ""
-        self._sort = "datum DESC"
+        self._search_token = None    # a még meg nem érkezett keresés tokenje
         self._build()
 
+        # Gépelés közben csak a szünet után indul keresés
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(config.get_int("search_debounce_ms"))
+        self._search_timer.timeout.connect(self.refresh)
+        self.search_done.connect(self._on_search_done)
+
     def _build(self):
         lay = QVBoxLayout(self)
         lay.setContentsMargins(0, 0, 0, 0)
@@ -893,85 +874,149 @@ class TabContent(QWidget):
         tb_lay.addWidget(self.btn_clear)
         lay.addWidget(toolbar)
 
-        # Scroll area bejegyzéseknek
-        self.scroll = QScrollArea(); self.scroll.setWidgetResizable(True)
-        self.scroll.setObjectName("content_area")
-        self.list_widget = QWidget(); self.list_widget.setObjectName("content_area")
-        self.list_lay = QVBoxLayout(self.list_widget)
-        self.list_lay.setContentsMargins(16, 10, 16, 16)
-        self.list_lay.setSpacing(7)
-        self.list_lay.addStretch()
-        self.scroll.setWidget(self.list_widget)
-        lay.addWidget(self.scroll)
+        # Bejegyzés lista: modell + delegate, csak a látható sorok rajzolódnak ki
+        body = QWidget(); body.setObjectName("content_area")
+        body_lay = QVBoxLayout(body)
+        body_lay.setContentsMargins(16, 10, 16, 16)
+        body_lay.setSpacing(7)
+
+        self.model = EntryTableModel(self._load_rows, self)
+        self.delegate = EntryDelegate(self.kategoria, self)
+        self.delegate.edit_requested.connect(self._edit_entry)
+        self.delegate.delete_requested.connect(self._delete_entry)
+        self.delegate.copy_requested.connect(self._copy_entry)
+        self.view = EntryTableView(EntryDelegate.ROW_H + EntryDelegate.GAP)
+        self.view.setModel(self.model)
+        self.view.setItemDelegate(self.delegate)
+
+        self.empty_label = QLabel("Nincs bejegyzés ebben a kategóriában.")
+        self.empty_label.setObjectName("empty_label")
+        self.empty_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.more_label = QLabel(f"Az első {SEARCH_LIMIT} találat látszik – pontosítsd a keresést.")
+        self.more_label.setObjectName("empty_label")
+        self.more_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.empty_label.hide(); self.more_label.hide()
+
+        body_lay.addWidget(self.empty_label)
+        body_lay.addWidget(self.view, stretch=1)
+        body_lay.addWidget(self.more_label)
+        lay.addWidget(body)
 
         self.btn_new.clicked.connect(self._new_entry)
         self.btn_csv.clicked.connect(self._import_csv)
 
-    def _sort_key(self):
+    def _sort_key(self) -> tuple[str, bool]:
+        """A választott rendezés (oszlop, csökkenő) alakban."""
         idx = self.sort_cb.currentIndex()
-        return ["datum DESC","datum ASC","osszeg DESC","km_allas DESC"][idx]
+        return [("datum", True), ("datum", False), ("osszeg", True), ("km_allas", True)][idx]
 
     def _on_sort_change(self): self.refresh()
-    def _on_search(self, txt): self._search_text = txt; self.refresh()
+    def _on_search(self, txt): self._search_text = txt; self._search_timer.start()
 
     def refresh(self):
         auto_id = self.auto_id_getter()
-        # Töröljük a régi sorokat (a stretch előtti elemeket)
-        while self.list_lay.count() > 1:
-            item = self.list_lay.takeAt(0)
-            if item.widget(): item.widget().deleteLater()
-
         if not auto_id:
+            self.cancel_refresh()
+            self.model.set_rows([])
+            self.empty_label.hide(); self.more_label.hide()
             return
 
-        sort = self._sort_key()
-        q = f"""SELECT id,datum,osszeg,km_allas,kategoria,
-                       mennyiseg_liter,egysegar_ft_l,benzinkut,megjegyzes,kep_utvonal
-                FROM szerviz_adatok
-                WHERE auto_id=? AND kategoria=?
-                ORDER BY {sort}"""
-        with get_db() as conn:
-            rows = conn.execute(q, (auto_id, self.kategoria)).fetchall()
-
-        txt = self._search_text.lower()
-        if txt:
-            rows = [r for r in rows if txt in (r["datum"] or "").lower()
-                    or txt in (r["megjegyzes"] or "").lower()
-                    or txt in (r["benzinkut"] or "").lower()]
-
-        if not rows:
-            lbl = QLabel("Nincs bejegyzés ebben a kategóriában.")
-            lbl.setObjectName("empty_label")
-            lbl.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.list_lay.insertWidget(0, lbl)
+        text = self._search_text.strip()
+        if text and fts_query(text) is not None:
+            # Keresés: a korábbi találatok szűkítése, vagy FTS lekérdezés háttérszálon
+            # (addig a jelenlegi lista marad látható)
+            loader.cancel(self)
+            with read_db() as conn:
+                rows = searcher.cached(conn, auto_id, self.kategoria, text)
+            if rows is None:
+                self._search_token = searcher.submit(auto_id, self.kategoria, text,
+                                                     self.search_done.emit)
+            else:
+                self._show_rows(rows)
             return
 
-        for r in rows:
-            row_w = EntryRow(r, self.kategoria)
-            row_w.edit_requested.connect(self._edit_entry)
-            row_w.delete_requested.connect(self._delete_entry)
-            row_w.copy_requested.connect(self._copy_entry)
-            self.list_lay.insertWidget(self.list_lay.count()-1, row_w)
-
+        # Nincs keresés: a még futó keresés eredménye már nem kell
+        self.cancel_refresh()
+        col, desc = self._sort_key()
+        kategoria = self.kategoria
+        # Csak a rendezett id-k és kulcsok (háttérszálon) – a sorok adatait a modell lapozva tölti be
+        loader.submit(self, lambda conn: self._load_keys(conn, auto_id, kategoria, col, desc),
+                      lambda keyed: self._show_keys(keyed, desc))
+
+    @staticmethod
+    def _load_keys(conn, auto_id, kategoria, col, desc) -> list:
+        direction = "DESC" if desc else "ASC"
+        return conn.execute(
+            f"""SELECT id, {col} FROM szerviz_adatok
+                WHERE auto_id=? AND kategoria_id={KATEGORIA_ID_SQL}
+                ORDER BY {col} {direction}, id {direction}""",
+            (auto_id, kategoria)).fetchall()
+
+    def _show_keys(self, keyed, desc):
+        self.model.set_ids([r[0] for r in keyed], [r[1] for r in keyed], desc)
+        self._update_labels(searched=False)
+
+    def apply_change(self, ev: EntryChange) -> bool:
+        """Egy bejegyzés írása után a lista helyben javul, újralekérdezés nélkül."""
+        if ev.kategoria != self.kategoria:
+            return True
+        if self.model.searching or loader.busy(self):
+            # A találatok a keresés gyorsítótárából frissülnek (az írás üríti);
+            # a még betöltés alatt álló lista az írás előtti állapotot hozhatja
+            return False
+        if ev.kind == DELETED:
+            self.model.remove(ev.entry_id)
+        else:
+            self.model.upsert(ev.row, ev.row[self._sort_key()[0]])
+        self._update_labels(searched=False)
+        return True
+
+    def cancel_refresh(self) -> bool:
+        """A várakozó (debounce) keresés, a futó keresés és a betöltés elvetése. Igaz, ha volt ilyen."""
+        pending = self._search_timer.isActive() or self._search_token is not None
+        self._search_timer.stop()
+        self._search_token = None
+        searcher.cancel(self.kategoria)
+        return loader.cancel(self) or pending
+
+    def _on_search_done(self, token, rows):
+        if searcher.current(self.kategoria, token):
+            self._search_token = None
+            self._show_rows(rows or [])
+
+    def _show_rows(self, rows):
+        self.model.set_rows(rows)
+        self._update_labels(searched=True)
+
+    def _update_labels(self, searched):
+        count = self.model.rowCount()
+        self.view.setVisible(count > 0)
+        self.empty_label.setVisible(count == 0)
+        self.more_label.setVisible(searched and count >= SEARCH_LIMIT)
+
+    def _load_rows(self, ids) -> dict:
+        """A lista egy lapjának sorai id szerint (a modell hívja megjelenítéskor)."""
+        with read_db() as conn:
+            rows = conn.execute(
+                f"""SELECT {LIST_COLUMNS} FROM szerviz_adatok_nevvel
+                    WHERE id IN ({",".join("?" * len(ids))})""", ids).fetchall()
+        return {r["id"]: r for r in rows}
+
+    # Az EntryDialog mentése EntryChange eseményt küld, az frissíti a listát
     def _new_entry(self):
-        dlg = EntryDialog(self, auto_id=self.auto_id_getter(), kategoria=self.kategoria)
-        if dlg.exec() == QDialog.DialogCode.Accepted:
-            self.refresh()
+        EntryDialog(self, auto_id=self.auto_id_getter(), kategoria=self.kategoria).exec()
 
     def _edit_entry(self, eid):
-        dlg = EntryDialog(self, auto_id=self.auto_id_getter(), kategoria=self.kategoria, entry_id=eid)
-        if dlg.exec() == QDialog.DialogCode.Accepted:
-            self.refresh()
+        EntryDialog(self, auto_id=self.auto_id_getter(), kategoria=self.kategoria, entry_id=eid).exec()
 
     def _copy_entry(self, eid):
-        with get_db() as conn:
+        with read_db() as conn:
             r = conn.execute("SELECT * FROM szerviz_adatok WHERE id=?", (eid,)).fetchone()
         if r:
             prefill = {"datum": datetime.today().strftime("%Y.%m.%d"),
                        "km_allas": r["km_allas"], "osszeg": r["osszeg"]}
-            dlg = EntryDialog(self, auto_id=self.auto_id_getter(), kategoria=self.kategoria, prefill=prefill)
-            if dlg.exec() == QDialog.DialogCode.Accepted:
-                self.refresh()
+            EntryDialog(self, auto_id=self.auto_id_getter(), kategoria=self.kategoria,
+                        prefill=prefill).exec()
 
     def _delete_entry(self, eid):
         ret = QMessageBox.question(self, "Törlés", "Biztosan törlöd ezt a bejegyzést?",
@@ -979,7 +1024,7 @@ class TabContent(QWidget):
         if ret == QMessageBox.StandardButton.Yes:
             with get_db() as conn:
                 conn.execute("DELETE FROM szerviz_adatok WHERE id=?", (eid,))
-            self.refresh()
+            events.publish(EntryChange(DELETED, eid, self.auto_id_getter(), self.kategoria))
 
     def _import_csv(self):
         path, _ = QFileDialog.getOpenFileName(self, "CSV importálása", "", "CSV fájlok (*.csv)")
@@ -1011,7 +1056,7 @@ class TabContent(QWidget):
             with get_db() as conn:
                 if ret == QMessageBox.StandardButton.Yes:
                     conn.execute(
-                        "DELETE FROM szerviz_adatok WHERE auto_id=? AND kategoria=?",
+                        f"DELETE FROM szerviz_adatok WHERE auto_id=? AND kategoria_id={KATEGORIA_ID_SQL}",
                         (auto_id, self.kategoria)
                     )
 
@@ -1027,16 +1072,16 @@ class TabContent(QWidget):
                     arl       = float(arl_s)   if arl_s   else None
                     conn.execute(
                         "INSERT INTO szerviz_adatok "
-                        "(auto_id,datum,osszeg,km_allas,kategoria,"
+                        "(auto_id,datum,osszeg,km_allas,kategoria_id,"
                         "mennyiseg_liter,egysegar_ft_l,benzinkut,megjegyzes) "
-                        "VALUES (?,?,?,?,?,?,?,?,?)",
+                        f"VALUES (?,?,?,?,{KATEGORIA_ID_SQL},?,?,?,?)",
                         (auto_id, datum, osszeg, km, self.kategoria,
                          liter, arl, benzinkut, megj)
                     )
                     count += 1
 
             QMessageBox.information(self, "✅ Kész", f"{count} bejegyzés importálva!")
-            self.refresh()
+            views.invalidate("szerviz_adatok", auto_id=auto_id)
         except Exception as e:
             QMessageBox.critical(self, "Hiba", f"Import hiba:\n{e}")
 
@@ -1049,7 +1094,6 @@ class SettingsDialog(QDialog):
         self.setWindowTitle("⚙️ Beállítások")
         self.setFixedWidth(400)
         self.setModal(True)
-        self.cfg = load_config()
         self._build()
 
     def _build(self):
@@ -1066,8 +1110,7 @@ class SettingsDialog(QDialog):
 
         # Sötét mód
         self.dark_cb = QCheckBox("Sötét mód")
-        self.dark_cb.setChecked(self.cfg.get("dark_mode", True))
-        self.dark_cb.setStyleSheet("color: #e2e8f0; font-size: 13px;")
+        self.dark_cb.setChecked(config.get_bool("dark_mode"))
         form.addRow(QLabel("Megjelenés:"), self.dark_cb)
 
         # Olajcsere intervallum
@@ -1075,23 +1118,28 @@ class SettingsDialog(QDialog):
         self.olaj_spin.setRange(1000, 50000)
         self.olaj_spin.setSingleStep(1000)
         self.olaj_spin.setSuffix(" km")
-        self.olaj_spin.setValue(self.cfg.get("default_oil_interval", 10000))
+        self.olaj_spin.setValue(config.get_int("default_oil_interval"))
         form.addRow(QLabel("Alapértelmezett olajcsere:"), self.olaj_spin)
 
         # Műszaki figyelmeztetés
         self.muszaki_spin = QSpinBox()
         self.muszaki_spin.setRange(7, 90)
         self.muszaki_spin.setSuffix(" nap")
-        self.muszaki_spin.setValue(self.cfg.get("muszaki_warning_days", 30))
+        self.muszaki_spin.setValue(config.get_int("muszaki_warning_days"))
         form.addRow(QLabel("Műszaki figyelmeztetés:"), self.muszaki_spin)
 
         # Biztosítás figyelmeztetés
         self.biz_spin = QSpinBox()
         self.biz_spin.setRange(7, 90)
         self.biz_spin.setSuffix(" nap")
-        self.biz_spin.setValue(self.cfg.get("biztositas_warning_days", 30))
+        self.biz_spin.setValue(config.get_int("biztositas_warning_days"))
         form.addRow(QLabel("Biztosítás figyelmeztetés:"), self.biz_spin)
 
+        # Nehéz modulok (grafikon, PDF) előtöltése az ablak megjelenése után
+        self.preload_cb = QCheckBox("Modulok előtöltése induláskor")
+        self.preload_cb.setChecked(config.get_bool("preload_modules"))
+        form.addRow(QLabel("Indítás:"), self.preload_cb)
+
         lay.addLayout(form)
         lay.addSpacing(6)
 
@@ -1105,11 +1153,13 @@ class SettingsDialog(QDialog):
         lay.addLayout(btn_row)
 
     def _save(self):
-        self.cfg["dark_mode"] = self.dark_cb.isChecked()
-        self.cfg["default_oil_interval"] = self.olaj_spin.value()
-        self.cfg["muszaki_warning_days"] = self.muszaki_spin.value()
-        self.cfg["biztositas_warning_days"] = self.biz_spin.value()
-        save_config(self.cfg)
+        config.update({
+            "dark_mode": self.dark_cb.isChecked(),
+            "default_oil_interval": self.olaj_spin.value(),
+            "muszaki_warning_days": self.muszaki_spin.value(),
+            "biztositas_warning_days": self.biz_spin.value(),
+            "preload_modules": self.preload_cb.isChecked(),
+        })
         self.accept()
 
     def get_dark_mode(self):
@@ -1191,15 +1241,22 @@ class BackupDialog(QDialog):
     def _create_backup(self):
         ts = datetime.now().strftime("%Y%m%d_%H%M%S")
         zip_path = os.path.join(BACKUP_DIR, f"wheelbook_backup_{ts}.zip")
+        snapshot = os.path.join(BACKUP_DIR, f"_snapshot_{ts}.db")
         try:
+            # Konzisztens pillanatkép – WAL módban a fájl másolása nem elég
+            copy_database(DB_PATH, snapshot)
             with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
-                zf.write(DB_PATH, "auto_naplo.db")
+                zf.write(snapshot, "auto_naplo.db")
+                config.flush()      # a még függő beállítás módosítások is bekerülnek
                 if os.path.exists(CONFIG_PATH):
                     zf.write(CONFIG_PATH, "config.json")
             QMessageBox.information(self, "✅ Kész", f"Backup létrehozva:\n{os.path.basename(zip_path)}")
             self._list_backups()
         except Exception as e:
             QMessageBox.critical(self, "Hiba", f"Backup hiba:\n{e}")
+        finally:
+            if os.path.exists(snapshot):
+                os.remove(snapshot)
 
     def _import_backup(self):
         path, _ = QFileDialog.getOpenFileName(self, "Backup importálása", "", "ZIP fájlok (*.zip)")
@@ -1223,9 +1280,17 @@ class BackupDialog(QDialog):
         try:
             with zipfile.ZipFile(zip_path, "r") as zf:
                 if "auto_naplo.db" in zf.namelist():
-                    zf.extract("auto_naplo.db", DATA_DIR)
+                    # Az élő adatbázisba a backup API-val írunk vissza (WAL-biztos)
+                    zf.extract("auto_naplo.db", BACKUP_DIR)
+                    extracted = os.path.join(BACKUP_DIR, "auto_naplo.db")
+                    try:
+                        copy_database(extracted, DB_PATH)
+                    finally:
+                        os.remove(extracted)
                 if "config.json" in zf.namelist():
+                    config.flush()
                     zf.extract("config.json", DATA_DIR)
+                    config.load()
             QMessageBox.information(self, "✅ Kész", "Adatok visszaállítva!\nIndítsd újra az alkalmazást.")
         except Exception as e:
             QMessageBox.critical(self, "Hiba", f"Visszaállítási hiba:\n{e}")
@@ -1272,15 +1337,11 @@ class CategoryDialog(QDialog):
         lay.addLayout(add_row)
 
         # Lista
-        self.list_widget = QWidget()
-        is_dark_dlg = load_config().get("dark_mode", True)
-        dlg_bg = "#0f172a" if is_dark_dlg else "#f8fafc"
-        self.list_widget.setStyleSheet(f"background: {dlg_bg};")
+        self.list_widget = QWidget(); self.list_widget.setObjectName("content_area")
         self.list_lay = QVBoxLayout(self.list_widget)
         self.list_lay.setContentsMargins(0,0,0,0)
         self.list_lay.setSpacing(5)
         scroll = QScrollArea(); scroll.setWidgetResizable(True)
-        scroll.setStyleSheet(f"QScrollArea {{ background: {dlg_bg}; border: none; }}")
         scroll.setWidget(self.list_widget)
         lay.addWidget(scroll)
 
@@ -1293,7 +1354,7 @@ class CategoryDialog(QDialog):
             w = self.list_lay.itemAt(i).widget()
             if w: w.deleteLater()
 
-        with get_db() as conn:
+        with read_db() as conn:
             cats = conn.execute("SELECT id,nev,ikon,alap FROM kategoriak ORDER BY alap DESC, id").fetchall()
 
         for cat in cats:
@@ -1305,13 +1366,12 @@ class CategoryDialog(QDialog):
             r_lay.addWidget(lbl, stretch=1)
 
             if cat["alap"]:
-                base_lbl = QLabel("alap")
-                is_dark_cat = load_config().get("dark_mode", True)
-                badge_bg  = "#1e293b" if is_dark_cat else "#e2e8f0"
-                badge_col = "#64748b" if is_dark_cat else "#475569"
-                base_lbl.setStyleSheet(f"color: {badge_col}; font-size: 11px; padding: 2px 6px; background: {badge_bg}; border-radius: 4px;")
+                base_lbl = QLabel("alap"); base_lbl.setObjectName("cat_badge")
                 r_lay.addWidget(base_lbl)
             else:
+                ren_btn = QPushButton("✏️"); ren_btn.setObjectName("e_btn"); ren_btn.setFixedSize(30,30)
+                ren_btn.clicked.connect(lambda _, cid=cat["id"], nev=cat["nev"]: self._rename_cat(cid, nev))
+                r_lay.addWidget(ren_btn)
                 del_btn = QPushButton("🗑️"); del_btn.setObjectName("e_btn_del"); del_btn.setFixedSize(30,30)
                 del_btn.clicked.connect(lambda _, cid=cat["id"]: self._del_cat(cid))
                 r_lay.addWidget(del_btn)
@@ -1332,11 +1392,29 @@ class CategoryDialog(QDialog):
         except Exception as e:
             QMessageBox.warning(self, "Hiba", f"Már létezik ilyen nevű kategória!\n{e}")
 
+    def _rename_cat(self, cid, nev):
+        uj_nev, ok = QInputDialog.getText(self, "Átnevezés", "Új név:", text=nev)
+        uj_nev = uj_nev.strip()
+        if not ok or not uj_nev or uj_nev == nev:
+            return
+        try:
+            # A bejegyzések kategoria_id-vel hivatkoznak, elég a kategória sort módosítani
+            with get_db() as conn:
+                conn.execute("UPDATE kategoriak SET nev=? WHERE id=? AND alap=0", (uj_nev, cid))
+            self._load()
+        except sqlite3.IntegrityError:
+            QMessageBox.warning(self, "Hiba", "Már létezik ilyen nevű kategória!")
+
     def _del_cat(self, cid):
-        ret = QMessageBox.question(self, "Törlés", "Biztosan törlöd ezt a kategóriát?\n(A bejegyzések megmaradnak.)",
+        ret = QMessageBox.question(self, "Törlés", "Biztosan törlöd ezt a kategóriát?\n(A bejegyzései az Egyéb kategóriába kerülnek.)",
                                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
         if ret == QMessageBox.StandardButton.Yes:
             with get_db() as conn:
+                conn.execute(
+                    f"UPDATE szerviz_adatok SET kategoria_id={KATEGORIA_ID_SQL} "
+                    "WHERE kategoria_id=(SELECT id FROM kategoriak WHERE id=? AND alap=0)",
+                    ("Egyéb", cid)
+                )
                 conn.execute("DELETE FROM kategoriak WHERE id=? AND alap=0", (cid,))
             self._load()
 
@@ -1388,7 +1466,7 @@ class BiztositasDialog(QDialog):
         lay.addLayout(btn_row)
 
     def _load(self):
-        with get_db() as conn:
+        with read_db() as conn:
             r = conn.execute("SELECT * FROM biztositas WHERE id=?", (self.entry_id,)).fetchone()
         if r:
             self.f_biztosito.setText(r["biztosito"] or "")
@@ -1433,63 +1511,73 @@ class BiztositasTab(QWidget):
         self.list_w = QWidget(); self.list_w.setObjectName("content_area")
         self.list_lay = QVBoxLayout(self.list_w)
         self.list_lay.setContentsMargins(16,10,16,16); self.list_lay.setSpacing(7)
+        self.empty_label = QLabel("Nincs biztosítási bejegyzés.")
+        self.empty_label.setObjectName("empty_label")
+        self.empty_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.empty_label.hide()
+        self.list_lay.addWidget(self.empty_label)
         self.list_lay.addStretch()
         self.scroll.setWidget(self.list_w)
         lay.addWidget(self.scroll)
+        # A sorok frissítéskor újrakötődnek (a gombok a sor aktuális id-jét olvassák)
+        self.row_pool = WidgetPool("BiztositasRow", self._new_row, self._bind_row, QWidget.hide)
+
+    def _new_row(self):
+        row_w = QFrame(); row_w.setObjectName("entry_row")
+        r_lay = QHBoxLayout(row_w); r_lay.setContentsMargins(14,11,14,11); r_lay.setSpacing(12)
+
+        row_w.dot = QLabel("●"); row_w.dot.setObjectName("status_dot")
+        r_lay.addWidget(row_w.dot)
+        row_w.info = QLabel(); row_w.info.setObjectName("entry_date")
+        r_lay.addWidget(row_w.info, stretch=1)
+        row_w.amt = QLabel(); row_w.amt.setObjectName("entry_amt")
+        r_lay.addWidget(row_w.amt)
+
+        edit_btn = QPushButton("✏️"); edit_btn.setObjectName("e_btn"); edit_btn.setFixedSize(30,30)
+        del_btn  = QPushButton("🗑️"); del_btn.setObjectName("e_btn_del"); del_btn.setFixedSize(30,30)
+        edit_btn.clicked.connect(lambda _: self._edit(row_w.rid))
+        del_btn.clicked.connect(lambda _: self._delete(row_w.rid))
+        r_lay.addWidget(edit_btn); r_lay.addWidget(del_btn)
+
+        # Az üres címke és a záró stretch közé
+        self.list_lay.insertWidget(self.list_lay.count()-1, row_w)
+        return row_w
+
+    @staticmethod
+    def _bind_row(row_w, r, today):
+        row_w.rid = r["id"]
+        # Lejárt-e?
+        expired = r["vege"] and r["vege"] < today
+        set_prop(row_w.dot, "tone", "red" if expired else "lime")
+        row_w.info.setText(f"{r['biztosito'] or '—'}  ·  {r['kezdete'] or '?'} → {r['vege'] or '?'}")
+        row_w.amt.setText(f"{int(r['osszeg']):,} Ft".replace(",", " ") if r["osszeg"] else "—")
+        row_w.show()
 
     def refresh(self):
-        while self.list_lay.count() > 1:
-            item = self.list_lay.takeAt(0)
-            if item.widget(): item.widget().deleteLater()
-
         auto_id = self.auto_id_getter()
-        if not auto_id:
-            return
-
-        with get_db() as conn:
-            rows = conn.execute("SELECT * FROM biztositas WHERE auto_id=? ORDER BY vege DESC", (auto_id,)).fetchall()
-
-        if not rows:
-            lbl = QLabel("Nincs biztosítási bejegyzés.")
-            lbl.setObjectName("empty_label")
-            lbl.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.list_lay.insertWidget(0, lbl)
-            return
+        rows = []
+        if auto_id:
+            with read_db() as conn:
+                rows = conn.execute("SELECT * FROM biztositas WHERE auto_id=? ORDER BY vege DESC", (auto_id,)).fetchall()
+        self.empty_label.setVisible(bool(auto_id) and not rows)
 
         today = datetime.today().strftime("%Y.%m.%d")
+        self.row_pool.begin()
         for r in rows:
-            row_w = QFrame(); row_w.setObjectName("entry_row")
-            r_lay = QHBoxLayout(row_w); r_lay.setContentsMargins(14,11,14,11); r_lay.setSpacing(12)
-
-            # Lejárt-e?
-            expired = r["vege"] and r["vege"] < today
-            color = "#ef4444" if expired else "#22c55e"
-            dot = QLabel("●"); dot.setStyleSheet(f"color: {color}; font-size: 16px;")
-            r_lay.addWidget(dot)
-
-            info = QLabel(f"{r['biztosito'] or '—'}  ·  {r['kezdete'] or '?'} → {r['vege'] or '?'}")
-            info.setObjectName("entry_date")
-            r_lay.addWidget(info, stretch=1)
-
-            amt = f"{int(r['osszeg']):,} Ft".replace(",", " ") if r["osszeg"] else "—"
-            amt_lbl = QLabel(amt); amt_lbl.setObjectName("entry_amt")
-            r_lay.addWidget(amt_lbl)
-
-            edit_btn = QPushButton("✏️"); edit_btn.setObjectName("e_btn"); edit_btn.setFixedSize(30,30)
-            del_btn  = QPushButton("🗑️"); del_btn.setObjectName("e_btn_del"); del_btn.setFixedSize(30,30)
-            edit_btn.clicked.connect(lambda _, rid=r["id"]: self._edit(rid))
-            del_btn.clicked.connect(lambda _, rid=r["id"]: self._delete(rid))
-            r_lay.addWidget(edit_btn); r_lay.addWidget(del_btn)
-
-            self.list_lay.insertWidget(self.list_lay.count()-1, row_w)
+            self.row_pool.take(r, today)
+        self.row_pool.end()
 
     def _new(self):
         dlg = BiztositasDialog(self, auto_id=self.auto_id_getter())
-        if dlg.exec() == QDialog.DialogCode.Accepted: self.refresh()
+        if dlg.exec() == QDialog.DialogCode.Accepted: self._changed()
 
     def _edit(self, rid):
         dlg = BiztositasDialog(self, auto_id=self.auto_id_getter(), entry_id=rid)
-        if dlg.exec() == QDialog.DialogCode.Accepted: self.refresh()
+        if dlg.exec() == QDialog.DialogCode.Accepted: self._changed()
+
+    def _changed(self):
+        # A fül (látható) azonnal, a statisztika a megjelenésekor frissül
+        views.invalidate("biztositas", auto_id=self.auto_id_getter())
 
     def _delete(self, rid):
         ret = QMessageBox.question(self, "Törlés", "Biztosan törlöd?",
@@ -1497,16 +1585,91 @@ class BiztositasTab(QWidget):
         if ret == QMessageBox.StandardButton.Yes:
             with get_db() as conn:
                 conn.execute("DELETE FROM biztositas WHERE id=?", (rid,))
-            self.refresh()
+            self._changed()
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# Grafikon kép (háttérben rajzolva, gyorsítótárból)
+# ══════════════════════════════════════════════════════════════════════════════
+CHART_DPI = 90
+
+class ChartView(QLabel):
+    """
+    Egy grafikon helye a fülön. A kép a DataLoader szálán készül (Agg, PNG),
+    addig helyőrző szöveg látszik; gyorsítótár találatnál azonnal megjelenik.
+    """
+    def __init__(self, chart: str, parent=None):
+        super().__init__(parent)
+        self.chart = chart
+        self._shown = None      # a megjelenített kép kulcsa
+        self._wanted = None     # a kért (esetleg még készülő) kép kulcsa
+        self.setObjectName("empty_label")
+        self.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.setFixedHeight(round(CHARTS[chart].figsize[1] * CHART_DPI))
+        self.hide()
+
+    def show_chart(self, auto_id, *data):
+        ratio = self.devicePixelRatioF()
+        key = charts.key(auto_id, self.chart, theme.current(), round(CHART_DPI * ratio), data)
+        self.show()
+        if key == self._shown or (key == self._wanted and loader.busy(self)):
+            return
+        self._wanted = key
+        png = charts.cached(key)
+        if png is not None:
+            loader.cancel(self)
+            self._set_png(key, ratio, png)
+            return
+        self.setPixmap(QPixmap())
+        self.setText("⏳ Grafikon készül…")
+        colors = chart_colors()
+        loader.submit(self, lambda conn: charts.render(key, data, colors),
+                      lambda png: self._set_png(key, ratio, png))
+
+    def _set_png(self, key, ratio, png: bytes):
+        pixmap = QPixmap()
+        pixmap.loadFromData(png, "PNG")
+        pixmap.setDevicePixelRatio(ratio)
+        self.setPixmap(pixmap)
+        self._shown = key
+
+    def clear(self):
+        """Elrejtés; a még készülő kép elmarad, a kész megmarad (visszatéréskor azonnal látszik)."""
+        loader.cancel(self)
+        self.hide()
 
 
 # ══════════════════════════════════════════════════════════════════════════════
 # Statisztika tab
 # ══════════════════════════════════════════════════════════════════════════════
+class StatCard(QFrame):
+    """Statisztika kártya; frissítéskor csak a szövegek cserélődnek (WidgetPool)."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setObjectName("entry_row")
+        self.setFixedHeight(95)
+        lay = QVBoxLayout(self); lay.setContentsMargins(16,10,16,10); lay.setSpacing(3)
+        self.title_lbl = QLabel(); self.title_lbl.setObjectName("entry_sub")
+        self.value_lbl = QLabel(); self.value_lbl.setObjectName("stat_value")
+        self.sub_lbl = QLabel(); self.sub_lbl.setObjectName("entry_km")
+        lay.addWidget(self.title_lbl); lay.addWidget(self.value_lbl); lay.addWidget(self.sub_lbl)
+
+    def set_values(self, title, value, sub="", tone="blue"):
+        self.title_lbl.setText(title)
+        self.value_lbl.setText(value)
+        set_prop(self.value_lbl, "tone", tone)
+        self.sub_lbl.setText(sub)
+        self.sub_lbl.setVisible(bool(sub))
+        self.show()
+
+
 class StatTab(QWidget):
+    CARDS_PER_ROW = 4
+
     def __init__(self, auto_id_getter, parent=None):
         super().__init__(parent)
         self.auto_id_getter = auto_id_getter
+        self._data = None   # az utoljára megjelenített adatok (témaváltáshoz)
         self.setObjectName("content_area")
         self._build()
 
@@ -1515,293 +1678,123 @@ class StatTab(QWidget):
         self.lay.setContentsMargins(20,16,20,16)
         self.lay.setSpacing(16)
 
-    def refresh(self):
-        while self.lay.count():
-            item = self.lay.takeAt(0)
-            if item.widget(): item.widget().deleteLater()
+        self.empty_label = QLabel("Nincs kiválasztott jármű.")
+        self.empty_label.setObjectName("empty_label")
+        self.empty_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.empty_label.hide()
+        self.lay.addWidget(self.empty_label)
+
+        # Kártyák: autóváltáskor / frissítéskor ugyanazok a widgetek kapnak új értéket
+        self.cards = QGridLayout(); self.cards.setSpacing(12)
+        self.lay.addLayout(self.cards)
+        self.card_pool = WidgetPool("StatCard", self._new_card, StatCard.set_values, QWidget.hide)
+
+        # Grafikonok: állandó helyek, a kép a háttérben készül
+        self.chart_havi = ChartView("havi")
+        self.chart_fog = ChartView("fogyasztas")
+        self.no_mpl = QLabel("📊 Grafikon: pip install matplotlib")
+        self.no_mpl.setObjectName("empty_label")
+        self.no_mpl.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.no_mpl.hide()
+        for w in (self.chart_havi, self.chart_fog, self.no_mpl):
+            self.lay.addWidget(w)
+        self.lay.addStretch()
+
+    def _new_card(self):
+        card = StatCard()
+        n = len(self.card_pool)
+        self.cards.addWidget(card, n // self.CARDS_PER_ROW, n % self.CARDS_PER_ROW)
+        return card
 
+    def refresh(self):
         auto_id = self.auto_id_getter()
         if not auto_id:
-            lbl = QLabel("Nincs kiválasztott jármű.")
-            lbl.setObjectName("empty_label")
-            lbl.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.lay.addWidget(lbl)
+            loader.cancel(self)
+            self._data = None
+            self.card_pool.begin(); self.card_pool.end()
+            self._clear()
+            self.empty_label.show()
+            return
+        # Változatlan adatoknál a gyorsítótárból (a már látható eredmény nem rajzolódik újra)
+        with read_db() as conn:
+            key = stats_cache.key(conn, auto_id)
+        stats = stats_cache.get(key)
+        if stats is not None:
+            loader.cancel(self)
+            if stats is not self._data:
+                self._show(stats)
             return
+        # A számítás háttérszálon fut; addig az előző tartalom látszik
+        loader.submit(self, lambda conn: compute_stats(conn, auto_id),
+                      lambda stats: self._store(key, stats))
 
-        with get_db() as conn:
-            tankolas = conn.execute("""
-                SELECT SUM(osszeg) as total_ft,
-                       SUM(mennyiseg_liter) as total_liter,
-                       COUNT(*) as db,
-                       AVG(egysegar_ft_l) as avg_ar
-                FROM szerviz_adatok WHERE auto_id=? AND kategoria='Tankolás'
-            """, (auto_id,)).fetchone()
-
-            karbantartas = conn.execute("""
-                SELECT SUM(osszeg) as total, COUNT(*) as db
-                FROM szerviz_adatok WHERE auto_id=? AND kategoria='Karbantartás'
-            """, (auto_id,)).fetchone()
-
-            egyeb = conn.execute("""
-                SELECT SUM(osszeg) as total, COUNT(*) as db
-                FROM szerviz_adatok WHERE auto_id=? AND kategoria NOT IN ('Tankolás','Karbantartás','Biztosítás')
-            """, (auto_id,)).fetchone()
-
-            km_range = conn.execute("""
-                SELECT MIN(km_allas) as min_km, MAX(km_allas) as max_km
-                FROM szerviz_adatok WHERE auto_id=? AND km_allas > 0
-            """, (auto_id,)).fetchone()
-
-            # Átlagfogyasztás: km különbség és össz liter alapján
-            fogyasztas_rows = conn.execute("""
-                SELECT km_allas, mennyiseg_liter
-                FROM szerviz_adatok
-                WHERE auto_id=? AND kategoria='Tankolás'
-                AND km_allas > 0 AND mennyiseg_liter > 0
-                ORDER BY km_allas
-            """, (auto_id,)).fetchall()
-
-            monthly = conn.execute("""
-                SELECT substr(datum,1,7) as honap,
-                       SUM(osszeg) as total,
-                       SUM(mennyiseg_liter) as liter
-                FROM szerviz_adatok
-                WHERE auto_id=? AND kategoria='Tankolás'
-                AND datum >= date('now','-12 months')
-                GROUP BY honap ORDER BY honap
-            """, (auto_id,)).fetchall()
-
-        # Átlagfogyasztás számítás (L/100km)
-        avg_fogyasztas = 0.0
-        if len(fogyasztas_rows) >= 2:
-            km_min = fogyasztas_rows[0]["km_allas"]
-            km_max = fogyasztas_rows[-1]["km_allas"]
-            total_liter_fog = sum(r["mennyiseg_liter"] for r in fogyasztas_rows[1:])
-            km_kulonbseg = km_max - km_min
-            if km_kulonbseg > 0:
-                avg_fogyasztas = (total_liter_fog / km_kulonbseg) * 100
+    def cancel_refresh(self) -> bool:
+        return loader.cancel(self)
+
+    def _clear(self):
+        self.chart_havi.clear()
+        self.chart_fog.clear()
+        self.no_mpl.hide()
+
+    def _store(self, key, stats: CarStats):
+        stats_cache.put(key, stats)
+        self._show(stats)
+
+    def restyle(self):
+        """Témaváltás: a grafikonok újrarajzolása a meglévő adatokból (lekérdezés nélkül)."""
+        if self._data is not None:
+            self._show(self._data)
+
+    def _show(self, stats: CarStats):
+        self._data = stats
+        self._clear()
+        self.empty_label.hide()
 
         # ── Kártyák ──────────────────────────────────────────────────────────
-        def stat_card(title, value, sub="", color="#3b82f6"):
-            frame = QFrame(); frame.setObjectName("entry_row")
-            frame.setFixedHeight(95)
-            lay = QVBoxLayout(frame); lay.setContentsMargins(16,10,16,10); lay.setSpacing(3)
-            t = QLabel(title); t.setObjectName("entry_sub"); lay.addWidget(t)
-            v = QLabel(value)
-            v.setStyleSheet(f"color: {color}; font-size: 20px; font-weight: 800; background: transparent;")
-            lay.addWidget(v)
-            if sub:
-                s = QLabel(sub); s.setObjectName("entry_km"); lay.addWidget(s)
-            return frame
-
-        total_ft   = int(tankolas["total_ft"] or 0)
-        total_lit  = float(tankolas["total_liter"] or 0)
-        avg_ar     = float(tankolas["avg_ar"] or 0)
-        karb_total = int(karbantartas["total"] or 0)
-        km_diff    = (km_range["max_km"] or 0) - (km_range["min_km"] or 0) if km_range["min_km"] else 0
-        egyeb_db   = int(egyeb["db"] or 0)
-        egyeb_total= int(egyeb["total"] or 0)
-
-        row1 = QHBoxLayout(); row1.setSpacing(12)
-        row1.addWidget(stat_card("⛽ Összes tankolás",
+        self.card_pool.begin()
+        stat_card = self.card_pool.take
+
+        total_ft = int(stats.tank_osszeg)
+        km_diff = stats.km_diff
+        stat_card("⛽ Összes tankolás",
             f"{total_ft:,} Ft".replace(",", " "),
-            f"{total_lit:.1f} L  ·  {tankolas['db']} alkalom", "#3b82f6"))
-        row1.addWidget(stat_card("🔥 Átlagfogyasztás",
-            f"{avg_fogyasztas:.1f} L/100km" if avg_fogyasztas else "—",
-            "km-alapú számítás", "#ef4444"))
-        row1.addWidget(stat_card("💰 Átlagos üzemanyagár",
-            f"{avg_ar:.1f} Ft/L" if avg_ar else "—",
-            "", "#f97316"))
-        row1.addWidget(stat_card("🛣️ Megtett km",
+            f"{stats.tank_liter:.1f} L  ·  {stats.tank_db} alkalom", "blue")
+        stat_card("🔥 Átlagfogyasztás",
+            f"{stats.avg_fogyasztas:.1f} L/100km" if stats.avg_fogyasztas else "—",
+            "km-alapú számítás", "red")
+        stat_card("💰 Átlagos üzemanyagár",
+            f"{stats.avg_ar:.1f} Ft/L" if stats.avg_ar else "—",
+            "", "orange")
+        stat_card("🛣️ Megtett km",
             f"{km_diff:,} km".replace(",", " ") if km_diff else "—",
-            "adatok alapján", "#8b5cf6"))
-        self.lay.addLayout(row1)
-
-        row2 = QHBoxLayout(); row2.setSpacing(12)
-        row2.addWidget(stat_card("🔧 Karbantartás",
-            f"{karb_total:,} Ft".replace(",", " "),
-            f"{karbantartas['db']} bejegyzés", "#10b981"))
-        row2.addWidget(stat_card("📦 Egyéb kiadások",
-            f"{egyeb_total:,} Ft".replace(",", " "),
-            f"{egyeb_db} bejegyzés", "#f97316"))
-        összes = total_ft + karb_total + egyeb_total
-        row2.addWidget(stat_card("💵 Összes kiadás",
-            f"{összes:,} Ft".replace(",", " "),
-            "tankolás + karbantartás + egyéb", "#22c55e"))
-        km_ft = összes / km_diff if km_diff > 0 else 0
-        row2.addWidget(stat_card("📊 Ft / km",
+            "adatok alapján", "violet")
+
+        stat_card("🔧 Karbantartás",
+            f"{int(stats.karb_osszeg):,} Ft".replace(",", " "),
+            f"{stats.karb_db} bejegyzés", "green")
+        stat_card("📦 Egyéb kiadások",
+            f"{int(stats.egyeb_osszeg):,} Ft".replace(",", " "),
+            f"{stats.egyeb_db} bejegyzés", "orange")
+        stat_card("💵 Összes kiadás",
+            f"{int(stats.osszes):,} Ft".replace(",", " "),
+            "tankolás + karbantartás + egyéb", "lime")
+        km_ft = stats.ft_per_km
+        stat_card("📊 Ft / km",
             f"{km_ft:.1f} Ft/km" if km_ft else "—",
-            "összes kiadás / megtett km", "#64748b"))
-        self.lay.addLayout(row2)
+            "összes kiadás / megtett km", "slate")
+        self.card_pool.end()
 
         # ── Grafikonok ────────────────────────────────────────────────────────
-        if HAS_MPL and monthly:
-            import numpy as np
-            honapok = [r["honap"] for r in monthly]
-            ossz    = [r["total"] or 0 for r in monthly]
-            literek = [r["liter"] or 0 for r in monthly]
-
-            # Havi átlagfogyasztás – minden tankolás km-e és litere alapján,
-            # az előző tankolás km-étől számítva (fill-up módszer)
-            all_tankolas = conn.execute("""
-                SELECT datum, km_allas, mennyiseg_liter,
-                       substr(datum,1,7) as honap
-                FROM szerviz_adatok
-                WHERE auto_id=? AND kategoria='Tankolás'
-                AND km_allas > 0 AND mennyiseg_liter > 0
-                ORDER BY km_allas ASC
-            """, (auto_id,)).fetchall()
-
-            # Fill-up módszer: minden tankolásnál km_diff = jelenlegi - előző km
-            fog_per_tankolas = []
-            for i in range(1, len(all_tankolas)):
-                prev = all_tankolas[i-1]
-                curr = all_tankolas[i]
-                km_diff_t = curr["km_allas"] - prev["km_allas"]
-                if km_diff_t > 0 and curr["mennyiseg_liter"]:
-                    fog = (curr["mennyiseg_liter"] / km_diff_t) * 100
-                    if 2.0 < fog < 30.0:  # szűrjük az irreális értékeket
-                        fog_per_tankolas.append((curr["honap"], fog))
-
-            # Havi átlagolás
-            from collections import defaultdict
-            havi_fog = defaultdict(list)
-            for honap, fog in fog_per_tankolas:
-                havi_fog[honap].append(fog)
-
-            # Csak az utolsó 12 hónap
-            fog_honapok = sorted(havi_fog.keys())[-12:]
-            fog_ertekek = [sum(havi_fog[h])/len(havi_fog[h]) for h in fog_honapok]
-
-            is_dark = load_config().get("dark_mode", True)
-            bg  = "#1e293b" if is_dark else "#f8fafc"
-            fg  = "#e2e8f0" if is_dark else "#1e293b"
-            gc  = "#334155" if is_dark else "#e2e8f0"
-
-            # ── Grafikon 1+2: Ft és Liter oszlopok ───────────────────────────
-            fig1, (ax1, ax2) = plt.subplots(1, 2, figsize=(11, 3.2), dpi=90)
-            fig1.patch.set_facecolor(bg)
-
-            for ax, adatok, cim, szin, fmt in [
-                (ax1, ossz,    "Havi tankolási költség",  "#3b82f6",
-                 lambda x: f"{int(x):,}".replace(",", " ") + " Ft"),
-                (ax2, literek, "Havi tankolási mennyiség","#10b981",
-                 lambda x: f"{x:.1f} L"),
-            ]:
-                ax.set_facecolor(bg)
-                bars = ax.bar(honapok, adatok, color=szin, alpha=0.85, width=0.6, zorder=3)
-                ax.set_title(cim, color=fg, fontsize=10, pad=8)
-                ax.tick_params(colors=fg, labelsize=8)
-                for spine in ax.spines.values(): spine.set_color(gc)
-                ax.yaxis.grid(True, color=gc, alpha=0.4, zorder=0)
-                ax.set_axisbelow(True)
-                plt.setp(ax.get_xticklabels(), rotation=40, ha="right")
-                ax.yaxis.set_tick_params(labelcolor=fg)
-                # Értékek az oszlopok tetejére
-                for bar, v in zip(bars, adatok):
-                    if v > 0:
-                        ax.text(bar.get_x() + bar.get_width()/2,
-                                bar.get_height() + max(adatok)*0.01,
-                                fmt(v),
-                                ha="center", va="bottom",
-                                fontsize=7, color=fg, fontweight="bold")
-            fig1.patch.set_facecolor(bg)
-            plt.tight_layout(pad=1.5)
-            canvas1 = FigureCanvas(fig1)
-            canvas1.setFixedHeight(270)
-            self.lay.addWidget(canvas1)
-            plt.close(fig1)
-
-            # ── Grafikon 3: Átlagfogyasztás vonal diagram ─────────────────────
-            # Egyedi tankolások alapján: minden egymást követő pár ad egy pontot
-            # Numerikus x tengellyel hogy a köztes hónapok is látszanak
-            if len(fog_per_tankolas) >= 2:
-                fig2, ax3 = plt.subplots(figsize=(11, 2.8), dpi=90)
-                fig2.patch.set_facecolor(bg)
-                ax3.set_facecolor(bg)
-
-                # Numerikus index az x tengelyen (minden tankolás egy pont)
-                all_tank_sorted = conn.execute("""
-                    SELECT datum, km_allas, mennyiseg_liter,
-                           substr(datum,1,7) as honap
-                    FROM szerviz_adatok
-                    WHERE auto_id=? AND kategoria='Tankolás'
-                    AND km_allas > 0 AND mennyiseg_liter > 0
-                    AND datum >= date('now','-12 months')
-                    ORDER BY km_allas ASC
-                """, (auto_id,)).fetchall()
-
-                # Fill-up fogyasztás minden tankoláshoz
-                x_vals, y_vals, x_labels = [], [], []
-                for i in range(1, len(all_tank_sorted)):
-                    prev = all_tank_sorted[i-1]
-                    curr = all_tank_sorted[i]
-                    km_d = curr["km_allas"] - prev["km_allas"]
-                    if km_d > 0 and curr["mennyiseg_liter"]:
-                        fog = (curr["mennyiseg_liter"] / km_d) * 100
-                        if 2.0 < fog < 30.0:
-                            x_vals.append(i)
-                            y_vals.append(fog)
-                            x_labels.append(curr["datum"])
-
-                if len(y_vals) >= 2:
-                    avg_line = sum(y_vals) / len(y_vals)
-
-                    # Vonal + pontok
-                    ax3.plot(x_vals, y_vals, color="#ef4444", linewidth=2.0,
-                             marker="o", markersize=7, markerfacecolor="#ef4444",
-                             markeredgecolor=bg, markeredgewidth=1.5, zorder=4)
-                    ax3.axhline(avg_line, color="#f97316", linewidth=1.5,
-                                linestyle="--", alpha=0.8, zorder=3,
-                                label=f"Átlag: {avg_line:.1f} L/100km")
-                    ax3.fill_between(x_vals, y_vals, avg_line,
-                                     where=[v >= avg_line for v in y_vals],
-                                     alpha=0.15, color="#ef4444", zorder=2,
-                                     interpolate=True)
-                    ax3.fill_between(x_vals, y_vals, avg_line,
-                                     where=[v < avg_line for v in y_vals],
-                                     alpha=0.15, color="#22c55e", zorder=2,
-                                     interpolate=True)
-
-                    # Értékek minden pont fölé/alá
-                    for xi, yi, lbl_t in zip(x_vals, y_vals, x_labels):
-                        offset = 10 if yi >= avg_line else -16
-                        ax3.annotate(f"{yi:.1f}",
-                                     xy=(xi, yi),
-                                     xytext=(0, offset),
-                                     textcoords="offset points",
-                                     ha="center", fontsize=7.5,
-                                     color=fg, fontweight="bold")
-
-                    # X tengely: dátum feliratok
-                    ax3.set_xticks(x_vals)
-                    ax3.set_xticklabels(x_labels, rotation=40, ha="right", fontsize=7)
-                    ax3.set_xlim(x_vals[0] - 0.5, x_vals[-1] + 0.5)
-
-                    ax3.set_title("Fogyasztás tankolásról tankolásra (L/100km)",
-                                  color=fg, fontsize=10, pad=8)
-                    ax3.set_ylabel("L/100km", color=fg, fontsize=9)
-                    ax3.tick_params(colors=fg, labelsize=7)
-                    for spine in ax3.spines.values(): spine.set_color(gc)
-                    ax3.yaxis.grid(True, color=gc, alpha=0.4, zorder=0)
-                    ax3.set_axisbelow(True)
-                    ax3.legend(facecolor=bg, edgecolor=gc, labelcolor=fg, fontsize=9)
-                    y_min = max(0, min(y_vals) - 1)
-                    y_max = max(y_vals) + 1.5
-                    ax3.set_ylim(y_min, y_max)
-                    plt.tight_layout(pad=1.5)
-
-                    canvas2 = FigureCanvas(fig2)
-                    canvas2.setFixedHeight(240)
-                    self.lay.addWidget(canvas2)
-                plt.close(fig2)
-        else:
-            lbl = QLabel("📊 Grafikon: pip install matplotlib")
-            lbl.setObjectName("empty_label")
-            lbl.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.lay.addWidget(lbl)
-
-        self.lay.addStretch()
+        if not HAS_MPL:
+            self.no_mpl.show()
+            return
+        if stats.havi_cimke:
+            self.chart_havi.show_chart(stats.auto_id, stats.havi_cimke,
+                                       stats.havi_osszeg, stats.havi_liter)
+            # Egyedi tankolások az utolsó 12 hónapból: minden egymást követő pár egy pont
+            if len(stats.fog_ertek) >= 2 and len(stats.ablak_fog) >= 2:
+                self.chart_fog.show_chart(stats.auto_id, stats.ablak_x,
+                                          stats.ablak_fog, stats.ablak_datum)
 
 
 # ══════════════════════════════════════════════════════════════════════════════
@@ -1811,6 +1804,7 @@ class YearlyTab(QWidget):
     def __init__(self, auto_id_getter, parent=None):
         super().__init__(parent)
         self.auto_id_getter = auto_id_getter
+        self._last = None   # (év, sorok) – az utoljára megjelenített adatok
         self.setObjectName("content_area")
         self._build()
 
@@ -1835,130 +1829,142 @@ class YearlyTab(QWidget):
         self.scroll.setWidget(self.content)
         lay.addWidget(self.scroll)
 
-    def refresh(self):
-        while self.content_lay.count():
-            item = self.content_lay.takeAt(0)
-            if item.widget(): item.widget().deleteLater()
+        self.empty_label = QLabel()
+        self.empty_label.setObjectName("empty_label")
+        self.empty_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.content_lay.addWidget(self.empty_label)
+
+        # Fejléc, havi sorok (WidgetPool), összesítő sor és grafikon – a keret állandó,
+        # év- vagy autóváltáskor csak a tartalom cserélődik
+        self.header = QFrame(); self.header.setObjectName("entry_row")
+        h_lay = QHBoxLayout(self.header); h_lay.setContentsMargins(14,8,14,8)
+        for txt, w in [("Hónap",100),("⛽ Tankolás",130),("🔧 Karbantartás",140),("📦 Egyéb",110),("💰 Összesen",120)]:
+            lbl = QLabel(txt); lbl.setObjectName("entry_km"); lbl.setFixedWidth(w)
+            h_lay.addWidget(lbl)
+        self.content_lay.addWidget(self.header)
+
+        self.rows_lay = QVBoxLayout(); self.rows_lay.setSpacing(10)
+        self.content_lay.addLayout(self.rows_lay)
+        self.row_pool = WidgetPool("YearRow", self._new_month_row, self._bind_month_row, QWidget.hide)
+
+        self.total_w = QFrame(); self.total_w.setObjectName("entry_row")
+        self.total_w.setProperty("level", "total")
+        t_lay = QHBoxLayout(self.total_w); t_lay.setContentsMargins(14,12,14,12); t_lay.setSpacing(0)
+        self.total_lbl = QLabel()
+        self.total_lbl.setObjectName("entry_date")
+        self.total_lbl.setFixedWidth(110)
+        t_lay.addWidget(self.total_lbl)
+        self.total_cells = []
+        for tone, w in [("blue", 130), ("green", 140), ("orange", 110), ("lime", 130)]:
+            lbl = QLabel(); lbl.setObjectName("year_total"); lbl.setProperty("tone", tone)
+            lbl.setFixedWidth(w)
+            t_lay.addWidget(lbl)
+            self.total_cells.append(lbl)
+        self.content_lay.addWidget(self.total_w)
+
+        self.chart = ChartView("eves")
+        self.content_lay.addWidget(self.chart)
+        self.content_lay.addStretch()
+        self._set_visible(False)
+
+    def _new_month_row(self):
+        row_w = QFrame(); row_w.setObjectName("entry_row")
+        r_lay = QHBoxLayout(row_w); r_lay.setContentsMargins(14,10,14,10)
+        honap_lbl = QLabel(); honap_lbl.setObjectName("entry_date"); honap_lbl.setFixedWidth(100)
+        r_lay.addWidget(honap_lbl)
+        row_w.cells = [honap_lbl]
+        for name, tone, w in [("year_cell", "blue", 130), ("year_cell", "green", 140),
+                              ("year_cell", "orange", 110), ("year_cell_total", "strong", 130)]:
+            lbl = QLabel(); lbl.setObjectName(name); lbl.setProperty("tone", tone)
+            lbl.setFixedWidth(w)
+            r_lay.addWidget(lbl)
+            row_w.cells.append(lbl)
+        self.rows_lay.addWidget(row_w)
+        return row_w
+
+    @staticmethod
+    def _bind_month_row(row_w, honap, vals):
+        row_w.cells[0].setText(honap)
+        for lbl, v in zip(row_w.cells[1:], vals):
+            lbl.setText(f"{int(v):,} Ft".replace(",", " ") if v else "—")
+        row_w.show()
+
+    def _set_visible(self, has_rows: bool):
+        self.empty_label.setVisible(not has_rows)
+        self.header.setVisible(has_rows)
+        self.total_w.setVisible(has_rows)
 
+    def refresh(self):
         auto_id = self.auto_id_getter()
         if not auto_id:
+            loader.cancel(self)
+            self._last = None
+            self._clear()
+            self.empty_label.hide()
             return
 
         ev = self.year_cb.currentText()
-
-        with get_db() as conn:
-            rows = conn.execute("""
-                SELECT substr(datum,1,7) as honap,
-                       SUM(CASE WHEN kategoria='Tankolás' THEN osszeg ELSE 0 END) as tankolos,
-                       SUM(CASE WHEN kategoria='Karbantartás' THEN osszeg ELSE 0 END) as karbantartas,
-                       SUM(CASE WHEN kategoria NOT IN ('Tankolás','Karbantartás') THEN osszeg ELSE 0 END) as egyeb,
-                       SUM(osszeg) as total
-                FROM szerviz_adatok
-                WHERE auto_id=? AND datum LIKE ?
-                GROUP BY honap ORDER BY honap
-            """, (auto_id, f"{ev}.%")).fetchall()
-
+        # A lekérdezés háttérszálon fut; addig az előző tartalom látszik
+        loader.submit(self, lambda conn: self._load(conn, auto_id, ev),
+                      lambda rows: self._show(ev, rows))
+
+    def cancel_refresh(self) -> bool:
+        return loader.cancel(self)
+
+    def _clear(self):
+        self.row_pool.begin(); self.row_pool.end()
+        self._set_visible(False)
+        self.chart.clear()
+
+    @staticmethod
+    def _load(conn, auto_id, ev) -> list:
+        """Az év havi összesítő sorai kategória csoportonként (worker szálon fut)."""
+        return conn.execute(f"""
+            SELECT {HONAP_CIMKE_SQL} as honap,
+                   round(SUM(CASE WHEN kategoria_id={KATEGORIA_ID_SQL} THEN osszeg ELSE 0 END), 2) as tankolos,
+                   round(SUM(CASE WHEN kategoria_id={KATEGORIA_ID_SQL} THEN osszeg ELSE 0 END), 2) as karbantartas,
+                   round(SUM(CASE WHEN kategoria_id NOT IN ({KATEGORIA_ID_SQL}, {KATEGORIA_ID_SQL})
+                                  THEN osszeg ELSE 0 END), 2) as egyeb,
+                   round(SUM(osszeg), 2) as total
+            FROM havi_osszesito
+            WHERE auto_id=? AND honap_kulcs BETWEEN ? AND ?
+            GROUP BY honap_kulcs ORDER BY honap_kulcs
+        """, ("Tankolás", "Karbantartás", "Tankolás", "Karbantartás",
+              auto_id, int(ev) * 100 + 1, int(ev) * 100 + 12)).fetchall()
+
+    def restyle(self):
+        """Témaváltás: a grafikon újrarajzolása a meglévő sorokból (lekérdezés nélkül)."""
+        if self._last is not None:
+            self._show(*self._last)
+
+    def _show(self, ev, rows):
+        self._last = (ev, rows)
+        self._clear()
         if not rows:
-            lbl = QLabel(f"Nincs adat {ev}-re.")
-            lbl.setObjectName("empty_label")
-            lbl.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.content_lay.addWidget(lbl)
+            self.empty_label.setText(f"Nincs adat {ev}-re.")
             return
-
-        # Fejléc
-        header = QFrame(); header.setObjectName("entry_row")
-        h_lay = QHBoxLayout(header); h_lay.setContentsMargins(14,8,14,8)
-        for txt, w in [("Hónap",100),("⛽ Tankolás",130),("🔧 Karbantartás",140),("📦 Egyéb",110),("💰 Összesen",120)]:
-            lbl = QLabel(txt); lbl.setObjectName("entry_km"); lbl.setFixedWidth(w)
-            h_lay.addWidget(lbl)
-        self.content_lay.addWidget(header)
+        self._set_visible(True)
 
         ev_total = [0, 0, 0, 0]
+        self.row_pool.begin()
         for r in rows:
-            row_w = QFrame(); row_w.setObjectName("entry_row")
-            r_lay = QHBoxLayout(row_w); r_lay.setContentsMargins(14,10,14,10)
-
             vals = [r["tankolos"] or 0, r["karbantartas"] or 0, r["egyeb"] or 0, r["total"] or 0]
             for i, v in enumerate(vals): ev_total[i] += v
-
-            honap_lbl = QLabel(r["honap"]); honap_lbl.setObjectName("entry_date"); honap_lbl.setFixedWidth(100)
-            r_lay.addWidget(honap_lbl)
-            is_dark_mode = load_config().get("dark_mode", True)
-            total_color = "#ffffff" if is_dark_mode else "#0f172a"
-            col_cfg = [
-                ("#3b82f6", 130, "400"),
-                ("#10b981", 140, "400"),
-                ("#f97316", 110, "400"),
-                (total_color, 130, "800"),
-            ]
-            for i, (v, (c, w, fw)) in enumerate(zip(vals, col_cfg)):
-                lbl = QLabel(f"{int(v):,} Ft".replace(",", " ") if v else "—")
-                lbl.setStyleSheet(f"color: {c}; font-weight: {fw}; font-size: {'14px' if i==3 else '13px'}; background: transparent;")
-                lbl.setFixedWidth(w)
-                r_lay.addWidget(lbl)
-            self.content_lay.addWidget(row_w)
+            self.row_pool.take(r["honap"], vals)
+        self.row_pool.end()
 
         # Összesítő sor
-        total_w = QFrame(); total_w.setObjectName("entry_row")
-        total_w.setStyleSheet("QFrame#entry_row { border: 2px solid #3b82f6; }")
-        t_lay = QHBoxLayout(total_w); t_lay.setContentsMargins(14,12,14,12); t_lay.setSpacing(0)
-
-        total_lbl = QLabel(f"📅 {ev} összesen")
-        total_lbl.setObjectName("entry_date")
-        total_lbl.setFixedWidth(110)
-        t_lay.addWidget(total_lbl)
-
-        col_data = [
-            (ev_total[0], "#3b82f6", 130),
-            (ev_total[1], "#10b981", 140),
-            (ev_total[2], "#f97316", 110),
-            (ev_total[3], "#22c55e", 130),
-        ]
-        for v, c, w in col_data:
-            lbl = QLabel(f"{int(v):,} Ft".replace(",", " "))
-            lbl.setStyleSheet(f"color: {c}; font-weight: 800; font-size: 13px; background: transparent;")
-            lbl.setFixedWidth(w)
-            t_lay.addWidget(lbl)
-
-        self.content_lay.addWidget(total_w)
+        self.total_lbl.setText(f"📅 {ev} összesen")
+        for lbl, v in zip(self.total_cells, ev_total):
+            lbl.setText(f"{int(v):,} Ft".replace(",", " "))
 
         # Éves grafikon
-        if HAS_MPL and rows:
-            is_dark = load_config().get("dark_mode", True)
-            bg = "#1e293b" if is_dark else "#f8fafc"
-            fg = "#e2e8f0" if is_dark else "#1e293b"
-            grid_color = "#334155" if is_dark else "#e2e8f0"
-
-            honapok  = [r["honap"][-2:] + ". hó" for r in rows]
-            tankolas_v = [r["tankolos"] or 0 for r in rows]
-            karb_v     = [r["karbantartas"] or 0 for r in rows]
-            egyeb_v    = [r["egyeb"] or 0 for r in rows]
-
-            x = range(len(honapok))
-            fig, ax = plt.subplots(figsize=(10, 3.0), dpi=90)
-            fig.patch.set_facecolor(bg)
-            ax.set_facecolor(bg)
-            w = 0.28
-            import numpy as np
-            xi = np.arange(len(honapok))
-            ax.bar(xi - w, tankolas_v, width=w, color="#3b82f6", alpha=0.85, label="⛽ Tankolás", zorder=3)
-            ax.bar(xi,     karb_v,     width=w, color="#10b981", alpha=0.85, label="🔧 Karbantartás", zorder=3)
-            ax.bar(xi + w, egyeb_v,    width=w, color="#f97316", alpha=0.85, label="📦 Egyéb", zorder=3)
-            ax.set_xticks(xi); ax.set_xticklabels(honapok, rotation=30, ha="right", fontsize=8)
-            ax.tick_params(colors=fg, labelsize=8)
-            ax.set_title(f"{ev} – havi kiadások kategóriánként", color=fg, fontsize=10, pad=8)
-            ax.yaxis.grid(True, color=grid_color, alpha=0.5, zorder=0); ax.set_axisbelow(True)
-            for spine in ax.spines.values(): spine.set_color(grid_color)
-            ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, _: f"{int(x):,}".replace(",", " ")))
-            ax.legend(facecolor=bg, edgecolor=grid_color, labelcolor=fg, fontsize=8)
-            plt.tight_layout(pad=1.2)
-
-            canvas = FigureCanvas(fig)
-            canvas.setFixedHeight(240)
-            self.content_lay.addWidget(canvas)
-            plt.close(fig)
-
-        self.content_lay.addStretch()
+        if HAS_MPL:
+            self.chart.show_chart(self.auto_id_getter(), ev,
+                                  tuple(r["honap"][-2:] + ". hó" for r in rows),
+                                  tuple(r["tankolos"] or 0 for r in rows),
+                                  tuple(r["karbantartas"] or 0 for r in rows),
+                                  tuple(r["egyeb"] or 0 for r in rows))
 
 
 # ══════════════════════════════════════════════════════════════════════════════
@@ -1996,7 +2002,7 @@ class PdfExportDialog(QDialog):
 
         if not HAS_FPDF:
             warn = QLabel("⚠️ PDF exporthoz szükséges: pip install fpdf2")
-            warn.setStyleSheet("color: #f59e0b; font-size: 12px;")
+            warn.setProperty("tone", "amber")
             lay.addWidget(warn)
 
         btn_row = QHBoxLayout()
@@ -2022,22 +2028,27 @@ class PdfExportDialog(QDialog):
         kat = self.cat_cb.currentText()
         datum_tol = self.ev_from.text().strip()
         datum_ig  = self.ev_to.text().strip()
+        nap_tol = datum_nap(datum_tol) if datum_tol else None
+        nap_ig  = datum_nap(datum_ig) if datum_ig else None
+        if (datum_tol and nap_tol is None) or (datum_ig and nap_ig is None):
+            QMessageBox.warning(self, "Hiba", "Érvénytelen dátum! Formátum: ÉÉÉÉ.HH.NN")
+            return
 
-        with get_db() as conn:
+        with read_db() as conn:
             auto = conn.execute("SELECT marka,tipus,rendszam FROM autok WHERE id=?", (self.auto_id,)).fetchone()
-            q = "SELECT datum,osszeg,km_allas,kategoria,megjegyzes,benzinkut,mennyiseg_liter,egysegar_ft_l FROM szerviz_adatok WHERE auto_id=?"
+            q = "SELECT datum,osszeg,km_allas,kategoria,megjegyzes,benzinkut,mennyiseg_liter,egysegar_ft_l FROM szerviz_adatok_nevvel WHERE auto_id=?"
             params = [self.auto_id]
             if kat != "Összes":
-                q += " AND kategoria=?"; params.append(kat)
-            if datum_tol:
-                q += " AND datum >= ?"; params.append(datum_tol)
-            if datum_ig:
-                q += " AND datum <= ?"; params.append(datum_ig)
-            q += " ORDER BY datum DESC"
+                q += f" AND kategoria_id={KATEGORIA_ID_SQL}"; params.append(kat)
+            if nap_tol is not None:
+                q += " AND datum_nap >= ?"; params.append(nap_tol)
+            if nap_ig is not None:
+                q += " AND datum_nap <= ?"; params.append(nap_ig)
+            q += " ORDER BY datum_nap DESC, id DESC"
             rows = conn.execute(q, params).fetchall()
 
         try:
-            pdf = FPDF()
+            pdf = fpdf.FPDF()
             pdf.add_page()
             pdf.set_auto_page_break(auto=True, margin=15)
 
@@ -2121,10 +2132,10 @@ class ReminderDialog(QDialog):
 
             # Szín az emoji alapján
             if "lejárt" in w or "esedékes" in w:
-                row.setStyleSheet("QFrame#entry_row { border: 1px solid #ef4444; }")
+                row.setProperty("level", "danger")
                 dot = QLabel("🔴")
             else:
-                row.setStyleSheet("QFrame#entry_row { border: 1px solid #f59e0b; }")
+                row.setProperty("level", "warn")
                 dot = QLabel("🟡")
 
             dot.setFixedWidth(24)
@@ -2144,102 +2155,191 @@ class ReminderDialog(QDialog):
         ok_btn.clicked.connect(self.accept)
         lay.addWidget(ok_btn)
 
+
+# ══════════════════════════════════════════════════════════════════════════════
+# Jármű chip
+# ══════════════════════════════════════════════════════════════════════════════
+class CarChip(QFrame):
+    """
+    Egy jármű a chip sávban. Egyszer épül fel; adatváltozáskor a set_car(),
+    kiválasztáskor a set_active() frissíti helyben (csak az "active" property vált).
+    """
+    def __init__(self, on_select, on_edit, on_delete, parent=None):
+        super().__init__(parent)
+        self.cid = None
+        self._on_select = on_select
+        self.setObjectName("car_chip")
+        self.setMouseTracking(True)
+        self.setFixedHeight(72)
+        self.setMinimumWidth(130)
+        self.setSizePolicy(QSizePolicy.Policy.Preferred, QSizePolicy.Policy.Fixed)
+        self.setCursor(QCursor(Qt.CursorShape.PointingHandCursor))
+
+        # Fő layout – jobb oldalt helyet hagyunk a gomboknak
+        main_lay = QVBoxLayout(self)
+        main_lay.setContentsMargins(10, 7, 54, 7)
+        main_lay.setSpacing(1)
+
+        self.name_lbl = QLabel(); self.name_lbl.setObjectName("chip_name")
+        self.rsz_lbl  = QLabel(); self.rsz_lbl.setObjectName("chip_rsz")
+        self.km_lbl   = QLabel(); self.km_lbl.setObjectName("chip_km")
+        for child in (self.name_lbl, self.rsz_lbl, self.km_lbl):
+            child.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+            main_lay.addWidget(child)
+
+        # Gombok – mindig a jobb felső sarokban (resizeEvent), csak hoverre látszanak
+        self.edit_btn = QPushButton("✏️", self); self.edit_btn.setObjectName("chip_edit_btn")
+        self.del_btn  = QPushButton("🗑️", self); self.del_btn.setObjectName("chip_del_btn")
+        self.edit_btn.clicked.connect(lambda: on_edit(self.cid))
+        self.del_btn.clicked.connect(lambda: on_delete(self.cid))
+        self._set_buttons_visible(False)
+
+    def set_car(self, car):
+        """A chip feliratai a gyorsítótárazott autó sorból."""
+        self.cid = car["id"]
+        self.name_lbl.setText(f"{car['marka']} {car['tipus']}")
+        self.rsz_lbl.setText(car["rendszam"] or "—")
+        self.km_lbl.setText(f'{car["km_allas"]:,} km'.replace(",", " ") if car["km_allas"] else "— km")
+
+    def set_active(self, active: bool):
+        set_prop(self, "active", active)
+
+    def _set_buttons_visible(self, visible: bool):
+        self.edit_btn.setVisible(visible)
+        self.del_btn.setVisible(visible)
+
+    def _reposition_btns(self):
+        w = self.width()
+        self.edit_btn.move(w - 48, 5)
+        self.del_btn.move(w - 24, 5)
+
+    def enterEvent(self, e):
+        self._set_buttons_visible(True)
+
+    def leaveEvent(self, e):
+        self._set_buttons_visible(False)
+
+    def resizeEvent(self, e):
+        self._reposition_btns()
+
+    def showEvent(self, e):
+        self._reposition_btns()
+
+    def mousePressEvent(self, e):
+        # Kattintás kiválasztja
+        self._on_select(self.cid)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# Főablak
+# ══════════════════════════════════════════════════════════════════════════════
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.selected_car_id = None
-        cfg = load_config()
-        self.dark_mode = cfg.get("dark_mode", True)
+        self._chips = {}       # auto_id -> CarChip (a sáv sorrendjében)
+        self._cars = {}        # auto_id -> autó sor (a chip-ek gyorsítótára)
+        self.dark_mode = config.get_bool("dark_mode")
         self.setWindowTitle(f"WheelBooK v{CURRENT_VERSION} – Dokumentum Kezelő")
         self.resize(1200, 820)
-        self._apply_theme()
+        apply_theme(self.dark_mode)
         self._build_ui()
         self.refresh_cars()
+        # Bejegyzés írásakor a km-állást a trigger frissíti: csak az az egy chip frissül
+        events.subscribe(lambda ev: self.refresh_car(ev.auto_id))
         # Induláskor emlékeztetők ellenőrzése (kis késleltetéssel)
-        from PyQt6.QtCore import QTimer
         QTimer.singleShot(800, self._check_reminders)
         # Frissítés ellenőrzés 3 mp késleltetéssel
         QTimer.singleShot(3000, lambda: start_update_check(self))
 
     def _check_reminders(self):
-        """Induláskor ellenőrzi az olajcsere és biztosítás lejáratát."""
-        cfg = load_config()
+        """Induláskor ellenőrzi az olajcsere és biztosítás lejáratát (háttérszálon)."""
+        cfg = config.snapshot()     # a worker szál a másolatot kapja
+        loader.submit(self, lambda conn: self._reminder_warnings(conn, cfg),
+                      self._show_reminders)
+
+    @staticmethod
+    def _reminder_warnings(conn, cfg) -> list[str]:
         warning_days_muszaki  = cfg.get("muszaki_warning_days", 30)
         warning_days_biz      = cfg.get("biztositas_warning_days", 30)
         warning_days_olaj     = cfg.get("olaj_warning_days", 1000)  # km
-        today = datetime.today().strftime("%Y.%m.%d")
         today_dt = datetime.today()
 
         warnings = []
 
-        with get_db() as conn:
-            cars = conn.execute(
-                "SELECT id, marka, tipus, km_allas, muszaki_lejarat, olaj_intervallum FROM autok"
-            ).fetchall()
-
-            for car in cars:
-                name = f"{car['marka']} {car['tipus']}"
+        # Autónként egy sor: az utolsó olajcsere és a biztosítás vége az összesítőből
+        cars = conn.execute("""
+            SELECT a.id, a.marka, a.tipus, a.km_allas, a.muszaki_lejarat, a.olaj_intervallum,
+                   o.utolso_olaj_km, o.biztositas_vege
+            FROM autok a LEFT JOIN auto_osszesito o ON o.auto_id = a.id
+        """).fetchall()
 
-                # Műszaki lejárat
-                if car["muszaki_lejarat"]:
-                    try:
-                        muszaki_dt = datetime.strptime(car["muszaki_lejarat"], "%Y.%m.%d")
-                        days_left = (muszaki_dt - today_dt).days
-                        if days_left < 0:
-                            warnings.append(f"🚗 <b>{name}</b> – Műszaki vizsga <b>lejárt</b> "
-                                          f"({car['muszaki_lejarat']})!")
-                        elif days_left <= warning_days_muszaki:
-                            warnings.append(f"🚗 <b>{name}</b> – Műszaki vizsga lejár "
-                                          f"<b>{days_left} nap múlva</b> ({car['muszaki_lejarat']})")
-                    except ValueError:
-                        pass
-
-                # Olajcsere (km alapján)
-                if car["km_allas"] and car["olaj_intervallum"]:
-                    last_oil = conn.execute("""
-                        SELECT MAX(km_allas) as km FROM szerviz_adatok
-                        WHERE auto_id=? AND (megjegyzes LIKE '%olaj%' OR kategoria='Karbantartás')
-                        AND km_allas > 0
-                    """, (car["id"],)).fetchone()
-                    last_oil_km = last_oil["km"] if last_oil and last_oil["km"] else 0
-                    if last_oil_km > 0:
-                        km_until_oil = (last_oil_km + car["olaj_intervallum"]) - car["km_allas"]
-                        if km_until_oil <= 0:
-                            warnings.append(f"🔧 <b>{name}</b> – Olajcsere <b>esedékes!</b> "
-                                          f"(+{abs(km_until_oil):,} km-rel késve)".replace(",", " "))
-                        elif km_until_oil <= warning_days_olaj:
-                            warnings.append(f"🔧 <b>{name}</b> – Olajcsere "
-                                          f"<b>{km_until_oil:,} km-en belül</b>".replace(",", " "))
-
-                # Biztosítás lejárat
-                biz = conn.execute("""
-                    SELECT vege, biztosito FROM biztositas
-                    WHERE auto_id=? AND vege IS NOT NULL AND vege != ''
-                    ORDER BY vege DESC LIMIT 1
-                """, (car["id"],)).fetchone()
-                if biz and biz["vege"]:
-                    try:
-                        biz_dt = datetime.strptime(biz["vege"], "%Y.%m.%d")
-                        days_left = (biz_dt - today_dt).days
-                        biztosito = biz["biztosito"] or "Biztosítás"
+        for car in cars:
+            name = f"{car['marka']} {car['tipus']}"
+
+            # Műszaki lejárat
+            if car["muszaki_lejarat"]:
+                try:
+                    muszaki_dt = datetime.strptime(car["muszaki_lejarat"], "%Y.%m.%d")
+                    days_left = (muszaki_dt - today_dt).days
+                    if days_left < 0:
+                        warnings.append(f"🚗 <b>{name}</b> – Műszaki vizsga <b>lejárt</b> "
+                                      f"({car['muszaki_lejarat']})!")
+                    elif days_left <= warning_days_muszaki:
+                        warnings.append(f"🚗 <b>{name}</b> – Műszaki vizsga lejár "
+                                      f"<b>{days_left} nap múlva</b> ({car['muszaki_lejarat']})")
+                except ValueError:
+                    pass
+
+            # Olajcsere (km alapján)
+            if car["km_allas"] and car["olaj_intervallum"]:
+                last_oil_km = car["utolso_olaj_km"] or 0
+                if last_oil_km > 0:
+                    km_until_oil = (last_oil_km + car["olaj_intervallum"]) - car["km_allas"]
+                    if km_until_oil <= 0:
+                        warnings.append(f"🔧 <b>{name}</b> – Olajcsere <b>esedékes!</b> "
+                                      f"(+{abs(km_until_oil):,} km-rel késve)".replace(",", " "))
+                    elif km_until_oil <= warning_days_olaj:
+                        warnings.append(f"🔧 <b>{name}</b> – Olajcsere "
+                                      f"<b>{km_until_oil:,} km-en belül</b>".replace(",", " "))
+
+            # Biztosítás lejárat – a biztosító nevét csak figyelmeztetéskor olvassuk ki
+            vege = car["biztositas_vege"]
+            if vege:
+                try:
+                    biz_dt = datetime.strptime(vege, "%Y.%m.%d")
+                    days_left = (biz_dt - today_dt).days
+                    if days_left <= warning_days_biz:
+                        biz = conn.execute("""
+                            SELECT biztosito FROM biztositas
+                            WHERE auto_id=? AND vege=? LIMIT 1
+                        """, (car["id"], vege)).fetchone()
+                        biztosito = (biz["biztosito"] if biz else None) or "Biztosítás"
                         if days_left < 0:
                             warnings.append(f"🛡️ <b>{name}</b> – {biztosito} biztosítás "
-                                          f"<b>lejárt</b> ({biz['vege']})!")
-                        elif days_left <= warning_days_biz:
+                                          f"<b>lejárt</b> ({vege})!")
+                        else:
                             warnings.append(f"🛡️ <b>{name}</b> – {biztosito} biztosítás lejár "
-                                          f"<b>{days_left} nap múlva</b> ({biz['vege']})")
-                    except ValueError:
-                        pass
+                                          f"<b>{days_left} nap múlva</b> ({vege})")
+                except ValueError:
+                    pass
+        return warnings
 
+    def _show_reminders(self, warnings):
         if warnings:
             dlg = ReminderDialog(self, warnings)
             dlg.exec()
 
     def _apply_theme(self):
-        self.setStyleSheet(DARK_QSS if self.dark_mode else LIGHT_QSS)
-        bg = "#0f172a" if self.dark_mode else "#f8fafc"
-        self.setStyleSheet((DARK_QSS if self.dark_mode else LIGHT_QSS) +
-                           f"QMainWindow {{ background: {bg}; }}")
+        apply_theme(self.dark_mode)
+        # A widgetek nélkül rajzolt részek: a listák delegate-je a következő
+        # rajzoláskor, a grafikonok a meglévő adataikból rajzolódnak újra
+        for i in range(self.stack.count()):
+            w = self.stack.widget(i)
+            if hasattr(w, "restyle"):
+                w.restyle()
+            elif hasattr(w, "view"):
+                w.view.viewport().update()
 
     def _build_ui(self):
         central = QWidget(); central.setObjectName("content_area")
@@ -2269,7 +2369,7 @@ class MainWindow(QMainWindow):
 
         # Topbar szeparátor
         sep1 = QFrame(); sep1.setFrameShape(QFrame.Shape.HLine)
-        sep1.setStyleSheet("background: #334155;" if self.dark_mode else "background: #e2e8f0;")
+        sep1.setObjectName("sep_top")
         sep1.setFixedHeight(1)
         root.addWidget(sep1)
 
@@ -2278,11 +2378,16 @@ class MainWindow(QMainWindow):
         self.chip_lay = QHBoxLayout(chipbar)
         self.chip_lay.setContentsMargins(16, 10, 16, 10)
         self.chip_lay.setSpacing(10)
+        # + Új jármű chip (a jármű chip-ek elé szúródnak be)
+        add_chip = QPushButton("➕  Új jármű"); add_chip.setObjectName("chip_add")
+        add_chip.setFixedSize(110, 72)
+        add_chip.clicked.connect(lambda: self._new_car())
+        self.chip_lay.addWidget(add_chip)
         self.chip_lay.addStretch()
         root.addWidget(chipbar)
 
         sep2 = QFrame(); sep2.setFrameShape(QFrame.Shape.HLine)
-        sep2.setStyleSheet("background: #1e293b;" if self.dark_mode else "background: #e2e8f0;")
+        sep2.setObjectName("sep_chip")
         sep2.setFixedHeight(1)
         root.addWidget(sep2)
 
@@ -2310,7 +2415,7 @@ class MainWindow(QMainWindow):
             self.stack.removeWidget(self.stack.widget(0))
 
         # Tab definíciók
-        with get_db() as conn:
+        with read_db() as conn:
             custom = conn.execute(
                 "SELECT nev,ikon FROM kategoriak WHERE alap=0 ORDER BY id"
             ).fetchall()
@@ -2329,7 +2434,9 @@ class MainWindow(QMainWindow):
             ("📅  Éves összesítő", "__eves__"),
         ]
 
-        # Tab gombok + tartalom
+        # Tab gombok + tartalom; a tartalom a megjelenésekor töltődik be
+        views.clear()
+        self._tab_keys = [kat for _, kat in tabs]
         for i, (label, kat) in enumerate(tabs):
             # Gomb
             btn = QPushButton(label)
@@ -2342,12 +2449,18 @@ class MainWindow(QMainWindow):
             # Tartalom
             if kat == "__biz__":
                 w = self._make_biz_tab()
+                views.register(kat, w.refresh, ("biztositas",))
             elif kat == "__stat__":
                 w = StatTab(lambda: self.selected_car_id)
+                views.register(kat, w.refresh, ("szerviz_adatok", "biztositas", "autok"),
+                               cancel=w.cancel_refresh)
             elif kat == "__eves__":
                 w = YearlyTab(lambda: self.selected_car_id)
+                views.register(kat, w.refresh, ("szerviz_adatok",), cancel=w.cancel_refresh)
             else:
                 w = TabContent(lambda: self.selected_car_id, kat)
+                views.register(kat, w.refresh, ("szerviz_adatok",),
+                               patch=w.apply_change, cancel=w.cancel_refresh)
             self.stack.addWidget(w)
 
         self._switch_tab(0)
@@ -2355,13 +2468,9 @@ class MainWindow(QMainWindow):
     def _switch_tab(self, idx):
         self.stack.setCurrentIndex(idx)
         for i, btn in enumerate(self._tab_buttons):
-            btn.setObjectName("tab_btn_active" if i == idx else "tab_btn")
-            btn.style().unpolish(btn)
-            btn.style().polish(btn)
-        # Frissítjük az aktuális tab tartalmát
-        w = self.stack.currentWidget()
-        if hasattr(w, 'refresh'):
-            w.refresh()
+            set_prop(btn, "active", i == idx)
+        # Csak akkor frissül, ha megjelenése óta változott valami, amitől függ
+        views.show(self._tab_keys[idx])
 
     def _make_placeholder(self, text):
         w = QWidget(); w.setObjectName("content_area")
@@ -2376,128 +2485,65 @@ class MainWindow(QMainWindow):
 
     # ── Jármű chip-ek ─────────────────────────────────────────────────────────
     def refresh_cars(self):
-        # Töröljük a régi chip-eket (stretch kivételével)
-        while self.chip_lay.count() > 1:
-            item = self.chip_lay.takeAt(0)
-            if item.widget(): item.widget().deleteLater()
-
-        with get_db() as conn:
+        """
+        A chip sáv szinkronizálása az autók táblával. A meglévő chip-ek
+        helyben frissülnek, csak az új autók kapnak új chip-et.
+        """
+        with read_db() as conn:
             cars = conn.execute(
                 "SELECT id,marka,tipus,rendszam,km_allas FROM autok ORDER BY id"
             ).fetchall()
+        self._cars = {car["id"]: car for car in cars}
+
+        for cid in [cid for cid in self._chips if cid not in self._cars]:
+            chip = self._chips.pop(cid)
+            self.chip_lay.removeWidget(chip)
+            chip.deleteLater()
+
+        for i, car in enumerate(cars):
+            chip = self._chips.get(car["id"])
+            if chip is None:
+                chip = self._chips[car["id"]] = CarChip(
+                    self._select_car, self._edit_car, self._delete_car)
+            if self.chip_lay.indexOf(chip) != i:
+                self.chip_lay.removeWidget(chip)
+                self.chip_lay.insertWidget(i, chip)
+            chip.set_car(car)
+
+        if self.selected_car_id not in self._cars:
+            self.selected_car_id = cars[0]["id"] if cars else None
+        self._select_car(self.selected_car_id, force=True)
+
+    def refresh_car(self, cid):
+        """Egy autó gyorsítótárazott sorának és chip-jének frissítése."""
+        chip = self._chips.get(cid)
+        if chip is None:
+            return
+        with read_db() as conn:
+            car = conn.execute(
+                "SELECT id,marka,tipus,rendszam,km_allas FROM autok WHERE id=?", (cid,)
+            ).fetchone()
+        if car:
+            self._cars[cid] = car
+            chip.set_car(car)
 
-        if not self.selected_car_id and cars:
-            self.selected_car_id = cars[0]["id"]
-
-        for car in cars:
-            cid = car["id"]
-            active = (cid == self.selected_car_id)
-            chip = self._make_chip(car, active)
-            self.chip_lay.insertWidget(self.chip_lay.count()-1, chip)
-
-        # + Új jármű chip
-        add_chip = QPushButton("➕  Új jármű"); add_chip.setObjectName("chip_add")
-        add_chip.setFixedSize(110, 72)
-        add_chip.clicked.connect(lambda: self._new_car())
-        self.chip_lay.insertWidget(self.chip_lay.count()-1, add_chip)
-
-        self._refresh_current_tab()
-
-    def _make_chip(self, car, active):
-        cid    = car["id"]
-        is_dark = self.dark_mode
-
-        # Egyedi QFrame subclass hover kezeléssel
-        class ChipFrame(QFrame):
-            def __init__(self, parent=None):
-                super().__init__(parent)
-                self.setMouseTracking(True)
-            def enterEvent(self, e):
-                edit_btn.setVisible(True)
-                del_btn.setVisible(True)
-            def leaveEvent(self, e):
-                edit_btn.setVisible(False)
-                del_btn.setVisible(False)
-            def mousePressEvent(self, e):
-                pass  # kezeljük lentebb
-
-        chip = ChipFrame()
-        chip.setObjectName("car_chip_active" if active else "car_chip")
-        chip.setFixedHeight(72)
-        chip.setMinimumWidth(130)
-        chip.setSizePolicy(QSizePolicy.Policy.Preferred, QSizePolicy.Policy.Fixed)
-        chip.setCursor(QCursor(Qt.CursorShape.PointingHandCursor))
-
-        # Fő layout – jobb oldalt helyet hagyunk a gomboknak
-        main_lay = QVBoxLayout(chip)
-        main_lay.setContentsMargins(10, 7, 54, 7)
-        main_lay.setSpacing(1)
-
-        name_lbl = QLabel(f"{car['marka']} {car['tipus']}")
-        name_lbl.setObjectName("chip_name")
-        name_lbl.setSizePolicy(QSizePolicy.Policy.Preferred, QSizePolicy.Policy.Preferred)
-        name_lbl.adjustSize()
-        main_lay.addWidget(name_lbl)
-
-        rsz_lbl = QLabel(car["rendszam"] or "—")
-        rsz_lbl.setObjectName("chip_rsz")
-        main_lay.addWidget(rsz_lbl)
-
-        km_str = f'{car["km_allas"]:,} km'.replace(",", " ") if car["km_allas"] else "— km"
-        km_lbl = QLabel(km_str)
-        km_lbl.setObjectName("chip_km")
-        main_lay.addWidget(km_lbl)
-
-        # Gombok – mindig a jobb felső sarokba pozicionálva resizeEvent-tel
-        btn_bg  = "#334155" if is_dark else "#e2e8f0"
-        del_bg  = "#450a0a" if is_dark else "#fee2e2"
-        btn_col = "#e2e8f0" if is_dark else "#374151"
-        del_col = "#f87171" if is_dark else "#dc2626"
-
-        edit_btn = QPushButton("✏️", chip)
-        edit_btn.setFixedSize(22, 22)
-        edit_btn.setStyleSheet(f"""
-            QPushButton {{ background: {btn_bg}; border: none; border-radius: 4px;
-                           color: {btn_col}; font-size: 11px; }}
-            QPushButton:hover {{ background: #475569; color: white; }}
-        """)
-        edit_btn.clicked.connect(lambda checked=False, c=cid: self._edit_car(c))
-        edit_btn.setVisible(False)
-
-        del_btn = QPushButton("🗑️", chip)
-        del_btn.setFixedSize(22, 22)
-        del_btn.setStyleSheet(f"""
-            QPushButton {{ background: {del_bg}; border: none; border-radius: 4px;
-                           color: {del_col}; font-size: 11px; }}
-            QPushButton:hover {{ background: #7f1d1d; color: #fca5a5; }}
-        """)
-        del_btn.clicked.connect(lambda checked=False, c=cid: self._delete_car(c))
-        del_btn.setVisible(False)
-
-        # Gombok pozícionálása mindig a jobb felső sarokba
-        def reposition_btns(e=None):
-            w = chip.width()
-            edit_btn.move(w - 48, 5)
-            del_btn.move(w - 24, 5)
-        chip.resizeEvent = lambda e: reposition_btns()
-        chip.showEvent   = lambda e: reposition_btns()
-
-        # Kattintás kiválasztja
-        chip.mousePressEvent = lambda e, c=cid: self._select_car(c)
-        for child in [name_lbl, rsz_lbl, km_lbl]:
-            child.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
-
-        return chip
-
-    def _select_car(self, cid):
+    def _select_car(self, cid, force=False):
+        # Kiválasztáskor nincs lekérdezés: csak a két érintett chip "active" property-je vált
+        if cid == self.selected_car_id and not force:
+            return
+        old, new = self._chips.get(self.selected_car_id), self._chips.get(cid)
+        if old is not None and old is not new:
+            old.set_active(False)
+        if new is not None:
+            new.set_active(True)
         self.selected_car_id = cid
-        self.refresh_cars()
+        views.set_car(cid)
 
     def _new_car(self):
         dlg = CarDialog(self)
         if dlg.exec() == QDialog.DialogCode.Accepted:
             # Utolsó beillesztett autó kiválasztása
-            with get_db() as conn:
+            with read_db() as conn:
                 r = conn.execute("SELECT id FROM autok ORDER BY id DESC LIMIT 1").fetchone()
             if r:
                 self.selected_car_id = r["id"]
@@ -2506,7 +2552,8 @@ class MainWindow(QMainWindow):
     def _edit_car(self, cid):
         dlg = CarDialog(self, car_id=cid)
         if dlg.exec() == QDialog.DialogCode.Accepted:
-            self.refresh_cars()
+            views.invalidate("autok", auto_id=cid)
+            self.refresh_car(cid)
 
     def _delete_car(self, cid):
         ret = QMessageBox.question(self, "Jármű törlése",
@@ -2519,11 +2566,6 @@ class MainWindow(QMainWindow):
                 self.selected_car_id = None
             self.refresh_cars()
 
-    def _refresh_current_tab(self):
-        w = self.stack.currentWidget()
-        if hasattr(w, 'refresh'):
-            w.refresh()
-
     # ── Topbar akciók ─────────────────────────────────────────────────────────
     def _pdf_export(self):
         dlg = PdfExportDialog(self, self.selected_car_id)
@@ -2533,7 +2575,6 @@ class MainWindow(QMainWindow):
         dlg = CategoryDialog(self)
         if dlg.exec() == QDialog.DialogCode.Accepted:
             self._build_tabs()
-            self._refresh_current_tab()
 
     def _backup(self):
         dlg = BackupDialog(self)
@@ -2549,18 +2590,32 @@ class MainWindow(QMainWindow):
             if new_mode != self.dark_mode:
                 self.dark_mode = new_mode
                 self._apply_theme()
-                self.refresh_cars()
-                self._build_tabs()
 
 # ══════════════════════════════════════════════════════════════════════════════
 # Indítás
 # ══════════════════════════════════════════════════════════════════════════════
+def warm_up():
+    """Az első rajzolás után: indulási riport, majd (ha be van kapcsolva) előtöltés."""
+    startup.mark("ablak")
+    logger.info(startup.report())
+    if config.get_bool("preload_modules"):
+        def done(elapsed):
+            startup.mark("előtöltés")
+            logger.info("Előtöltés kész (%.0f ms) – %s", elapsed * 1000, startup.report())
+        preload(on_done=done)
+
+
 if __name__ == "__main__":
-    init_db()
+    startup.mark("importok")
+    init_db(DB_PATH, config.get_db_profile())
     app = QApplication(sys.argv)
     app.setFont(QFont("Segoe UI", 10))
+    app.aboutToQuit.connect(loader.shutdown)
+    app.aboutToQuit.connect(close_db)
+    app.aboutToQuit.connect(config.flush)
     win = MainWindow()
     win.show()
+    QTimer.singleShot(0, warm_up)
     sys.exit(app.exec())
 
 # ══════════════════════════════════════════════════════════════════════════════
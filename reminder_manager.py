@@ -8,10 +8,11 @@ Szerviz emlékeztetők és Windows értesítések kezelése.
 - Indításkori popup összefoglaló
 """
 
-import sqlite3
 import logging
 from datetime import datetime, timedelta
 
+from connection_manager import ConnectionManager
+
 logger = logging.getLogger(__name__)
 
 # plyer opcionális — ha nincs telepítve, csak popup lesz
@@ -27,6 +28,7 @@ class ReminderManager:
     def __init__(self, db_path: str, config_manager):
         self.db_path = db_path
         self.config = config_manager
+        self.db = ConnectionManager.for_path(db_path)
 
     # ------------------------------------------------------------------
     # Fő ellenőrzés – indításkor hívandó
@@ -39,29 +41,28 @@ class ReminderManager:
         sulyossag: "warning" | "danger"
         """
         reminders = []
-        conn = sqlite3.connect(self.db_path)
-        try:
-            cars = conn.execute(
-                "SELECT id, marka, tipus, km_allas, muszaki_lejarat, olaj_intervallum FROM autok"
-            ).fetchall()
-
-            for car in cars:
-                cid, marka, tipus, curr_km, muszaki, intervallum = car
-                auto_str = f"{marka} {tipus}"
-                curr_km = curr_km or 0
-                intervallum = intervallum or 10000
-
-                # Műszaki vizsga ellenőrzés
-                muszaki_reminders = self._check_muszaki(auto_str, muszaki)
-                reminders.extend(muszaki_reminders)
-
-                # Olajcsere ellenőrzés
-                olaj_reminder = self._check_olaj(conn, cid, auto_str, curr_km, intervallum)
-                if olaj_reminder:
-                    reminders.append(olaj_reminder)
-
-        finally:
-            conn.close()
+        conn = self.db.reader()
+        # Autónként egy sor: az utolsó olajcsere km az auto_osszesito táblából
+        cars = conn.execute("""
+            SELECT a.marka, a.tipus, a.km_allas, a.muszaki_lejarat, a.olaj_intervallum,
+                   o.utolso_olaj_km
+            FROM autok a LEFT JOIN auto_osszesito o ON o.auto_id = a.id
+        """).fetchall()
+
+        for car in cars:
+            marka, tipus, curr_km, muszaki, intervallum, last_oil_km = car
+            auto_str = f"{marka} {tipus}"
+            curr_km = curr_km or 0
+            intervallum = intervallum or 10000
+
+            # Műszaki vizsga ellenőrzés
+            muszaki_reminders = self._check_muszaki(auto_str, muszaki)
+            reminders.extend(muszaki_reminders)
+
+            # Olajcsere ellenőrzés
+            olaj_reminder = self._check_olaj(auto_str, curr_km, last_oil_km, intervallum)
+            if olaj_reminder:
+                reminders.append(olaj_reminder)
 
         return reminders
 
@@ -113,21 +114,13 @@ class ReminderManager:
     # Olajcsere ellenőrzés
     # ------------------------------------------------------------------
 
-    def _check_olaj(self, conn, car_id: int, auto_str: str, curr_km: int, intervallum: int):
+    def _check_olaj(self, auto_str: str, curr_km: int, last_oil_km: int | None, intervallum: int):
         warning_km = self.config.get("oil_warning_km", 1000)
 
-        last_oil = conn.execute("""
-            SELECT km_allas FROM szerviz_adatok
-            WHERE auto_id=? AND kategoria='Karbantartás'
-            AND (megjegyzes LIKE '%olaj%' OR megjegyzes LIKE '%Oil%'
-                 OR megjegyzes LIKE '%OLAJ%')
-            ORDER BY km_allas DESC LIMIT 1
-        """, (car_id,)).fetchone()
-
-        if not last_oil:
+        if not last_oil_km:
             return None
 
-        diff = curr_km - last_oil[0]
+        diff = curr_km - last_oil_km
         remaining = intervallum - diff
 
         if remaining <= 0:
@@ -0,0 +1,280 @@
+"""
+search_manager.py
+-----------------
+Gépelés közbeni keresés mindkét felülethez (CustomTkinter és PyQt6).
+- (autó, kategória) kulcsonként az utolsó és a legszélesebb teljes találati lista
+- Ha az új keresőszöveg az előző folytatása, az előző találatok szűrődnek
+  tovább (lekérdezés nélkül), a kiemelések újraszámolva
+- Az FTS lekérdezés háttérszálon fut; kategóriánként csak a legutolsó kérés
+  számít, a futó elavult lekérdezés megszakad (Connection.interrupt)
+- Adatváltozáskor (saját írás vagy más kapcsolat commitja) a gyorsítótár ürül
+
+A késleltetést (debounce) a felület végzi – Qt: QTimer, Tk: after() –, a
+"search_debounce_ms" beállítás szerint.
+"""
+
+import re
+import sqlite3
+import logging
+import threading
+import unicodedata
+
+from database import (search_entries, SEARCH_LIMIT, SEARCH_COLUMN_NAMES,
+                      SEARCH_TEXT_COLUMNS, HL_START, HL_END)
+
+logger = logging.getLogger(__name__)
+
+# Az FTS5 unicode61 tokenizer szó fogalma: betűk és számjegyek (az _ elválasztó)
+_TOKEN = re.compile(r"[^\W_]+")
+_INDEX = {name: i for i, name in enumerate(SEARCH_COLUMN_NAMES)}
+
+
+class ResultRow(tuple):
+    """Találati sor: index és oszlopnév szerint is olvasható, mint az sqlite3.Row."""
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            key = _INDEX[key]
+        return tuple.__getitem__(self, key)
+
+    def keys(self) -> list[str]:
+        return list(SEARCH_COLUMN_NAMES)
+
+
+# ----------------------------------------------------------------------
+# Szűkítés a memóriában (az FTS illesztés Python megfelelője)
+# ----------------------------------------------------------------------
+
+def _fold(text: str) -> str:
+    """Kisbetűs, ékezet nélküli alak (remove_diacritics 2)."""
+    decomposed = unicodedata.normalize("NFD", text.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def search_terms(text: str) -> list[list[str]]:
+    """
+    A keresőszöveg kifejezései tokenlistaként, a database.fts_query szerint:
+    szavanként egy kifejezés, az utolsó token előtagként illeszkedik.
+    """
+    terms = []
+    for word in text.split():
+        tokens = _TOKEN.findall(_fold(word))
+        if tokens:
+            terms.append(tokens)
+    return terms
+
+
+def _term_spans(tokens, term) -> list[tuple[int, int]]:
+    """Egy kifejezés előfordulásai egy oszlop tokenjei között (kezdet, vég) alakban."""
+    n = len(term)
+    spans = []
+    for i in range(len(tokens) - n + 1):
+        if (all(tokens[i + k][2] == term[k] for k in range(n - 1))
+                and tokens[i + n - 1][2].startswith(term[-1])):
+            spans.append((tokens[i][0], tokens[i + n - 1][1]))
+    return spans
+
+
+def _highlight(text: str, spans) -> str:
+    """HL_START / HL_END jelölés a (kezdet, vég) szakaszokra, az átfedők összevonva."""
+    out, pos = [], 0
+    merged = []
+    for start, stop in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], stop)
+        else:
+            merged.append([start, stop])
+    for start, stop in merged:
+        out += [text[pos:start], HL_START, text[start:stop], HL_END]
+        pos = stop
+    out.append(text[pos:])
+    return "".join(out)
+
+
+def narrow(rows, terms) -> list[ResultRow]:
+    """
+    A találatok közül azok, amelyekre minden kifejezés illeszkedik valamelyik
+    indexelt oszlopban; a *_hl oszlopok az új kifejezésekkel újraszámolva.
+    A sorrend az előző (bm25) rangsor marad.
+    """
+    result = []
+    for row in rows:
+        values = list(row)
+        found = [False] * len(terms)
+        for col, hl_col in SEARCH_TEXT_COLUMNS:
+            text = row[col]
+            if not text:
+                continue
+            tokens = [(m.start(), m.end(), _fold(m.group())) for m in _TOKEN.finditer(text)]
+            spans = []
+            for i, term in enumerate(terms):
+                term_spans = _term_spans(tokens, term)
+                if term_spans:
+                    found[i] = True
+                    spans += term_spans
+            values[_INDEX[hl_col]] = _highlight(text, spans)
+        if all(found):
+            result.append(ResultRow(values))
+    return result
+
+
+# ----------------------------------------------------------------------
+# SearchManager
+# ----------------------------------------------------------------------
+
+class _Entry:
+    """Egy (autó, kategória) kulcs gyorsítótára: az utolsó és a legszélesebb lista."""
+    __slots__ = ("base_text", "base_rows", "last_text", "last_rows")
+
+    def __init__(self, text, rows):
+        self.base_text, self.base_rows = text, rows
+        self.last_text, self.last_rows = text, rows
+
+
+class SearchManager:
+    """
+    Keresés gyorsítótárral és háttérszálas FTS lekérdezéssel.
+
+    Használat a felületről (a fő szálon):
+        rows = manager.cached(conn, auto_id, kategoria, text)
+        if rows is None:
+            manager.submit(auto_id, kategoria, text, callback)
+
+    A callback(token, rows) a háttérszálon hívódik; a felületnek kell a fő
+    szálra továbbítania, és a current(kategoria, token) hívással eldönteni,
+    hogy az eredmény még érvényes-e.
+    """
+
+    def __init__(self, connect, limit: int = SEARCH_LIMIT):
+        self._connect = connect          # az aktuális szál olvasó kapcsolata
+        self.limit = limit
+        self._lock = threading.Condition()
+        self._cache: dict[tuple, _Entry] = {}
+        self._version = None
+        self._generation: dict[str, int] = {}
+        self._pending: dict[str, tuple] = {}
+        self._running = None              # (kategoria, token, kapcsolat)
+        self._thread = None
+
+    # ------------------------------------------------------------------
+    # Gyorsítótár
+    # ------------------------------------------------------------------
+
+    def _check_version(self, conn):
+        """
+        Ürít, ha az adatbázis változott: total_changes a saját írásokat,
+        a data_version a más kapcsolatokból érkező commitokat jelzi.
+        """
+        version = (id(conn), conn.total_changes,
+                   conn.execute("PRAGMA data_version").fetchone()[0])
+        with self._lock:
+            if version != self._version:
+                self._cache.clear()
+                self._version = version
+            return version
+
+    def cached(self, conn, auto_id, kategoria, text) -> list | None:
+        """
+        Találatok lekérdezés nélkül: pontos egyezés, vagy az előző / a
+        legszélesebb teljes lista szűkítése. None, ha lekérdezés kell.
+        """
+        self._check_version(conn)
+        text = text.strip()
+        with self._lock:
+            entry = self._cache.get((auto_id, kategoria))
+        if entry is None:
+            return None
+        if text == entry.last_text:
+            return entry.last_rows
+
+        for base_text, base_rows in ((entry.last_text, entry.last_rows),
+                                     (entry.base_text, entry.base_rows)):
+            # Csak teljes listából szűkíthető: limitnél a hiányzó sorok is illeszkedhetnének
+            if text.startswith(base_text) and len(base_rows) < self.limit:
+                rows = narrow(base_rows, search_terms(text))
+                with self._lock:
+                    entry.last_text, entry.last_rows = text, rows
+                return rows
+        return None
+
+    def _store(self, version, auto_id, kategoria, text, rows):
+        with self._lock:
+            if version != self._version:
+                return
+            entry = self._cache.get((auto_id, kategoria))
+            if entry is None or not text.startswith(entry.base_text) \
+                    or len(entry.base_rows) >= self.limit:
+                self._cache[(auto_id, kategoria)] = _Entry(text, rows)
+            else:
+                entry.last_text, entry.last_rows = text, rows
+
+    def invalidate(self):
+        with self._lock:
+            self._cache.clear()
+
+    # ------------------------------------------------------------------
+    # Háttérszálas lekérdezés
+    # ------------------------------------------------------------------
+
+    def current(self, kategoria, token) -> bool:
+        """Igaz, ha a token a kategória legutolsó kérése."""
+        with self._lock:
+            return self._generation.get(kategoria) == token
+
+    def submit(self, auto_id, kategoria, text, callback) -> int:
+        """
+        FTS lekérdezés indítása a háttérszálon. Az ugyanarra a kategóriára
+        korábban beküldött, még várakozó kérés elmarad, a futó megszakad.
+        Visszatér: a kérés tokenje.
+        """
+        with self._lock:
+            token = self._generation.get(kategoria, 0) + 1
+            self._generation[kategoria] = token
+            self._pending[kategoria] = (token, self._version, auto_id, text.strip(), callback)
+            if self._running is not None and self._running[0] == kategoria:
+                self._running[2].interrupt()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._worker, name="search",
+                                                daemon=True)
+                self._thread.start()
+            self._lock.notify()
+        return token
+
+    def cancel(self, kategoria):
+        """A kategória várakozó és futó kérésének elvetése."""
+        with self._lock:
+            self._generation[kategoria] = self._generation.get(kategoria, 0) + 1
+            self._pending.pop(kategoria, None)
+            if self._running is not None and self._running[0] == kategoria:
+                self._running[2].interrupt()
+
+    def _worker(self):
+        while True:
+            with self._lock:
+                while not self._pending:
+                    self._lock.wait()
+                kategoria = next(iter(self._pending))
+                token, version, auto_id, text, callback = self._pending.pop(kategoria)
+                conn = self._connect()
+                self._running = (kategoria, token, conn)
+
+            rows = None
+            try:
+                rows = search_entries(conn, auto_id, kategoria, text, self.limit)
+            except sqlite3.OperationalError as e:
+                if "interrupt" not in str(e):
+                    logger.warning(f"Keresési hiba ({kategoria}, {text!r}): {e}")
+            finally:
+                with self._lock:
+                    self._running = None
+
+            if rows is not None:
+                rows = [ResultRow(r) for r in rows]
+                self._store(version, auto_id, kategoria, text, rows)
+            if self.current(kategoria, token):
+                try:
+                    callback(token, rows)
+                except Exception as e:
+                    # Pl. időközben bezárt / újraépített fül – a szálnak tovább kell futnia
+                    logger.warning(f"Keresési eredmény nem adható át ({kategoria}): {e}")
@@ -0,0 +1,340 @@
+"""
+stats_engine.py
+---------------
+Egy jármű statisztikája egyetlen lekérdezésből (CustomTkinter és PyQt6).
+- Az autó bejegyzései egyszer töltődnek be, oszloponként NumPy tömbökbe
+- Kártya összegek, havi tankolási sorozat, tankolásonkénti fogyasztás és
+  a kiugró értékek szűrése vektoros műveletekkel, Python ciklus nélkül
+- Az eredmény egy megváltoztathatatlan CarStats objektum: mindkét felület
+  ebből rajzol, saját lekérdezés nélkül
+- StatsCache: LRU gyorsítótár (autó, adat generáció, hónap ablak) kulccsal,
+  darab- és memóriakorláttal; az írási út és a PRAGMA data_version ürít
+
+A számítás nem ismeri a felületet: a Qt worker szálon, a Tk a fő szálon
+hívja a kapott kapcsolattal.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date
+
+from database import KATEGORIA_ID_SQL, honap_kulcs
+from lazy_import import lazy
+
+# A NumPy az első számításkor töltődik be (a típusjelölések nem értékelődnek ki)
+np = lazy("numpy")
+
+# Tankolásonkénti fogyasztás elfogadott tartománya (L/100km, a határok kizárva)
+FOGYASZTAS_MIN = 2.0
+FOGYASZTAS_MAX = 30.0
+# Az ablak hossza hónapban, az aktuális hónappal együtt
+HONAPOK = 12
+
+# Bejegyzés fajták – az egyéb az auto_osszesito egyeb_* oszlopaival egyezik:
+# ami nem tankolás, karbantartás vagy biztosítás
+TANKOLAS, KARBANTARTAS, BIZTOSITAS, EGYEB = range(4)
+_FAJTA_KATEGORIAK = ("Tankolás", "Karbantartás", "Biztosítás")
+
+# Az autó összes bejegyzése km szerint (idx_szerviz_auto_km, rendezés nélkül);
+# a kategória név egyszer oldódik fel, soronként csak egész összehasonlítás
+STAT_SQL = f"""
+    SELECT datum, datum_nap, honap_kulcs,
+           CASE kategoria_id WHEN {KATEGORIA_ID_SQL} THEN {TANKOLAS}
+                             WHEN {KATEGORIA_ID_SQL} THEN {KARBANTARTAS}
+                             WHEN {KATEGORIA_ID_SQL} THEN {BIZTOSITAS}
+                             ELSE {EGYEB} END,
+           osszeg, mennyiseg_liter, egysegar_ft_l, km_allas
+    FROM szerviz_adatok WHERE auto_id=? ORDER BY km_allas, id
+"""
+
+
+def _frozen(values, dtype=float) -> np.ndarray:
+    """Csak olvasható tömb (az eredmény megosztható szálak és nézetek között)."""
+    arr = np.array(values, dtype=dtype)
+    arr.setflags(write=False)
+    return arr
+
+
+_EMPTY = None
+
+
+def _empty() -> np.ndarray:
+    global _EMPTY
+    if _EMPTY is None:
+        _EMPTY = _frozen(())
+    return _EMPTY
+
+
+@dataclass(frozen=True, eq=False)
+class CarStats:
+    auto_id: int
+    # Kártyák
+    tank_osszeg: float = 0.0
+    tank_liter: float = 0.0
+    tank_db: int = 0
+    avg_ar: float = 0.0            # Ft/L, az egységárral rögzített tankolások átlaga
+    karb_osszeg: float = 0.0
+    karb_db: int = 0
+    egyeb_osszeg: float = 0.0
+    egyeb_db: int = 0
+    km_min: int = 0
+    km_max: int = 0
+    avg_fogyasztas: float = 0.0    # L/100km: az első utáni literek / megtett km
+    # Havi tankolás az ablakban – csak a tankolásos hónapok, időrendben
+    havi_cimke: tuple = ()         # 'YYYY.MM'
+    havi_osszeg: np.ndarray = field(default_factory=_empty)
+    havi_liter: np.ndarray = field(default_factory=_empty)
+    # Tankolások km sorrendben (költség idővonal)
+    tank_datum: tuple = ()
+    tank_ft: np.ndarray = field(default_factory=_empty)
+    # Tankolásonkénti fogyasztás (fill-up módszer), kiugró értékek nélkül
+    fog_datum: tuple = ()
+    fog_ertek: np.ndarray = field(default_factory=_empty)
+    # Ugyanez csak az ablak tankolásaiból; x = a tankolás sorszáma az ablakban
+    ablak_x: np.ndarray = field(default_factory=_empty)
+    ablak_fog: np.ndarray = field(default_factory=_empty)
+    ablak_datum: tuple = ()
+
+    @property
+    def km_diff(self) -> int:
+        return self.km_max - self.km_min if self.km_min else 0
+
+    @property
+    def osszes(self) -> float:
+        """Tankolás + karbantartás + egyéb (a biztosítás külön tétel)."""
+        return self.tank_osszeg + self.karb_osszeg + self.egyeb_osszeg
+
+    @property
+    def ft_per_km(self) -> float:
+        return self.osszes / self.km_diff if self.km_diff > 0 else 0.0
+
+
+def _fill_up(km: np.ndarray, liter: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Tankolásonkénti fogyasztás km szerint rendezett tankolásokból: minden
+    tankolás litere az előző tankolás óta megtett km-re vetítve.
+    Visszatér: (fogyasztás a 2. tankolástól, érvényes maszk).
+    """
+    if len(km) < 2:
+        return _empty(), np.zeros(0, dtype=bool)
+    d = np.diff(km)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fog = liter[1:] / d * 100
+    ok = (d > 0) & (fog > FOGYASZTAS_MIN) & (fog < FOGYASZTAS_MAX)
+    return fog, ok
+
+
+def compute_stats(conn, auto_id: int, today: date | None = None) -> CarStats:
+    """Egy autó teljes statisztikája egyetlen lekérdezésből."""
+    rows = conn.execute(STAT_SQL, (*_FAJTA_KATEGORIAK, auto_id)).fetchall()
+    if not rows:
+        return CarStats(auto_id)
+
+    datum, nap, honap, fajta, osszeg, liter, ar, km = zip(*rows)
+    datum = np.array(datum, dtype=object)
+    nap = np.array(nap, dtype=float)           # NULL -> nan: minden összehasonlítás hamis
+    honap = np.array(honap, dtype=float)
+    fajta = np.array(fajta, dtype=np.int8)
+    osszeg = np.nan_to_num(np.array(osszeg, dtype=float))
+    liter = np.array(liter, dtype=float)
+    ar = np.array(ar, dtype=float)
+    km = np.array(km, dtype=float)
+
+    tank = fajta == TANKOLAS
+    karb = fajta == KARBANTARTAS
+    egyeb = fajta == EGYEB
+    ar_ok = tank & ~np.isnan(ar)
+    km_ok = km > 0
+    km_min = int(km[km_ok].min()) if km_ok.any() else 0
+    km_max = int(km[km_ok].max()) if km_ok.any() else 0
+
+    # Fogyasztás: a km-mel és literrel rögzített tankolások (a sorrend már km szerinti)
+    fill = tank & km_ok & (liter > 0)
+    fk, fl = km[fill], liter[fill]
+    avg_fogyasztas = 0.0
+    if len(fk) >= 2 and fk[-1] > fk[0]:
+        avg_fogyasztas = float(fl[1:].sum() / (fk[-1] - fk[0]) * 100)
+    fog, fog_ok = _fill_up(fk, fl)
+
+    # Ablak: az utolsó HONAPOK hónap az aktuálissal együtt (a jövőbeli dátumok is)
+    kezdo_kulcs = honap_kulcs(today or date.today(), -(HONAPOK - 1))
+    kezdo_nap = date(kezdo_kulcs // 100, kezdo_kulcs % 100, 1).toordinal()
+
+    ablak = fill & (nap >= kezdo_nap)
+    ablak_fog, ablak_ok = _fill_up(km[ablak], liter[ablak])
+
+    # Havi összegek: hónap index az ablak elejétől, csoportosítás bincount-tal
+    kezdo_index = (kezdo_kulcs // 100) * 12 + kezdo_kulcs % 100 - 1
+    havi = tank & (honap >= kezdo_kulcs)
+    hk = honap[havi].astype(np.int64)
+    idx = (hk // 100) * 12 + hk % 100 - 1 - kezdo_index
+    db = np.bincount(idx, minlength=HONAPOK)
+    havi_osszeg = np.bincount(idx, weights=osszeg[havi], minlength=HONAPOK)
+    havi_liter = np.bincount(idx, weights=np.nan_to_num(liter[havi]), minlength=HONAPOK)
+    van = np.flatnonzero(db)
+    kulcsok = (kezdo_index + van) // 12 * 100 + (kezdo_index + van) % 12 + 1
+
+    return CarStats(
+        auto_id=auto_id,
+        tank_osszeg=float(osszeg[tank].sum()),
+        tank_liter=float(np.nansum(liter[tank])),
+        tank_db=int(np.count_nonzero(tank)),
+        avg_ar=float(ar[ar_ok].mean()) if ar_ok.any() else 0.0,
+        karb_osszeg=float(osszeg[karb].sum()),
+        karb_db=int(np.count_nonzero(karb)),
+        egyeb_osszeg=float(osszeg[egyeb].sum()),
+        egyeb_db=int(np.count_nonzero(egyeb)),
+        km_min=km_min,
+        km_max=km_max,
+        avg_fogyasztas=avg_fogyasztas,
+        havi_cimke=tuple(f"{k // 100:04d}.{k % 100:02d}" for k in kulcsok.tolist()),
+        havi_osszeg=_frozen(havi_osszeg[van]),
+        havi_liter=_frozen(havi_liter[van]),
+        tank_datum=tuple(datum[tank]),
+        tank_ft=_frozen(osszeg[tank]),
+        fog_datum=tuple(datum[fill][1:][fog_ok]),
+        fog_ertek=_frozen(fog[fog_ok]),
+        ablak_x=_frozen(np.arange(1, len(ablak_fog) + 1)[ablak_ok], dtype=np.int64),
+        ablak_fog=_frozen(ablak_fog[ablak_ok]),
+        ablak_datum=tuple(datum[ablak][1:][ablak_ok]),
+    )
+
+
+def _nbytes(stats: CarStats) -> int:
+    """Az eredmény becsült memóriaigénye (tömbök + szöveg címkék)."""
+    size = 512
+    for value in vars(stats).values():
+        if isinstance(value, np.ndarray):
+            size += value.nbytes
+        elif isinstance(value, tuple):
+            size += 64 * len(value)
+    return size
+
+
+class StatsCache:
+    """
+    CarStats eredmények autónként, LRU kiszorítással.
+
+    Kulcs: (autó, korszak, autó generáció, aktuális hónap kulcs).
+    - A bejelentett írás (EntryChange) csak az érintett autó generációját
+      lépteti: a többi autó eredménye érvényes marad
+    - Bejelentés nélküli változásnál (import, visszaállítás, másik
+      kapcsolat commitja) a total_changes / PRAGMA data_version eltér:
+      új korszak kezdődik, minden eredmény kiesik
+    - A hónap kulcs a 12 hónapos ablakot követi: hónapváltáskor új kulcs
+    Az eredmény témától független; a kulcs ezért nem tartalmazza.
+
+    Használat:
+        key = cache.key(conn, auto_id)
+        stats = cache.get(key)
+        if stats is None:
+            stats = compute_stats(conn, auto_id)    # akár worker szálon
+            cache.put(key, stats)
+    """
+    MAX_ENTRIES = 32
+    MAX_BYTES = 8 * 1024 * 1024
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, tuple[CarStats, int]] = OrderedDict()
+        self._generation: dict[int, int] = {}
+        self._epoch = 0
+        self._version = None
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------
+    # Kulcs és érvényesség
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _db_version(conn) -> tuple:
+        # total_changes: a kapcsolat saját írásai, data_version: más kapcsolatok commitjai
+        return (id(conn), conn.total_changes,
+                conn.execute("PRAGMA data_version").fetchone()[0])
+
+    def key(self, conn, auto_id: int, today: date | None = None) -> tuple:
+        """Az autó aktuális kulcsa; ha az adatbázis bejelentés nélkül változott, ürít."""
+        version = self._db_version(conn)
+        with self._lock:
+            if version != self._version:
+                if self._version is not None:
+                    self._clear()
+                self._version = version
+            return (auto_id, self._epoch, self._generation.get(auto_id, 0),
+                    honap_kulcs(today or date.today()))
+
+    def bump(self, auto_id: int, conn=None):
+        """
+        Bejelentett írás az autó bejegyzésein: csak az ő eredményei esnek ki.
+        A conn (amelyen a key() hívódik, pl. a GUI szál olvasó kapcsolata)
+        megadásával az írás utáni verzió elfogadott, így a többi autó
+        eredménye megmarad.
+        """
+        version = self._db_version(conn) if conn is not None else None
+        with self._lock:
+            self._generation[auto_id] = self._generation.get(auto_id, 0) + 1
+            for k in [k for k in self._entries if k[0] == auto_id]:
+                self._drop(k)
+            if version is not None:
+                self._version = version
+
+    def invalidate(self):
+        with self._lock:
+            self._clear()
+
+    def _clear(self):
+        self._entries.clear()
+        self._bytes = 0
+        self._epoch += 1
+
+    def _drop(self, k):
+        _, size = self._entries.pop(k)
+        self._bytes -= size
+
+    # ------------------------------------------------------------------
+    # Olvasás / tárolás
+    # ------------------------------------------------------------------
+
+    def get(self, key: tuple) -> CarStats | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: tuple, stats: CarStats):
+        """Tárolás; a számítás közben elavult kulcs (új korszak vagy generáció) eldobódik."""
+        auto_id, epoch, generation, _ = key
+        size = _nbytes(stats)
+        with self._lock:
+            if epoch != self._epoch or generation != self._generation.get(auto_id, 0):
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (stats, size)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries
+                                     or self._bytes > self.max_bytes):
+                self._drop(next(iter(self._entries)))
+
+    def stats(self) -> dict:
+        """{entries, bytes, hits, misses, hit_rate}"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
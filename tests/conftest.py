@@ -0,0 +1,82 @@
+"""
+Közös pytest segédek: a modulok a repó gyökeréből importálódnak, az
+adatbázis tesztek ideiglenes, init_db()-vel létrehozott fájlon futnak.
+"""
+
+import os
+import random
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import init_db, KATEGORIA_ID_SQL  # noqa: E402
+
+KATEGORIAK = ("Tankolás", "Karbantartás", "Egyéb", "Biztosítás")
+MEGJEGYZESEK = ("", "Olajcsere", "olaj + szűrő", "Téli gumi", "fékbetét", "mosás", None)
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    """Képernyő nélküli QApplication a Qt felület tesztjeihez (PyQt6 nélkül kimarad)."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    widgets = pytest.importorskip("PyQt6.QtWidgets")
+    return widgets.QApplication.instance() or widgets.QApplication([])
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "auto_naplo.db")
+    init_db(path)
+    return path
+
+
+@pytest.fixture
+def conn(db_path):
+    c = sqlite3.connect(db_path)
+    c.execute("PRAGMA foreign_keys = ON")
+    yield c
+    c.close()
+
+
+def add_car(conn, marka="Teszt", tipus="Autó", km=0) -> int:
+    cur = conn.execute("INSERT INTO autok (marka, tipus, km_allas) VALUES (?,?,?)",
+                       (marka, tipus, km))
+    return cur.lastrowid
+
+
+def add_entry(conn, auto_id, kategoria="Tankolás", datum="2024.01.01", osszeg=0.0,
+              km=None, liter=None, ar=None, kut=None, megj="") -> int:
+    cur = conn.execute(
+        "INSERT INTO szerviz_adatok (auto_id, datum, kategoria_id, osszeg, km_allas, "
+        "mennyiseg_liter, egysegar_ft_l, benzinkut, megjegyzes) "
+        f"VALUES (?,?,{KATEGORIA_ID_SQL},?,?,?,?,?,?)",
+        (auto_id, datum, kategoria, osszeg, km, liter, ar, kut, megj))
+    return cur.lastrowid
+
+
+def random_datum(rng: random.Random) -> str:
+    """Többnyire 'YYYY.MM.DD', néha régi kötőjeles alak vagy érvénytelen szöveg."""
+    ev, ho, nap = rng.randint(2019, 2025), rng.randint(1, 12), rng.randint(1, 28)
+    forma = rng.random()
+    if forma < 0.1:
+        return f"{ev}-{ho:02}-{nap:02}"
+    if forma < 0.13:
+        return "nincs dátum"
+    return f"{ev}.{ho:02}.{nap:02}"
+
+
+def random_entry(rng: random.Random, cars) -> dict:
+    return {
+        "auto_id": rng.choice(cars),
+        "kategoria": rng.choice(KATEGORIAK),
+        "datum": random_datum(rng),
+        # Két tizedesnél pontosabb összegek is (pl. importált adatok)
+        "osszeg": rng.choice((round(rng.uniform(0, 50000), rng.choice((0, 2, 3, 5))), None)),
+        "km": rng.choice((rng.randint(1000, 300000), None)),
+        "liter": rng.choice((round(rng.uniform(5, 60), 3), round(rng.uniform(5, 60), 7), None)),
+        "ar": rng.choice((round(rng.uniform(500, 700), 1), round(rng.uniform(500, 700), 4), None)),
+        "megj": rng.choice(MEGJEGYZESEK),
+    }
@@ -0,0 +1,140 @@
+import os
+import threading
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("matplotlib")
+
+from chart_renderer import ChartRenderer, data_digest  # noqa: E402
+
+# A jelmagyarázat emoji ikonjai a teszt környezet betűkészletéből hiányozhatnak
+pytestmark = pytest.mark.filterwarnings("ignore:Glyph .* missing from font")
+
+SZINEK = {"bg": "#0f172a", "fg": "#e2e8f0", "grid": "#334155"}
+PNG = b"\x89PNG\r\n\x1a\n"
+
+
+def _havi(szorzo=1.0):
+    return (("2025.04", "2025.05", "2025.06"),
+            np.array([20000.0, 35000.0, 18000.0]) * szorzo,
+            np.array([40.0, 70.0, 36.0]) * szorzo)
+
+
+def test_key_follows_data_content():
+    a = ChartRenderer.key(1, "havi", "dark", 90, _havi())
+    assert a == ChartRenderer.key(1, "havi", "dark", 90, _havi())
+    assert a != ChartRenderer.key(1, "havi", "dark", 90, _havi(1.01))
+    assert a != ChartRenderer.key(1, "havi", "light", 90, _havi())
+    assert a != ChartRenderer.key(1, "havi", "dark", 120, _havi())
+    # A tömb típusa is a lenyomat része
+    assert data_digest((np.array([1, 2]),)) != data_digest((np.array([1.0, 2.0]),))
+
+
+def test_render_cached_in_memory_and_on_disk(tmp_path):
+    cache_dir = str(tmp_path / "charts")
+    renderer = ChartRenderer(cache_dir)
+    key = renderer.key(1, "havi", "dark", 60, _havi())
+    assert renderer.cached(key) is None
+    png = renderer.render(key, _havi(), SZINEK)
+    assert png.startswith(PNG)
+    assert renderer.render(key, _havi(), SZINEK) is png
+    assert renderer.stats()["renders"] == 1 and renderer.stats()["hits"] == 1
+    assert len(os.listdir(cache_dir)) == 1
+
+    # Újraindítás után a lemezről, rajzolás nélkül
+    ujra = ChartRenderer(cache_dir)
+    assert ujra.cached(key) == png
+    assert ujra.stats()["disk_hits"] == 1 and ujra.stats()["renders"] == 0
+    ujra.clear()
+    assert ujra.stats()["memory_items"] == 0
+
+
+def test_memory_limit_keeps_latest():
+    renderer = ChartRenderer(memory_bytes=1)
+    keys = [renderer.key(1, "havi", "dark", 60, _havi(m)) for m in (1, 2, 3)]
+    for key, m in zip(keys, (1, 2, 3)):
+        renderer.render(key, _havi(m), SZINEK)
+    assert renderer.stats()["memory_items"] == 1
+    assert renderer.cached(keys[0]) is None and renderer.cached(keys[2]) is not None
+
+
+def test_disk_pruned_oldest_first(tmp_path):
+    cache_dir = str(tmp_path / "charts")
+    renderer = ChartRenderer(cache_dir)
+    keys = [renderer.key(1, "havi", "dark", 60, _havi(m)) for m in (1, 2, 3)]
+    for i, (key, m) in enumerate(zip(keys, (1, 2, 3))):
+        renderer.render(key, _havi(m), SZINEK)
+        os.utime(renderer._path(key), (1000 + i, 1000 + i))
+    egy = os.path.getsize(renderer._path(keys[2]))
+
+    ChartRenderer(cache_dir, disk_bytes=egy)
+    assert [os.path.exists(renderer._path(k)) for k in keys] == [False, False, True]
+
+
+def test_submit_delivers_only_latest():
+    renderer = ChartRenderer()
+    owner, kapott, done = object(), [], threading.Event()
+    keys = [renderer.key(1, "havi", "dark", 60, _havi(m)) for m in (1, 2)]
+
+    def callback(png):
+        kapott.append(png)
+        done.set()
+
+    with renderer._lock:                          # a worker csak a két kérés után juthat szóhoz
+        renderer.submit(owner, keys[0], _havi(1), SZINEK, callback)
+        renderer.submit(owner, keys[1], _havi(2), SZINEK, callback)
+    assert done.wait(10)
+    assert kapott == [renderer.cached(keys[1])]
+    assert renderer.cached(keys[0]) is None       # a felülírt kérés el sem készült
+    assert not renderer.cancel(owner)
+
+
+# ----------------------------------------------------------------------
+# Hosszú életű Figure-ök (LiveChart)
+# ----------------------------------------------------------------------
+
+def _kep(png):
+    from matplotlib import image
+    import io
+    return image.imread(io.BytesIO(png), format="png")
+
+
+def _fogyasztas(y):
+    return np.arange(1, len(y) + 1), np.array(y, dtype=float), tuple(f"2025.0{i}.01" for i in range(1, len(y) + 1))
+
+
+@pytest.mark.parametrize("chart, elso, masodik", [
+    ("havi", _havi(1.0), _havi(1.02)),
+    ("fogyasztas", _fogyasztas([6.1, 7.4, 6.8]), _fogyasztas([6.5, 7.4, 6.1])),
+    ("eves", ("2025", ("01", "02"), np.array([1000.0, 2000.0]), np.array([0.0, 500.0]),
+              np.array([100.0, 0.0])),
+             ("2025", ("01", "02"), np.array([1100.0, 2000.0]), np.array([0.0, 520.0]),
+              np.array([90.0, 10.0]))),
+    ("idosor", ("Költség", ("a", "b", "c"), np.array([10.0, 30.0, 20.0]), "#3b82f6"),
+               ("Költség", ("a", "b", "c"), np.array([30.0, 10.0, 25.0]), "#3b82f6")),
+])
+def test_blit_matches_full_draw(chart, elso, masodik):
+    # Azonos elrendezésnél (tengely határok, címkék) a háttér visszatöltése és az
+    # adat artistek rajzolása ugyanazt a képet adja, mint a teljes rajzolás
+    renderer = ChartRenderer()
+    renderer.render(renderer.key(1, chart, "dark", 60, elso), elso, SZINEK)
+    blit = renderer.render(renderer.key(1, chart, "dark", 60, masodik), masodik, SZINEK)
+    assert (renderer.stats()["full_draws"], renderer.stats()["blits"]) == (1, 1)
+
+    teljes = ChartRenderer().render(renderer.key(1, chart, "dark", 60, masodik), masodik, SZINEK)
+    assert np.abs(_kep(blit) - _kep(teljes)).max() < 1e-6
+
+
+def test_layout_or_theme_change_redraws_fully():
+    renderer = ChartRenderer()
+    vilagos = {"bg": "#ffffff", "fg": "#0f172a", "grid": "#e2e8f0"}
+    harom = (("2025.04", "2025.05", "2025.06", "2025.07"),
+             np.array([20000.0, 35000.0, 18000.0, 1000.0]), np.array([40.0, 70.0, 36.0, 2.0]))
+    for data, szinek in ((_havi(), SZINEK), (_havi(1.01), SZINEK),   # blit
+                         (harom, SZINEK),                            # új hónap: új tengely
+                         (_havi(5.0), SZINEK),                       # nagyobb tengely határ
+                         (_havi(5.0), vilagos)):                     # témaváltás
+        renderer.render(renderer.key(1, "havi", str(szinek), 60, data), data, szinek)
+    assert renderer.stats()["figures"] == 1
+    assert (renderer.stats()["full_draws"], renderer.stats()["blits"]) == (4, 1)
@@ -0,0 +1,114 @@
+import json
+import os
+import time
+
+import pytest
+
+import config as config_module
+from config import ConfigManager, DEFAULT_SETTINGS
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "config.json")
+
+
+def _fajl(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _kulso_iras(path, data):
+    """Másik folyamat írása: új tartalom, biztosan eltérő mtime."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+
+def test_defaults_and_typed_getters(path):
+    _kulso_iras(path, {"font_size": "16", "auto_backup": "igen", "oil_warning_km": "sok"})
+    cfg = ConfigManager(path)
+    assert cfg.get("accent_color") == DEFAULT_SETTINGS["accent_color"]
+    assert cfg.get_int("font_size") == 16
+    assert cfg.get_bool("auto_backup") is True
+    # Érvénytelen érték helyett az alapérték
+    assert cfg.get_int("oil_warning_km") == DEFAULT_SETTINGS["oil_warning_km"]
+    assert cfg.get_float("nincs", 1.5) == 1.5
+
+
+def test_corrupt_file_falls_back_to_defaults(path):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{ nem json")
+    assert ConfigManager(path).snapshot() == DEFAULT_SETTINGS
+
+
+def test_reads_served_from_memory(path, monkeypatch):
+    _kulso_iras(path, {"font_size": 18})
+    cfg = ConfigManager(path)
+    opened, stats = [], []
+    real_open, real_stat = open, os.stat
+    monkeypatch.setattr("builtins.open", lambda f, *a, **k: opened.append(f) or real_open(f, *a, **k))
+    monkeypatch.setattr(os, "stat", lambda f, *a, **k: stats.append(f) or real_stat(f, *a, **k))
+    for _ in range(1000):
+        assert cfg.get_int("font_size") == 18
+    # Sem olvasás, sem mtime ellenőrzés a RELOAD_CHECK_S időn belül
+    assert path not in opened and path not in stats
+
+
+def test_external_change_reloaded_by_mtime(path, monkeypatch):
+    _kulso_iras(path, {"font_size": 18})
+    cfg = ConfigManager(path)
+    monkeypatch.setattr(cfg, "RELOAD_CHECK_S", 0.0)
+    _kulso_iras(path, {"font_size": 20})
+    assert cfg.get("font_size") == 20
+    # Függő (még ki nem írt) saját módosítás mellett nincs újraolvasás
+    monkeypatch.setattr(cfg, "SAVE_DELAY_S", 60)
+    cfg.set("dark_mode", False)
+    _kulso_iras(path, {"font_size": 22})
+    assert cfg.get("font_size") == 20 and cfg.get("dark_mode") is False
+    cfg.flush()
+    assert _fajl(path)["font_size"] == 20
+
+
+def test_writes_coalesced_into_one_save(path, monkeypatch):
+    monkeypatch.setattr(ConfigManager, "SAVE_DELAY_S", 0.05)
+    cfg = ConfigManager(path)
+    saves = []
+    real_save = cfg.save
+    monkeypatch.setattr(cfg, "save", lambda: saves.append(1) or real_save())
+    for i in range(50):
+        cfg.set("font_size", i)
+    cfg.update({"dark_mode": False, "accent_color": "#000000"})
+    assert not os.path.exists(path)
+    deadline = time.monotonic() + 5
+    while not saves:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    cfg.flush()                                   # nincs függő módosítás: nincs újabb írás
+    assert saves == [1]
+    data = _fajl(path)
+    assert (data["font_size"], data["dark_mode"], data["accent_color"]) == (49, False, "#000000")
+
+
+def test_failed_save_keeps_old_file(path, monkeypatch):
+    cfg = ConfigManager(path)
+    cfg.set("font_size", 15)
+    cfg.flush()
+
+    def hibas_csere(src, dst):
+        raise OSError("lemez megtelt")
+
+    monkeypatch.setattr(config_module.os, "replace", hibas_csere)
+    cfg.set("font_size", 99)
+    cfg.flush()
+    assert _fajl(path)["font_size"] == 15
+    # A módosítás függő marad, a következő sikeres mentés kiírja
+    monkeypatch.undo()
+    cfg.flush()
+    assert _fajl(path)["font_size"] == 99
+
+
+def test_for_path_shares_instance(path):
+    assert ConfigManager.for_path(path) is ConfigManager.for_path(os.path.join(os.path.dirname(path),
+                                                                               ".", "config.json"))
@@ -0,0 +1,116 @@
+import gc
+import sqlite3
+import threading
+
+import pytest
+
+from connection_manager import ConnectionManager, profile_pragmas
+
+
+@pytest.fixture
+def manager(tmp_path):
+    m = ConnectionManager(str(tmp_path / "cm.db"))
+    with m.writer() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+    yield m
+    m.close_all()
+
+
+def _count(conn):
+    return conn.execute("SELECT COUNT(*) FROM t").fetchone()[0]
+
+
+def test_reader_reused_within_thread(manager):
+    assert manager.reader() is manager.reader()
+
+
+def test_reader_closed_when_thread_exits(manager):
+    conns = []
+
+    def work():
+        conns.append(manager.reader())
+        _count(conns[-1])
+
+    threads = [threading.Thread(target=work) for _ in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    gc.collect()
+
+    assert manager.stats()["open"] == 1          # csak az író kapcsolat
+    assert manager.stats()["opened"] == 11
+    with pytest.raises(sqlite3.ProgrammingError):
+        conns[0].execute("SELECT 1")
+
+
+def test_open_reader_owned_by_caller(manager):
+    conn = manager.open_reader()
+    assert manager.stats()["open"] == 2
+    manager.release_reader(conn)
+    assert manager.stats()["open"] == 1
+    manager.release_reader(conn)                 # ismételt lezárás nem hiba
+
+
+def test_writer_commits_at_block_end(manager):
+    with manager.writer() as conn:
+        conn.execute("INSERT INTO t VALUES (1)")
+    assert _count(manager.reader()) == 1
+
+
+def test_writer_rolls_back_on_error(manager):
+    with pytest.raises(ZeroDivisionError):
+        with manager.writer() as conn:
+            conn.execute("INSERT INTO t VALUES (1)")
+            1 / 0
+    assert _count(manager.reader()) == 0
+
+
+def test_nested_writer_blocks_are_one_transaction(manager):
+    with manager.writer() as outer:
+        outer.execute("INSERT INTO t VALUES (1)")
+        with manager.writer() as inner:
+            assert inner is outer
+            inner.execute("INSERT INTO t VALUES (2)")
+        # A belső blokk vége még nem commit
+        assert _count(manager.reader()) == 0
+    assert _count(manager.reader()) == 2
+
+
+def test_failed_inner_block_rolls_back_outer(manager):
+    with manager.writer() as outer:
+        outer.execute("INSERT INTO t VALUES (1)")
+        try:
+            with manager.writer() as inner:
+                inner.execute("INSERT INTO t VALUES (2)")
+                raise ValueError
+        except ValueError:
+            pass
+    assert _count(manager.reader()) == 0
+
+
+def test_writer_block_holds_write_lock(manager):
+    order = []
+
+    def other():
+        with manager.writer() as conn:
+            order.append("other")
+            conn.execute("INSERT INTO t VALUES (2)")
+
+    with manager.writer() as conn:
+        t = threading.Thread(target=other)
+        t.start()
+        t.join(timeout=0.2)
+        # A másik szál a blokk végéig vár
+        assert t.is_alive() and order == []
+        order.append("main")
+        conn.execute("INSERT INTO t VALUES (1)")
+    t.join()
+    assert order == ["main", "other"]
+    assert _count(manager.reader()) == 2
+
+
+def test_profile_pragmas_skip_invalid_values():
+    pragmas = profile_pragmas({"journal_mode": "wal", "synchronous": "SOMETIMES",
+                               "cache_size_kb": 2048, "mmap_size_mb": "x"})
+    assert pragmas == ["PRAGMA journal_mode = WAL", "PRAGMA cache_size = -2048"]
@@ -0,0 +1,139 @@
+import dataclasses
+
+import pytest
+
+from data_events import EventBus, EntryChange, ViewRegistry, INSERTED, DELETED
+
+
+# ----------------------------------------------------------------------
+# EventBus
+# ----------------------------------------------------------------------
+
+def test_subscribers_run_in_order_once():
+    bus, calls = EventBus(), []
+    first = bus.subscribe(lambda ev: calls.append(("első", ev.entry_id)))
+    bus.subscribe(first)                          # ismételt feliratkozás nem duplikál
+    bus.subscribe(lambda ev: calls.append(("második", ev.entry_id)))
+    bus.publish(EntryChange(INSERTED, 7, 1, "Tankolás", ("sor",)))
+    assert calls == [("első", 7), ("második", 7)]
+
+    bus.unsubscribe(first)
+    bus.unsubscribe(first)
+    bus.publish(EntryChange(DELETED, 8, 1, "Tankolás"))
+    assert calls[-1] == ("második", 8) and len(calls) == 3
+
+
+def test_failing_subscriber_does_not_stop_others():
+    bus, calls = EventBus(), []
+
+    def hibas(ev):
+        raise RuntimeError("bezárt fül")
+
+    bus.subscribe(hibas)
+    bus.subscribe(lambda ev: calls.append(ev.kind))
+    bus.publish(EntryChange(DELETED, 1, 1, "Egyéb"))
+    assert calls == [DELETED]
+
+
+def test_entry_change_is_immutable():
+    ev = EntryChange(DELETED, 1, 2, "Egyéb")
+    assert ev.row is None
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        ev.entry_id = 3
+
+
+# ----------------------------------------------------------------------
+# ViewRegistry
+# ----------------------------------------------------------------------
+
+class _Nezet:
+    def __init__(self, registry, name, tables, patch=None, cancel=None):
+        self.refreshes = 0
+        registry.register(name, self.refresh, tables, patch, cancel)
+
+    def refresh(self):
+        self.refreshes += 1
+
+
+@pytest.fixture
+def nezetek():
+    views = ViewRegistry()
+    lista = _Nezet(views, "lista", {"szerviz_adatok"})
+    stat = _Nezet(views, "stat", {"szerviz_adatok", "autok"})
+    bizt = _Nezet(views, "bizt", {"biztositas"})
+    views.set_car(1)
+    views.show("lista")
+    return views, lista, stat, bizt
+
+
+def test_only_visible_view_refreshes(nezetek):
+    views, lista, stat, bizt = nezetek
+    assert (lista.refreshes, stat.refreshes, bizt.refreshes) == (1, 0, 0)
+    views.show("stat")
+    views.show("lista")                           # nem piszkos: nincs újabb frissítés
+    assert (lista.refreshes, stat.refreshes) == (1, 1)
+
+
+def test_invalidate_marks_dependent_views(nezetek):
+    views, lista, stat, bizt = nezetek
+    views.show("stat")
+    views.invalidate("biztositas")
+    assert stat.refreshes == 1 and views.is_dirty("bizt") and not views.is_dirty("lista")
+
+    views.invalidate("szerviz_adatok")            # a látható azonnal, a másik megjelenéskor
+    assert stat.refreshes == 2 and lista.refreshes == 1 and views.is_dirty("lista")
+    views.show("lista")
+    assert lista.refreshes == 2
+
+    views.invalidate("szerviz_adatok", auto_id=2)  # másik autó nézetei nincsenek
+    assert not views.is_dirty("stat")
+    views.invalidate()
+    assert all(views.is_dirty(n) for n in ("stat", "bizt")) and lista.refreshes == 3
+
+
+def test_car_change_refreshes_on_show(nezetek):
+    views, lista, stat, bizt = nezetek
+    views.show("stat")
+    views.set_car(2)
+    assert stat.refreshes == 2 and views.is_dirty("lista")
+    views.show("lista")
+    assert lista.refreshes == 2
+
+
+def test_apply_patches_or_marks_dirty():
+    views, patched = ViewRegistry(), []
+    lista = _Nezet(views, "lista", {"szerviz_adatok"}, patch=lambda ev: patched.append(ev) or True)
+    stat = _Nezet(views, "stat", {"szerviz_adatok"})
+    views.set_car(1)
+    views.show("lista")
+    views.show("stat")
+
+    views.apply(EntryChange(DELETED, 5, 1, "Tankolás"))
+    # A lista helyben javul, a patch nélküli (látható) nézet újratöltődik
+    assert [ev.entry_id for ev in patched] == [5]
+    assert (lista.refreshes, stat.refreshes) == (1, 2) and not views.is_dirty("lista")
+    # Másik autó eseménye nem érinti a nézeteket
+    views.apply(EntryChange(DELETED, 6, 2, "Tankolás"))
+    assert len(patched) == 1 and stat.refreshes == 2
+
+
+def test_hidden_view_cancel_marks_dirty():
+    views, fut = ViewRegistry(), [True]
+    lista = _Nezet(views, "lista", {"szerviz_adatok"}, cancel=lambda: fut[0])
+    _Nezet(views, "stat", {"szerviz_adatok"})
+    views.show("lista")
+    views.show("stat")                            # a félbemaradt betöltés miatt piszkos
+    assert views.is_dirty("lista")
+    views.show("lista")
+    assert lista.refreshes == 2
+
+
+def test_failing_refresh_stays_dirty():
+    views = ViewRegistry()
+
+    def hibas():
+        raise RuntimeError("hiba")
+
+    views.register("hibas", hibas, {"autok"})
+    views.show("hibas")
+    assert views.is_dirty("hibas")
@@ -0,0 +1,451 @@
+import random
+import sqlite3
+from datetime import date
+
+import pytest
+
+import database
+from backup_manager import copy_database
+from config import ConfigManager, DB_PROFILES
+from connection_manager import ConnectionManager
+from database import (init_db, check_query_plans, datum_nap, honap_kulcs, rebuild_havi_osszesito,
+                      rebuild_auto_osszesito, get_entry, list_entries, LIST_COLUMNS,
+                      fts_query, search_entries, reclassify_esemenyek, utolso_esemeny_km,
+                      ESEMENY_FEK, ESEMENY_GUMI, ESEMENY_OLAJ, ESEMENY_VEZERMU,
+                      HL_END, HL_START, KATEGORIA_ID_SQL,
+                      MANAGED_INDEXES, OBSOLETE_INDEXES, SEARCH_COLUMN_NAMES)
+
+from conftest import add_car, add_entry, random_entry
+
+
+# ----------------------------------------------------------------------
+# Teljesítmény profil (WAL)
+# ----------------------------------------------------------------------
+
+def test_init_db_persists_wal(tmp_path):
+    path = str(tmp_path / "wal.db")
+    init_db(path, DB_PROFILES["balanced"])
+    conn = sqlite3.connect(path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.close()
+
+
+def test_db_profile_overrides(tmp_path):
+    config = ConfigManager(str(tmp_path / "config.json"))
+    config.update({"db_profile": "fast", "db_pragmas": {"synchronous": "FULL", "ismeretlen": 1}})
+    profile = config.get_db_profile()
+    assert profile["synchronous"] == "FULL"
+    assert profile["cache_size_kb"] == DB_PROFILES["fast"]["cache_size_kb"]
+    assert "ismeretlen" not in profile
+
+    config.set("db_profile", "nincs ilyen")
+    assert config.get_db_profile()["cache_size_kb"] == DB_PROFILES["balanced"]["cache_size_kb"]
+
+
+def test_profile_applied_to_every_connection(db_path):
+    manager = ConnectionManager(db_path, profile=DB_PROFILES["balanced"])
+    try:
+        assert manager.reader().execute("PRAGMA synchronous").fetchone()[0] == 1   # NORMAL
+        with manager.writer() as conn:
+            assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2            # MEMORY
+        manager.set_profile(DB_PROFILES["safe"])
+        assert manager.reader().execute("PRAGMA synchronous").fetchone()[0] == 2   # FULL
+    finally:
+        manager.close_all()
+
+
+def test_copy_database_includes_wal_changes(db_path, tmp_path):
+    init_db(db_path, DB_PROFILES["balanced"])
+    live = sqlite3.connect(db_path)
+    live.execute("PRAGMA wal_autocheckpoint = 0")
+    add_car(live, "Mentés", "Teszt")
+    live.commit()
+
+    dest = str(tmp_path / "backup.db")
+    copy_database(db_path, dest)
+    copy = sqlite3.connect(dest)
+    assert copy.execute("SELECT marka FROM autok").fetchall() == [("Mentés",)]
+    copy.close()
+    live.close()
+
+
+# ----------------------------------------------------------------------
+# Kezelt indexek és lekérdezés tervek
+# ----------------------------------------------------------------------
+
+def _seed(conn, n=600, seed=1):
+    rng = random.Random(seed)
+    cars = [add_car(conn, "Autó", str(i)) for i in range(3)]
+    for _ in range(n):
+        e = random_entry(rng, cars)
+        add_entry(conn, e["auto_id"], e["kategoria"], e["datum"], e["osszeg"], e["km"],
+                  e["liter"], e["ar"], megj=e["megj"])
+    conn.commit()
+    return cars, rng
+
+
+def test_managed_indexes_in_place(conn):
+    indexes = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+    assert set(MANAGED_INDEXES) <= indexes
+    assert not indexes & set(OBSOLETE_INDEXES)
+
+
+def test_hot_queries_use_indexes(conn):
+    _seed(conn)
+    conn.execute("ANALYZE")
+    assert check_query_plans(conn) == []
+
+
+def test_check_query_plans_reports_full_scan(conn):
+    problems = check_query_plans(conn, {"rossz": ("SELECT * FROM szerviz_adatok WHERE megjegyzes = ?", ("x",))})
+    assert [name for name, _ in problems] == ["rossz"]
+
+
+def test_init_db_checks_plans_on_every_start(db_path, monkeypatch):
+    # A conftest már létrehozta a sémát: itt nincs migráció, az ellenőrzés mégis lefut
+    calls = []
+    monkeypatch.setattr(database, "check_query_plans", lambda conn: calls.append(conn) or [])
+    init_db(db_path)
+    init_db(db_path)
+    assert len(calls) == 2
+
+
+# ----------------------------------------------------------------------
+# Dátum kulcs oszlopok
+# ----------------------------------------------------------------------
+
+def _datum_kulcsok(conn, entry_id):
+    return conn.execute("SELECT datum_nap, honap_kulcs FROM szerviz_adatok WHERE id=?",
+                        (entry_id,)).fetchone()
+
+
+def test_datum_columns_filled_by_triggers(conn):
+    car = add_car(conn)
+    pont = add_entry(conn, car, datum="2024.03.15")
+    kotojel = add_entry(conn, car, datum="2024-03-15 10:00")
+    rossz = add_entry(conn, car, datum="tavaly")
+    nap = date(2024, 3, 15).toordinal()
+    assert _datum_kulcsok(conn, pont) == (nap, 202403)
+    assert _datum_kulcsok(conn, kotojel) == (nap, 202403)
+    assert _datum_kulcsok(conn, rossz) == (None, None)
+    assert datum_nap("2024.03.15") == nap and datum_nap("tavaly") is None
+
+    conn.execute("UPDATE szerviz_adatok SET datum='2023.12.31' WHERE id=?", (pont,))
+    assert _datum_kulcsok(conn, pont) == (date(2023, 12, 31).toordinal(), 202312)
+
+
+def test_honap_kulcs_offsets():
+    assert honap_kulcs(date(2024, 1, 20)) == 202401
+    assert honap_kulcs(date(2024, 1, 20), -1) == 202312
+    assert honap_kulcs(date(2024, 1, 20), -13) == 202212
+    assert honap_kulcs(date(2024, 11, 1), 3) == 202502
+
+
+# ----------------------------------------------------------------------
+# Trigger által vezetett összesítők
+# ----------------------------------------------------------------------
+
+_UPDATE_OSZLOPOK = {
+    "auto_id": "auto_id", "kategoria": f"kategoria_id={KATEGORIA_ID_SQL}", "datum": "datum",
+    "osszeg": "osszeg", "km": "km_allas", "liter": "mennyiseg_liter", "ar": "egysegar_ft_l",
+    "megj": "megjegyzes",
+}
+
+
+def _random_muveletek(conn, n=400, seed=7):
+    """Véletlen beszúrás / módosítás / törlés sorozat (autó törléssel együtt)."""
+    cars, rng = _seed(conn, n=150, seed=seed)
+    for _ in range(n):
+        ids = [r[0] for r in conn.execute("SELECT id FROM szerviz_adatok")]
+        op = rng.random()
+        if op < 0.45 or not ids:
+            e = random_entry(rng, cars)
+            add_entry(conn, e["auto_id"], e["kategoria"], e["datum"], e["osszeg"], e["km"],
+                      e["liter"], e["ar"], megj=e["megj"])
+        elif op < 0.8:
+            e = random_entry(rng, cars)
+            keys = rng.sample(sorted(_UPDATE_OSZLOPOK), rng.randint(1, 4))
+            sets = ", ".join(f"{_UPDATE_OSZLOPOK[k]}" if k == "kategoria" else f"{_UPDATE_OSZLOPOK[k]}=?"
+                             for k in keys)
+            conn.execute(f"UPDATE szerviz_adatok SET {sets} WHERE id=?",
+                         (*(e[k] for k in keys), rng.choice(ids)))
+        else:
+            conn.execute("DELETE FROM szerviz_adatok WHERE id=?", (rng.choice(ids),))
+    # Kaszkád törlés: az autó bejegyzései a triggereken keresztül tűnnek el
+    conn.execute("DELETE FROM autok WHERE id=?", (cars[-1],))
+    conn.commit()
+
+
+def _tabla(conn, sql):
+    return {tuple(r[:-3]): r[-3:] for r in conn.execute(sql)}
+
+
+def _egyezik(kapott, vart):
+    assert kapott.keys() == vart.keys()
+    for key, (osszeg, liter, db) in vart.items():
+        assert kapott[key] == (pytest.approx(osszeg, abs=1e-6), pytest.approx(liter, abs=1e-6), db), key
+
+
+HAVI_SQL = "SELECT auto_id, honap_kulcs, kategoria_id, osszeg, liter, db FROM havi_osszesito"
+
+
+def test_havi_osszesito_triggers_match_rebuild(conn):
+    _random_muveletek(conn)
+    triggerrel = _tabla(conn, HAVI_SQL)
+    valodi = _tabla(conn, """
+        SELECT auto_id, honap_kulcs, kategoria_id, SUM(COALESCE(osszeg, 0)),
+               SUM(COALESCE(mennyiseg_liter, 0)), COUNT(*)
+        FROM szerviz_adatok WHERE honap_kulcs IS NOT NULL
+        GROUP BY auto_id, honap_kulcs, kategoria_id
+    """)
+    rebuild_havi_osszesito(conn)
+    _egyezik(triggerrel, _tabla(conn, HAVI_SQL))
+    _egyezik(triggerrel, valodi)
+
+
+def test_havi_osszesito_not_rounded_per_step(conn):
+    car = add_car(conn)
+    for _ in range(3):
+        add_entry(conn, car, datum="2024.05.01", osszeg=0.004)
+    assert conn.execute("SELECT osszeg FROM havi_osszesito").fetchone()[0] == pytest.approx(0.012)
+
+
+def _auto_sorok(conn):
+    cur = conn.execute("SELECT * FROM auto_osszesito ORDER BY auto_id")
+    nevek = [d[0] for d in cur.description]
+    return [dict(zip(nevek, r)) for r in cur]
+
+
+def test_auto_osszesito_triggers_match_rebuild(conn):
+    _random_muveletek(conn)
+    triggerrel = _auto_sorok(conn)
+    rebuild_auto_osszesito(conn)
+    ujra = _auto_sorok(conn)
+    assert len(triggerrel) == len(ujra)
+    for kapott, vart in zip(triggerrel, ujra):
+        for oszlop, ertek in vart.items():
+            if isinstance(ertek, float):
+                assert kapott[oszlop] == pytest.approx(ertek, abs=1e-6), oszlop
+            else:
+                assert kapott[oszlop] == ertek, oszlop
+
+
+def test_auto_osszesito_not_rounded_per_step(conn):
+    car = add_car(conn)
+    for _ in range(3):
+        add_entry(conn, car, "Tankolás", "2024.05.01", osszeg=0.004, liter=0.0004)
+    osszeg, liter = conn.execute("SELECT tankolas_osszeg, tankolas_liter FROM auto_osszesito "
+                                 "WHERE auto_id=?", (car,)).fetchone()
+    assert (osszeg, liter) == (pytest.approx(0.012), pytest.approx(0.0012))
+
+
+def test_utolso_tankolas_by_datum_nap(conn):
+    car = add_car(conn)
+    add_entry(conn, car, "Tankolás", "2024.01.05", km=1000)
+    # A régi kötőjeles alak szövegként a '2024.01.05' elé rendeződne
+    add_entry(conn, car, "Tankolás", "2024-04-05", km=2000)
+    add_entry(conn, car, "Tankolás", "nincs dátum", km=3000)
+
+    def utolso():
+        return conn.execute("SELECT utolso_tankolas_datum, utolso_tankolas_km FROM auto_osszesito "
+                            "WHERE auto_id=?", (car,)).fetchone()
+
+    assert utolso() == ("2024-04-05", 2000)
+    # Azonos napon a később felvett bejegyzés az utolsó
+    b = add_entry(conn, car, "Tankolás", "2024.04.05", km=2100)
+    assert utolso() == ("2024.04.05", 2100)
+    conn.execute("UPDATE szerviz_adatok SET datum='2023.12.31' WHERE id=?", (b,))
+    assert utolso() == ("2024-04-05", 2000)
+
+
+# ----------------------------------------------------------------------
+# Teljes szöveges keresés
+# ----------------------------------------------------------------------
+
+def _talalatok(conn, car, kategoria, text):
+    return [r[0] for r in search_entries(conn, car, kategoria, text)]
+
+
+def test_fts_query_terms():
+    assert fts_query("olaj szűrő") == '"olaj"* "szűrő"*'
+    assert fts_query("2025.03") == '"2025 03"*'
+    assert fts_query("  -- ") is None
+
+
+def test_search_is_accent_insensitive_prefix_match(conn):
+    car = add_car(conn)
+    a = add_entry(conn, car, "Tankolás", "2025.03.02", kut="MOL Győr")
+    b = add_entry(conn, car, "Tankolás", "2024.11.20", kut="Shell", megj="győri út")
+    add_entry(conn, car, "Karbantartás", "2025.03.05", megj="Győr szerviz")
+    assert sorted(_talalatok(conn, car, "Tankolás", "gyor")) == [a, b]
+    assert _talalatok(conn, car, "Tankolás", "2025.03") == [a]
+    assert _talalatok(conn, car + 1, "Tankolás", "gyor") == []
+
+    row = search_entries(conn, car, "Tankolás", "mol")[0]
+    assert row[SEARCH_COLUMN_NAMES.index("benzinkut_hl")] == f"{HL_START}MOL{HL_END} Győr"
+
+
+def test_search_index_follows_updates_and_deletes(conn):
+    car = add_car(conn)
+    entry = add_entry(conn, car, "Egyéb", megj="autómosó")
+    conn.execute("UPDATE szerviz_adatok SET megjegyzes='parkolás' WHERE id=?", (entry,))
+    assert _talalatok(conn, car, "Egyéb", "mos") == []
+    assert _talalatok(conn, car, "Egyéb", "park") == [entry]
+    conn.execute("DELETE FROM szerviz_adatok WHERE id=?", (entry,))
+    assert _talalatok(conn, car, "Egyéb", "park") == []
+    assert search_entries(conn, car, "Egyéb", "!!") is None
+
+
+# ----------------------------------------------------------------------
+# Szerviz esemény típusok
+# ----------------------------------------------------------------------
+
+def _esemenyek(conn, entry_id):
+    return sorted(r[0] for r in conn.execute(
+        "SELECT esemeny FROM szerviz_esemenyek WHERE bejegyzes_id=?", (entry_id,)))
+
+
+def test_esemeny_classified_on_write(conn):
+    car = add_car(conn)
+    olaj = add_entry(conn, car, "Karbantartás", km=100000, megj="OLAJCSERE és fékbetét")
+    tankolas = add_entry(conn, car, "Tankolás", km=100500, megj="olaj utántöltés")
+    assert _esemenyek(conn, olaj) == [ESEMENY_FEK, ESEMENY_OLAJ]
+    assert _esemenyek(conn, tankolas) == []
+
+    conn.execute("UPDATE szerviz_adatok SET megjegyzes='téli gumi' WHERE id=?", (olaj,))
+    assert _esemenyek(conn, olaj) == [ESEMENY_GUMI]
+    conn.execute(f"UPDATE szerviz_adatok SET kategoria_id={KATEGORIA_ID_SQL} WHERE id=?", ("Egyéb", olaj))
+    assert _esemenyek(conn, olaj) == []
+
+
+@pytest.mark.parametrize("megj, vart", [
+    ("entire service", []),
+    ("fekete kárpit tisztítás", []),
+    ("fekvő rendszám tábla", []),
+    ("coil csere", []),
+    ("retiring timing belt", [ESEMENY_VEZERMU]),
+    ("Tire rotation", [ESEMENY_GUMI]),
+    ("első (fek) csere", [ESEMENY_FEK]),
+    ("fekbetet + fektarcsa", [ESEMENY_FEK]),
+    ("kézifék állítás", [ESEMENY_FEK]),
+    ("motorolaj, oil filter", [ESEMENY_OLAJ]),
+])
+def test_esemeny_patterns_match_word_starts(conn, megj, vart):
+    # A rövid angol és ékezet nélküli minták nem találnak más szavak belsejében
+    car = add_car(conn)
+    entry = add_entry(conn, car, "Karbantartás", km=100000, megj=megj)
+    assert _esemenyek(conn, entry) == vart
+    reclassify_esemenyek(conn)
+    assert _esemenyek(conn, entry) == vart
+
+
+def test_utolso_esemeny_km(conn):
+    car = add_car(conn)
+    add_entry(conn, car, "Karbantartás", km=90000, megj="olajcsere")
+    last = add_entry(conn, car, "Karbantartás", km=100000, megj="Olaj + szűrő")
+    add_entry(conn, car, "Karbantartás", km=0, megj="olaj (km nélkül)")
+    assert utolso_esemeny_km(conn, car) == 100000
+    conn.execute("DELETE FROM szerviz_adatok WHERE id=?", (last,))
+    assert utolso_esemeny_km(conn, car) == 90000
+    assert utolso_esemeny_km(conn, car, ESEMENY_VEZERMU) is None
+
+
+def test_esemeny_triggers_match_reclassify(conn):
+    _random_muveletek(conn)
+    triggerrel = sorted(conn.execute("SELECT * FROM szerviz_esemenyek").fetchall())
+    reclassify_esemenyek(conn)
+    assert sorted(conn.execute("SELECT * FROM szerviz_esemenyek").fetchall()) == triggerrel
+
+
+# ----------------------------------------------------------------------
+# Kategória kulcsok
+# ----------------------------------------------------------------------
+
+def test_entries_store_category_id(conn):
+    car = add_car(conn)
+    entry = add_entry(conn, car, "Karbantartás", "2024.05.01", osszeg=100)
+    kat_id = conn.execute("SELECT id FROM kategoriak WHERE nev='Karbantartás'").fetchone()[0]
+    assert "kategoria" not in {r[1] for r in conn.execute("PRAGMA table_info(szerviz_adatok)")}
+    assert conn.execute("SELECT kategoria_id FROM szerviz_adatok WHERE id=?", (entry,)).fetchone()[0] == kat_id
+    # A nézet a régi, név szerinti sor alakot adja
+    assert get_entry(conn, entry)[4] == "Karbantartás"
+
+
+def test_unknown_category_name_rejected(conn):
+    car = add_car(conn)
+    with pytest.raises(sqlite3.IntegrityError):
+        add_entry(conn, car, "Nincs ilyen", "2024.05.01")
+
+
+def test_category_rename_is_single_update(conn):
+    car = add_car(conn)
+    conn.execute("INSERT INTO kategoriak (nev) VALUES ('Parkolás')")
+    entry = add_entry(conn, car, "Parkolás", "2024.05.01", osszeg=800)
+    havi = _tabla(conn, HAVI_SQL)
+
+    conn.execute("UPDATE kategoriak SET nev='Parkolódíj' WHERE nev='Parkolás'")
+    assert [r[0] for r in list_entries(conn, car, "Parkolódíj")] == [entry]
+    assert list_entries(conn, car, "Parkolás") == []
+    # Az összesítők azonosítóval kulcsolnak, így nem változnak
+    assert _tabla(conn, HAVI_SQL) == havi
+    assert conn.execute("SELECT egyeb_osszeg, egyeb_db FROM auto_osszesito WHERE auto_id=?",
+                        (car,)).fetchone() == (800, 1)
+
+
+# ----------------------------------------------------------------------
+# Lapozott bejegyzés lista
+# ----------------------------------------------------------------------
+
+def _teljes_lista(conn, car, kategoria, order, desc, where="", params=()):
+    irany = "DESC" if desc else "ASC"
+    nulls = "NULLS LAST" if desc else "NULLS FIRST"
+    return conn.execute(f"""
+        SELECT {LIST_COLUMNS} FROM szerviz_adatok_nevvel
+        WHERE auto_id=? AND kategoria=? {where}
+        ORDER BY {order} {irany} {nulls}, id {irany}
+    """, (car, kategoria, *params)).fetchall()
+
+
+def _lapozva(conn, car, kategoria, order, desc, limit, where="", params=()):
+    rows, after = [], None
+    while True:
+        lap = list_entries(conn, car, kategoria, order, desc, after, limit, where, params)
+        assert len(lap) <= limit
+        rows += lap
+        if len(lap) < limit:
+            return rows
+        after = lap[-1]
+
+
+@pytest.fixture
+def lista_db(conn):
+    cars, rng = _seed(conn, n=500, seed=3)
+    # Azonos rendezési kulcsok: a lapok határán az id dönt
+    for _ in range(40):
+        add_entry(conn, cars[0], "Tankolás", rng.choice(("2024.01.01", "2024.01.02")),
+                  osszeg=rng.choice((1000, 2000, None)), km=rng.choice((5000, None)))
+    conn.commit()
+    return cars
+
+
+@pytest.mark.parametrize("order", ["datum", "osszeg", "km_allas"])
+@pytest.mark.parametrize("desc", [True, False])
+@pytest.mark.parametrize("limit", [1, 7, 100])
+def test_list_entries_pages_match_full_query(conn, lista_db, order, desc, limit):
+    for car in lista_db[:2]:
+        for kategoria in ("Tankolás", "Karbantartás"):
+            assert _lapozva(conn, car, kategoria, order, desc, limit) == \
+                _teljes_lista(conn, car, kategoria, order, desc)
+
+
+@pytest.mark.parametrize("order", ["datum", "osszeg"])
+def test_list_entries_pages_with_filter(conn, lista_db, order):
+    where, params = "AND datum >= ? AND (megjegyzes IS NULL OR megjegyzes != ?)", ("2022.01.01", "")
+    for desc in (True, False):
+        assert _lapozva(conn, lista_db[0], "Tankolás", order, desc, 9, where, params) == \
+            _teljes_lista(conn, lista_db[0], "Tankolás", order, desc, where, params)
+
+
+def test_list_entries_rejects_unknown_order(conn):
+    with pytest.raises(ValueError):
+        list_entries(conn, 1, "Tankolás", order="megjegyzes")
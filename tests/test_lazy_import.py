@@ -0,0 +1,80 @@
+import os
+import subprocess
+import sys
+import textwrap
+import time
+
+import pytest
+
+import lazy_import
+from lazy_import import StartupTimer, available, lazy, preload
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def modul(tmp_path, monkeypatch):
+    """Egyedi nevű, importáláskor számláló próba modul."""
+    name = f"lassu_modul_{time.monotonic_ns()}"
+    (tmp_path / f"{name}.py").write_text(textwrap.dedent("""
+        import time
+        time.sleep(0.01)
+        ERTEK = 42
+    """))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield name
+    sys.modules.pop(name, None)
+
+
+def test_lazy_imports_on_first_attribute(modul):
+    m = lazy(modul)
+    assert modul not in sys.modules and "halasztva" in repr(m)
+    assert m.ERTEK == 42
+    assert modul in sys.modules and "betöltve" in repr(m)
+    # Az első betöltés ideje egyszer rögzül
+    assert m.ERTEK == 42 and lazy(modul).ERTEK == 42
+    loads = [l for l in lazy_import._loads if l[0] == modul]
+    assert len(loads) == 1 and loads[0][2] >= 0.01
+
+
+def test_lazy_missing_module_raises_on_use():
+    m = lazy("nincs_ilyen_modul_xyz")
+    with pytest.raises(ImportError):
+        m.valami
+
+
+def test_available_without_import(modul):
+    assert available(modul) and modul not in sys.modules
+    assert available("json.decoder")
+    assert not available("nincs_ilyen_modul_xyz.al")
+
+
+def test_preload_skips_missing(modul):
+    done = []
+    preload((modul, "nincs_ilyen_modul_xyz"), on_done=done.append).join(5)
+    assert modul in sys.modules and len(done) == 1 and done[0] >= 0
+
+
+def test_startup_report_splits_at_window(monkeypatch):
+    monkeypatch.setattr(lazy_import, "_loads", [("numpy", 0.05, 0.2), ("fpdf", 0.5, 0.1)])
+    timer = StartupTimer()
+    timer._marks.update({"importok": 0.03, "ablak": 0.3})
+    assert timer.mark("ablak") == 0.3             # az első rögzítés marad
+    report = timer.report()
+    assert "ablak előtt importálva: numpy=200ms" in report
+    assert "ablak után: fpdf=100ms (nyereség 100 ms)" in report
+
+
+@pytest.mark.parametrize("modules", ["stats_engine, chart_renderer", "main_qt", "main"])
+def test_entry_points_defer_heavy_imports(modules):
+    if modules == "main_qt":
+        pytest.importorskip("PyQt6")
+    if modules == "main":
+        pytest.importorskip("customtkinter")
+    code = (f"import sys; import {modules}; "
+            "print([n for n in ('numpy', 'matplotlib', 'fpdf') if n in sys.modules])")
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    out = subprocess.run([sys.executable, "-c", code], cwd=REPO, env=env,
+                         capture_output=True, text=True, timeout=60)
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.strip().splitlines()[-1] == "[]"
@@ -0,0 +1,350 @@
+import random
+import sqlite3
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("PyQt6")
+
+import main_qt  # noqa: E402
+from connection_manager import ConnectionManager  # noqa: E402
+from data_events import EventBus, ViewRegistry, EntryChange, INSERTED, UPDATED, DELETED  # noqa: E402
+from database import get_entry  # noqa: E402
+import theme  # noqa: E402
+
+from conftest import add_car, add_entry, random_entry  # noqa: E402
+
+
+# ----------------------------------------------------------------------
+# Bejegyzés lista modell
+# ----------------------------------------------------------------------
+
+def _sorrend(keys: dict, desc: bool) -> list[int]:
+    """Az SQLite szerinti sorrend (NULL a legkisebb, azonos kulcsnál id szerint)."""
+    rank = lambda i: (keys[i] is not None, keys[i] if keys[i] is not None else 0, i)
+    return sorted(keys, key=rank, reverse=desc)
+
+
+def _modell(keys: dict, desc: bool, loads=None):
+    def load_page(ids):
+        if loads is not None:
+            loads.append(list(ids))
+        return {i: {"id": i, "datum": f"sor {i}"} for i in ids}
+
+    model = main_qt.EntryTableModel(load_page)
+    ids = _sorrend(keys, desc)
+    model.set_ids(ids, [keys[i] for i in ids], desc)
+    return model
+
+
+@pytest.mark.parametrize("desc", [True, False])
+def test_entry_model_upsert_remove_keep_order(qapp, desc):
+    rng = random.Random(11)
+    keys = {i: rng.choice((None, rng.randint(0, 20))) for i in range(1, 60)}
+    model = _modell(keys, desc)
+    for _ in range(300):
+        op = rng.random()
+        if op < 0.3 or not keys:
+            entry_id = max(keys, default=0) + 1
+        elif op < 0.75:
+            entry_id = rng.choice(list(keys))
+        else:
+            entry_id = rng.choice(list(keys))
+            del keys[entry_id]
+            model.remove(entry_id)
+            continue
+        keys[entry_id] = rng.choice((None, rng.randint(0, 20)))
+        model.upsert({"id": entry_id, "datum": f"új {entry_id}"}, keys[entry_id])
+        assert model._ids == _sorrend(keys, desc)
+        assert model._keys == [keys[i] for i in model._ids]
+    assert model.rowCount() == len(keys)
+
+
+def test_entry_model_signals(qapp):
+    model = _modell({1: 5, 2: 10, 3: 15}, desc=True)
+    jelek = []
+    model.dataChanged.connect(lambda a, b: jelek.append(("changed", a.row())))
+    model.rowsInserted.connect(lambda p, a, b: jelek.append(("inserted", a)))
+    model.rowsRemoved.connect(lambda p, a, b: jelek.append(("removed", a)))
+    model.modelReset.connect(lambda: jelek.append(("reset",)))
+
+    model.upsert({"id": 2, "datum": "módosítva"}, 11)       # a helyén marad
+    model.upsert({"id": 1, "datum": "áthelyezve"}, 20)       # a lista elejére kerül
+    model.upsert({"id": 4, "datum": "új"}, 12)
+    model.remove(3)
+    model.remove(99)                                        # ismeretlen id: nincs jel
+    assert jelek == [("changed", 1), ("removed", 2), ("inserted", 0),
+                     ("inserted", 2), ("removed", 1)]
+    assert model._ids == [1, 4, 2]
+    assert model.row(0)["datum"] == "áthelyezve" and model.row(2)["datum"] == "módosítva"
+
+
+def test_entry_model_loads_pages_lazily(qapp):
+    loads = []
+    n = main_qt.EntryTableModel.PAGE_SIZE * (main_qt.EntryTableModel.MAX_PAGES + 2)
+    model = _modell({i: i for i in range(1, n + 1)}, desc=True, loads=loads)
+    assert loads == []
+    assert model.row(0)["id"] == n and model.row(1)["id"] == n - 1
+    assert len(loads) == 1 and len(loads[0]) == model.PAGE_SIZE
+    for sor in range(0, n, model.PAGE_SIZE):
+        model.row(sor)
+    assert len(model._cache) == model.PAGE_SIZE * model.MAX_PAGES
+    # Az első lap már kiesett a gyorsítótárból, újra betöltődik
+    model.row(0)
+    assert len(loads) == n // model.PAGE_SIZE + 1
+
+
+def test_entry_model_search_rows(qapp):
+    model = _modell({1: 1, 2: 2}, desc=True)
+    model.set_rows([{"id": 7, "datum": "találat"}])
+    assert model.searching and model.rowCount() == 1
+    assert model.row(0)["datum"] == "találat"
+
+
+@pytest.mark.parametrize("sort", range(4))
+def test_entry_changes_patch_list_like_reload(qapp, conn, sort):
+    # Beszúrás / módosítás / törlés eseményei a listát a teljes újratöltéssel azonos állapotba hozzák
+    conn.row_factory = sqlite3.Row
+    rng = random.Random(21)
+    car = add_car(conn)
+    for _ in range(80):
+        e = random_entry(rng, [car])
+        add_entry(conn, car, "Tankolás", e["datum"], e["osszeg"], e["km"])
+
+    def betoltes():
+        return main_qt.TabContent._load_keys(conn, car, "Tankolás", col, desc)
+
+    tab = main_qt.TabContent(lambda: car, "Tankolás")
+    tab.sort_cb.blockSignals(True)                # a betöltés itt kézzel történik
+    tab.sort_cb.setCurrentIndex(sort)
+    col, desc = tab._sort_key()
+    tab._show_keys(betoltes(), desc)
+    for _ in range(150):
+        ids = [r[0] for r in betoltes()]
+        op = rng.random()
+        if op < 0.4 or not ids:
+            e = random_entry(rng, [car])
+            entry_id = add_entry(conn, car, "Tankolás", e["datum"], e["osszeg"], e["km"])
+            ev = EntryChange(INSERTED, entry_id, car, "Tankolás", get_entry(conn, entry_id))
+        elif op < 0.8:
+            e, entry_id = random_entry(rng, [car]), rng.choice(ids)
+            conn.execute("UPDATE szerviz_adatok SET datum=?, osszeg=?, km_allas=? WHERE id=?",
+                         (e["datum"], e["osszeg"], e["km"], entry_id))
+            ev = EntryChange(UPDATED, entry_id, car, "Tankolás", get_entry(conn, entry_id))
+        else:
+            entry_id = rng.choice(ids)
+            conn.execute("DELETE FROM szerviz_adatok WHERE id=?", (entry_id,))
+            ev = EntryChange(DELETED, entry_id, car, "Tankolás")
+        assert tab.apply_change(ev)
+        assert tab.model._ids == [r[0] for r in betoltes()]
+    # Másik kategória eseménye nem érinti a listát
+    assert tab.apply_change(EntryChange(DELETED, tab.model._ids[0], car, "Egyéb"))
+    assert tab.model._ids == [r[0] for r in betoltes()]
+
+
+# ----------------------------------------------------------------------
+# Háttér lekérdezések
+# ----------------------------------------------------------------------
+
+@pytest.fixture
+def loader(qapp, db_path, monkeypatch):
+    db = ConnectionManager(db_path)
+    monkeypatch.setattr(main_qt, "db", db)
+    loader = main_qt.DataLoader()
+    yield loader
+    loader.shutdown()
+    db.close_all()
+
+
+def _var(qapp, feltetel, timeout=5.0):
+    """Az eseményhurok futtatása, amíg a feltétel teljesül."""
+    hatarido = time.monotonic() + timeout
+    while not feltetel():
+        assert time.monotonic() < hatarido, "időtúllépés"
+        qapp.processEvents()
+        time.sleep(0.005)
+
+
+def test_loader_runs_job_off_gui_thread(qapp, loader):
+    owner, results = object(), []
+
+    def job(conn):
+        return threading.current_thread() is threading.main_thread(), \
+            conn.execute("SELECT COUNT(*) FROM autok").fetchone()[0]
+
+    loader.submit(owner, job, lambda r: results.append((r, threading.current_thread())))
+    assert loader.busy(owner)
+    _var(qapp, lambda: results)
+    assert results == [((False, 0), threading.main_thread())]
+    assert not loader.busy(owner)
+
+
+def test_loader_drops_stale_results(qapp, loader):
+    owner, results, gate = object(), [], threading.Event()
+
+    def lassu(conn):
+        gate.wait(5)
+        return "régi"
+
+    loader.submit(owner, lassu, results.append)
+    loader.submit(owner, lambda conn: "új", results.append)
+    other = loader.submit(object(), lambda conn: "másik", results.append)
+    gate.set()
+    _var(qapp, lambda: "új" in results and "másik" in results)
+    _var(qapp, lambda: not any(loader._pending))
+    assert sorted(results) == ["másik", "új"] and other > 0
+
+
+def test_loader_cancel_and_errors(qapp, loader):
+    owner, results, gate = object(), [], threading.Event()
+    loader.submit(owner, lambda conn: gate.wait(5), results.append)
+    assert loader.cancel(owner) and not loader.cancel(owner)
+    gate.set()
+
+    def hibas(conn):
+        raise sqlite3.OperationalError("hiba")
+
+    loader.submit(owner, hibas, results.append)
+    _var(qapp, lambda: not any(loader._pending))
+    assert results == [] and not loader.busy(owner)
+
+
+def test_loader_shutdown_releases_connections(qapp, loader):
+    done = []
+    for i in range(6):
+        loader.submit(i, lambda conn: conn.execute("SELECT 1").fetchone()[0], done.append)
+    _var(qapp, lambda: len(done) == 6)
+    # Workerenként egy olvasó kapcsolat, a kérések között megtartva
+    assert main_qt.db.stats()["open"] == main_qt.db.stats()["opened"] == loader.THREADS
+    loader.shutdown()
+    assert main_qt.db.stats()["open"] == 0
+
+
+# ----------------------------------------------------------------------
+# Jármű chip sáv
+# ----------------------------------------------------------------------
+
+@pytest.fixture
+def ablak(qapp, db_path, monkeypatch):
+    """Főablak ideiglenes adatbázissal, saját esemény busszal és háttér szálakkal."""
+    db = ConnectionManager(db_path, row_factory=sqlite3.Row)
+    for name, value in (("db", db), ("events", EventBus()), ("views", ViewRegistry()),
+                        ("loader", main_qt.DataLoader())):
+        monkeypatch.setattr(main_qt, name, value)
+    monkeypatch.setattr(main_qt, "start_update_check", lambda *a, **k: None)
+    monkeypatch.setattr(main_qt.MainWindow, "_check_reminders", lambda self: None)
+    w = main_qt.MainWindow()
+    yield w
+    w.deleteLater()
+    main_qt.loader.shutdown()
+    db.close_all()
+
+
+def _chip_sav(w):
+    lay = w.chip_lay
+    return [lay.itemAt(i).widget() for i in range(lay.count())
+            if isinstance(lay.itemAt(i).widget(), main_qt.CarChip)]
+
+
+def test_chips_updated_in_place(ablak):
+    with main_qt.get_db() as conn:
+        a = add_car(conn, "Opel", "Astra", 1000)
+        b = add_car(conn, "Fiat", "Punto")
+    ablak.refresh_cars()
+    chips = _chip_sav(ablak)
+    assert [c.cid for c in chips] == [a, b] and ablak.selected_car_id == a
+    assert chips[0].name_lbl.text() == "Opel Astra" and chips[1].km_lbl.text() == "— km"
+    assert chips[0].property("active") and not chips[1].property("active")
+
+    with main_qt.get_db() as conn:
+        c = add_car(conn, "Suzuki", "Swift")
+        conn.execute("UPDATE autok SET rendszam='ABC-123' WHERE id=?", (b,))
+    ablak.refresh_cars()
+    # A meglévő chip-ek ugyanazok a widgetek, csak az új autó kap újat
+    assert _chip_sav(ablak)[:2] == chips and [x.cid for x in _chip_sav(ablak)] == [a, b, c]
+    assert chips[1].rsz_lbl.text() == "ABC-123"
+
+    ablak._select_car(b)
+    assert not chips[0].property("active") and chips[1].property("active")
+
+    with main_qt.get_db() as conn:
+        conn.execute("DELETE FROM autok WHERE id=?", (b,))
+    ablak.refresh_cars()
+    assert [x.cid for x in _chip_sav(ablak)] == [a, c] and ablak.selected_car_id == a
+
+
+def test_entry_event_refreshes_one_chip(ablak):
+    with main_qt.get_db() as conn:
+        a = add_car(conn, "Opel", "Astra", 1000)
+        b = add_car(conn, "Fiat", "Punto", 500)
+    ablak.refresh_cars()
+    chip_a, chip_b = _chip_sav(ablak)
+    with main_qt.get_db() as conn:
+        entry_id = add_entry(conn, a, "Tankolás", "2024.05.01", km=123456)
+        row = get_entry(conn, entry_id)
+    main_qt.events.publish(EntryChange(INSERTED, entry_id, a, "Tankolás", row))
+    # A km állást a trigger írta az autóhoz; csak az érintett chip frissült
+    assert chip_a.km_lbl.text() == "123 456 km" and chip_b.km_lbl.text() == "500 km"
+    assert ablak._cars[a]["km_allas"] == 123456
+    assert chip_b.cid == b and ablak._cars[b]["km_allas"] == 500
+
+
+def test_reads_do_not_wait_for_writer(ablak):
+    with main_qt.get_db() as conn:
+        a = add_car(conn, "Opel", "Astra", 1000)
+    ablak.refresh_cars()
+    irasban, vege = threading.Event(), threading.Event()
+
+    def hosszu_iras():                          # pl. CSV import egy másik szálon
+        with main_qt.get_db() as conn:
+            conn.execute("UPDATE autok SET km_allas=2000 WHERE id=?", (a,))
+            irasban.set()
+            vege.wait(5)
+
+    t = threading.Thread(target=hosszu_iras)
+    t.start()
+    assert irasban.wait(5)
+    try:
+        start = time.monotonic()
+        ablak.refresh_cars()
+        ablak.refresh_car(a)
+        assert time.monotonic() - start < 1
+        # A még nem commitolt írás nem látszik
+        assert ablak._cars[a]["km_allas"] == 1000
+    finally:
+        vege.set()
+        t.join()
+
+
+# ----------------------------------------------------------------------
+# Téma
+# ----------------------------------------------------------------------
+
+def test_apply_theme_swaps_stylesheet_only(qapp, monkeypatch):
+    monkeypatch.setattr(theme, "_current", theme.current())
+    elozo = qapp.styleSheet()
+    label = main_qt.QLabel("érték")
+    main_qt.set_prop(label, "tone", "green")
+    try:
+        main_qt.apply_theme(False)
+        assert qapp.styleSheet() == theme.compile_qss(theme.LIGHT) and not theme.is_dark()
+        main_qt.apply_theme(True)
+        assert qapp.styleSheet() == theme.compile_qss(theme.DARK)
+        assert main_qt.chart_colors()["bg"] == theme.TOKENS[theme.DARK]["chart_bg"]
+        # A widget és a property megmarad, csak a stíluslap cserélődik
+        assert label.property("tone") == "green"
+    finally:
+        qapp.setStyleSheet(elozo)
+
+
+def test_set_prop_repolishes_only_on_change(qapp, monkeypatch):
+    label = main_qt.QLabel()
+    polished = []
+    style = label.style()
+    monkeypatch.setattr(style, "polish", lambda w: polished.append(w), raising=False)
+    main_qt.set_prop(label, "active", True)
+    main_qt.set_prop(label, "active", True)
+    main_qt.set_prop(label, "active", False)
+    assert label.property("active") is False
+    assert len(polished) == 2
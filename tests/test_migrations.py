@@ -0,0 +1,132 @@
+import sqlite3
+
+import pytest
+
+import database
+from database import (init_db, migrate, search_entries, rebuild_auto_osszesito,
+                      rebuild_havi_osszesito, MANAGED_INDEXES, MIGRATIONS, OBSOLETE_INDEXES)
+
+# Az első (verzió nélküli) kiadás sémája: kategória név szerint, egyoszlopos
+# indexek, ikon oszlop nélküli autok tábla
+BASELINE_SCHEMA = """
+    CREATE TABLE autok (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        marka TEXT NOT NULL, tipus TEXT NOT NULL, evjarat TEXT,
+        km_allas INTEGER DEFAULT 0, vin TEXT, rendszam TEXT,
+        muszaki_lejarat TEXT, olaj_intervallum INTEGER DEFAULT 10000
+    );
+    CREATE TABLE szerviz_adatok (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        auto_id INTEGER NOT NULL, datum TEXT NOT NULL, kategoria TEXT NOT NULL,
+        osszeg REAL DEFAULT 0, km_allas INTEGER, mennyiseg_liter REAL,
+        egysegar_ft_l REAL, benzinkut TEXT, megjegyzes TEXT,
+        FOREIGN KEY (auto_id) REFERENCES autok (id) ON DELETE CASCADE
+    );
+    CREATE TABLE kategoriak (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, nev TEXT NOT NULL UNIQUE,
+        ikon TEXT DEFAULT '📦', szin TEXT DEFAULT '#64748b', alap INTEGER DEFAULT 0
+    );
+    CREATE TABLE biztositas (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        auto_id INTEGER NOT NULL, datum TEXT NOT NULL, osszeg REAL DEFAULT 0,
+        biztosito TEXT, kezdete TEXT, vege TEXT, megjegyzes TEXT, kep_utvonal TEXT DEFAULT '',
+        FOREIGN KEY (auto_id) REFERENCES autok (id) ON DELETE CASCADE
+    );
+    CREATE INDEX idx_szerviz_auto_id ON szerviz_adatok (auto_id);
+    CREATE INDEX idx_szerviz_datum ON szerviz_adatok (datum);
+    CREATE INDEX idx_biztositas_auto_id ON biztositas (auto_id);
+    INSERT INTO kategoriak (nev, ikon, szin, alap) VALUES
+        ('Tankolás', '⛽', '#3b82f6', 1), ('Karbantartás', '🔧', '#10b981', 1),
+        ('Egyéb', '📦', '#f97316', 1);
+    INSERT INTO autok (marka, tipus, km_allas) VALUES ('Opel', 'Astra', 1000), ('Fiat', 'Punto', 0);
+    INSERT INTO szerviz_adatok
+        (id, auto_id, datum, kategoria, osszeg, km_allas, mennyiseg_liter, egysegar_ft_l, benzinkut, megjegyzes)
+    VALUES
+        (10, 1, '2024.01.05', 'Tankolás', 20000.125, 150000, 35.5, 563.4, 'MOL Győr', ''),
+        (11, 1, '2024-04-05', 'Tankolás', 18000, 150600, 30, 600, 'Shell', 'régi dátum forma'),
+        (12, 1, '2024.02.10', 'Karbantartás', 45000, 150300, NULL, NULL, NULL, 'Olajcsere + szűrő'),
+        (13, 1, '2024.03.01', 'Parkolás', 1200.333, NULL, NULL, NULL, NULL, 'belváros'),
+        (14, 2, 'ismeretlen', 'Egyéb', 500, NULL, NULL, NULL, NULL, 'mosás'),
+        (15, 2, '2023.12.24', 'Karbantartás', 30000, 80000, NULL, NULL, NULL, 'téli gumi');
+    INSERT INTO biztositas (auto_id, datum, osszeg, biztosito, kezdete, vege)
+    VALUES (1, '2024.01.01', 60000, 'Allianz', '2024.01.01', '2025.01.01');
+"""
+
+
+@pytest.fixture
+def baseline_path(tmp_path):
+    path = str(tmp_path / "regi.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(BASELINE_SCHEMA)
+    conn.close()
+    return path
+
+
+def _columns(conn, table):
+    return {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _snapshot(conn, table):
+    return sorted(conn.execute(f"SELECT * FROM {table}").fetchall())
+
+
+def test_baseline_database_migrates_to_latest(baseline_path):
+    init_db(baseline_path)
+    conn = sqlite3.connect(baseline_path)
+    latest = MIGRATIONS[-1][0]
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == latest
+
+    # Kategória név -> kulcs; az ismeretlen név is kategória sort kap
+    assert "kategoria" not in _columns(conn, "szerviz_adatok")
+    assert {"kategoria_id", "datum_nap", "honap_kulcs", "kep_utvonal"} <= _columns(conn, "szerviz_adatok")
+    assert "ikon" in _columns(conn, "autok")
+    rows = conn.execute("SELECT id, kategoria, osszeg FROM szerviz_adatok_nevvel ORDER BY id").fetchall()
+    assert rows == [(10, "Tankolás", 20000.125), (11, "Tankolás", 18000), (12, "Karbantartás", 45000),
+                    (13, "Parkolás", 1200.333), (14, "Egyéb", 500), (15, "Karbantartás", 30000)]
+    assert conn.execute("SELECT COUNT(*) FROM kategoriak WHERE nev='Biztosítás'").fetchone()[0] == 1
+
+    # Indexek
+    indexes = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+    assert set(MANAGED_INDEXES) <= indexes
+    assert not indexes & set(OBSOLETE_INDEXES)
+
+    # Származtatott adatok: esemény, keresés, összesítők
+    assert conn.execute("SELECT bejegyzes_id, esemeny FROM szerviz_esemenyek ORDER BY 1, 2").fetchall() == [
+        (12, "olaj"), (15, "gumi")]
+    assert [r[0] for r in search_entries(conn, 1, "Tankolás", "gyor")] == [10]
+    auto = conn.execute("SELECT km_allas, utolso_olaj_km, biztositas_vege, utolso_tankolas_datum "
+                        "FROM auto_osszesito WHERE auto_id=1").fetchone()
+    assert auto == (150600, 150300, "2025.01.01", "2024-04-05")
+    havi, osszesito = _snapshot(conn, "havi_osszesito"), _snapshot(conn, "auto_osszesito")
+    rebuild_havi_osszesito(conn)
+    rebuild_auto_osszesito(conn)
+    assert _snapshot(conn, "havi_osszesito") == havi
+    assert _snapshot(conn, "auto_osszesito") == osszesito
+    conn.close()
+
+
+def test_up_to_date_schema_is_not_migrated(baseline_path):
+    init_db(baseline_path)
+    conn = sqlite3.connect(baseline_path)
+    assert migrate(conn) is False
+    conn.close()
+
+
+def test_failed_step_rolls_back(baseline_path, monkeypatch):
+    def hibas(conn):
+        raise sqlite3.OperationalError("hibás lépés")
+
+    monkeypatch.setattr(database, "MIGRATIONS", MIGRATIONS[:3] + [(4, "hibás", hibas)])
+    conn = sqlite3.connect(baseline_path)
+    with pytest.raises(sqlite3.OperationalError):
+        migrate(conn)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == 0
+    assert "datum_nap" not in _columns(conn, "szerviz_adatok")
+    assert conn.execute("SELECT name FROM sqlite_master WHERE name='havi_osszesito'").fetchone() is None
+    conn.close()
+
+
+def test_migration_descriptions_are_unique():
+    leirasok = [leiras for _, leiras, _ in MIGRATIONS]
+    assert len(set(leirasok)) == len(leirasok)
+    assert [v for v, _, _ in MIGRATIONS] == list(range(1, len(MIGRATIONS) + 1))
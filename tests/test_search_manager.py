@@ -0,0 +1,122 @@
+import random
+import threading
+
+import pytest
+
+from connection_manager import ConnectionManager
+from database import search_entries
+from search_manager import SearchManager, ResultRow, narrow, search_terms
+
+from conftest import add_car, add_entry
+
+SZAVAK = ("Olajcsere", "olaj", "szűrő", "Győr", "győri", "MOL", "Shell", "fék", "fékbetét",
+          "téli", "gumi", "Gumicsere", "2025.03", "út", "szerviz")
+KERESESEK = ("o", "ol", "ola", "olaj", "olaj s", "olaj sz", "g", "gy", "gyo", "győr",
+             "f", "fe", "fék", "fékb", "2", "2025", "2025.0", "2025.03", "s", "sh", "gumi t")
+
+
+@pytest.fixture
+def kereso_db(conn):
+    rng = random.Random(5)
+    car = add_car(conn)
+    for _ in range(300):
+        add_entry(conn, car, rng.choice(("Tankolás", "Karbantartás")),
+                  f"{rng.choice((2024, 2025))}.{rng.randint(1, 12):02}.{rng.randint(1, 28):02}",
+                  kut=rng.choice((None, "MOL Győr", "Shell", "OMV győri út")),
+                  megj=" ".join(rng.sample(SZAVAK, rng.randint(0, 3))))
+    conn.commit()
+    return car
+
+
+def _talalat(rows):
+    rows = [ResultRow(r) for r in rows]
+    return {r["id"]: tuple(r[k] for k in ("megjegyzes_hl", "benzinkut_hl", "datum_hl"))
+            for r in rows}
+
+
+def test_search_terms_follow_fts_query():
+    assert search_terms("  Olaj SZŰRŐ ") == [["olaj"], ["szuro"]]
+    assert search_terms("2025.03 -") == [["2025", "03"]]
+
+
+def test_narrow_matches_fts_query(conn, kereso_db):
+    # A szűkítés a teljes FTS lekérdezéssel azonos sorokat és kiemeléseket ad
+    for kategoria in ("Tankolás", "Karbantartás"):
+        for base in KERESESEK:
+            base_rows = [ResultRow(r) for r in search_entries(conn, kereso_db, kategoria, base)]
+            for text in KERESESEK:
+                if not text.startswith(base):
+                    continue
+                vart = search_entries(conn, kereso_db, kategoria, text)
+                assert _talalat(narrow(base_rows, search_terms(text))) == _talalat(vart), (base, text)
+
+
+def test_result_row_by_name_and_index(conn, kereso_db):
+    row = ResultRow(search_entries(conn, kereso_db, "Karbantartás", "olaj")[0])
+    assert row["id"] == row[0] and row["datum_hl"] == row[-1]
+    assert dict(zip(row.keys(), row))["kategoria"] == "Karbantartás"
+
+
+@pytest.fixture
+def manager(db_path):
+    db = ConnectionManager(db_path)
+    yield SearchManager(db.reader), db
+    db.close_all()
+
+
+def _kuld(manager, auto_id, kategoria, text, reader):
+    """A felület menete: előbb a gyorsítótár, csak annak hiányában lekérdezés."""
+    assert manager.cached(reader, auto_id, kategoria, text) is None
+    done = threading.Event()
+    result = []
+
+    def callback(token, rows):
+        result.append((token, rows))
+        done.set()
+
+    token = manager.submit(auto_id, kategoria, text, callback)
+    assert done.wait(5)
+    return token, result[0][1]
+
+
+def test_cached_narrows_without_query(manager, conn, kereso_db):
+    sm, db = manager
+    reader = db.reader()
+    _, rows = _kuld(sm, kereso_db, "Karbantartás", "ol", reader)
+    assert sm.cached(reader, kereso_db, "Karbantartás", "ol ") is rows
+
+    szukitett = sm.cached(reader, kereso_db, "Karbantartás", "olaj sz")
+    assert _talalat(szukitett) == _talalat(search_entries(reader, kereso_db, "Karbantartás", "olaj sz"))
+    # Visszatörlésnél a legszélesebb lista is szűkíthető
+    assert sm.cached(reader, kereso_db, "Karbantartás", "olaj") is not None
+    # Más szöveggel kezdődő keresés lekérdezést igényel
+    assert sm.cached(reader, kereso_db, "Karbantartás", "fék") is None
+
+
+def test_cached_not_narrowed_from_limited_list(manager, conn, kereso_db):
+    sm, db = manager
+    sm.limit = 3
+    _, rows = _kuld(sm, kereso_db, "Karbantartás", "o", db.reader())
+    assert len(rows) == 3
+    assert sm.cached(db.reader(), kereso_db, "Karbantartás", "olaj") is None
+
+
+def test_cache_cleared_after_write(manager, conn, kereso_db):
+    sm, db = manager
+    reader = db.reader()
+    _kuld(sm, kereso_db, "Karbantartás", "olaj", reader)
+    assert sm.cached(reader, kereso_db, "Karbantartás", "olaj") is not None
+    # Másik kapcsolat commitja (data_version)
+    add_entry(conn, kereso_db, "Karbantartás", "2025.01.01", megj="olaj")
+    conn.commit()
+    assert sm.cached(reader, kereso_db, "Karbantartás", "olaj") is None
+
+
+def test_only_latest_request_is_current(manager, kereso_db):
+    sm, db = manager
+    elso = sm.submit(kereso_db, "Karbantartás", "o", lambda token, rows: None)
+    token, rows = _kuld(sm, kereso_db, "Karbantartás", "olaj", db.reader())
+    assert token == elso + 1
+    assert not sm.current("Karbantartás", elso) and sm.current("Karbantartás", token)
+    sm.cancel("Karbantartás")
+    assert not sm.current("Karbantartás", token)
@@ -0,0 +1,253 @@
+import random
+import sqlite3
+from datetime import date
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from database import HONAP_CIMKE_SQL, KATEGORIA_ID_SQL, honap_kulcs  # noqa: E402
+from stats_engine import CarStats, StatsCache, compute_stats  # noqa: E402
+
+from conftest import add_car, add_entry, random_datum, random_entry  # noqa: E402
+
+MA = date(2025, 6, 15)
+
+
+def _regi_statisztika(conn, auto_id, today):
+    """
+    A motor előtti, lekérdezésenkénti számítás (Qt StatTab._load és Tk
+    update_statistics) – összehasonlítási alapnak. Az azonos km-ű sorok
+    sorrendjét az id dönti el, ahogy az index is adta.
+    """
+    o = conn.execute("""
+        SELECT tankolas_osszeg, tankolas_liter, tankolas_db, tankolas_ar_osszeg, tankolas_ar_db,
+               karbantartas_osszeg, karbantartas_db, egyeb_osszeg, egyeb_db
+        FROM auto_osszesito WHERE auto_id=?
+    """, (auto_id,)).fetchone()
+    km_min, km_max = conn.execute(
+        "SELECT MIN(km_allas), MAX(km_allas) FROM szerviz_adatok WHERE auto_id=? AND km_allas > 0",
+        (auto_id,)).fetchone()
+
+    tankolasok = f"""
+        SELECT datum, km_allas, mennyiseg_liter FROM szerviz_adatok
+        WHERE auto_id=? AND kategoria_id={KATEGORIA_ID_SQL} AND km_allas > 0 AND mennyiseg_liter > 0
+    """
+    fog_rows = conn.execute(tankolasok + " ORDER BY km_allas, id", (auto_id, "Tankolás")).fetchall()
+    avg_fogyasztas = 0.0
+    if len(fog_rows) >= 2 and fog_rows[-1][1] - fog_rows[0][1] > 0:
+        avg_fogyasztas = sum(r[2] for r in fog_rows[1:]) / (fog_rows[-1][1] - fog_rows[0][1]) * 100
+
+    def fill_up(rows):
+        pontok = []
+        for i in range(1, len(rows)):
+            d = rows[i][1] - rows[i - 1][1]
+            if d > 0 and rows[i][2]:
+                fog = rows[i][2] / d * 100
+                if 2.0 < fog < 30.0:
+                    pontok.append((i, rows[i][0], fog))
+        return pontok
+
+    kezdo_kulcs = honap_kulcs(today, -11)
+    monthly = conn.execute(f"""
+        SELECT {HONAP_CIMKE_SQL}, osszeg, liter FROM havi_osszesito
+        WHERE auto_id=? AND honap_kulcs >= ? AND kategoria_id={KATEGORIA_ID_SQL}
+        ORDER BY honap_kulcs
+    """, (auto_id, kezdo_kulcs, "Tankolás")).fetchall()
+    ablak = conn.execute(tankolasok + " AND datum_nap >= ? ORDER BY km_allas, id",
+                         (auto_id, "Tankolás",
+                          date(kezdo_kulcs // 100, kezdo_kulcs % 100, 1).toordinal())).fetchall()
+    # Tk: költség idővonal km szerint
+    idovonal = conn.execute(f"""
+        SELECT datum, osszeg FROM szerviz_adatok
+        WHERE auto_id=? AND kategoria_id={KATEGORIA_ID_SQL} ORDER BY km_allas, id
+    """, (auto_id, "Tankolás")).fetchall()
+
+    return {
+        "tank_osszeg": o[0], "tank_liter": o[1], "tank_db": o[2],
+        "avg_ar": o[3] / o[4] if o[4] else 0.0,
+        "karb_osszeg": o[5], "karb_db": o[6], "egyeb_osszeg": o[7], "egyeb_db": o[8],
+        "km_min": km_min or 0, "km_max": km_max or 0,
+        "avg_fogyasztas": avg_fogyasztas,
+        "havi": [(r[0], r[1], r[2]) for r in monthly],
+        "fog": [(d, f) for _, d, f in fill_up(fog_rows)],
+        "ablak": fill_up(ablak),
+        "idovonal": [(d, o or 0) for d, o in idovonal],
+    }
+
+
+def _auto_adatok(conn, rng, car):
+    """Valószerű tankolás sorozat (2-30 L/100km körül, néhány kiugró) és vegyes egyéb bejegyzések."""
+    km = rng.randint(10000, 150000)
+    for _ in range(rng.randint(0, 60)):
+        km += rng.choice((rng.randint(200, 900), 0, -50))
+        liter = rng.choice((round(rng.uniform(15, 55), 2), None, 0.5, 300))
+        ev, ho, nap = rng.choice((2023, 2024, 2025)), rng.randint(1, 12), rng.randint(1, 28)
+        datum = rng.choice((f"{ev}.{ho:02}.{nap:02}", f"{ev}-{ho:02}-{nap:02}", random_datum(rng)))
+        add_entry(conn, car, "Tankolás", datum, rng.choice((round(rng.uniform(5000, 30000), 2), None)),
+                  rng.choice((km, km, None)), liter, rng.choice((round(rng.uniform(550, 650), 1), None)))
+    for _ in range(rng.randint(0, 20)):
+        e = random_entry(rng, [car])
+        add_entry(conn, car, rng.choice(("Karbantartás", "Egyéb", "Biztosítás")), e["datum"],
+                  e["osszeg"], e["km"], megj=e["megj"])
+
+
+def _osszevet(uj: CarStats, regi: dict):
+    approx = lambda v: pytest.approx(v, rel=1e-9, abs=1e-6)
+    for mezo in ("tank_osszeg", "tank_liter", "avg_ar", "karb_osszeg", "egyeb_osszeg",
+                 "avg_fogyasztas"):
+        assert getattr(uj, mezo) == approx(regi[mezo]), mezo
+    for mezo in ("tank_db", "karb_db", "egyeb_db", "km_min", "km_max"):
+        assert getattr(uj, mezo) == regi[mezo], mezo
+
+    assert list(uj.havi_cimke) == [h for h, _, _ in regi["havi"]]
+    assert uj.havi_osszeg.tolist() == approx([o for _, o, _ in regi["havi"]])
+    assert uj.havi_liter.tolist() == approx([l for _, _, l in regi["havi"]])
+    assert list(uj.fog_datum) == [d for d, _ in regi["fog"]]
+    assert uj.fog_ertek.tolist() == approx([f for _, f in regi["fog"]])
+    assert uj.ablak_x.tolist() == [i for i, _, _ in regi["ablak"]]
+    assert list(uj.ablak_datum) == [d for _, d, _ in regi["ablak"]]
+    assert uj.ablak_fog.tolist() == approx([f for _, _, f in regi["ablak"]])
+    assert list(zip(uj.tank_datum, uj.tank_ft.tolist())) == regi["idovonal"]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_compute_stats_matches_per_query_statistics(conn, seed):
+    rng = random.Random(seed)
+    cars = [add_car(conn) for _ in range(4)]
+    for car in cars:
+        _auto_adatok(conn, rng, car)
+    conn.commit()
+    for car in cars:
+        _osszevet(compute_stats(conn, car, MA), _regi_statisztika(conn, car, MA))
+
+
+def test_compute_stats_empty_car(conn):
+    car = add_car(conn)
+    stats = compute_stats(conn, car, MA)
+    assert stats == stats and (stats.tank_db, stats.osszes, stats.ft_per_km) == (0, 0.0, 0.0)
+    assert len(stats.havi_osszeg) == 0 and stats.fog_datum == ()
+
+
+def test_compute_stats_derived_values(conn):
+    car = add_car(conn)
+    add_entry(conn, car, "Tankolás", "2025.05.01", 20000, km=10000, liter=40)
+    add_entry(conn, car, "Tankolás", "2025.06.01", 15000, km=10500, liter=35)
+    add_entry(conn, car, "Karbantartás", "2025.06.02", 50000, km=10600)
+    add_entry(conn, car, "Biztosítás", "2025.06.03", 70000)
+    stats = compute_stats(conn, car, MA)
+    assert stats.osszes == 85000 and stats.km_diff == 600
+    assert stats.ft_per_km == pytest.approx(85000 / 600)
+    assert stats.avg_fogyasztas == pytest.approx(7.0)
+    assert stats.havi_cimke == ("2025.05", "2025.06")
+    # Az eredmény tömbjei csak olvashatók (szálak és nézetek között megosztva)
+    with pytest.raises(ValueError):
+        stats.fog_ertek[0] = 1.0
+
+
+# ----------------------------------------------------------------------
+# StatsCache
+# ----------------------------------------------------------------------
+
+@pytest.fixture
+def ket_auto(conn):
+    a, b = add_car(conn), add_car(conn)
+    for car in (a, b):
+        add_entry(conn, car, "Tankolás", "2025.05.01", 10000, km=1000, liter=30)
+    conn.commit()
+    return a, b
+
+
+def _tarol(cache, conn, car):
+    key = cache.key(conn, car, MA)
+    stats = compute_stats(conn, car, MA)
+    cache.put(key, stats)
+    return key, stats
+
+
+def test_cache_hit_until_bump(conn, ket_auto):
+    a, b = ket_auto
+    cache = StatsCache()
+    key_a, stats_a = _tarol(cache, conn, a)
+    key_b, stats_b = _tarol(cache, conn, b)
+    assert cache.get(cache.key(conn, a, MA)) is stats_a
+
+    # Bejelentett írás az író kapcsolaton: csak az érintett autó esik ki
+    add_entry(conn, a, "Tankolás", "2025.06.01", 5000, km=1500, liter=35)
+    conn.commit()
+    cache.bump(a, conn)
+    assert cache.key(conn, a, MA) != key_a and cache.get(cache.key(conn, a, MA)) is None
+    assert cache.get(cache.key(conn, b, MA)) is stats_b
+    assert cache.stats()["hits"] == 2 and cache.stats()["entries"] == 1
+
+
+def test_bump_on_reader_keeps_other_cars(conn, db_path, ket_auto):
+    # A felület az olvasó kapcsolaton kér kulcsot, az írás az író kapcsolaton fut
+    a, b = ket_auto
+    reader = sqlite3.connect(db_path)
+    cache = StatsCache()
+    _tarol(cache, reader, a)
+    _, stats_b = _tarol(cache, reader, b)
+    add_entry(conn, a, "Tankolás", "2025.06.01", 5000, km=1500, liter=35)
+    conn.commit()
+    cache.bump(a, reader)
+    assert cache.get(cache.key(reader, b, MA)) is stats_b
+    assert cache.get(cache.key(reader, a, MA)) is None
+    reader.close()
+
+
+def test_unannounced_change_clears_cache(conn, db_path, ket_auto):
+    a, b = ket_auto
+    cache = StatsCache()
+    _tarol(cache, conn, a)
+    _tarol(cache, conn, b)
+    # Másik kapcsolat commitja (pl. import, visszaállítás): új korszak
+    other = sqlite3.connect(db_path)
+    add_entry(other, b, "Egyéb", "2025.06.01", 100)
+    other.commit()
+    other.close()
+    assert cache.get(cache.key(conn, a, MA)) is None
+    assert cache.stats()["entries"] == 0
+    # Saját, be nem jelentett írás is
+    _tarol(cache, conn, a)
+    add_entry(conn, a, "Egyéb", "2025.06.02", 100)
+    assert cache.get(cache.key(conn, a, MA)) is None
+
+
+def test_stale_put_dropped(conn, ket_auto):
+    a, _ = ket_auto
+    cache = StatsCache()
+    key = cache.key(conn, a, MA)
+    stats = compute_stats(conn, a, MA)         # számítás közben érkezik az írás
+    cache.bump(a)
+    cache.put(key, stats)
+    assert cache.stats()["entries"] == 0
+    cache.invalidate()
+    key = cache.key(conn, a, MA)
+    cache.invalidate()
+    cache.put(key, stats)
+    assert cache.stats()["entries"] == 0
+
+
+def test_month_change_gives_new_key(conn, ket_auto):
+    a, _ = ket_auto
+    cache = StatsCache()
+    assert cache.key(conn, a, date(2025, 6, 30)) == cache.key(conn, a, date(2025, 6, 1))
+    assert cache.key(conn, a, date(2025, 7, 1)) != cache.key(conn, a, date(2025, 6, 30))
+
+
+def test_lru_limits(conn):
+    cars = [add_car(conn) for _ in range(5)]
+    conn.commit()
+    cache = StatsCache(max_entries=3)
+    keys = [cache.key(conn, car, MA) for car in cars]
+    for key, car in zip(keys, cars):
+        cache.put(key, CarStats(car))
+        if car == cars[2]:
+            cache.get(keys[0])                 # a legrégebbi használat frissül
+    assert [cache.get(k) is not None for k in keys] == [True, False, False, True, True]
+
+    kicsi = StatsCache(max_bytes=1000)
+    kicsi.put(kicsi.key(conn, cars[0], MA), CarStats(cars[0]))
+    kicsi.put(kicsi.key(conn, cars[1], MA), CarStats(cars[1]))
+    assert kicsi.stats()["entries"] == 1 and kicsi.stats()["bytes"] <= 1000
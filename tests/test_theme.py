@@ -0,0 +1,45 @@
+import re
+
+import pytest
+
+import theme
+from theme import DARK, LIGHT, TOKENS, TONES
+
+
+@pytest.fixture(autouse=True)
+def _aktualis_tema():
+    elozo = theme.current()
+    yield
+    theme.set_current(elozo)
+
+
+def test_themes_define_same_tokens():
+    assert TOKENS[DARK].keys() == TOKENS[LIGHT].keys()
+
+
+@pytest.mark.parametrize("name", [DARK, LIGHT])
+def test_compile_qss_substitutes_every_token(name):
+    qss = theme.compile_qss(name)
+    assert "$" not in qss
+    assert qss.count("{") == qss.count("}")
+    assert f'QLabel[tone="strong"] {{ color: {TOKENS[name]["text_max"]}; }}' in qss
+    for tone, color in TONES.items():
+        assert f'QLabel[tone="{tone}"] {{ color: {color}; }}' in qss
+    # Csak a két téma szín értékei kerülnek a lapba
+    other = LIGHT if name == DARK else DARK
+    sajat = set(TOKENS[name].values()) | set(TONES.values())
+    idegen = {re.escape(v) for v in set(TOKENS[other].values()) - sajat if v.startswith("#")}
+    assert not any(re.search(v + r"\b", qss) for v in idegen)
+
+
+def test_compile_qss_is_cached():
+    assert theme.compile_qss(DARK) is theme.compile_qss(DARK)
+    assert theme.compile_qss(DARK) != theme.compile_qss(LIGHT)
+
+
+def test_current_theme_tokens():
+    theme.set_current(theme.theme_name(False))
+    assert not theme.is_dark() and theme.token("bg") == TOKENS[LIGHT]["bg"]
+    assert theme.tokens() is TOKENS[LIGHT] and theme.tokens(DARK) is TOKENS[DARK]
+    theme.set_current(theme.theme_name(True))
+    assert theme.is_dark() and theme.current() == DARK
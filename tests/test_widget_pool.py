@@ -0,0 +1,65 @@
+import gc
+
+from widget_pool import WidgetPool, pool_stats
+
+
+class _Widget:
+    def __init__(self, n):
+        self.n, self.data, self.visible = n, None, False
+
+
+def _pool(name="sor"):
+    made = []
+
+    def make():
+        made.append(_Widget(len(made)))
+        return made[-1]
+
+    def bind(widget, *data):
+        widget.data, widget.visible = data, True
+
+    def hide(widget):
+        widget.visible = False
+
+    return WidgetPool(name, make, bind, hide), made
+
+
+def _kor(pool, sorok):
+    pool.begin()
+    widgets = [pool.take(*sor) for sor in sorok]
+    pool.end()
+    return widgets
+
+
+def test_widgets_reused_in_creation_order():
+    pool, made = _pool()
+    elso = _kor(pool, [(1, "a"), (2, "b"), (3, "c")])
+    masodik = _kor(pool, [(4, "d"), (5, "e")])
+    assert masodik == elso[:2] and len(made) == 3
+    assert [w.data for w in masodik] == [(4, "d"), (5, "e")]
+    # A fel nem használt widget elrejtődik, de a készletben marad
+    assert not made[2].visible and len(pool) == 3 and pool.in_use() == masodik
+
+    harmadik = _kor(pool, [(i,) for i in range(5)])
+    assert harmadik[:3] == made[:3] and len(made) == 5
+    assert all(w.visible for w in made)
+
+
+def test_pool_stats():
+    pool, _ = _pool()
+    _kor(pool, [(1,), (2,)])
+    _kor(pool, [(1,), (2,), (3,)])
+    assert pool.stats() == {"size": 3, "in_use": 3, "hits": 2, "misses": 3, "hit_rate": 0.4}
+
+
+def test_pool_stats_merged_by_name_and_dropped_with_pool():
+    a, _ = _pool("kartya_teszt")
+    b, _ = _pool("kartya_teszt")
+    _kor(a, [(1,)])
+    _kor(b, [(1,), (2,)])
+    _kor(b, [(1,)])
+    assert pool_stats()["kartya_teszt"] == {"pools": 2, "size": 3, "in_use": 2, "hits": 1,
+                                            "misses": 3, "hit_rate": 0.25}
+    del a, b
+    gc.collect()
+    assert "kartya_teszt" not in pool_stats()
@@ -0,0 +1,419 @@
+"""
+theme.py
+--------
+Token alapú téma motor a PyQt6 felülethez.
+- Témánként egy szín token tábla (TOKENS); a QSS egyetlen sablonból
+  témánként egyszer fordul le (compile_qss, gyorsítótárazva)
+- Az állapotfüggő megjelenés dinamikus property-n keresztül megy:
+  [active="true"] (kiválasztott chip / fül), [tone="..."] (érték színe),
+  [level="..."] (kiemelt sor keret) – nincs widgetenkénti stíluslap
+- A widgetek nélkül rajzolók (bejegyzés delegate, grafikonok) a token
+  táblából olvasnak: token() / tokens()
+
+A stíluslap alkalmazás szinten kerül fel, így a témaváltás egyetlen
+setStyleSheet hívás; a widgetek és az adatok maradnak.
+"""
+
+from string import Template
+
+DARK, LIGHT = "dark", "light"
+
+# Témától független értékszínek ([tone="..."])
+TONES = {
+    "blue":   "#3b82f6",
+    "green":  "#10b981",
+    "orange": "#f97316",
+    "red":    "#ef4444",
+    "violet": "#8b5cf6",
+    "lime":   "#22c55e",
+    "slate":  "#64748b",
+    "amber":  "#f59e0b",
+}
+
+TOKENS = {
+    DARK: {
+        "bg":                "#0f172a",   # ablak, tartalom, sávok alapja
+        "surface":           "#1e293b",   # topbar, tab sáv
+        "popup_bg":          "#1e293b",
+        "border":            "#334155",
+        "chipbar_border":    "#1e293b",
+        "toolbar_border":    "#1e293b",
+        "text":              "#e2e8f0",
+        "text_max":          "#ffffff",   # az éves összesítő "Összesen" oszlopa
+        "heading":           "#f1f5f9",
+        "label":             "#94a3b8",
+        "muted":             "#64748b",
+        "empty_fg":          "#475569",
+        "accent":            "#3b82f6",
+        "tb_btn_fg":         "#cbd5e1",
+        "tb_btn_border":     "none",
+        "btn_soft_bg":       "#334155",
+        "btn_soft_hover":    "#475569",
+        "btn_soft_hover_fg": "white",
+        "btn_bg":            "#1e293b",
+        "btn_fg":            "#94a3b8",
+        "btn_border":        "#334155",
+        "btn_hover_bg":      "#334155",
+        "btn_hover_fg":      "#e2e8f0",
+        "green_btn":         "#16a34a",
+        "green_btn_hover":   "#15803d",
+        "danger_bg":         "#450a0a",
+        "danger_fg":         "#f87171",
+        "danger_border":     "#7f1d1d",
+        "danger_hover":      "#7f1d1d",
+        "chip_bg":           "#1e293b",
+        "chip_border":       "#334155",
+        "chip_active_bg":    "#1e3a5f",
+        "chip_add_fg":       "#475569",
+        "tab_fg":            "#64748b",
+        "tab_hover_fg":      "#e2e8f0",
+        "tab_hover_bg":      "#0f172a",
+        "combo_bg":          "#1e293b",
+        "search_bg":         "#1e293b",
+        "search_border":     "1px solid #334155",
+        "entry_bg":          "#1e293b",
+        "entry_border":      "#334155",
+        "entry_border_hover": "#475569",
+        "entry_date":        "#e2e8f0",
+        "entry_sub":         "#94a3b8",
+        "e_btn_bg":          "transparent",
+        "e_btn_border":      "#334155",
+        "e_btn_fg":          "#64748b",
+        "e_btn_hover_bg":    "#334155",
+        "e_btn_hover_fg":    "#e2e8f0",
+        "scroll_track":      "#0f172a",
+        "scroll_handle":     "#334155",
+        "scroll_handle_hover": "#475569",
+        "spin_btn":          "#475569",
+        "spin_btn_hover":    "#64748b",
+        "spin_arrow":        "#e2e8f0",
+        "badge_bg":          "#1e293b",
+        "badge_fg":          "#64748b",
+        "chart_bg":          "#1e293b",
+        "chart_fg":          "#e2e8f0",
+        "chart_grid":        "#334155",
+    },
+    LIGHT: {
+        "bg":                "#f8fafc",
+        "surface":           "#ffffff",
+        "popup_bg":          "#ffffff",
+        "border":            "#e2e8f0",
+        "chipbar_border":    "#e2e8f0",
+        "toolbar_border":    "#f1f5f9",
+        "text":              "#0f172a",
+        "text_max":          "#0f172a",
+        "heading":           "#0f172a",
+        "label":             "#64748b",
+        "muted":             "#94a3b8",
+        "empty_fg":          "#cbd5e1",
+        "accent":            "#3b82f6",
+        "tb_btn_fg":         "#374151",
+        "tb_btn_border":     "1px solid #e2e8f0",
+        "btn_soft_bg":       "#f1f5f9",
+        "btn_soft_hover":    "#e2e8f0",
+        "btn_soft_hover_fg": "#374151",
+        "btn_bg":            "#f1f5f9",
+        "btn_fg":            "#374151",
+        "btn_border":        "#e2e8f0",
+        "btn_hover_bg":      "#e2e8f0",
+        "btn_hover_fg":      "#374151",
+        "green_btn":         "#22c55e",
+        "green_btn_hover":   "#16a34a",
+        "danger_bg":         "#fee2e2",
+        "danger_fg":         "#dc2626",
+        "danger_border":     "#fecaca",
+        "danger_hover":      "#fecaca",
+        "chip_bg":           "#ffffff",
+        "chip_border":       "#e2e8f0",
+        "chip_active_bg":    "#eff6ff",
+        "chip_add_fg":       "#94a3b8",
+        "tab_fg":            "#94a3b8",
+        "tab_hover_fg":      "#374151",
+        "tab_hover_bg":      "transparent",
+        "combo_bg":          "#eff6ff",
+        "search_bg":         "#ffffff",
+        "search_border":     "1.5px solid #e2e8f0",
+        "entry_bg":          "#ffffff",
+        "entry_border":      "#f1f5f9",
+        "entry_border_hover": "#e2e8f0",
+        "entry_date":        "#1e293b",
+        "entry_sub":         "#64748b",
+        "e_btn_bg":          "#f8fafc",
+        "e_btn_border":      "#e2e8f0",
+        "e_btn_fg":          "#94a3b8",
+        "e_btn_hover_bg":    "#e2e8f0",
+        "e_btn_hover_fg":    "#374151",
+        "scroll_track":      "#f1f5f9",
+        "scroll_handle":     "#cbd5e1",
+        "scroll_handle_hover": "#94a3b8",
+        "spin_btn":          "#e2e8f0",
+        "spin_btn_hover":    "#cbd5e1",
+        "spin_arrow":        "#374151",
+        "badge_bg":          "#e2e8f0",
+        "badge_fg":          "#475569",
+        "chart_bg":          "#f8fafc",
+        "chart_fg":          "#1e293b",
+        "chart_grid":        "#e2e8f0",
+    },
+}
+
+QSS_TEMPLATE = Template("""
+QMainWindow, QDialog { background: $bg; }
+QWidget { background: transparent; color: $text; font-family: 'Segoe UI'; font-size: 13px; }
+
+/* Topbar */
+#topbar { background: $surface; border-bottom: 1px solid $border; }
+#logo   { color: #f97316; font-size: 20px; font-weight: 900; background: transparent; }
+#sep_top  { background: $border; }
+#sep_chip { background: $chipbar_border; }
+
+/* Topbar gombok */
+#tb_btn {
+    background: $btn_soft_bg; color: $tb_btn_fg;
+    border: $tb_btn_border; border-radius: 7px;
+    padding: 6px 14px; font-size: 12px; font-weight: 600;
+}
+#tb_btn:hover { background: $btn_soft_hover; color: $btn_soft_hover_fg; }
+
+/* Chip sáv */
+#chipbar { background: $bg; border-bottom: 1px solid $chipbar_border; }
+
+/* Jármű chip */
+#car_chip {
+    background: $chip_bg; border: 2px solid $chip_border;
+    border-radius: 10px; padding: 8px 14px;
+}
+#car_chip:hover { border-color: $accent; }
+#car_chip[active="true"] { background: $chip_active_bg; border-color: $accent; }
+
+/* Új jármű chip */
+#chip_add {
+    background: transparent; border: 2px dashed $chip_border;
+    border-radius: 10px; color: $chip_add_fg;
+    font-size: 13px; font-weight: 600;
+}
+#chip_add:hover { border-color: #f97316; color: #f97316; }
+
+/* Tab sáv */
+#tabbar { background: $surface; border-bottom: 2px solid $border; }
+
+#tab_btn {
+    background: transparent; border: none;
+    color: $tab_fg; font-size: 13px; font-weight: 600;
+    padding: 12px 20px; border-bottom: 3px solid transparent;
+}
+#tab_btn:hover { color: $tab_hover_fg; background: $tab_hover_bg; }
+#tab_btn[active="true"] {
+    background: transparent; color: $accent;
+    font-weight: 700; border-bottom: 3px solid $accent;
+}
+
+/* Toolbar */
+#toolbar { background: $bg; border-bottom: 1px solid $toolbar_border; }
+
+#btn_green {
+    background: $green_btn; color: white;
+    border: none; border-radius: 8px;
+    padding: 8px 16px; font-size: 13px; font-weight: 700;
+}
+#btn_green:hover { background: $green_btn_hover; }
+
+#btn_gray {
+    background: $btn_bg; color: $btn_fg;
+    border: 1px solid $btn_border; border-radius: 8px;
+    padding: 8px 14px; font-size: 13px; font-weight: 600;
+}
+#btn_gray:hover { background: $btn_hover_bg; color: $btn_hover_fg; }
+
+#btn_red {
+    background: $danger_bg; color: $danger_fg;
+    border: 1px solid $danger_border; border-radius: 8px;
+    padding: 7px 14px; font-size: 13px;
+}
+#btn_red:hover { background: $danger_hover; }
+
+#btn_filter {
+    background: $btn_bg; color: $btn_fg;
+    border: 1px solid $btn_border; border-radius: 8px;
+    padding: 7px 14px; font-size: 13px;
+}
+#btn_filter:hover { background: $btn_hover_bg; }
+
+#sort_combo {
+    background: $combo_bg; color: $accent;
+    border: 1px solid $accent; border-radius: 7px;
+    padding: 6px 10px; font-size: 12px; font-weight: 600;
+}
+#sort_combo::drop-down { border: none; width: 20px; }
+#sort_combo QAbstractItemView { background: $popup_bg; color: $text; border: 1px solid $border; }
+
+#search_box {
+    background: $search_bg; color: $text;
+    border: $search_border; border-radius: 8px;
+    padding: 7px 12px; font-size: 13px;
+}
+#search_box:focus { border-color: $accent; }
+
+/* Bejegyzés sorok (és a delegate által rajzolt sorok színei) */
+#entry_row {
+    background: $entry_bg; border: 1px solid $entry_border;
+    border-radius: 10px;
+}
+#entry_row:hover { border-color: $entry_border_hover; }
+#entry_row[level="total"]  { border: 2px solid $accent; }
+#entry_row[level="danger"] { border: 1px solid #ef4444; }
+#entry_row[level="warn"]   { border: 1px solid #f59e0b; }
+
+#entry_date { color: $entry_date; font-size: 13px; font-weight: 700; }
+#entry_km   { color: $muted; font-size: 12px; }
+#entry_sub  { color: $entry_sub; font-size: 12px; }
+#entry_amt  { color: $heading; font-size: 14px; font-weight: 800; }
+
+#e_btn {
+    background: $e_btn_bg; border: 1px solid $e_btn_border;
+    border-radius: 7px; color: $e_btn_fg;
+    font-size: 13px; padding: 4px;
+    min-width: 30px; max-width: 30px;
+    min-height: 30px; max-height: 30px;
+}
+#e_btn:hover { background: $e_btn_hover_bg; color: $e_btn_hover_fg; }
+#e_btn_del:hover { border-color: #ef4444; color: #ef4444; background: $danger_bg; }
+
+/* Statisztika kártyák, éves összesítő, biztosítás állapot */
+#stat_value      { font-size: 20px; font-weight: 800; }
+#year_cell       { font-size: 13px; }
+#year_cell_total { font-size: 14px; font-weight: 800; }
+#year_total      { font-size: 13px; font-weight: 800; }
+#status_dot      { font-size: 16px; }
+#cat_badge {
+    color: $badge_fg; background: $badge_bg;
+    font-size: 11px; padding: 2px 6px; border-radius: 4px;
+}
+
+/* Scrollbar */
+QScrollBar:vertical { background: $scroll_track; width: 8px; border-radius: 4px; }
+QScrollBar::handle:vertical { background: $scroll_handle; border-radius: 4px; min-height: 30px; }
+QScrollBar::handle:vertical:hover { background: $scroll_handle_hover; }
+QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical { height: 0; }
+
+QScrollBar:horizontal { background: $scroll_track; height: 8px; border-radius: 4px; }
+QScrollBar::handle:horizontal { background: $scroll_handle; border-radius: 4px; }
+QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal { width: 0; }
+
+/* Popup dialógusok */
+QDialog { background: $popup_bg; border: 1px solid $border; border-radius: 12px; }
+QLabel  { color: $label; font-size: 12px; }
+QLineEdit, QDoubleSpinBox, QSpinBox, QDateEdit, QTextEdit, QComboBox {
+    background: $bg; color: $text;
+    border: 1.5px solid $border; border-radius: 8px;
+    padding: 8px 12px; font-size: 13px;
+}
+QLineEdit:focus, QDoubleSpinBox:focus, QSpinBox:focus,
+QDateEdit:focus, QTextEdit:focus, QComboBox:focus { border-color: $accent; }
+QComboBox::drop-down { border: none; width: 24px; }
+QComboBox QAbstractItemView { background: $popup_bg; color: $text; border: 1px solid $border; selection-background-color: $chip_active_bg; }
+QSpinBox { padding-right: 20px; }
+QDoubleSpinBox { padding-right: 20px; }
+QSpinBox::up-button, QSpinBox::down-button,
+QDoubleSpinBox::up-button, QDoubleSpinBox::down-button {
+    background: $spin_btn; border: none; border-radius: 3px;
+    width: 18px; height: 14px;
+}
+QSpinBox::up-button { subcontrol-position: top right; subcontrol-origin: border; top: 2px; right: 2px; border-radius: 3px 3px 0 0; }
+QSpinBox::down-button { subcontrol-position: bottom right; subcontrol-origin: border; bottom: 2px; right: 2px; border-radius: 0 0 3px 3px; }
+QDoubleSpinBox::up-button { subcontrol-position: top right; subcontrol-origin: border; top: 2px; right: 2px; border-radius: 3px 3px 0 0; }
+QDoubleSpinBox::down-button { subcontrol-position: bottom right; subcontrol-origin: border; bottom: 2px; right: 2px; border-radius: 0 0 3px 3px; }
+QSpinBox::up-button:hover, QSpinBox::down-button:hover,
+QDoubleSpinBox::up-button:hover, QDoubleSpinBox::down-button:hover { background: $spin_btn_hover; }
+QSpinBox::up-arrow, QDoubleSpinBox::up-arrow { image: none; width: 0; height: 0; border-left: 4px solid transparent; border-right: 4px solid transparent; border-bottom: 5px solid $spin_arrow; }
+QSpinBox::down-arrow, QDoubleSpinBox::down-arrow { image: none; width: 0; height: 0; border-left: 4px solid transparent; border-right: 4px solid transparent; border-top: 5px solid $spin_arrow; }
+QDateEdit::up-button, QDateEdit::down-button { background: $border; border: none; }
+QDateEdit::drop-down { background: $spin_btn; border: none; width: 24px; border-radius: 0 6px 6px 0; }
+
+#popup_title { color: $heading; font-size: 16px; font-weight: 700; }
+#save_btn {
+    background: #f97316; color: white;
+    border: none; border-radius: 8px;
+    padding: 10px; font-size: 14px; font-weight: 700;
+}
+#save_btn:hover { background: #ea580c; }
+#cancel_btn {
+    background: $btn_soft_bg; color: $btn_fg;
+    border: none; border-radius: 8px;
+    padding: 10px; font-size: 13px;
+}
+#cancel_btn:hover { background: $btn_soft_hover; color: $btn_hover_fg; }
+
+/* Üres állapot */
+#empty_label { color: $empty_fg; font-size: 14px; }
+
+/* Jármű chip szerkesztés / törlés gombok */
+#chip_edit_btn {
+    background: $btn_soft_bg; border: none; border-radius: 4px;
+    color: $label; font-size: 11px;
+    min-width: 22px; max-width: 22px;
+    min-height: 22px; max-height: 22px;
+}
+#chip_edit_btn:hover { background: $btn_soft_hover; color: $btn_soft_hover_fg; }
+#chip_del_btn {
+    background: $danger_bg; border: none; border-radius: 4px;
+    color: $danger_fg; font-size: 11px;
+    min-width: 22px; max-width: 22px;
+    min-height: 22px; max-height: 22px;
+}
+#chip_del_btn:hover { background: $danger_hover; }
+
+/* Chip neve/rsz/km labelek */
+#chip_name { color: $heading; font-size: 14px; font-weight: 800; background: transparent; }
+#chip_rsz  { color: $muted; font-size: 11px; background: transparent; }
+#chip_km   { color: $accent; font-size: 12px; font-weight: 700; background: transparent; }
+
+/* Content area */
+#content_area { background: $bg; }
+
+/* Scroll area */
+QScrollArea { border: none; background: $bg; }
+QScrollArea > QWidget > QWidget { background: $bg; }
+""")
+
+_current = DARK
+_compiled = {}
+
+
+def theme_name(dark: bool) -> str:
+    return DARK if dark else LIGHT
+
+
+def compile_qss(name: str) -> str:
+    """A téma teljes QSS-e; témánként csak az első hívás fordít."""
+    qss = _compiled.get(name)
+    if qss is None:
+        qss = QSS_TEMPLATE.substitute(TOKENS[name])
+        # Értékszínek: QLabel[tone="..."] – az "strong" témafüggő
+        tones = dict(TONES, strong=TOKENS[name]["text_max"])
+        qss += "".join(f'QLabel[tone="{tone}"] {{ color: {color}; }}\n'
+                       for tone, color in tones.items())
+        _compiled[name] = qss
+    return qss
+
+
+def set_current(name: str):
+    global _current
+    _current = name
+
+
+def current() -> str:
+    return _current
+
+
+def is_dark() -> bool:
+    return _current == DARK
+
+
+def tokens(name: str = None) -> dict:
+    """Az (alapból az aktuális) téma token táblája – rajzoláshoz, csak olvasásra."""
+    return TOKENS[name or _current]
+
+
+def token(key: str) -> str:
+    return TOKENS[_current][key]
@@ -1,12 +1,14 @@
 """
 ui_components.py
 ----------------
-UI komponensek: InfoCard, DataRow, SearchFilterBar, ReminderPopup, BackupPanel, SettingsPanel
+UI komponensek: InfoCard, StatCard, DataRow, WindowedList, SearchFilterBar, ReminderPopup, BackupPanel, SettingsPanel
 """
 
 import os
+import bisect
 import customtkinter as ctk
 from tkinter import messagebox
+from widget_pool import WidgetPool
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -48,39 +50,76 @@ class InfoCard(ctk.CTkFrame):
         "Kia": "🔴", "Mazda": "🔴", "Nissan": "🔴", "Volvo": "🔵",
     }
 
-    def __init__(self, parent, car_data, select_cb, edit_cb, delete_cb, active=False):
-        cid, marka, tipus, ev, km, vin, rsz, muszaki, intervallum, ikon = car_data
-        mode = ctk.get_appearance_mode()
-        is_dark = mode == "Dark"
-
-        if is_dark:
-            bg = "#1e293b" if not active else "#1e3a5f"
-            border = "#334155" if not active else "#3b82f6"
-        else:
-            bg = "#ffffff" if not active else "#eff6ff"
-            border = "#e2e8f0" if not active else "#3b82f6"
+    # (világos, sötét) színpárok – módváltáskor a CTk maga vált
+    COLORS = {
+        False: {"fg_color": ("#ffffff", "#1e293b"), "border_color": ("#e2e8f0", "#334155")},
+        True:  {"fg_color": ("#eff6ff", "#1e3a5f"), "border_color": ("#3b82f6", "#3b82f6")},
+    }
 
-        super().__init__(parent, fg_color=bg, corner_radius=15,
-                         border_width=2, border_color=border, width=220, height=155)
+    def __init__(self, parent, car_data, select_cb, edit_cb, delete_cb, active=False):
+        super().__init__(parent, corner_radius=15, border_width=2,
+                         width=220, height=155, **self.COLORS[active])
         self.pack_propagate(False)
-        bind_widget_tree(self, "<Button-1>", lambda e: select_cb(cid))
-
-        # Ikon megjelenítése
-        display_ikon = ikon if ikon else self.BRAND_ICONS.get(marka, "🚗")
-        ctk.CTkLabel(self, text=display_ikon, font=("Arial", 28)).pack(pady=(8, 0))
-        ctk.CTkLabel(self, text=f"{marka} {tipus}", font=("Arial", 13, "bold")).pack(pady=(2, 0))
-        ctk.CTkLabel(self, text=rsz if rsz else "---", font=("Arial", 11), text_color="gray").pack()
-        km_str = f"{km:,} km".replace(",", " ") if km else "--- km"
-        ctk.CTkLabel(self, text=km_str, font=("Arial", 11), text_color="#3b82f6").pack()
+        self.cid = None
+        self.active = active
+
+        self.icon_lbl = ctk.CTkLabel(self, text="", font=("Arial", 28))
+        self.icon_lbl.pack(pady=(8, 0))
+        self.name_lbl = ctk.CTkLabel(self, text="", font=("Arial", 13, "bold"))
+        self.name_lbl.pack(pady=(2, 0))
+        self.rsz_lbl = ctk.CTkLabel(self, text="", font=("Arial", 11), text_color="gray")
+        self.rsz_lbl.pack()
+        self.km_lbl = ctk.CTkLabel(self, text="", font=("Arial", 11), text_color="#3b82f6")
+        self.km_lbl.pack()
 
         btn_f = ctk.CTkFrame(self, fg_color="transparent")
         btn_f.pack(side="bottom", pady=5)
         ctk.CTkButton(btn_f, text="📝", width=30, height=25,
                       fg_color="#f1f5f9", text_color="black",
-                      command=lambda: edit_cb(cid)).pack(side="left", padx=2)
+                      command=lambda: edit_cb(self.cid)).pack(side="left", padx=2)
         ctk.CTkButton(btn_f, text="🗑", width=30, height=25,
                       fg_color="#f1f5f9", text_color="red",
-                      command=lambda: delete_cb(cid)).pack(side="left", padx=2)
+                      command=lambda: delete_cb(self.cid)).pack(side="left", padx=2)
+        bind_widget_tree(self, "<Button-1>", lambda e: select_cb(self.cid))
+        self.set_car(car_data)
+
+    def set_car(self, car_data):
+        """A kártya feliratai a (gyorsítótárazott) autó sorból, helyben."""
+        cid, marka, tipus, ev, km, vin, rsz, muszaki, intervallum, ikon = car_data
+        self.cid = cid
+        # Ikon megjelenítése
+        self.icon_lbl.configure(text=ikon if ikon else self.BRAND_ICONS.get(marka, "🚗"))
+        self.name_lbl.configure(text=f"{marka} {tipus}")
+        self.rsz_lbl.configure(text=rsz if rsz else "---")
+        self.km_lbl.configure(text=f"{km:,} km".replace(",", " ") if km else "--- km")
+
+    def set_active(self, active: bool):
+        if active != self.active:
+            self.active = active
+            self.configure(**self.COLORS[active])
+
+
+# =============================================================================
+# StatCard – statisztika kártya
+# =============================================================================
+
+class StatCard(ctk.CTkFrame):
+    """Statisztika kártya; frissítéskor a show() csak a szövegeket cseréli."""
+
+    def __init__(self, parent):
+        super().__init__(parent, fg_color="white", corner_radius=12,
+                         border_width=1, border_color="#e2e8f0")
+        self.title_lbl = ctk.CTkLabel(self, text="", font=("Arial", 11))
+        self.title_lbl.pack(pady=(10, 0))
+        self.value_lbl = ctk.CTkLabel(self, text="", font=("Arial", 16, "bold"))
+        self.value_lbl.pack()
+        self.desc_lbl = ctk.CTkLabel(self, text="", font=("Arial", 10), text_color="gray")
+        self.desc_lbl.pack(pady=(0, 10))
+
+    def show(self, title: str, value: str, desc: str):
+        self.title_lbl.configure(text=title)
+        self.value_lbl.configure(text=value)
+        self.desc_lbl.configure(text=desc)
 
 
 # =============================================================================
@@ -88,16 +127,20 @@ class InfoCard(ctk.CTkFrame):
 # =============================================================================
 
 class DataRow(ctk.CTkFrame):
-    def __init__(self, parent, entry_id, date, amount, km, category,
-                 delete_callback, edit_callback, copy_callback=None,
-                 liter="", ar_l="", kut="", note="", image_path=""):
-
-        mode = ctk.get_appearance_mode()
-        row_bg = "#1e293b" if mode == "Dark" else "white"
+    """
+    Egy bejegyzés sor fix magassággal. A widgetek egyszer épülnek fel; a
+    WindowedList görgetéskor a show() hívással tölti fel más bejegyzéssel.
+    """
+    HEIGHT = 76
 
-        super().__init__(parent, fg_color=row_bg, corner_radius=12,
-                         border_width=1, border_color="#334155" if mode == "Dark" else "#e2e8f0")
-        self.pack(fill="x", pady=6, padx=10)
+    def __init__(self, parent, delete_callback, edit_callback, copy_callback=None):
+        # (világos, sötét) színpár – módváltáskor a CTk maga vált
+        super().__init__(parent, fg_color=("white", "#1e293b"), corner_radius=12,
+                         border_width=1, border_color=("#e2e8f0", "#334155"),
+                         height=self.HEIGHT)
+        self.pack_propagate(False)
+        self.entry_id = None
+        self.image_path = ""
 
         main_cont = ctk.CTkFrame(self, fg_color="transparent")
         main_cont.pack(fill="x", padx=15, pady=10)
@@ -105,35 +148,55 @@ class DataRow(ctk.CTkFrame):
         top_row = ctk.CTkFrame(main_cont, fg_color="transparent")
         top_row.pack(fill="x")
 
-        icon = get_category_icon(category)
-        info_str = f"{icon} {date}"
-        if km:
-            info_str += f"    {km} km"
-
-        ctk.CTkLabel(top_row, text=info_str, font=("Arial", 13, "bold")).pack(side="left")
+        self.info_lbl = ctk.CTkLabel(top_row, text="", font=("Arial", 13, "bold"))
+        self.info_lbl.pack(side="left")
 
         btn_f = ctk.CTkFrame(top_row, fg_color="transparent")
         btn_f.pack(side="right")
 
-        ctk.CTkLabel(btn_f, text=format_amount(amount),
-                     font=("Arial", 15, "bold")).pack(side="left", padx=20)
+        self.amount_lbl = ctk.CTkLabel(btn_f, text="", font=("Arial", 15, "bold"))
+        self.amount_lbl.pack(side="left", padx=20)
 
-        if image_path:
-            full_path = os.path.join(BASE_DIR, image_path)
-            ctk.CTkButton(btn_f, text="📷", width=30, height=30,
-                          fg_color="#f1f5f9", text_color="#10b981",
-                          command=lambda p=full_path: self._open_file(p)).pack(side="left", padx=2)
+        # Csak csatolt képnél látszik (show() csomagolja a szerkesztés gomb elé)
+        self.image_btn = ctk.CTkButton(btn_f, text="📷", width=30, height=30,
+                                       fg_color="#f1f5f9", text_color="#10b981",
+                                       command=lambda: self._open_file(
+                                           os.path.join(BASE_DIR, self.image_path)))
 
-        ctk.CTkButton(btn_f, text="📝", width=30, height=30,
-                      fg_color="#f1f5f9", text_color="#3b82f6",
-                      command=lambda: edit_callback(entry_id)).pack(side="left", padx=2)
+        self.edit_btn = ctk.CTkButton(btn_f, text="📝", width=30, height=30,
+                                      fg_color="#f1f5f9", text_color="#3b82f6",
+                                      command=lambda: edit_callback(self.entry_id))
+        self.edit_btn.pack(side="left", padx=2)
         if copy_callback:
             ctk.CTkButton(btn_f, text="📋", width=30, height=30,
                           fg_color="#f1f5f9", text_color="#8b5cf6",
-                          command=lambda: copy_callback(entry_id)).pack(side="left", padx=2)
+                          command=lambda: copy_callback(self.entry_id)).pack(side="left", padx=2)
         ctk.CTkButton(btn_f, text="🗑", width=30, height=30,
                       fg_color="#f1f5f9", text_color="#ef4444",
-                      command=lambda: delete_callback(entry_id)).pack(side="left", padx=2)
+                      command=lambda: delete_callback(self.entry_id)).pack(side="left", padx=2)
+
+        bottom_row = ctk.CTkFrame(main_cont, fg_color="transparent")
+        bottom_row.pack(fill="x", pady=(5, 0))
+        self.details_lbl = ctk.CTkLabel(bottom_row, text="", font=("Arial", 11),
+                                        text_color="#64748b", height=16)
+        self.details_lbl.pack(side="left", padx=(25, 0))
+
+    def show(self, entry_id, date, amount, km, category,
+             liter="", ar_l="", kut="", note="", image_path=""):
+        """A sor feltöltése egy bejegyzés adataival."""
+        self.entry_id = entry_id
+        self.image_path = image_path
+
+        info_str = f"{get_category_icon(category)} {date}"
+        if km:
+            info_str += f"    {km} km"
+        self.info_lbl.configure(text=info_str)
+        self.amount_lbl.configure(text=format_amount(amount))
+
+        if image_path and not self.image_btn.winfo_manager():
+            self.image_btn.pack(side="left", padx=2, before=self.edit_btn)
+        elif not image_path and self.image_btn.winfo_manager():
+            self.image_btn.pack_forget()
 
         details = []
         if category == "Tankolás" and liter:
@@ -144,12 +207,7 @@ class DataRow(ctk.CTkFrame):
             details.append(f"📍 {kut}")
         if note:
             details.append(f"💬 {note}")
-
-        if details:
-            bottom_row = ctk.CTkFrame(main_cont, fg_color="transparent")
-            bottom_row.pack(fill="x", pady=(5, 0))
-            ctk.CTkLabel(bottom_row, text="  |  ".join(details),
-                         font=("Arial", 11), text_color="#64748b").pack(side="left", padx=(25, 0))
+        self.details_lbl.configure(text="  |  ".join(details))
 
     @staticmethod
     def _open_file(path: str):
@@ -159,6 +217,203 @@ class DataRow(ctk.CTkFrame):
             messagebox.showwarning("Hiba", f"A fájl nem található:\n{path}")
 
 
+# =============================================================================
+# WindowedList – ablakos, lapozva töltött lista
+# =============================================================================
+
+class WindowedList(ctk.CTkFrame):
+    """
+    Görgethető lista, amely csak a látható sorokat (+ MARGIN tartalékot)
+    tartja widgetként. Görgetéskor ugyanazok a sor widgetek kapnak új
+    adatot (show_row), a további sorokat pedig fetch_page(utolsó_sor, db)
+    tölti be lapokban, amikor a görgetés a betöltött rész végéhez közelít.
+
+    make_row(parent) -> fix magasságú sor widget
+    show_row(widget, row) – a sor widget feltöltése
+    Írás után a sorok helyben javíthatók (upsert / remove), újratöltés nélkül.
+    """
+    PAGE_SIZE = 100
+    MARGIN = 2
+    ROW_PAD = 6
+    WHEEL_ROWS = 3
+
+    def __init__(self, parent, make_row, show_row, row_height, empty_text="", **kwargs):
+        super().__init__(parent, fg_color="transparent", **kwargs)
+        self._make_row = make_row
+        self._show_row = show_row
+        self._row_height = row_height
+        self._pitch = row_height + 2 * self.ROW_PAD
+        # A látható sorok widgetjei: görgetéskor / új tartalomnál újrakötődnek
+        self._slots = WidgetPool("DataRow", self._new_slot, self._bind_slot,
+                                 lambda slot: slot.winfo_manager() and slot.pack_forget())
+        self._rows = []
+        self._fetch = None
+        self._exhausted = True
+        self._order = None
+        self._top = 0
+
+        self.footer = ctk.CTkLabel(self, text="", text_color="gray", font=("Arial", 12))
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.body = ctk.CTkFrame(self, fg_color="transparent")
+        self.body.pack(side="left", fill="both", expand=True)
+        self.body.pack_propagate(False)
+        self.empty_label = ctk.CTkLabel(self.body, text=empty_text,
+                                        text_color="gray", font=("Arial", 13))
+
+        self.body.bind("<Configure>", lambda e: self._render())
+        self._bind_wheel(self.body)
+
+    # ------------------------------------------------------------------
+    # Tartalom
+    # ------------------------------------------------------------------
+
+    def set_source(self, fetch_page=None, rows=None, footer="", order=None):
+        """
+        Új tartalom: lapozó betöltő (fetch_page) vagy kész sorlista (rows).
+        order = (oszlop index, csökkenő): a sorok rendezése, az upsert ehhez
+        igazodik (None: pl. relevancia sorrend, ekkor csak helyben csere van).
+        A görgetés az elejére ugrik.
+        """
+        self._fetch = fetch_page
+        self._rows = list(rows or [])
+        self._exhausted = fetch_page is None
+        self._order = order
+        self._top = 0
+        if footer:
+            self.footer.configure(text=footer)
+            self.footer.pack(side="bottom", pady=10, before=self.scrollbar)
+        else:
+            self.footer.pack_forget()
+        self._render()
+
+    def _ensure_loaded(self, count: int):
+        while not self._exhausted and len(self._rows) < count:
+            page = self._fetch(self._rows[-1] if self._rows else None, self.PAGE_SIZE)
+            self._rows.extend(page)
+            if len(page) < self.PAGE_SIZE:
+                self._exhausted = True
+
+    @staticmethod
+    def _rank(key, entry_id):
+        # SQLite sorrend: a NULL a legkisebb érték, egyezésnél az id dönt
+        return (key is not None, key if key is not None else 0, entry_id)
+
+    def _index_of(self, entry_id) -> int | None:
+        for i, row in enumerate(self._rows):
+            if row[0] == entry_id:
+                return i
+        return None
+
+    def upsert(self, row):
+        """Új vagy módosított sor (row[0] = id) a rendezés szerinti helyére."""
+        old = self._index_of(row[0])
+        if self._order is None:
+            if old is not None:
+                self._rows[old] = row
+                self._render()
+            return
+        if old is not None:
+            del self._rows[old]
+
+        col, desc = self._order
+        new = self._rank(row[col], row[0])
+        if desc:
+            after = lambda i: self._rank(self._rows[i][col], self._rows[i][0]) < new
+        else:
+            after = lambda i: self._rank(self._rows[i][col], self._rows[i][0]) > new
+        pos = bisect.bisect_left(range(len(self._rows)), True, key=after)
+        # A betöltött rész mögé kerülő sort a következő lap hozza
+        if pos < len(self._rows) or self._exhausted:
+            self._rows.insert(pos, row)
+        self._render()
+
+    def remove(self, entry_id):
+        index = self._index_of(entry_id)
+        if index is not None:
+            del self._rows[index]
+            self._render()
+
+    # ------------------------------------------------------------------
+    # Megjelenítés
+    # ------------------------------------------------------------------
+
+    def _visible_rows(self) -> int:
+        height = self.body.winfo_height()
+        if height <= 1:
+            # Még nincs megjelenítve: egy képernyőnyi becslés
+            height = 600
+        return max(1, height // self._pitch)
+
+    def _render(self):
+        visible = self._visible_rows()
+        # Egy képernyőnyi előretöltés, hogy a görgetés ne a lekérdezésre várjon
+        self._ensure_loaded(self._top + 2 * visible + self.MARGIN)
+        self._top = max(0, min(self._top, len(self._rows) - visible))
+
+        # A látszó sorok mindig a készlet elején vannak, így a pack sorrend marad
+        self._slots.begin()
+        for row in self._rows[self._top:self._top + visible + self.MARGIN]:
+            self._slots.take(row)
+        self._slots.end()
+
+        if self._rows:
+            self.empty_label.pack_forget()
+        elif not self.empty_label.winfo_manager():
+            self.empty_label.pack(pady=30)
+
+        total = self._total()
+        if total:
+            self.scrollbar.set(self._top / total, min(1.0, (self._top + visible) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _new_slot(self):
+        slot = self._make_row(self.body)
+        self._bind_wheel(slot)
+        # A tényleges (skálázott) sormagasság
+        self._pitch = round(slot.winfo_reqheight() * (self._row_height + 2 * self.ROW_PAD)
+                            / self._row_height)
+        return slot
+
+    def _bind_slot(self, slot, row):
+        self._show_row(slot, row)
+        if not slot.winfo_manager():
+            slot.pack(fill="x", pady=self.ROW_PAD, padx=10)
+
+    def pool_stats(self) -> dict:
+        return self._slots.stats()
+
+    def _total(self) -> int:
+        # Amíg van még betöltetlen lap, egy képernyőnyivel többet jelzünk
+        return len(self._rows) + (0 if self._exhausted else self._visible_rows())
+
+    # ------------------------------------------------------------------
+    # Görgetés
+    # ------------------------------------------------------------------
+
+    def scroll_to(self, top: int):
+        if top != self._top:
+            self._top = max(0, top)
+            self._render()
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(value) * self._total()))
+        elif action == "scroll":
+            step = self._visible_rows() if unit == "pages" else 1
+            self.scroll_to(self._top + int(value) * step)
+
+    def _on_wheel(self, event):
+        # Windows/macOS: event.delta, Linux: Button-4 / Button-5
+        up = event.num == 4 or getattr(event, "delta", 0) > 0
+        self.scroll_to(self._top + (-self.WHEEL_ROWS if up else self.WHEEL_ROWS))
+
+    def _bind_wheel(self, widget):
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            bind_widget_tree(widget, seq, self._on_wheel)
+
+
 # =============================================================================
 # SearchFilterBar – keresés és szűrés sáv
 # =============================================================================
@@ -172,10 +427,20 @@ class SearchFilterBar(ctk.CTkFrame):
     """
 
     SORT_OPTIONS = ["Dátum (újabb)", "Dátum (régebbi)", "Összeg (nagyobb)", "Összeg (kisebb)", "KM állás"]
+    # Rendezés -> (oszlop, csökkenő) a lapozott listához (database.list_entries)
+    SORT_ORDERS = {
+        "Dátum (újabb)": ("datum", True),
+        "Dátum (régebbi)": ("datum", False),
+        "Összeg (nagyobb)": ("osszeg", True),
+        "Összeg (kisebb)": ("osszeg", False),
+        "KM állás": ("km_allas", True),
+    }
 
-    def __init__(self, parent, on_change_callback, **kwargs):
+    def __init__(self, parent, on_change_callback, debounce_ms=0, **kwargs):
         super().__init__(parent, fg_color="transparent", **kwargs)
         self.on_change = on_change_callback
+        self.debounce_ms = debounce_ms
+        self._after_id = None
         self._build()
 
     def _build(self):
@@ -184,7 +449,7 @@ class SearchFilterBar(ctk.CTkFrame):
         row1.pack(fill="x", pady=(0, 4))
 
         self.search_var = ctk.StringVar()
-        self.search_var.trace_add("write", self._notify)
+        self.search_var.trace_add("write", self._notify_later)
         ctk.CTkLabel(row1, text="🔍", font=("Arial", 14)).pack(side="left", padx=(0, 4))
         ctk.CTkEntry(row1, textvariable=self.search_var,
                      placeholder_text="Keresés (megjegyzés, helyszín...)",
@@ -213,22 +478,22 @@ class SearchFilterBar(ctk.CTkFrame):
         ctk.CTkLabel(self.filter_frame, text="Dátumtól:").pack(side="left", padx=(0, 4))
         self.date_from = ctk.CTkEntry(self.filter_frame, placeholder_text="ÉÉÉÉ.HH.NN", width=110)
         self.date_from.pack(side="left", padx=(0, 10))
-        self.date_from.bind("<KeyRelease>", lambda e: self._notify())
+        self.date_from.bind("<KeyRelease>", self._notify_later)
 
         ctk.CTkLabel(self.filter_frame, text="Dátumig:").pack(side="left", padx=(0, 4))
         self.date_to = ctk.CTkEntry(self.filter_frame, placeholder_text="ÉÉÉÉ.HH.NN", width=110)
         self.date_to.pack(side="left", padx=(0, 15))
-        self.date_to.bind("<KeyRelease>", lambda e: self._notify())
+        self.date_to.bind("<KeyRelease>", self._notify_later)
 
         ctk.CTkLabel(self.filter_frame, text="Min Ft:").pack(side="left", padx=(0, 4))
         self.amount_min = ctk.CTkEntry(self.filter_frame, placeholder_text="0", width=80)
         self.amount_min.pack(side="left", padx=(0, 10))
-        self.amount_min.bind("<KeyRelease>", lambda e: self._notify())
+        self.amount_min.bind("<KeyRelease>", self._notify_later)
 
         ctk.CTkLabel(self.filter_frame, text="Max Ft:").pack(side="left", padx=(0, 4))
         self.amount_max = ctk.CTkEntry(self.filter_frame, placeholder_text="∞", width=80)
         self.amount_max.pack(side="left")
-        self.amount_max.bind("<KeyRelease>", lambda e: self._notify())
+        self.amount_max.bind("<KeyRelease>", self._notify_later)
 
     def _toggle_filters(self):
         self.filter_visible = not self.filter_visible
@@ -239,7 +504,16 @@ class SearchFilterBar(ctk.CTkFrame):
             self.filter_frame.pack_forget()
             self.toggle_btn.configure(text="▾ Szűrők")
 
+    def _notify_later(self, *_):
+        """Gépelésnél: a változás csak debounce_ms szünet után jelez (a korábbi elmarad)."""
+        if self._after_id is not None:
+            self.after_cancel(self._after_id)
+        self._after_id = self.after(self.debounce_ms, self._notify)
+
     def _notify(self, *_):
+        if self._after_id is not None:
+            self.after_cancel(self._after_id)
+            self._after_id = None
         self.on_change(self.get_filters())
 
     def get_filters(self) -> dict:
@@ -267,20 +541,37 @@ class SearchFilterBar(ctk.CTkFrame):
         self.sort_var.set(self.SORT_OPTIONS[0])
         self._notify()
 
-    def apply_filters(self, rows: list[tuple]) -> list[tuple]:
+    def sort_order(self) -> tuple[str, bool]:
+        """A választott rendezés (oszlop, csökkenő) alakban."""
+        return self.SORT_ORDERS.get(self.sort_var.get(), ("datum", True))
+
+    def sql_filter(self) -> tuple[str, tuple]:
+        """
+        A dátum és összeg szűrők SQL feltételként (" AND ..." alakban) a
+        paramétereivel – ugyanaz, mint az apply_filters, csak az adatbázisban.
+        """
+        f = self.get_filters()
+        conds, params = [], []
+        if f["date_from"]:
+            conds.append("datum >= ?"); params.append(f["date_from"])
+        if f["date_to"]:
+            conds.append("datum <= ?"); params.append(f["date_to"])
+        if f["amount_min"] is not None:
+            conds.append("COALESCE(osszeg, 0) >= ?"); params.append(f["amount_min"])
+        if f["amount_max"] is not None:
+            conds.append("COALESCE(osszeg, 0) <= ?"); params.append(f["amount_max"])
+        return "".join(f" AND {c}" for c in conds), tuple(params)
+
+    def apply_filters(self, rows: list[tuple], ranked: bool = False) -> list[tuple]:
         """
         Szűri és rendezi az adatbázisból kapott sorokat.
         rows: [(id, datum, osszeg, km_allas, kategoria, liter, ar_l, kut, megj, kep), ...]
+        A szöveges keresést az adatbázis végzi (database.search_entries);
+        ranked=True esetén a relevancia sorrend megmarad, nincs rendezés.
         """
         f = self.get_filters()
         result = list(rows)
 
-        # Szöveges keresés (megjegyzés + helyszín)
-        if f["search"]:
-            result = [r for r in result if
-                      f["search"] in str(r[8] or "").lower() or
-                      f["search"] in str(r[7] or "").lower()]
-
         # Dátum szűrő
         if f["date_from"]:
             result = [r for r in result if str(r[1]) >= f["date_from"]]
@@ -294,7 +585,7 @@ class SearchFilterBar(ctk.CTkFrame):
             result = [r for r in result if (r[2] or 0) <= f["amount_max"]]
 
         # Rendezés
-        sort = f["sort"]
+        sort = None if ranked else f["sort"]
         if sort == "Dátum (újabb)":
             result.sort(key=lambda r: r[1] or "", reverse=True)
         elif sort == "Dátum (régebbi)":
@@ -440,12 +731,12 @@ class BackupPanel(ctk.CTkToplevel):
                 messagebox.showerror("Hiba", msg, parent=self)
 
     def _manual_backup(self):
-        import shutil
         from datetime import datetime
+        from backup_manager import copy_database
         ts = datetime.now().strftime("%Y%m%d_%H%M%S")
         dest = f"{self.bm.backup_dir}/manual_{ts}.db"
         try:
-            shutil.copy2(self.bm.db_path, dest)
+            copy_database(self.bm.db_path, dest)
             messagebox.showinfo("Siker", f"Backup elkészült:\n{dest}", parent=self)
             self._refresh_list()
         except Exception as e:
@@ -520,6 +811,14 @@ class SettingsPanel(ctk.CTkToplevel):
         self._labeled_entry(section4, "Alapértelmezett olajcsere periódus (km):",
                             "default_oil_interval", default=10000)
 
+        # Indítás
+        section5 = self._section("🚀 Indítás")
+        preload_row = ctk.CTkFrame(section5, fg_color="transparent")
+        preload_row.pack(fill="x", pady=5)
+        ctk.CTkLabel(preload_row, text="Grafikon és PDF modulok előtöltése:").pack(side="left")
+        self.preload_var = ctk.BooleanVar(value=self.config.get("preload_modules", True))
+        ctk.CTkSwitch(preload_row, variable=self.preload_var, text="").pack(side="right")
+
         # Gombok
         btn_f = ctk.CTkFrame(self, fg_color="transparent")
         btn_f.pack(pady=20)
@@ -562,6 +861,7 @@ class SettingsPanel(ctk.CTkToplevel):
         self.config.set("backup_keep_days", safe_int("backup_keep_days", 30))
         self.config.set("default_oil_interval", safe_int("default_oil_interval", 10000))
         self.config.set("auto_backup", self.auto_backup_var.get())
+        self.config.set("preload_modules", self.preload_var.get())
         self.config.set("appearance_mode", self.mode_var.get().lower())
         messagebox.showinfo("Mentve", "Beállítások elmentve!", parent=self)
         self.destroy()
@@ -680,10 +980,8 @@ class CategoryManagerPanel(ctk.CTkToplevel):
         self._build()
 
     def _get_db(self):
-        import sqlite3
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("PRAGMA foreign_keys = ON")
-        return conn
+        from connection_manager import ConnectionManager
+        return ConnectionManager.for_path(self.db_path).writer()
 
     def _build(self):
         ctk.CTkLabel(self, text="Kategóriák kezelése",
@@ -747,6 +1045,10 @@ class CategoryManagerPanel(ctk.CTkToplevel):
                               fg_color="#f1f5f9", text_color="#ef4444",
                               command=lambda c=cid, n=nev: self._delete_category(c, n)
                               ).pack(side="right", padx=8)
+                ctk.CTkButton(row, text="✏️", width=30, height=28,
+                              fg_color="#f1f5f9", text_color="#3b82f6",
+                              command=lambda c=cid, n=nev: self._rename_category(c, n)
+                              ).pack(side="right")
 
     def _add_category(self):
         nev = self.new_nev.get().strip()
@@ -768,11 +1070,27 @@ class CategoryManagerPanel(ctk.CTkToplevel):
         except Exception as e:
             messagebox.showerror("Hiba", f"Már létezik ilyen nevű kategória!\n{e}", parent=self)
 
+    def _rename_category(self, cid: int, nev: str):
+        uj_nev = ctk.CTkInputDialog(text=f"'{nev}' új neve:", title="Átnevezés").get_input()
+        uj_nev = (uj_nev or "").strip()
+        if not uj_nev or uj_nev == nev:
+            return
+        try:
+            # A bejegyzések kategoria_id-vel hivatkoznak, elég a kategória sort módosítani
+            with self._get_db() as conn:
+                conn.execute("UPDATE kategoriak SET nev=? WHERE id=? AND alap=0", (uj_nev, cid))
+        except Exception as e:
+            messagebox.showerror("Hiba", f"Már létezik ilyen nevű kategória!\n{e}", parent=self)
+            return
+        self._refresh_list()
+        if self.on_change:
+            self.on_change()
+
     def _delete_category(self, cid: int, nev: str):
         # Ellenőrzés: van-e bejegyzés ebben a kategóriában?
         with self._get_db() as conn:
             db_count = conn.execute(
-                "SELECT COUNT(*) FROM szerviz_adatok WHERE kategoria=?", (nev,)
+                "SELECT COUNT(*) FROM szerviz_adatok WHERE kategoria_id=?", (cid,)
             ).fetchone()[0]
 
         if db_count > 0:
@@ -784,7 +1102,10 @@ class CategoryManagerPanel(ctk.CTkToplevel):
             ):
                 return
             with self._get_db() as conn:
-                conn.execute("UPDATE szerviz_adatok SET kategoria='Egyéb' WHERE kategoria=?", (nev,))
+                conn.execute(
+                    "UPDATE szerviz_adatok SET kategoria_id=(SELECT id FROM kategoriak WHERE nev='Egyéb') "
+                    "WHERE kategoria_id=?", (cid,)
+                )
 
         with self._get_db() as conn:
             conn.execute("DELETE FROM kategoriak WHERE id=?", (cid,))
@@ -16,6 +16,14 @@ GitHub repó struktúra:
   /config.py
   /backup_manager.py
   /reminder_manager.py
+  /connection_manager.py
+  /search_manager.py
+  /data_events.py
+  /widget_pool.py
+  /theme.py
+  /stats_engine.py
+  /chart_renderer.py
+  /lazy_import.py
   /updater.py
   /CHANGELOG.md
 """
@@ -49,6 +57,14 @@ UPDATABLE_FILES = [
     "config.py",
     "backup_manager.py",
     "reminder_manager.py",
+    "connection_manager.py",
+    "search_manager.py",
+    "data_events.py",
+    "widget_pool.py",
+    "theme.py",
+    "stats_engine.py",
+    "chart_renderer.py",
+    "lazy_import.py",
     "updater.py",
     "CHANGELOG.md",
 ]
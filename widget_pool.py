@@ -0,0 +1,95 @@
+"""
+widget_pool.py
+--------------
+Widget újrahasznosító készlet mindkét felülethez (CustomTkinter és PyQt6).
+- Egy nézet frissítésekor a meglévő widgetek új adatot kapnak (bind),
+  csak a hiányzók készülnek el (make), a fölöslegesek elrejtődnek (hide)
+- A widgetek a létrehozás sorrendjében adódnak ki, így a layout / pack
+  sorrend frissítésről frissítésre ugyanaz marad
+- Statisztika készletenként: méret, használatban lévők, találati arány
+
+A készlet nem ismeri a keretrendszert: a make / bind / hide függvényeket
+a felület adja.
+"""
+
+import weakref
+
+# Név -> készlet (a statisztikához; a nézettel együtt megszűnő készlet kiesik)
+_pools: "weakref.WeakValueDictionary[str, WidgetPool]" = weakref.WeakValueDictionary()
+
+
+class WidgetPool:
+    """
+    Használat egy frissítésben:
+        pool.begin()
+        for adat in sorok:
+            widget = pool.take(*adat)    # újrakötött vagy új widget
+        pool.end()                       # a maradék elrejtése
+    """
+
+    def __init__(self, name: str, make, bind, hide=None):
+        self.name = name
+        self._make = make          # make() -> új widget
+        self._bind = bind          # bind(widget, *adat) – adat + megjelenítés
+        self._hide = hide          # hide(widget) – a kör végén fel nem használt
+        self._widgets = []
+        self._used = 0
+        self.hits = 0
+        self.misses = 0
+        _pools[f"{name}#{id(self)}"] = self
+
+    def begin(self):
+        """Új feltöltési kör: minden widget újra kiadható."""
+        self._used = 0
+
+    def take(self, *data):
+        """A következő szabad widget az adatokkal újrakötve (ha nincs, új készül)."""
+        if self._used < len(self._widgets):
+            widget = self._widgets[self._used]
+            self.hits += 1
+        else:
+            widget = self._make()
+            self._widgets.append(widget)
+            self.misses += 1
+        self._used += 1
+        self._bind(widget, *data)
+        return widget
+
+    def end(self):
+        """A körben fel nem használt widgetek elrejtése (nem törlődnek)."""
+        if self._hide is not None:
+            for widget in self._widgets[self._used:]:
+                self._hide(widget)
+
+    def in_use(self) -> list:
+        return self._widgets[:self._used]
+
+    def __len__(self) -> int:
+        return len(self._widgets)
+
+    def stats(self) -> dict:
+        """{size, in_use, hits, misses, hit_rate}"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._widgets),
+            "in_use": self._used,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+def pool_stats() -> dict:
+    """Az élő készletek statisztikája névenként összevonva."""
+    merged = {}
+    for pool in list(_pools.values()):
+        s = pool.stats()
+        m = merged.setdefault(pool.name, {"pools": 0, "size": 0, "in_use": 0,
+                                          "hits": 0, "misses": 0})
+        m["pools"] += 1
+        for k in ("size", "in_use", "hits", "misses"):
+            m[k] += s[k]
+    for m in merged.values():
+        total = m["hits"] + m["misses"]
+        m["hit_rate"] = round(m["hits"] / total, 3) if total else 0.0
+    return merged